@@ -1,8 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db.models import Case, Count, F, Value, When
+from django.utils import timezone
 
 from .models import (
     ContactMessage,
     FCLQuote,
+    LCLShipment,
     PackagingPrice,
     Price,
     ProductRequest,
@@ -14,6 +17,36 @@ from .models import (
 )
 
 
+# Statuses that are never advanced automatically
+FINAL_STATUSES = ("DELIVERED", "CANCELLED")
+
+
+def advance_to_next_status(queryset, status_choices, **extra_fields):
+    """
+    Move every row to the status that follows its current one, as one UPDATE
+
+    Args:
+        queryset: Rows to advance
+        status_choices: The model's ordered STATUS_CHOICES
+        extra_fields: Other fields to set in the same UPDATE
+
+    Returns:
+        Number of rows updated
+    """
+    flow = [code for code, _ in status_choices if code not in FINAL_STATUSES]
+    flow.append("DELIVERED")
+    next_status = Case(
+        *[
+            When(status=current, then=Value(following))
+            for current, following in zip(flow, flow[1:])
+        ],
+        default=F("status"),
+    )
+    return queryset.filter(status__in=flow[:-1]).update(
+        status=next_status, **extra_fields
+    )
+
+
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ("full_name", "email", "subject", "created_at", "is_read")
@@ -42,9 +75,14 @@ class FCLQuoteAdmin(admin.ModelAdmin):
         "number_of_containers",
         "created_at",
         "status",
+        "payment_status",
     )
+    list_select_related = ("user",)
+    show_full_result_count = False
+    actions = ("mark_paid", "advance_status")
     list_filter = (
         "status",
+        "payment_status",
         "container_type",
         "usage_type",
         "created_at",
@@ -123,6 +161,137 @@ class FCLQuoteAdmin(admin.ModelAdmin):
         ("Terms", {"fields": ("accepted_terms",)}),
     )
 
+    @admin.action(description="Mark selected quotes as paid")
+    def mark_paid(self, request, queryset):
+        """Mark quotes paid in full with a single UPDATE (same status change as confirm_fcl_quote_payment_view)"""
+        now = timezone.now()
+        unpaid = queryset.exclude(payment_status="paid")
+        unpriced = [
+            quote_number or f"#{quote_id}"
+            for quote_id, quote_number in unpaid.filter(
+                total_price__isnull=True
+            ).values_list("id", "quote_number")
+        ]
+        updated = unpaid.filter(total_price__isnull=False).update(
+            payment_status="paid",
+            amount_paid=F("total_price"),
+            payment_updated_at=now,
+            status=Case(
+                When(status__in=["CREATED", "OFFER_SENT"], then=Value("PENDING_PAYMENT")),
+                default=F("status"),
+            ),
+        )
+        self.message_user(request, f"{updated} quote(s) marked as paid.", messages.SUCCESS)
+        if unpriced:
+            self.message_user(
+                request,
+                f"{len(unpriced)} quote(s) skipped because they have no total price: {', '.join(unpriced)}",
+                messages.WARNING,
+            )
+
+    @admin.action(description="Advance selected quotes to the next status")
+    def advance_status(self, request, queryset):
+        updated = advance_to_next_status(queryset, FCLQuote.STATUS_CHOICES)
+        self.message_user(
+            request,
+            f"{updated} quote(s) moved to the next status (no customer notifications are sent).",
+            messages.SUCCESS,
+        )
+
+
+@admin.register(LCLShipment)
+class LCLShipmentAdmin(admin.ModelAdmin):
+    list_display = (
+        "shipment_number",
+        "user",
+        "direction",
+        "sender_name",
+        "receiver_name",
+        "status",
+        "payment_status",
+        "total_price",
+        "amount_paid",
+        "total_cbm",
+        "parcel_count",
+        "created_at",
+    )
+    list_filter = (
+        "status",
+        "payment_status",
+        "direction",
+        "shipment_type",
+        "payment_method",
+        "created_at",
+    )
+    search_fields = (
+        "shipment_number",
+        "tracking_number",
+        "sender_name",
+        "sender_email",
+        "receiver_name",
+        "receiver_phone",
+        "user__username",
+        "user__email",
+    )
+    list_select_related = ("user",)
+    show_full_result_count = False
+    raw_id_fields = ("user",)
+    readonly_fields = (
+        "shipment_number",
+        "total_cbm",
+        "total_weight_kg",
+        "chargeable_weight_kg",
+        "parcel_count",
+        "created_at",
+        "updated_at",
+        "paid_at",
+    )
+    date_hierarchy = "created_at"
+    actions = ("mark_paid", "advance_status", "generate_documents")
+
+    @admin.action(description="Mark selected shipments as paid")
+    def mark_paid(self, request, queryset):
+        """Mark shipments paid in full with a single UPDATE"""
+        now = timezone.now()
+        # update() skips auto_now; updated_at drives the dashboard rollup
+        updated = queryset.exclude(payment_status="paid").update(
+            payment_status="paid",
+            amount_paid=F("total_price"),
+            paid_at=now,
+            updated_at=now,
+            status=Case(
+                When(status="PENDING_PAYMENT", then=Value("PENDING_PICKUP")),
+                default=F("status"),
+            ),
+        )
+        self.message_user(
+            request, f"{updated} shipment(s) marked as paid.", messages.SUCCESS
+        )
+
+    @admin.action(description="Advance selected shipments to the next status")
+    def advance_status(self, request, queryset):
+        updated = advance_to_next_status(
+            queryset, LCLShipment.STATUS_CHOICES, updated_at=timezone.now()
+        )
+        self.message_user(
+            request,
+            f"{updated} shipment(s) moved to the next status (no customer notifications are sent).",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Generate invoices/receipts for selected shipments")
+    def generate_documents(self, request, queryset):
+        """Render the PDFs in the background; the page returns right away"""
+        from .document_service import generate_shipment_documents_in_background
+
+        shipment_ids = list(queryset.values_list("id", flat=True))
+        generate_shipment_documents_in_background(shipment_ids)
+        self.message_user(
+            request,
+            f"Generating documents for {len(shipment_ids)} shipment(s) in the background.",
+            messages.INFO,
+        )
+
 
 @admin.register(Price)
 class PriceAdmin(admin.ModelAdmin):
@@ -225,6 +394,7 @@ class ProductRequestAdmin(admin.ModelAdmin):
         "updated_at",
     )
     list_filter = ("status", "language", "created_at", "updated_at")
+    list_select_related = ("user",)
     search_fields = ("product_name", "user__username", "user__email")
     readonly_fields = ("created_at", "updated_at")
     list_editable = ("status",)
@@ -360,21 +530,35 @@ class CountryAdmin(admin.ModelAdmin):
         ),
     )
     
+    def get_queryset(self, request):
+        """Count cities and ports in the list query instead of per row"""
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                cities_total=Count("cities", distinct=True),
+                ports_total=Count("ports", distinct=True),
+            )
+        )
+
     def cities_count(self, obj):
         """Display count of cities for this country"""
-        return obj.cities.count()
+        return obj.cities_total
     cities_count.short_description = "Cities"
+    cities_count.admin_order_field = "cities_total"
     
     def ports_count(self, obj):
         """Display count of ports for this country"""
-        return obj.ports.count()
+        return obj.ports_total
     ports_count.short_description = "Ports"
+    ports_count.admin_order_field = "ports_total"
 
 
 @admin.register(City)
 class CityAdmin(admin.ModelAdmin):
     list_display = ("name_en", "name_ar", "country", "country_code")
     list_filter = ("country",)
+    list_select_related = ("country",)
     search_fields = ("name_en", "name_ar", "country__name_en", "country__code")
     ordering = ("country__name_en", "name_en")
     
@@ -398,6 +582,7 @@ class CityAdmin(admin.ModelAdmin):
 class PortAdmin(admin.ModelAdmin):
     list_display = ("name_en", "name_ar", "code", "country", "country_code")
     list_filter = ("country",)
+    list_select_related = ("country",)
     search_fields = ("name_en", "name_ar", "code", "country__name_en", "country__code")
     ordering = ("country__name_en", "name_en")
     
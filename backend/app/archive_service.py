@@ -0,0 +1,272 @@
+"""
+Archival of old, finished records
+
+Delivered/cancelled LCL shipments and FCL quotes, and read contact
+messages, older than a threshold are copied into ArchivedRecord and removed
+from the live tables, so lists and admin queries only touch current data.
+Their media (invoices, receipts, transfer slips, parcel photos, ...) are
+moved from MEDIA_ROOT to ARCHIVE_MEDIA_ROOT, which is not publicly served;
+archived files are downloaded through the authenticated archive API.
+"""
+
+import logging
+import shutil
+import time
+from datetime import timedelta
+from functools import reduce
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from django.conf import settings
+from django.core import serializers
+from django.db import models, transaction
+from django.utils import timezone
+
+from .image_derivatives import media_name_from_url, remove_derivatives
+from .models import ArchivedRecord, ContactMessage, FCLQuote, LCLShipment
+
+logger = logging.getLogger(__name__)
+
+FINAL_STATUSES = ("DELIVERED", "CANCELLED")
+
+# Parcel keys holding URLs of uploaded photos
+PARCEL_PHOTO_KEYS = ("device_photo_url", "electronics_picture_url")
+
+# Parcel photos stored or reused this recently are kept: the upload that
+# returned them may belong to a shipment that is not saved yet
+PHOTO_REUSE_GRACE = timedelta(hours=24)
+
+
+def archivable_queryset(record_type: str, older_than_days: int):
+    """
+    Records of a type that are due for archiving
+
+    Args:
+        record_type: One of ArchivedRecord.RECORD_TYPE_CHOICES
+        older_than_days: Minimum age in days (by created_at)
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    if record_type == "lcl_shipment":
+        return LCLShipment.objects.filter(
+            status__in=FINAL_STATUSES, created_at__lt=cutoff
+        )
+    if record_type == "fcl_quote":
+        return FCLQuote.objects.filter(
+            status__in=FINAL_STATUSES, created_at__lt=cutoff
+        ).prefetch_related("edit_request_messages")
+    if record_type == "contact_message":
+        return ContactMessage.objects.filter(is_read=True, created_at__lt=cutoff)
+    raise ValueError(f"Unknown record type: {record_type}")
+
+
+def _media_path(name: str) -> Optional[Path]:
+    """Absolute path of a media file, or None if it is outside MEDIA_ROOT"""
+    media_root = Path(settings.MEDIA_ROOT).resolve()
+    path = (media_root / name).resolve()
+    if not path.is_relative_to(media_root) or path == media_root:
+        return None
+    return path
+
+
+def _media_files(obj) -> List[Dict[str, str]]:
+    """Media files referenced by a record, as [{"field", "path"}]"""
+    files = []
+    for field in obj._meta.fields:
+        if isinstance(field, models.FileField):
+            file = getattr(obj, field.name)
+            if file and file.name:
+                files.append({"field": field.name, "path": file.name})
+
+    if isinstance(obj, LCLShipment):
+        for name in _parcel_photo_names(obj.parcels):
+            files.append({"field": "parcel_photo", "path": name})
+
+    return files
+
+
+def _parcel_photo_names(parcels) -> List[str]:
+    """Storage names of the photos referenced by a parcels JSON"""
+    names = []
+    for parcel in parcels or []:
+        if not isinstance(parcel, dict):
+            continue
+        urls = list(parcel.get("photo_urls") or [])
+        urls += [parcel.get(key) for key in PARCEL_PHOTO_KEYS]
+        for url in urls:
+            name = media_name_from_url(url)
+            if name:
+                names.append(name)
+    return names
+
+
+def _copy_to_cold_storage(files: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Copy media files to ARCHIVE_MEDIA_ROOT; returns the files copied"""
+    archive_root = Path(settings.ARCHIVE_MEDIA_ROOT)
+    copied = []
+    for file in files:
+        source = _media_path(file["path"])
+        if source is None or not source.is_file():
+            continue
+        target = archive_root / source.relative_to(Path(settings.MEDIA_ROOT).resolve())
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+        copied.append(file)
+    return copied
+
+
+def _referenced_photos(names: Set[str]) -> Set[str]:
+    """
+    Which of the given parcel photos live shipments still reference
+
+    Parcel photos are stored by content and may be shared by shipments. One
+    query fetches the parcels of the shipments that may mention any of the
+    names; the JSON is then matched exactly.
+    """
+    if not names:
+        return set()
+    mentions = reduce(
+        lambda q1, q2: q1 | q2,
+        (models.Q(parcels__icontains=Path(name).stem) for name in names),
+    )
+    referenced = set()
+    for parcels in (
+        LCLShipment.objects.filter(mentions)
+        .values_list("parcels", flat=True)
+        .iterator()
+    ):
+        referenced.update(
+            name for name in _parcel_photo_names(parcels) if name in names
+        )
+    return referenced
+
+
+def _recently_stored(path: Path) -> bool:
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return False
+    return age < PHOTO_REUSE_GRACE.total_seconds()
+
+
+def _remove_media(files: List[Dict[str, str]], removed: List[Dict[str, str]]) -> None:
+    """
+    Remove archived media from MEDIA_ROOT, keeping shared parcel photos that
+    are still referenced or were stored recently
+
+    Args:
+        files: Media files of the archived records
+        removed: Files removed so far are appended to it (also if this raises)
+    """
+    referenced = _referenced_photos(
+        {file["path"] for file in files if file["field"] == "parcel_photo"}
+    )
+    for file in files:
+        path = _media_path(file["path"])
+        if path is None:
+            continue
+        if file["field"] == "parcel_photo" and (
+            file["path"] in referenced or _recently_stored(path)
+        ):
+            continue
+        try:
+            path.unlink(missing_ok=True)
+            removed.append(file)
+            remove_derivatives(file["path"])
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove archived media {file['path']}: {e}")
+
+
+def _restore_media(files: List[Dict[str, str]]) -> None:
+    """Copy removed media back from cold storage (archive rolled back)"""
+    archive_root = Path(settings.ARCHIVE_MEDIA_ROOT)
+    for file in files:
+        target = _media_path(file["path"])
+        source = archive_root / target.relative_to(Path(settings.MEDIA_ROOT).resolve())
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, target)
+        except OSError as e:
+            logger.error(f"❌ Could not restore media {file['path']}: {e}")
+
+
+def _record_data(obj) -> dict:
+    data = serializers.serialize("python", [obj])[0]["fields"]
+    if isinstance(obj, FCLQuote):
+        data["edit_request_messages"] = [
+            {
+                "sender_id": message.sender_id,
+                "message": message.message,
+                "is_admin": message.is_admin,
+                "created_at": message.created_at,
+            }
+            for message in obj.edit_request_messages.all()
+        ]
+    return data
+
+
+def _archived_record(record_type: str, obj, files) -> ArchivedRecord:
+    if record_type == "lcl_shipment":
+        reference = obj.shipment_number or ""
+    elif record_type == "fcl_quote":
+        reference = obj.quote_number or ""
+    else:
+        reference = obj.subject
+    return ArchivedRecord(
+        record_type=record_type,
+        original_id=obj.id,
+        reference=reference[:255],
+        user_id=getattr(obj, "user_id", None),
+        status=getattr(obj, "status", ""),
+        created_at=obj.created_at,
+        data=_record_data(obj),
+        files=files,
+    )
+
+
+def archive_batch(record_type: str, objects) -> int:
+    """
+    Archive a batch of records in one transaction
+
+    Media are copied to cold storage first. They are removed from MEDIA_ROOT
+    at the end of the transaction, after the records are deleted, so the
+    check for shared parcel photos sees the same data as the delete; if the
+    transaction fails, the removed files are copied back.
+
+    Returns:
+        Number of records archived
+    """
+    objects = list(objects)
+    if not objects:
+        return 0
+
+    archived = []
+    moved_files = []
+    for obj in objects:
+        files = _copy_to_cold_storage(_media_files(obj))
+        moved_files.extend(files)
+        archived.append(_archived_record(record_type, obj, files))
+
+    removed_files = []
+    try:
+        with transaction.atomic():
+            ArchivedRecord.objects.bulk_create(archived)
+            type(objects[0]).objects.filter(id__in=[obj.id for obj in objects]).delete()
+            _remove_media(moved_files, removed_files)
+    except Exception:
+        _restore_media(removed_files)
+        raise
+
+    return len(archived)
+
+
+def archived_file_path(record: ArchivedRecord, index: int) -> Optional[Path]:
+    """Absolute cold storage path of the index-th file of an archived record"""
+    try:
+        file = record.files[index]
+    except (IndexError, KeyError, TypeError):
+        return None
+    archive_root = Path(settings.ARCHIVE_MEDIA_ROOT).resolve()
+    path = (archive_root / file["path"]).resolve()
+    if not path.is_relative_to(archive_root) or not path.is_file():
+        return None
+    return path
@@ -0,0 +1,49 @@
+"""
+Shared httpx.AsyncClient instances for the async views (ASGI mode)
+
+An AsyncClient keeps its connection pool on the event loop it was first
+used on, so one client per service is kept for each running loop (uvicorn
+workers run a single loop; tests and management commands may create more).
+httpx is only imported once an async view makes a request, so WSGI
+deployments run without it.
+"""
+
+import asyncio
+import weakref
+
+from django.conf import settings
+
+from .request_metrics import instrumented_async_transport
+
+# loop -> {service name: AsyncClient}
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client(name: str, **options):
+    """
+    AsyncClient of a service on the running event loop
+
+    Args:
+        name: Service name ('sendcloud', 'recaptcha', ...)
+        options: httpx.AsyncClient arguments used when the client is created
+            (e.g. auth, timeout)
+    """
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(name)
+    if client is None or client.is_closed:
+        max_connections = settings.ASYNC_HTTP_MAX_CONNECTIONS
+        client = httpx.AsyncClient(
+            transport=instrumented_async_transport(
+                service=name,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                ),
+            ),
+            **options,
+        )
+        clients[name] = client
+    return client
@@ -0,0 +1,374 @@
+"""
+Async views for the endpoints dominated by outbound HTTP calls
+
+In ASGI mode (SERVER_MODE=asgi, see backend/gunicorn.conf.py) urls.py routes
+the Sendcloud quote and label endpoints here instead of to their DRF views:
+while Sendcloud answers, the worker's event loop keeps serving other
+requests, so concurrency is bounded by connections rather than by the
+number of workers. DRF views are synchronous, so these are plain Django
+views with the same URLs, JWT authentication and response bodies.
+
+The reCAPTCHA-gated forms stay DRF views; with_recaptcha_precheck verifies
+their token asynchronously before handing the request to the view.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import traceback
+from concurrent.futures import Future
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+
+from .models import LCLShipment
+from .sendcloud_service import SendcloudAPIError, SendcloudValidationError
+
+logger = logging.getLogger(__name__)
+
+QUOTE_FIELDS = (
+    "sender_address",
+    "sender_city",
+    "sender_postal_code",
+    "sender_country",
+    "receiver_address",
+    "receiver_city",
+    "receiver_postal_code",
+    "receiver_country",
+    "weight",
+    "length",
+    "width",
+    "height",
+)
+
+OPTIONAL_QUOTE_FIELDS = ("length", "width", "height")
+
+
+async def _authenticate(request):
+    """User of the request's JWT access token, or None"""
+    from rest_framework.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def _unauthorized_response():
+    """401 as DRF sends it, so the frontend refreshes its access token"""
+    response = JsonResponse(
+        {"detail": "Authentication credentials were not provided."},
+        status=status.HTTP_401_UNAUTHORIZED,
+    )
+    response["WWW-Authenticate"] = 'Bearer realm="api"'
+    return response
+
+
+def _request_data(request):
+    """Body of a JSON or form POST as a dict, or None if it is malformed"""
+    if request.content_type != "application/json":
+        return request.POST.dict()
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@require_POST
+async def calculate_eu_shipping_view(request):
+    """
+    Async views.calculate_eu_shipping_view
+
+    POST /api/calculate-eu-shipping/
+    """
+    from .sendcloud_async import aget_shipping_methods
+    from .views.sendcloud import _apply_sendcloud_profit_margin
+
+    data = _request_data(request)
+    if data is None:
+        return JsonResponse(
+            {"success": False, "error": "Invalid request body"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        missing_fields = [
+            field
+            for field in QUOTE_FIELDS
+            if field not in OPTIONAL_QUOTE_FIELDS and not data.get(field)
+        ]
+        if missing_fields:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": f"Missing required fields: {', '.join(missing_fields)}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        shipping_methods = await aget_shipping_methods(
+            **{field: data.get(field) for field in QUOTE_FIELDS}
+        )
+
+        logger.info(
+            f"✅ Retrieved {len(shipping_methods)} shipping methods from Sendcloud"
+        )
+
+        await sync_to_async(_apply_sendcloud_profit_margin)(shipping_methods)
+
+        return JsonResponse({"success": True, "shipping_methods": shipping_methods})
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Validation error in calculate_eu_shipping: {str(e)}")
+        return JsonResponse(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SendcloudAPIError as e:
+        logger.error(f"Sendcloud API error in calculate_eu_shipping: {str(e)}")
+        return JsonResponse(
+            {
+                "success": False,
+                "error": "Unable to fetch shipping rates. Please try again.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in calculate_eu_shipping: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return JsonResponse(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@require_GET
+async def get_shipping_methods_simple_view(request):
+    """
+    Async views.get_shipping_methods_simple_view
+
+    GET /api/sendcloud/shipping-methods-simple/?weight=10&country=NL
+    """
+    from .sendcloud_async import aget_shipping_methods_simple
+    from .views.sendcloud import _apply_sendcloud_profit_margin
+
+    if await _authenticate(request) is None:
+        return _unauthorized_response()
+
+    try:
+        weight = request.GET.get("weight")
+        country = request.GET.get("country")
+
+        if not weight:
+            return JsonResponse(
+                {"success": False, "error": "Weight parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not country:
+            return JsonResponse(
+                {"success": False, "error": "Country parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            weight_float = float(weight)
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {"success": False, "error": "Invalid weight value"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        shipping_methods = await aget_shipping_methods_simple(
+            weight=weight_float, country=country
+        )
+
+        logger.info(
+            f"✅ Retrieved {len(shipping_methods)} shipping methods for weight={weight}kg, country={country}"
+        )
+
+        await sync_to_async(_apply_sendcloud_profit_margin)(shipping_methods)
+        # If profit calculation failed, use the base prices
+        for method in shipping_methods:
+            if "total_price" not in method:
+                method["total_price"] = method.get("price", 0)
+                method["profit_amount"] = 0
+                method["profit_margin_percent"] = 0
+
+        return JsonResponse({"success": True, "shipping_methods": shipping_methods})
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return JsonResponse(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SendcloudAPIError as e:
+        logger.error(f"Sendcloud API error: {str(e)}")
+        return JsonResponse(
+            {
+                "success": False,
+                "error": "Unable to fetch shipping methods. Please try again.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return JsonResponse(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@require_GET
+async def download_sendcloud_label_view(request, shipment_id):
+    """
+    Async views.download_sendcloud_label_view
+
+    GET /api/shipments/<shipment_id>/download-sendcloud-label/?type=normal_printer
+    """
+    from .protected_media import protected_file_response
+    from .sendcloud_labels import LABEL_CACHE_DIR, LABEL_TYPES, aget_label
+
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized_response()
+
+    try:
+        shipment = await LCLShipment.objects.filter(id=shipment_id).afirst()
+        if not shipment:
+            return JsonResponse(
+                {"success": False, "error": "Shipment not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        if not user.is_superuser and shipment.user_id != user.id:
+            return JsonResponse(
+                {"success": False, "error": "Permission denied"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if not shipment.sendcloud_id:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": "Shipment does not have a Sendcloud parcel",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        label_type = request.GET.get("type", "normal_printer")
+
+        filename = f"label_{shipment.shipment_number or shipment.id}_{label_type}.pdf"
+
+        # Labels already cached are sent by nginx (with ETag and Range support)
+        if settings.USE_X_ACCEL_REDIRECT and label_type in LABEL_TYPES:
+            response = protected_file_response(
+                f"{LABEL_CACHE_DIR}/{label_type}/{int(shipment.sendcloud_id)}.pdf",
+                filename=filename,
+                content_type="application/pdf",
+                as_attachment=True,
+            )
+            if response is not None:
+                logger.info(
+                    f"✅ Downloaded {label_type} label for shipment {shipment_id}"
+                )
+                return response
+
+        try:
+            label_content, etag = await aget_label(shipment.sendcloud_id, label_type)
+        except (SendcloudAPIError, SendcloudValidationError) as e:
+            logger.error(f"Failed to download label: {str(e)}")
+            return JsonResponse(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            return response
+
+        response = HttpResponse(label_content, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+
+        logger.info(f"✅ Downloaded {label_type} label for shipment {shipment_id}")
+        return response
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return JsonResponse(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+async def _precheck_recaptcha(token, action) -> dict:
+    """averify_recaptcha_token() within the RECAPTCHA_FAIL_OPEN_SECONDS budget"""
+    from .recaptcha_verify import averify_recaptcha_token
+
+    timeout = getattr(settings, "RECAPTCHA_FAIL_OPEN_SECONDS", 3.0)
+    # Shielded: after the budget the verification still finishes and caches
+    verification = asyncio.ensure_future(averify_recaptcha_token(token, action))
+    try:
+        return await asyncio.wait_for(
+            asyncio.shield(verification), timeout=timeout if timeout > 0 else None
+        )
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"⚠️ reCAPTCHA verification took longer than {timeout}s, accepting token (fail-open)"
+        )
+        return {"success": True, "fail_open": True}
+
+
+def with_recaptcha_precheck(view, action):
+    """
+    Verify the reCAPTCHA token of JSON submissions before a sync DRF view runs
+
+    The view then takes the result from the request (see
+    recaptcha_precheck_future) instead of waiting for Google in Django's
+    sync thread. Other requests (e.g. multipart) are passed through.
+
+    Args:
+        view: DRF view function (e.g. RegisterView.as_view())
+        action: reCAPTCHA action the view verifies against
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method == "POST" and request.content_type == "application/json":
+            data = _request_data(request) or {}
+            token = data.get("recaptcha_token")
+            if token and isinstance(token, str):
+                result = await _precheck_recaptcha(token, action)
+                request.recaptcha_precheck = (token, action, result)
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
+
+
+def recaptcha_precheck_future(request, token, action):
+    """
+    Completed Future of a with_recaptcha_precheck result for this token and
+    action, or None if the request was not prechecked
+    """
+    precheck = getattr(request, "recaptcha_precheck", None)
+    if not precheck or precheck[:2] != (token, action):
+        return None
+    future = Future()
+    future.set_result(precheck[2])
+    return future
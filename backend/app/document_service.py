@@ -10,6 +10,7 @@ import io
 import logging
 import os
 import re
+import threading
 from decimal import Decimal
 from typing import Dict, List, Optional
 
@@ -26,7 +27,18 @@ from docx.shared import Inches, Pt, RGBColor
 from weasyprint import CSS, HTML
 from weasyprint.text.fonts import FontConfiguration
 
-from .models import FCLQuote, LCLShipment, PackagingPrice, Price, SyrianProvincePrice
+from .image_derivatives import document_image_path
+from .models import (
+    FCLQuote,
+    LCLShipment,
+    NumberSequence,
+    PackagingPrice,
+    Parcel,
+    Price,
+    SyrianProvincePrice,
+)
+from .prometheus_metrics import instrument_document
+from .request_metrics import timed_function
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +55,11 @@ except ImportError:
     )
 
 
+def _document_generator(func):
+    """Record the render time of a generator (Server-Timing and Prometheus)"""
+    return timed_function("render")(instrument_document(func))
+
+
 def generate_barcode(shipment_number: str) -> Optional[str]:
     """
     Generate Code128 barcode for shipment number.
@@ -409,6 +426,7 @@ def get_company_info() -> Dict:
     }
 
 
+@_document_generator
 def generate_invoice(shipment: LCLShipment, language: str = "ar") -> bytes:
     """
     Generate invoice PDF for LCL shipment.
@@ -474,7 +492,7 @@ def generate_invoice(shipment: LCLShipment, language: str = "ar") -> bytes:
         signature_base64 = None
         if shipment.invoice_signature:
             try:
-                signature_path = shipment.invoice_signature.path
+                signature_path = document_image_path(shipment.invoice_signature)
                 if os.path.exists(signature_path):
                     with open(signature_path, "rb") as f:
                         signature_data = f.read()
@@ -525,6 +543,7 @@ def generate_invoice(shipment: LCLShipment, language: str = "ar") -> bytes:
         raise
 
 
+@_document_generator
 def generate_consolidated_export_invoice(
     shipment: LCLShipment, language: str = "en"
 ) -> bytes:
@@ -558,7 +577,6 @@ def generate_consolidated_export_invoice(
         total_cbm = 0.0
         total_packages = 0
         total_weight = 0.0
-        shipment_types = []
 
         for item in pricing.get("parcel_calculations", []):
             try:
@@ -575,18 +593,10 @@ def generate_consolidated_export_invoice(
             total_weight += weight_value * repeat_count
             total_packages += repeat_count
 
-            # Get shipment type from parcel
-            if shipment.parcels:
-                for parcel in shipment.parcels:
-                    if isinstance(parcel, dict):
-                        parcel_type = parcel.get("shipmentType") or parcel.get(
-                            "shipment_type"
-                        )
-                        if parcel_type:
-                            shipment_types.append(parcel_type)
-
         # Determine if shipment is personal, commercial, or mixed
-        unique_types = list(set(shipment_types))
+        unique_types = _parcel_shipment_types(
+            shipment, Parcel.shipment_types_by_shipment([shipment.id])
+        )
         is_personal_only = len(unique_types) == 1 and unique_types[0] == "personal"
         is_commercial_only = len(unique_types) == 1 and unique_types[0] == "commercial"
         is_mixed = len(unique_types) > 1
@@ -628,6 +638,7 @@ def generate_consolidated_export_invoice(
         raise
 
 
+@_document_generator
 def generate_packing_list(shipment: LCLShipment, language: str = "en") -> bytes:
     """
     Generate Packing List for LCL shipment.
@@ -679,7 +690,7 @@ def generate_packing_list(shipment: LCLShipment, language: str = "en") -> bytes:
         signature_base64 = None
         if shipment.invoice_signature:
             try:
-                signature_path = shipment.invoice_signature.path
+                signature_path = document_image_path(shipment.invoice_signature)
                 if os.path.exists(signature_path):
                     with open(signature_path, "rb") as f:
                         signature_data = f.read()
@@ -723,6 +734,7 @@ def generate_packing_list(shipment: LCLShipment, language: str = "en") -> bytes:
         raise
 
 
+@_document_generator
 def generate_consolidated_packing_list(
     shipments: List[LCLShipment], language: str = "en"
 ) -> bytes:
@@ -826,7 +838,7 @@ def generate_consolidated_packing_list(
         signature_base64 = None
         if shipments[0].invoice_signature:
             try:
-                signature_path = shipments[0].invoice_signature.path
+                signature_path = document_image_path(shipments[0].invoice_signature)
                 if os.path.exists(signature_path):
                     with open(signature_path, "rb") as f:
                         signature_data = f.read()
@@ -871,6 +883,7 @@ def generate_consolidated_packing_list(
         raise
 
 
+@_document_generator
 def generate_consolidated_packing_list_bulk(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -1015,6 +1028,7 @@ def generate_consolidated_packing_list_bulk(
         raise
 
 
+@_document_generator
 def generate_multiple_consolidated_packing_lists(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -1102,6 +1116,7 @@ def generate_multiple_consolidated_packing_lists(
         raise
 
 
+@_document_generator
 def generate_consolidated_export_invoice_bulk(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -1132,6 +1147,9 @@ def generate_consolidated_export_invoice_bulk(
         grand_total_weight = 0.0
         grand_total_value = 0.0
         all_shipment_types = []
+        types_by_shipment = Parcel.shipment_types_by_shipment(
+            [shipment.id for shipment in shipments]
+        )
 
         for shipment in shipments:
             # Reuse invoice pricing calculations
@@ -1142,7 +1160,6 @@ def generate_consolidated_export_invoice_bulk(
             total_packages = 0
             total_weight = 0.0
             total_value = 0.0
-            shipment_types = []
 
             for item in pricing.get("parcel_calculations", []):
                 try:
@@ -1165,16 +1182,7 @@ def generate_consolidated_export_invoice_bulk(
                     price_value = 0.0
                 total_value += price_value
 
-            # Get shipment types from parcels
-            if shipment.parcels:
-                for parcel in shipment.parcels:
-                    if isinstance(parcel, dict):
-                        parcel_type = parcel.get("shipmentType") or parcel.get(
-                            "shipment_type"
-                        )
-                        if parcel_type:
-                            shipment_types.append(parcel_type)
-
+            shipment_types = _parcel_shipment_types(shipment, types_by_shipment)
             all_shipment_types.extend(shipment_types)
 
             grand_total_cbm += total_cbm
@@ -1309,6 +1317,59 @@ def generate_consolidated_export_invoice_bulk(
         raise
 
 
+def shipment_totals_by_id(shipments: List[LCLShipment]) -> Dict[int, Dict]:
+    """
+    Total CBM and weight of each shipment, summed in SQL over the Parcel rows.
+    Shipments without Parcel rows (not backfilled yet) fall back to get_totals().
+
+    Args:
+        shipments: List of LCLShipment instances
+
+    Returns:
+        {shipment_id: {"cbm": float, "weight": float}}
+    """
+    totals = Parcel.totals_by_shipment([shipment.id for shipment in shipments])
+    result = {}
+    for shipment in shipments:
+        if shipment.id in totals:
+            result[shipment.id] = {
+                "cbm": float(totals[shipment.id]["cbm"] or 0),
+                "weight": float(totals[shipment.id]["weight"] or 0),
+            }
+        else:
+            shipment_totals = shipment.get_totals()
+            result[shipment.id] = {
+                "cbm": float(shipment_totals["total_cbm"]),
+                "weight": float(shipment_totals["total_weight_kg"]),
+            }
+    return result
+
+
+def _parcel_shipment_types(
+    shipment: LCLShipment, types_by_shipment: Dict
+) -> List[str]:
+    """
+    Distinct shipment types of a shipment's parcels
+
+    Args:
+        shipment: LCLShipment instance
+        types_by_shipment: Result of Parcel.shipment_types_by_shipment() for
+            the shipments being rendered; the parcels JSON is used for
+            shipments without Parcel rows
+    """
+    parcel_types = types_by_shipment.get(shipment.id)
+    if parcel_types is not None:
+        return list(parcel_types)
+
+    shipment_types = set()
+    for parcel in shipment.parcels or []:
+        if isinstance(parcel, dict):
+            parcel_type = parcel.get("shipmentType") or parcel.get("shipment_type")
+            if parcel_type:
+                shipment_types.add(parcel_type)
+    return list(shipment_types)
+
+
 def split_shipments_by_limits(
     shipments: List[LCLShipment],
     max_cbm: float = 65.0,
@@ -1332,27 +1393,12 @@ def split_shipments_by_limits(
     current_group = []
     current_cbm = 0.0
     current_weight = 0.0
+    totals = shipment_totals_by_id(shipments)
 
     for shipment in shipments:
-        # Calculate totals for this shipment
         try:
-            pricing = calculate_invoice_totals(shipment)
-            shipment_cbm = 0.0
-            shipment_weight = 0.0
-
-            for item in pricing.get("parcel_calculations", []):
-                try:
-                    cbm_value = float(item.get("cbm", 0) or 0)
-                except (TypeError, ValueError):
-                    cbm_value = 0.0
-                shipment_cbm += cbm_value
-
-                try:
-                    weight_value = float(item.get("weight", 0) or 0)
-                except (TypeError, ValueError):
-                    weight_value = 0.0
-                repeat_count = int(item.get("repeat_count", 1) or 1)
-                shipment_weight += weight_value * repeat_count
+            shipment_cbm = totals[shipment.id]["cbm"]
+            shipment_weight = totals[shipment.id]["weight"]
 
             # If this single shipment exceeds limits, we need to split it across multiple groups
             # Calculate how many groups this shipment needs
@@ -1421,6 +1467,7 @@ def split_shipments_by_limits(
     return groups
 
 
+@_document_generator
 def generate_multiple_consolidated_invoices(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -1454,9 +1501,12 @@ def generate_multiple_consolidated_invoices(
         zip_buffer = io.BytesIO()
         date_str = datetime.now().strftime("%Y%m%d")
 
+        # Reserve one invoice number per group from today's sequence
+        first_num = NumberSequence.next_value(f"INV-{date_str}", count=len(groups))
+
         try:
             with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-                for idx, group in enumerate(groups, start=1):
+                for idx, group in enumerate(groups, start=first_num):
                     # Generate invoice number for this group
                     invoice_number = f"INV-{date_str}-{idx:03d}"
 
@@ -1506,6 +1556,7 @@ def generate_multiple_consolidated_invoices(
         raise
 
 
+@_document_generator
 def generate_shipping_labels(
     shipment: LCLShipment, language: str = "ar", num_labels: Optional[int] = None
 ) -> bytes:
@@ -1839,6 +1890,7 @@ def save_invoice_to_storage(shipment: LCLShipment, pdf_bytes: bytes) -> str:
         raise
 
 
+@_document_generator
 def generate_receipt(shipment: LCLShipment, language: str = "en") -> bytes:
     """
     Generate receipt PDF for LCL shipment.
@@ -1908,7 +1960,7 @@ def generate_receipt(shipment: LCLShipment, language: str = "en") -> bytes:
         signature_base64 = None
         if shipment.invoice_signature:
             try:
-                signature_path = shipment.invoice_signature.path
+                signature_path = document_image_path(shipment.invoice_signature)
                 if os.path.exists(signature_path):
                     with open(signature_path, "rb") as f:
                         signature_data = f.read()
@@ -2152,6 +2204,7 @@ def _add_table_row(doc, cells_data, header=False, widths=None):
     return table
 
 
+@_document_generator
 def generate_packing_list_word(shipment: LCLShipment, language: str = "en") -> bytes:
     """
     Generate Packing List Word document for LCL shipment.
@@ -2586,6 +2639,7 @@ def generate_packing_list_word(shipment: LCLShipment, language: str = "en") -> b
         raise
 
 
+@_document_generator
 def generate_consolidated_export_invoice_word(
     shipment: LCLShipment, language: str = "en"
 ) -> bytes:
@@ -2811,7 +2865,6 @@ def generate_consolidated_export_invoice_word(
         total_cbm = 0.0
         total_packages = 0
         total_weight = 0.0
-        shipment_types = []
 
         for item in pricing.get("parcel_calculations", []):
             try:
@@ -2828,16 +2881,9 @@ def generate_consolidated_export_invoice_word(
             total_weight += weight_value * repeat_count
             total_packages += repeat_count
 
-            if shipment.parcels:
-                for parcel in shipment.parcels:
-                    if isinstance(parcel, dict):
-                        parcel_type = parcel.get("shipmentType") or parcel.get(
-                            "shipment_type"
-                        )
-                        if parcel_type:
-                            shipment_types.append(parcel_type)
-
-        unique_types = list(set(shipment_types))
+        unique_types = _parcel_shipment_types(
+            shipment, Parcel.shipment_types_by_shipment([shipment.id])
+        )
         is_personal_only = len(unique_types) == 1 and unique_types[0] == "personal"
         is_commercial_only = len(unique_types) == 1 and unique_types[0] == "commercial"
         is_mixed = len(unique_types) > 1
@@ -3030,6 +3076,7 @@ def generate_consolidated_export_invoice_word(
         raise
 
 
+@_document_generator
 def generate_consolidated_packing_list_word(
     shipments: List[LCLShipment], language: str = "en"
 ) -> bytes:
@@ -3394,6 +3441,7 @@ def generate_consolidated_packing_list_word(
         raise
 
 
+@_document_generator
 def generate_consolidated_export_invoice_bulk_word(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -3916,6 +3964,7 @@ def generate_consolidated_export_invoice_bulk_word(
         raise
 
 
+@_document_generator
 def generate_consolidated_packing_list_bulk_word(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -3936,6 +3985,7 @@ def generate_consolidated_packing_list_bulk_word(
     return generate_consolidated_packing_list_word(shipments, language)
 
 
+@_document_generator
 def generate_multiple_consolidated_packing_lists_word(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -3994,6 +4044,7 @@ def generate_multiple_consolidated_packing_lists_word(
         raise
 
 
+@_document_generator
 def generate_multiple_consolidated_invoices_word(
     shipments: List[LCLShipment],
     language: str = "en",
@@ -4024,9 +4075,10 @@ def generate_multiple_consolidated_invoices_word(
 
         zip_buffer = io.BytesIO()
         date_str = datetime.now().strftime("%Y%m%d")
+        first_num = NumberSequence.next_value(f"INV-{date_str}", count=len(groups))
 
         with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            for idx, group in enumerate(groups, start=1):
+            for idx, group in enumerate(groups, start=first_num):
                 invoice_number = f"INV-{date_str}-{idx:03d}"
                 docx_bytes = generate_consolidated_export_invoice_bulk_word(
                     group, language=language, invoice_number=invoice_number
@@ -4047,3 +4099,53 @@ def generate_multiple_consolidated_invoices_word(
             f"Error generating multiple consolidated invoices: {str(e)}", exc_info=True
         )
         raise
+
+
+def _generate_shipment_documents(shipment_ids: List[int], language: str) -> None:
+    from django.db import connection
+
+    try:
+        for shipment in LCLShipment.objects.filter(id__in=shipment_ids).order_by("id"):
+            try:
+                save_invoice_to_storage(
+                    shipment, generate_invoice(shipment, language=language)
+                )
+                if shipment.payment_status == "paid":
+                    save_receipt_to_storage(
+                        shipment, generate_receipt(shipment, language=language)
+                    )
+            except Exception as e:
+                logger.error(
+                    f"❌ Failed to generate documents for shipment {shipment.id}: {str(e)}",
+                    exc_info=True,
+                )
+
+        logger.info(f"✅ Generated documents for {len(shipment_ids)} shipments")
+    finally:
+        # Threads get their own connection; don't leave it open
+        connection.close()
+
+
+def generate_shipment_documents_in_background(
+    shipment_ids: List[int], language: str = "ar"
+) -> None:
+    """
+    Generate and store the invoice (and receipt for paid shipments) of
+    several shipments in a background thread
+
+    Used by the admin bulk action, so the request returns immediately while
+    the PDFs are rendered one by one.
+
+    Args:
+        shipment_ids: LCLShipment IDs
+        language: Document language ('ar' or 'en')
+    """
+    shipment_ids = list(shipment_ids)
+    if not shipment_ids:
+        return
+
+    threading.Thread(
+        target=_generate_shipment_documents,
+        args=(shipment_ids, language),
+        daemon=True,
+    ).start()
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.core.mail import send_mail
 from django.utils.html import strip_tags
 
+from .prometheus_metrics import instrument_email
+
 logger = logging.getLogger(__name__)
 
 # Status display names for emails (base names, direction-specific handled by function)
@@ -71,6 +73,7 @@ def get_status_display_name(status, direction=None):
     return status
 
 
+@instrument_email
 def send_status_update_email(quote, old_status, new_status, offer_message=None):
     """
     Send email notification to user when FCL quote status is updated
@@ -186,6 +189,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_status_update_notification_to_admin(
     quote, old_status, new_status, offer_message=None
 ):
@@ -320,6 +324,7 @@ You can view and manage this quote in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_edit_request_confirmation_to_user(quote, edit_message):
     """
     Send confirmation email to user when they request edit to an offer
@@ -419,6 +424,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_edit_request_notification(quote, edit_message):
     """
     Send email notification to admin when user requests edit to an offer
@@ -506,6 +512,7 @@ You can manage this quote in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_payment_reminder_notification_to_admin(quote):
     """
     Send email notification to admin when payment reminder is sent to user
@@ -619,6 +626,7 @@ A payment reminder email has been sent to the customer. You can track the paymen
         return False
 
 
+@instrument_email
 def send_payment_reminder_email(quote):
     """
     Send email reminder to user to complete payment
@@ -725,6 +733,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_lcl_shipment_status_update_email(shipment, old_status, new_status):
     """
     Send email notification to user when LCL shipment status is updated
@@ -846,6 +855,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_lcl_shipment_status_update_notification_to_admin(
     shipment, old_status, new_status
 ):
@@ -972,6 +982,7 @@ You can view and manage this shipment in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_lcl_shipment_confirmation_email(shipment):
     """
     Send confirmation email to user when a new LCL shipment is created
@@ -1100,6 +1111,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_lcl_shipment_notification_to_admin(shipment):
     """
     Send email notification to admin when a new LCL shipment is created
@@ -1224,6 +1236,7 @@ You can view and manage this shipment in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_lcl_shipment_payment_reminder_email(shipment):
     """
     Send email reminder to user to complete payment for LCL shipment
@@ -1337,6 +1350,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_lcl_shipment_payment_reminder_notification_to_admin(shipment):
     """
     Send email notification to admin when payment reminder is sent to user for LCL shipment
@@ -1455,6 +1469,7 @@ A payment reminder email has been sent to the customer. You can track the paymen
         return False
 
 
+@instrument_email
 def send_contact_form_notification(contact_message):
     """
     Send email notification to admin when a contact form is submitted
@@ -1539,6 +1554,7 @@ You can view and manage contact messages in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_fcl_quote_confirmation_email(quote):
     """
     Send confirmation email to user when a new FCL quote is submitted
@@ -1649,6 +1665,7 @@ contact@medo-freight.eu
         return False
 
 
+@instrument_email
 def send_fcl_quote_notification(quote):
     """
     Send email notification to admin when a new FCL quote is submitted
@@ -1781,6 +1798,7 @@ You can view and manage this quote in the admin dashboard.
         return False
 
 
+@instrument_email
 def send_invoice_email_to_user(shipment, pdf_bytes):
     """
     Send invoice PDF to user via email.
@@ -1887,6 +1905,7 @@ def send_invoice_email_to_user(shipment, pdf_bytes):
         return False
 
 
+@instrument_email
 def send_invoice_email_to_admin(shipment, pdf_bytes):
     """
     Send invoice PDF to admin via email.
@@ -1969,6 +1988,7 @@ def send_invoice_email_to_admin(shipment, pdf_bytes):
         return False
 
 
+@instrument_email
 def send_consolidated_export_invoice_email_to_admin(shipment, pdf_bytes):
     """
     Send Consolidated Export Invoice PDF to admin via email.
@@ -2049,6 +2069,7 @@ This document is for export/customs records only and is not shared with the cust
         return False
 
 
+@instrument_email
 def send_packing_list_email_to_admin(shipment, pdf_bytes):
     """
     Send Packing List PDF to admin via email.
@@ -2129,6 +2150,7 @@ This document is for cargo identification purposes only. All packages have been
         return False
 
 
+@instrument_email
 def send_shipping_labels_email_to_user(shipment, pdf_bytes, num_labels=None):
     """
     Send shipping labels PDF to user via email.
@@ -2233,6 +2255,7 @@ def send_shipping_labels_email_to_user(shipment, pdf_bytes, num_labels=None):
         return False
 
 
+@instrument_email
 def send_shipping_labels_email_to_admin(shipment, pdf_bytes, num_labels=None):
     """
     Send shipping labels PDF to admin via email.
@@ -2313,6 +2336,7 @@ def send_shipping_labels_email_to_admin(shipment, pdf_bytes, num_labels=None):
         return False
 
 
+@instrument_email
 def send_receipt_email_to_user(shipment, pdf_bytes):
     """
     Send receipt PDF to user via email.
@@ -2416,6 +2440,7 @@ def send_receipt_email_to_user(shipment, pdf_bytes):
         return False
 
 
+@instrument_email
 def send_receipt_email_to_admin(shipment, pdf_bytes):
     """
     Send receipt PDF to admin via email.
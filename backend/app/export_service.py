@@ -0,0 +1,241 @@
+"""
+Streaming CSV / XLSX export of shipments and quotes
+
+Rows are read with values_list().iterator(), so a server-side cursor feeds
+the response chunk by chunk and the queryset is never materialized. The
+XLSX writer produces the workbook XML row by row into a ZIP stream (no
+spreadsheet library needed), so memory stays constant for any row count.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import FCLQuote, LCLShipment
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (column header, values_list lookup)
+LCL_SHIPMENT_COLUMNS = (
+    ("ID", "id"),
+    ("Shipment Number", "shipment_number"),
+    ("Created At", "created_at"),
+    ("User", "user__username"),
+    ("Direction", "direction"),
+    ("Shipment Type", "shipment_type"),
+    ("Status", "status"),
+    ("Payment Method", "payment_method"),
+    ("Payment Status", "payment_status"),
+    ("Sender Name", "sender_name"),
+    ("Sender Country", "sender_country"),
+    ("Receiver Name", "receiver_name"),
+    ("Receiver Country", "receiver_country"),
+    ("Syrian Province", "syria_province"),
+    ("Parcels", "parcel_count"),
+    ("Total CBM", "total_cbm"),
+    ("Total Weight (kg)", "total_weight_kg"),
+    ("Chargeable Weight (kg)", "chargeable_weight_kg"),
+    ("Total Price (EUR)", "total_price"),
+    ("Amount Paid (EUR)", "amount_paid"),
+    ("Tracking Number", "tracking_number"),
+    ("Paid At", "paid_at"),
+)
+
+FCL_QUOTE_COLUMNS = (
+    ("ID", "id"),
+    ("Quote Number", "quote_number"),
+    ("Created At", "created_at"),
+    ("User", "user__username"),
+    ("Full Name", "full_name"),
+    ("Company", "company_name"),
+    ("Email", "email"),
+    ("Origin Country", "origin_country"),
+    ("Port of Loading", "port_of_loading"),
+    ("Destination Country", "destination_country"),
+    ("Port of Discharge", "port_of_discharge"),
+    ("Container Type", "container_type"),
+    ("Containers", "number_of_containers"),
+    ("Status", "status"),
+    ("Payment Status", "payment_status"),
+    ("Total Price (EUR)", "total_price"),
+    ("Amount Paid (EUR)", "amount_paid"),
+)
+
+EXPORTS = {
+    "lcl-shipments": (LCLShipment, LCL_SHIPMENT_COLUMNS),
+    "fcl-quotes": (FCLQuote, FCL_QUOTE_COLUMNS),
+}
+
+
+def export_rows(queryset, columns: Sequence[Tuple[str, str]]) -> Iterator[tuple]:
+    """Stream value tuples for the given columns without caching the queryset"""
+    lookups = [lookup for _, lookup in columns]
+    return (
+        queryset.order_by("id")
+        .values_list(*lookups)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+# Leading characters that make spreadsheet apps evaluate a CSV cell
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _format_value(value, escape_formulas=False):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if (
+        escape_formulas
+        and isinstance(value, str)
+        and value.startswith(_FORMULA_PREFIXES)
+    ):
+        # Customer supplied text (names, companies) must not run as a formula
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns the data instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header: Sequence[str], rows: Iterable[tuple]) -> Iterator[str]:
+    """
+    Yield CSV lines for a header and rows
+
+    Starts with a UTF-8 BOM so Excel detects the encoding (Arabic names).
+    Text cells that would be evaluated as formulas are prefixed with "'".
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(
+            [_format_value(value, escape_formulas=True) for value in row]
+        )
+
+
+class _ZipStream:
+    """Unseekable sink for zipfile; written bytes are collected for yielding"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+# Characters not allowed in XML 1.0 documents
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+_WORKBOOK_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+
+def _xlsx_cell(value) -> str:
+    value = _format_value(value)
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, Decimal):
+        return f"<c><v>{value:f}</v></c>"
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_INVALID_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(value) for value in values) + "</row>"
+
+
+def stream_xlsx(
+    header: Sequence[str], rows: Iterable[tuple], sheet_name: str = "Export"
+) -> Iterator[bytes]:
+    """
+    Yield an XLSX workbook with a single sheet, built row by row
+
+    Strings are written inline (no shared string table), so nothing has to
+    be kept in memory between rows.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES_XML)
+        archive.writestr("_rels/.rels", _ROOT_RELS_XML)
+        archive.writestr(
+            "xl/workbook.xml", _WORKBOOK_XML.format(name=escape(sheet_name[:31]))
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS_XML)
+        yield stream.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(header).encode("utf-8"))
+            for index, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                if index % EXPORT_CHUNK_SIZE == 0:
+                    yield stream.drain()
+            sheet.write(b"</sheetData></worksheet>")
+
+    yield stream.drain()
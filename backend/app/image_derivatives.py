@@ -0,0 +1,222 @@
+"""
+Thumbnails and web/document-sized variants of uploaded images
+
+Originals (parcel photos, transfer slips, invoice signatures) are kept as
+uploaded; smaller derivatives are generated with Pillow in a background
+thread after the upload and stored next to them under
+
+    derivatives/<variant>/<original name without extension>.<ext>
+
+Names are derived from the original, so no database field is needed: a
+derivative exists once the worker has written it, and callers fall back to
+the original until then.
+"""
+
+import io
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import unquote, urlparse
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_PREFIX = "derivatives"
+
+# variant -> (Pillow format, extension, longest side in pixels, save options)
+VARIANTS = {
+    # Dashboard lists and previews
+    "thumb": ("WEBP", "webp", 320, {"quality": 75, "method": 4}),
+    # Full-screen viewing in the browser
+    "web": (
+        "JPEG",
+        "jpg",
+        1600,
+        {"quality": 82, "optimize": True, "progressive": True},
+    ),
+    # Embedded in PDFs; PNG keeps the transparency of signatures
+    "document": ("PNG", "png", 600, {"optimize": True}),
+}
+
+PHOTO_VARIANTS = ("thumb", "web")
+SIGNATURE_VARIANTS = ("thumb", "document")
+
+
+def media_name_from_url(url) -> Optional[str]:
+    """Storage name of a /media/ URL (as stored in the parcels JSON)"""
+    if not isinstance(url, str):
+        return None
+    path = unquote(urlparse(url).path)
+    if not path.startswith(settings.MEDIA_URL):
+        return None
+    return path[len(settings.MEDIA_URL) :]
+
+
+def derivative_name(name: str, variant: str) -> str:
+    """Storage name of a variant of the original stored as `name`"""
+    extension = VARIANTS[variant][1]
+    return f"{DERIVATIVES_PREFIX}/{variant}/{os.path.splitext(name)[0]}.{extension}"
+
+
+def derivative_url(name: Optional[str], variant: str) -> Optional[str]:
+    """URL of a generated variant, or None if it does not exist (yet)"""
+    if not name:
+        return None
+    derivative = derivative_name(name, variant)
+    if not default_storage.exists(derivative):
+        return None
+    return default_storage.url(derivative)
+
+
+def derivative_urls(name: Optional[str], variants: Iterable[str]) -> Dict[str, str]:
+    """{variant: url} of the variants of an original that were generated"""
+    urls = {}
+    for variant in variants:
+        url = derivative_url(name, variant)
+        if url:
+            urls[variant] = url
+    return urls
+
+
+def _render(image: Image.Image, variant: str) -> bytes:
+    image_format, _, max_size, options = VARIANTS[variant]
+    image = image.copy()
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+    if image_format == "JPEG":
+        if image.mode in ("RGBA", "LA", "P"):
+            # Flatten transparency on white instead of black
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+    elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+        image = image.convert("RGBA")
+
+    output = io.BytesIO()
+    image.save(output, image_format, **options)
+    return output.getvalue()
+
+
+def _write(name: str, data: bytes) -> None:
+    """Store a derivative, replacing an existing one atomically"""
+    try:
+        path = Path(default_storage.path(name))
+    except NotImplementedError:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(data))
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def generate_derivatives(
+    name: str, variants: Iterable[str] = PHOTO_VARIANTS, force: bool = False
+) -> Dict[str, str]:
+    """
+    Generate the variants of a stored image
+
+    Args:
+        name: Storage name of the original
+        variants: Variant names from VARIANTS
+        force: Regenerate variants that already exist
+
+    Returns:
+        {variant: storage name} of the variants that exist afterwards;
+        empty if the original is missing or not an image (e.g. a PDF slip)
+    """
+    variants = [
+        variant
+        for variant in variants
+        if force or not default_storage.exists(derivative_name(name, variant))
+    ]
+    if variants:
+        try:
+            with default_storage.open(name, "rb") as original:
+                with Image.open(original) as image:
+                    # Let the JPEG decoder downscale while decoding
+                    largest = max(VARIANTS[variant][2] for variant in variants)
+                    image.draft("RGB", (largest, largest))
+                    image = ImageOps.exif_transpose(image)
+                    for variant in variants:
+                        _write(derivative_name(name, variant), _render(image, variant))
+        except FileNotFoundError:
+            logger.warning(f"⚠️ Image {name} not found, no derivatives generated")
+            return {}
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            logger.info(f"Skipping derivatives of {name}: {str(e)}")
+            return {}
+
+    return {
+        variant: derivative_name(name, variant)
+        for variant in VARIANTS
+        if default_storage.exists(derivative_name(name, variant))
+    }
+
+
+def remove_derivatives(name: str) -> None:
+    """Delete all variants of an original"""
+    for variant in VARIANTS:
+        derivative = derivative_name(name, variant)
+        try:
+            if default_storage.exists(derivative):
+                default_storage.delete(derivative)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not remove derivative {derivative}: {e}")
+
+
+def document_image_path(field_file) -> Optional[str]:
+    """
+    Filesystem path of the image to embed in a PDF for an ImageField
+
+    The document-sized variant is generated on demand if the background
+    worker has not produced it yet; the original is used if that fails.
+    """
+    if not field_file:
+        return None
+    name = field_file.name
+    if "document" in generate_derivatives(name, ("document",)):
+        return default_storage.path(derivative_name(name, "document"))
+    return field_file.path
+
+
+def _generate_in_background(jobs) -> None:
+    for name, variants in jobs:
+        try:
+            generate_derivatives(name, variants)
+        except Exception as e:
+            logger.error(f"❌ Failed to generate derivatives of {name}: {str(e)}")
+
+
+def generate_derivatives_in_background(names, variants=PHOTO_VARIANTS) -> None:
+    """
+    Generate the variants of several stored images in a background thread
+
+    Args:
+        names: Storage names of the originals
+        variants: Variant names from VARIANTS
+    """
+    jobs = [(name, tuple(variants)) for name in names if name]
+    if not jobs:
+        return
+
+    threading.Thread(target=_generate_in_background, args=(jobs,), daemon=True).start()
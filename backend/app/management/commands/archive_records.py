@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.app.archive_service import archivable_queryset, archive_batch
+from backend.app.models import ArchivedRecord
+
+RECORD_TYPES = [record_type for record_type, _ in ArchivedRecord.RECORD_TYPE_CHOICES]
+
+
+class Command(BaseCommand):
+    help = (
+        "Move delivered/cancelled shipments and quotes and read contact messages "
+        "older than a threshold into the archive (media to cold storage)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help=f"Minimum age in days (default: {settings.ARCHIVE_AFTER_DAYS})",
+        )
+        parser.add_argument(
+            "--type",
+            action="append",
+            dest="record_types",
+            choices=RECORD_TYPES,
+            help="Only archive this record type (can be repeated)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Records archived per transaction (default: 100)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many records would be archived",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+
+        for record_type in options["record_types"] or RECORD_TYPES:
+            queryset = archivable_queryset(record_type, options["older_than_days"])
+
+            if options["dry_run"]:
+                self.stdout.write(
+                    f"{record_type}: {queryset.count()} records would be archived"
+                )
+                continue
+
+            last_id = 0
+            archived = 0
+            while True:
+                batch = list(queryset.filter(id__gt=last_id).order_by("id")[:batch_size])
+                if not batch:
+                    break
+                archived += archive_batch(record_type, batch)
+                last_id = batch[-1].id
+
+            self.stdout.write(
+                self.style.SUCCESS(f"{record_type}: archived {archived} records")
+            )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.app.models import LCLShipment, PackagingPrice, Parcel, Price
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Parcel table from the parcels JSON of every LCL shipment"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of shipments processed per transaction (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+
+        # Parcels reference products/packaging by ID; look the valid IDs up once
+        product_ids = set(Price.objects.values_list("id", flat=True))
+        packaging_ids = set(PackagingPrice.objects.values_list("id", flat=True))
+
+        last_id = 0
+        shipment_count = 0
+        parcel_count = 0
+        while True:
+            shipments = list(
+                LCLShipment.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "parcels")[:batch_size]
+            )
+            if not shipments:
+                break
+
+            rows = []
+            for shipment in shipments:
+                rows.extend(
+                    Parcel.rows_for_shipment(shipment, product_ids, packaging_ids)
+                )
+
+            with transaction.atomic():
+                Parcel.objects.filter(
+                    shipment_id__in=[shipment.id for shipment in shipments]
+                ).delete()
+                Parcel.objects.bulk_create(rows, batch_size=1000)
+
+            last_id = shipments[-1].id
+            shipment_count += len(shipments)
+            parcel_count += len(rows)
+            self.stdout.write(f"Processed {shipment_count} shipments...")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Backfilled {parcel_count} parcels for {shipment_count} shipments"
+            )
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from backend.app.models import LCLShipment
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored parcel totals of every LCL shipment"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of shipments updated per query (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+
+        last_id = 0
+        shipment_count = 0
+        while True:
+            shipments = list(
+                LCLShipment.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "parcels")[:batch_size]
+            )
+            if not shipments:
+                break
+
+            now = timezone.now()
+            for shipment in shipments:
+                for field, value in shipment.compute_totals().items():
+                    setattr(shipment, field, value)
+                shipment.updated_at = now
+
+            # bulk_update skips save() and auto_now: Parcel rows are untouched
+            # (see backfill_parcels), updated_at is set so the dashboard rollup
+            # picks the new totals up
+            LCLShipment.objects.bulk_update(
+                shipments, [*LCLShipment.TOTAL_FIELDS, "updated_at"]
+            )
+
+            last_id = shipments[-1].id
+            shipment_count += len(shipments)
+            self.stdout.write(f"Processed {shipment_count} shipments...")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Backfilled totals for {shipment_count} shipments")
+        )
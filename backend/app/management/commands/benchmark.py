@@ -0,0 +1,525 @@
+import json
+import math
+import platform
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import resolve
+from django.utils import timezone
+
+from backend.app.models import (
+    FCLQuote,
+    LCLShipment,
+    PackagingPrice,
+    Parcel,
+    Price,
+    SyrianProvincePrice,
+)
+
+# Synthetic data per scale: products, packaging options, users, LCL shipments,
+# parcels per shipment and FCL quotes
+SCALES = {
+    "small": dict(
+        products=20, packaging=5, users=5, shipments=50, parcels=3, quotes=50
+    ),
+    "medium": dict(
+        products=100, packaging=10, users=20, shipments=500, parcels=5, quotes=500
+    ),
+    "large": dict(
+        products=300, packaging=20, users=100, shipments=5000, parcels=10, quotes=5000
+    ),
+}
+
+# (name, URL, user) of the timed list endpoints; user is "admin", "user" or None
+LIST_ENDPOINTS = (
+    ("lcl_shipments_admin", "/api/shipments/list/", "admin"),
+    ("lcl_shipments_admin_summary", "/api/shipments/list/?view=summary", "admin"),
+    ("lcl_shipments_user", "/api/shipments/list/", "user"),
+    ("fcl_quotes_admin", "/api/fcl/quotes/", "admin"),
+    ("fcl_quotes_admin_summary", "/api/fcl/quotes/?view=summary", "admin"),
+    ("fcl_quotes_user", "/api/fcl/quotes/", "user"),
+    ("prices", "/api/prices/", None),
+    ("packaging_prices", "/api/packaging-prices/", None),
+    ("archived_records", "/api/archive/", "admin"),
+)
+
+# document_service generators as (name, takes a list of shipments)
+DOCUMENT_GENERATORS = (
+    ("generate_invoice", False),
+    ("generate_receipt", False),
+    ("generate_packing_list", False),
+    ("generate_packing_list_word", False),
+    ("generate_shipping_labels", False),
+    ("generate_consolidated_export_invoice", False),
+    ("generate_consolidated_export_invoice_word", False),
+    ("generate_consolidated_packing_list", True),
+    ("generate_consolidated_packing_list_word", True),
+    ("generate_consolidated_packing_list_bulk", True),
+    ("generate_consolidated_packing_list_bulk_word", True),
+    ("generate_consolidated_export_invoice_bulk", True),
+    ("generate_consolidated_export_invoice_bulk_word", True),
+    ("generate_multiple_consolidated_packing_lists", True),
+    ("generate_multiple_consolidated_packing_lists_word", True),
+    ("generate_multiple_consolidated_invoices", True),
+    ("generate_multiple_consolidated_invoices_word", True),
+)
+
+# Shipments passed to the generators taking a list
+DOCUMENT_SHIPMENTS = 10
+
+
+def seed(scale, rng):
+    """
+    Create the synthetic catalog, users, shipments and quotes
+
+    Rows are bulk created with explicit numbers (no NumberSequence), totals
+    and Parcel rows as LCLShipment.save() would compute them.
+
+    Returns:
+        Dict with the created admin user, a regular user, products and packaging
+    """
+    products = Price.objects.bulk_create(
+        Price(
+            ar_item=f"منتج {i}",
+            en_item=f"Product {i}",
+            price_per_kg=Decimal(rng.randint(2, 15)),
+            minimum_shipping_weight=Decimal(1),
+            minimum_shipping_unit="per_piece" if i % 5 == 0 else "per_kg",
+            one_cbm=Decimal(rng.randint(150, 400)),
+            hs_code=f"{8400 + i:04d}.00",
+        )
+        for i in range(scale["products"])
+    )
+    packaging = PackagingPrice.objects.bulk_create(
+        PackagingPrice(
+            ar_option=f"تغليف {i}",
+            en_option=f"Packaging {i}",
+            dimension=f"{40 + i}x40x40",
+            price=Decimal(rng.randint(2, 20)),
+        )
+        for i in range(scale["packaging"])
+    )
+    SyrianProvincePrice.objects.bulk_create(
+        SyrianProvincePrice(
+            province_code=f"P{i}",
+            province_name_ar=f"محافظة {i}",
+            province_name_en=f"Province {i}",
+            min_price=Decimal(10),
+            rate_per_kg=Decimal("0.5"),
+            display_order=i,
+        )
+        for i in range(14)
+    )
+
+    admin = User.objects.create_superuser("benchmark-admin", "admin@example.com")
+    users = User.objects.bulk_create(
+        User(username=f"benchmark-user-{i}", email=f"user{i}@example.com")
+        for i in range(scale["users"])
+    )
+
+    product_ids = {product.id for product in products}
+    packaging_ids = {option.id for option in packaging}
+    statuses = [code for code, _ in LCLShipment.STATUS_CHOICES]
+    shipments = []
+    for i in range(scale["shipments"]):
+        shipment = LCLShipment(
+            user=users[i % len(users)],
+            shipment_number=f"LCL-BENCH-{i:06d}",
+            direction="eu-sy",
+            shipment_type="personal",
+            sender_name=f"Sender {i}",
+            sender_email=f"sender{i}@example.com",
+            sender_phone="+31600000000",
+            sender_address=f"Street {i}",
+            sender_city="Amsterdam",
+            sender_country="NL",
+            receiver_name=f"Receiver {i}",
+            receiver_email=f"receiver{i}@example.com",
+            receiver_phone="+963900000000",
+            receiver_address=f"Street {i}",
+            receiver_city="Damascus",
+            receiver_country="SY",
+            parcels=[
+                _parcel(rng, products, packaging) for _ in range(scale["parcels"])
+            ],
+            status=statuses[i % len(statuses)],
+            total_price=Decimal(rng.randint(100, 5000)),
+        )
+        for field, value in shipment.compute_totals().items():
+            setattr(shipment, field, value)
+        shipments.append(shipment)
+    shipments = LCLShipment.objects.bulk_create(shipments, batch_size=500)
+    Parcel.objects.bulk_create(
+        (
+            row
+            for shipment in shipments
+            for row in Parcel.rows_for_shipment(shipment, product_ids, packaging_ids)
+        ),
+        batch_size=1000,
+    )
+
+    FCLQuote.objects.bulk_create(
+        (
+            FCLQuote(
+                user=users[i % len(users)],
+                quote_number=f"FCL-BENCH-{i:06d}",
+                origin_country="NL",
+                origin_city="Rotterdam",
+                port_of_loading="Rotterdam",
+                destination_country="SY",
+                destination_city="Latakia",
+                port_of_discharge="Latakia",
+                container_type="40ft_standard",
+                cargo_ready_date=date.today() + timedelta(days=i % 30),
+                commodity_type="General cargo",
+                usage_type="commercial",
+                total_weight=Decimal(rng.randint(1000, 20000)),
+                total_volume=Decimal(rng.randint(10, 60)),
+                cargo_value=Decimal(rng.randint(1000, 90000)),
+                full_name=f"Customer {i}",
+                country="NL",
+                phone="+31600000000",
+                email=f"customer{i}@example.com",
+                preferred_contact="email",
+            )
+            for i in range(scale["quotes"])
+        ),
+        batch_size=500,
+    )
+
+    return {
+        "admin": admin,
+        "user": users[0],
+        "products": products,
+        "packaging": packaging,
+    }
+
+
+def _parcel(rng, products, packaging):
+    """One parcel of the parcels JSON as the frontend sends it"""
+    length, width, height = (rng.randint(20, 120) for _ in range(3))
+    return {
+        "productCategory": rng.choice(products).id,
+        "packagingType": rng.choice(packaging).id,
+        "shipmentType": "personal",
+        "weight": rng.randint(1, 80),
+        "length": length,
+        "width": width,
+        "height": height,
+        "cbm": round(length * width * height / 1_000_000, 4),
+        "repeatCount": rng.randint(1, 3),
+        "wantsInsurance": rng.random() < 0.2,
+        "declaredShipmentValue": rng.randint(50, 2000),
+    }
+
+
+def _api(method, path, user=None, data=None):
+    """Call the view routed at a URL the way a client would, rendered"""
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    request = getattr(APIRequestFactory(), method)(path, data=data, format="json")
+    if user is not None:
+        force_authenticate(request, user=user)
+    match = resolve(path.split("?")[0])
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    if response.status_code >= 400:
+        raise CommandError(f"{method.upper()} {path} answered {response.status_code}")
+    return response
+
+
+def benchmarks(data, rng, pricing_parcels):
+    """
+    (name, callable) pairs of the timed hot paths, and {name: reason} of the
+    ones that cannot run here
+    """
+    user = data["user"]
+    pricing_request = {
+        "parcels": [
+            _parcel(rng, data["products"], data["packaging"])
+            for _ in range(pricing_parcels)
+        ],
+        "language": "en",
+    }
+
+    cases = [
+        (
+            "pricing.calculate_pricing_view",
+            lambda: _api("post", "/api/calculate-pricing/", data=pricing_request),
+        )
+    ]
+    for name, path, as_user in LIST_ENDPOINTS:
+        cases.append(
+            (
+                f"list.{name}",
+                lambda path=path, as_user=as_user: _api(
+                    "get", path, user=data[as_user] if as_user else None
+                ),
+            )
+        )
+
+    skipped = {}
+    try:
+        from backend.app import document_service
+    except Exception as e:  # weasyprint needs system libraries (pango)
+        reason = f"document_service unavailable: {type(e).__name__}: {e}"
+        skipped["pricing.calculate_invoice_totals"] = reason
+        skipped["pricing.split_shipments_by_limits"] = reason
+        skipped["documents.*"] = reason
+        return cases, skipped
+
+    shipments = list(LCLShipment.objects.order_by("id"))
+    user_shipments = [s for s in shipments if s.user_id == user.id] or shipments
+    cases.append(
+        (
+            "pricing.calculate_invoice_totals",
+            lambda: [
+                document_service.calculate_invoice_totals(shipment)
+                for shipment in user_shipments
+            ],
+        )
+    )
+    cases.append(
+        (
+            "pricing.split_shipments_by_limits",
+            lambda: document_service.split_shipments_by_limits(shipments),
+        )
+    )
+
+    for function_name, takes_list in DOCUMENT_GENERATORS:
+        function = getattr(document_service, function_name)
+        argument = shipments[:DOCUMENT_SHIPMENTS] if takes_list else user_shipments[0]
+        cases.append(
+            (
+                f"documents.{function_name}",
+                lambda function=function, argument=argument: function(argument),
+            )
+        )
+
+    return cases, skipped
+
+
+def measure(function, repeat, warmup=1):
+    """Timing statistics (ms) and query count of repeated calls"""
+    for _ in range(warmup):
+        function()
+
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = len(captured.captured_queries)
+
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p95_ms": round(timings[max(math.ceil(len(timings) * 0.95) - 1, 0)], 3),
+        "max_ms": round(timings[-1], 3),
+        "queries": queries,
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Compare results with a baseline run
+
+    A benchmark regresses when its median is more than `tolerance` (fraction)
+    and `min_delta_ms` slower than the baseline, or when it runs more queries.
+
+    Returns:
+        (lines to print, names of the regressed benchmarks)
+    """
+    lines = []
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            lines.append(f"  {name}: {result['median_ms']:.2f} ms (new)")
+            continue
+
+        delta = result["median_ms"] - before["median_ms"]
+        change = delta / before["median_ms"] if before["median_ms"] else 0.0
+        slower = change > tolerance and delta > min_delta_ms
+        more_queries = result["queries"] > before["queries"]
+        flag = ""
+        if slower or more_queries:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        lines.append(
+            f"  {name}: {result['median_ms']:.2f} ms vs {before['median_ms']:.2f} ms "
+            f"({change:+.0%}), queries {result['queries']} vs {before['queries']}{flag}"
+        )
+
+    for name in sorted(set(baseline) - set(results)):
+        lines.append(f"  {name}: not run (in baseline)")
+    return lines, regressions
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the pricing, document and list hot paths on synthetic data in a "
+        "throwaway test database; print JSON and optionally compare it with a "
+        "saved baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            choices=sorted(SCALES),
+            default="small",
+            help="Size of the synthetic data set (default: small)",
+        )
+        for name in ("products", "users", "shipments", "parcels", "quotes"):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                help=f"Override the number of {name} of the scale",
+            )
+        parser.add_argument(
+            "--pricing-parcels",
+            type=int,
+            default=10,
+            help="Parcels in the timed pricing request (default: 10)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timed runs per benchmark, after one warm-up run (default: 5)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Random seed of the synthetic data (default: 1)",
+        )
+        parser.add_argument(
+            "--only",
+            help="Run only benchmarks whose name contains this text (e.g. list.)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON results to this file instead of stdout",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="JSON results of an earlier run to compare with; exits with an "
+            "error when a benchmark regressed",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed slowdown of the median against the baseline (default: 0.25)",
+        )
+        parser.add_argument(
+            "--min-delta-ms",
+            type=float,
+            default=2.0,
+            help="Ignore slowdowns smaller than this many ms (default: 2)",
+        )
+
+    def handle(self, *args, **options):
+        scale = dict(SCALES[options["scale"]])
+        for name in scale:
+            if options.get(name) is not None:
+                scale[name] = max(options[name], 1)
+
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(Path(options["baseline"]).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+        # Seeding and timing happen in a fresh test database, so production
+        # data, number sequences and row locks are never touched. The test
+        # environment also keeps emails in memory and allows the test host.
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            rng = random.Random(options["seed"])
+            started = time.perf_counter()
+            data = seed(scale, rng)
+            seed_seconds = time.perf_counter() - started
+            self.stderr.write(f"Seeded {scale} in {seed_seconds:.1f}s")
+
+            cases, skipped = benchmarks(data, rng, options["pricing_parcels"])
+            results = {}
+            for name, function in cases:
+                if options["only"] and options["only"] not in name:
+                    continue
+                results[name] = measure(function, max(options["repeat"], 1))
+                self.stderr.write(f"{name}: {results[name]['median_ms']:.2f} ms")
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "scale": options["scale"],
+                "data": scale,
+                "seed": options["seed"],
+                "repeat": options["repeat"],
+                "pricing_parcels": options["pricing_parcels"],
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "database": connection.vendor,
+                "debug": settings.DEBUG,
+            },
+            "results": results,
+            "skipped": skipped,
+        }
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+            self.stderr.write(f"Results written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline is None:
+            return
+
+        if baseline.get("meta", {}).get("data") != scale:
+            self.stderr.write(
+                "⚠️ Baseline was recorded with different data sizes; "
+                "timings are not comparable"
+            )
+        lines, regressions = compare(
+            results,
+            baseline.get("results", {}),
+            options["tolerance"],
+            options["min_delta_ms"],
+        )
+        self.stderr.write("Compared with baseline:")
+        for line in lines:
+            self.stderr.write(line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}"
+            )
@@ -0,0 +1,97 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker does before it can answer its first request
+WORKER_BOOT = (
+    "import backend.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+
+def _scenarios():
+    """name -> command line, each run in a fresh interpreter"""
+    return {
+        "worker_boot": [sys.executable, "-c", WORKER_BOOT],
+        "manage_check": [
+            sys.executable,
+            str(Path(settings.BASE_DIR) / "manage.py"),
+            "check",
+        ],
+    }
+
+
+def _run(command, importtime=False):
+    """Wall time of a command in seconds, and its stderr"""
+    env = dict(os.environ)
+    if importtime:
+        env["PYTHONPROFILEIMPORTTIME"] = "1"
+    started = time.perf_counter()
+    result = subprocess.run(
+        command,
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise CommandError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+    return elapsed, result.stderr
+
+
+def slowest_imports(importtime_output, count):
+    """(cumulative microseconds, module) of the slowest imports"""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start time of a worker (WSGI app + URLconf) and of "
+        "manage.py, each in fresh interpreters"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=5,
+            help="Runs per scenario (default: 5)",
+        )
+        parser.add_argument(
+            "--imports",
+            type=int,
+            default=0,
+            help="Also list the N slowest imports (with dependencies) of each scenario",
+        )
+
+    def handle(self, *args, **options):
+        runs = max(options["runs"], 1)
+
+        for name, command in _scenarios().items():
+            # The first run warms the OS file cache and writes .pyc files
+            _run(command)
+            timings = [_run(command)[0] for _ in range(runs)]
+            self.stdout.write(
+                f"{name}: median {statistics.median(timings) * 1000:.0f} ms, "
+                f"min {min(timings) * 1000:.0f} ms ({runs} runs)"
+            )
+
+            if options["imports"]:
+                _, output = _run(command, importtime=True)
+                for cumulative, module in slowest_imports(output, options["imports"]):
+                    self.stdout.write(f"  {cumulative / 1000:8.1f} ms  {module}")
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.app.upload_sessions import cleanup_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete upload sessions (and their partial files) not touched for a while"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=settings.UPLOAD_SESSION_EXPIRY_HOURS,
+            help="Age in hours after which sessions are removed "
+            "(default: UPLOAD_SESSION_EXPIRY_HOURS)",
+        )
+
+    def handle(self, *args, **options):
+        deleted = cleanup_expired_sessions(options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} upload sessions"))
@@ -0,0 +1,149 @@
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.app.models import FCLQuote, LCLShipment
+
+# Plans that read a whole table instead of an index
+FULL_SCAN_PATTERNS = (
+    re.compile(r"Seq Scan on \"?app_"),  # PostgreSQL
+    re.compile(r"SCAN app_\w+(?!\w| USING)"),  # SQLite
+)
+
+
+def hot_queries():
+    """
+    The queries the API and admin run most, as (name, queryset) pairs
+
+    Lookup values are taken from existing rows so the planner sees
+    realistic selectivity.
+    """
+    user = User.objects.filter(is_superuser=False).order_by("id").first()
+    user_id = user.id if user else 0
+    session_id = (
+        LCLShipment.objects.exclude(stripe_session_id="")
+        .values_list("stripe_session_id", flat=True)
+        .first()
+        or "cs_test"
+    )
+    payment_id = (
+        FCLQuote.objects.exclude(payment_id__isnull=True)
+        .values_list("payment_id", flat=True)
+        .first()
+        or "cs_test"
+    )
+
+    return [
+        (
+            "lcl_user_list",
+            LCLShipment.objects.filter(user_id=user_id).order_by("-created_at")[:20],
+        ),
+        (
+            "lcl_admin_page",
+            LCLShipment.objects.order_by("-created_at", "-id")[:20],
+        ),
+        (
+            "lcl_by_status",
+            LCLShipment.objects.filter(status="READY_FOR_EXPORT").order_by(
+                "-created_at"
+            )[:20],
+        ),
+        (
+            "lcl_unpaid",
+            LCLShipment.objects.exclude(payment_status="paid").order_by("-created_at")[
+                :20
+            ],
+        ),
+        (
+            "lcl_by_direction",
+            LCLShipment.objects.filter(direction="eu-sy").order_by("-created_at")[:20],
+        ),
+        (
+            "lcl_stripe_session",
+            LCLShipment.objects.filter(stripe_session_id=session_id),
+        ),
+        (
+            "lcl_sendcloud_id",
+            LCLShipment.objects.filter(sendcloud_id=1),
+        ),
+        (
+            "lcl_shipment_number",
+            LCLShipment.objects.filter(shipment_number="LCL-20250101-0001"),
+        ),
+        (
+            "fcl_user_list",
+            FCLQuote.objects.filter(user_id=user_id).order_by("-created_at", "-id")[
+                :20
+            ],
+        ),
+        (
+            "fcl_by_status",
+            FCLQuote.objects.filter(status="CREATED").order_by("-created_at")[:20],
+        ),
+        (
+            "fcl_payment_id",
+            FCLQuote.objects.filter(payment_id=payment_id),
+        ),
+        (
+            "fcl_unpaid",
+            FCLQuote.objects.exclude(payment_status="paid").order_by("-created_at")[
+                :20
+            ],
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Print EXPLAIN plans of the hot API/admin queries and flag full table scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run EXPLAIN ANALYZE (PostgreSQL only; executes the queries)",
+        )
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Only explain the named query (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        queries = hot_queries()
+        if options["queries"]:
+            unknown = set(options["queries"]) - {name for name, _ in queries}
+            if unknown:
+                raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}")
+            queries = [(name, qs) for name, qs in queries if name in options["queries"]]
+
+        explain_options = {}
+        if options["analyze"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--analyze is only supported on PostgreSQL")
+            explain_options = {"analyze": True, "buffers": True}
+
+        full_scans = []
+        for name, queryset in queries:
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan)
+            self.stdout.write("")
+            if any(pattern.search(plan) for pattern in FULL_SCAN_PATTERNS):
+                full_scans.append(name)
+
+        if full_scans:
+            # Expected on small tables, where the planner prefers a scan
+            self.stdout.write(
+                self.style.WARNING(
+                    f"⚠️ Full table scan in: {', '.join(full_scans)} "
+                    f"(normal for small tables; re-check on production data)"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ All {len(queries)} queries use an index")
+            )
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand
+
+from backend.app.image_derivatives import (
+    PHOTO_VARIANTS,
+    SIGNATURE_VARIANTS,
+    generate_derivatives,
+    media_name_from_url,
+)
+from backend.app.models import LCLShipment
+
+PARCEL_PHOTO_KEYS = ("device_photo_url", "electronics_picture_url")
+
+
+def shipment_images(shipment):
+    """(storage name, variants) of every image of a shipment"""
+    images = []
+    if shipment.transfer_slip:
+        images.append((shipment.transfer_slip.name, PHOTO_VARIANTS))
+    if shipment.invoice_signature:
+        images.append((shipment.invoice_signature.name, SIGNATURE_VARIANTS))
+    for parcel in shipment.parcels or []:
+        if not isinstance(parcel, dict):
+            continue
+        urls = list(parcel.get("photo_urls") or [])
+        urls += [parcel.get(key) for key in PARCEL_PHOTO_KEYS]
+        for url in urls:
+            name = media_name_from_url(url)
+            if name:
+                images.append((name, PHOTO_VARIANTS))
+    return images
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumbnails and web/document variants of shipment images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of shipments loaded per query (default: 200)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants that already exist",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options["batch_size"], 1)
+
+        last_id = 0
+        shipment_count = 0
+        image_count = 0
+        seen = set()
+        while True:
+            shipments = list(
+                LCLShipment.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "parcels", "transfer_slip", "invoice_signature")[
+                    :batch_size
+                ]
+            )
+            if not shipments:
+                break
+
+            for shipment in shipments:
+                for name, variants in shipment_images(shipment):
+                    # Content-addressed photos can be shared by shipments
+                    if name in seen:
+                        continue
+                    seen.add(name)
+                    if generate_derivatives(name, variants, force=options["force"]):
+                        image_count += 1
+
+            last_id = shipments[-1].id
+            shipment_count += len(shipments)
+            self.stdout.write(f"Processed {shipment_count} shipments...")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Derivatives available for {image_count} images of "
+                f"{shipment_count} shipments"
+            )
+        )
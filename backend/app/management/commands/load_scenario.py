@@ -0,0 +1,462 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.app.management.commands.benchmark import _parcel
+from backend.app.models import PackagingPrice, Price
+from backend.app.request_metrics import percentile
+
+# Steps of one customer flow, in order; a flow stops at its first failed step
+STEPS = (
+    "quote",
+    "eu_shipping",
+    "create_shipment",
+    "checkout",
+    "payment_webhook",
+    "invoice",
+)
+
+# Sendcloud only accepts parcels up to this weight
+MAX_EU_SHIPPING_WEIGHT = 30
+
+PICKUP_ADDRESS = {
+    "address": "Damrak",
+    "house_number": "12",
+    "city": "Amsterdam",
+    "postal_code": "1012LG",
+    "country": "NL",
+}
+
+
+class StepFailed(Exception):
+    pass
+
+
+def catalog(stdout):
+    """Products and packaging options of the quotes; created if there are none"""
+    products = list(Price.objects.all()[:50])
+    packaging = list(PackagingPrice.objects.all()[:10])
+    if not products:
+        products = Price.objects.bulk_create(
+            Price(
+                ar_item=f"منتج اختبار {i}",
+                en_item=f"Load test product {i}",
+                price_per_kg=Decimal(5 + i),
+                minimum_shipping_weight=Decimal(1),
+                minimum_shipping_unit="per_kg",
+                one_cbm=Decimal(250),
+                hs_code=f"{9900 + i:04d}.00",
+            )
+            for i in range(5)
+        )
+        stdout.write(f"Created {len(products)} load test products")
+    if not packaging:
+        packaging = PackagingPrice.objects.bulk_create(
+            PackagingPrice(
+                ar_option=f"تغليف اختبار {i}",
+                en_option=f"Load test packaging {i}",
+                dimension="40x40x40",
+                price=Decimal(5 + i),
+            )
+            for i in range(3)
+        )
+        stdout.write(f"Created {len(packaging)} load test packaging options")
+    return products, packaging
+
+
+def virtual_users(count):
+    """(user, JWT access token) of the load test accounts"""
+    accounts = []
+    for i in range(count):
+        user, created = User.objects.get_or_create(
+            username=f"loadtest-{i}", defaults={"email": f"loadtest-{i}@example.com"}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save(update_fields=["password"])
+        accounts.append((user, str(RefreshToken.for_user(user).access_token)))
+    return accounts
+
+
+class Scenario:
+    """
+    One customer flow against a running app whose external services are the
+    stubs (SERVICE_STUBS_URL): quote, EU shipping rates, shipment, Stripe
+    checkout, payment webhook (Sendcloud parcel), invoice (document + emails)
+    """
+
+    def __init__(self, base_url, stubs_url, parcels, products, packaging, timeout):
+        self.base_url = base_url
+        self.stubs_url = stubs_url
+        self.parcels = parcels
+        self.products = products
+        self.packaging = packaging
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(Counter)
+
+    def _record(self, step, started, error=None):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.timings[step].append(elapsed)
+            if error is not None:
+                self.errors[step][error] += 1
+
+    def _fail(self, step, error):
+        """Count an error of a step whose request itself succeeded"""
+        with self._lock:
+            self.errors[step][error] += 1
+        raise StepFailed(step)
+
+    def _call(self, step, session, method, url, **kwargs):
+        """Timed request; raises StepFailed unless it answered 2xx"""
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException as e:
+            self._record(step, started, type(e).__name__)
+            raise StepFailed(step)
+        if response.status_code >= 300:
+            try:
+                detail = str(response.json().get("error", ""))[:100]
+            except ValueError:
+                detail = ""
+            self._record(step, started, f"HTTP {response.status_code} {detail}".strip())
+            raise StepFailed(step)
+        self._record(step, started)
+        return response
+
+    def run(self, session, user, rng):
+        """
+        One flow for a user
+
+        Returns:
+            True if every step succeeded
+        """
+        api = f"{self.base_url}/api"
+        parcels = [
+            _parcel(rng, self.products, self.packaging) for _ in range(self.parcels)
+        ]
+        weight = min(
+            sum(parcel["weight"] * parcel["repeatCount"] for parcel in parcels),
+            MAX_EU_SHIPPING_WEIGHT,
+        )
+
+        try:
+            quote = self._call(
+                "quote",
+                session,
+                "post",
+                f"{api}/calculate-pricing/",
+                json={"parcels": parcels, "language": "en"},
+            ).json()
+
+            methods = self._call(
+                "eu_shipping",
+                session,
+                "post",
+                f"{api}/calculate-eu-shipping/",
+                json={
+                    "sender_address": PICKUP_ADDRESS["address"],
+                    "sender_city": PICKUP_ADDRESS["city"],
+                    "sender_postal_code": PICKUP_ADDRESS["postal_code"],
+                    "sender_country": PICKUP_ADDRESS["country"],
+                    "receiver_address": "Waalhaven",
+                    "receiver_city": "Rotterdam",
+                    "receiver_postal_code": "3089JH",
+                    "receiver_country": "NL",
+                    "weight": weight,
+                },
+            ).json()["shipping_methods"]
+            if not methods:
+                self._fail("eu_shipping", "no shipping methods")
+            method = methods[0]
+            total = round(float(quote["totalPrice"]) + float(method["price"]), 2)
+
+            shipment = self._call(
+                "create_shipment",
+                session,
+                "post",
+                f"{api}/shipments/",
+                json={
+                    "direction": "eu-sy",
+                    "shipment_type": "personal",
+                    "sender_name": user.username,
+                    "sender_email": user.email,
+                    "sender_phone": "+31600000000",
+                    "sender_address": f"{PICKUP_ADDRESS['address']} {PICKUP_ADDRESS['house_number']}",
+                    "sender_city": PICKUP_ADDRESS["city"],
+                    "sender_postal_code": PICKUP_ADDRESS["postal_code"],
+                    "sender_country": PICKUP_ADDRESS["country"],
+                    "receiver_name": f"Receiver of {user.username}",
+                    "receiver_email": user.email,
+                    "receiver_phone": "+963900000000",
+                    "receiver_address": "Baghdad Street 1",
+                    "receiver_city": "Damascus",
+                    "receiver_country": "SY",
+                    "parcels": parcels,
+                    "total_price": total,
+                    "payment_method": "stripe",
+                    "eu_pickup_name": user.username,
+                    "eu_pickup_address": PICKUP_ADDRESS["address"],
+                    "eu_pickup_house_number": PICKUP_ADDRESS["house_number"],
+                    "eu_pickup_city": PICKUP_ADDRESS["city"],
+                    "eu_pickup_postal_code": PICKUP_ADDRESS["postal_code"],
+                    "eu_pickup_country": PICKUP_ADDRESS["country"],
+                    "eu_pickup_email": user.email,
+                    "eu_pickup_telephone": "+31600000000",
+                    "eu_pickup_weight": weight,
+                    "selected_eu_shipping_method": method["id"],
+                    "selected_eu_shipping_name": method["name"],
+                    # Unique, so the app does not answer from its token cache
+                    "recaptcha_token": f"stub:create_shipment:{uuid.uuid4().hex}",
+                },
+            ).json()
+
+            checkout = self._call(
+                "checkout",
+                session,
+                "post",
+                f"{api}/shipments/create-checkout-session/",
+                json={"shipment_id": shipment["id"], "amount": total},
+            ).json()
+
+            # The stub marks the session paid and delivers the signed webhook,
+            # answering once the app has processed it
+            paid = self._call(
+                "payment_webhook",
+                session,
+                "post",
+                f"{self.stubs_url}/stripe/_stubs/checkout/{checkout['session_id']}/pay",
+            ).json()
+            if paid.get("webhook_status") != 200:
+                self._fail(
+                    "payment_webhook", f"webhook answered {paid.get('webhook_status')}"
+                )
+
+            self._call(
+                "invoice",
+                session,
+                "get",
+                f"{api}/shipments/{shipment['id']}/invoice/",
+                params={"language": "en"},
+            )
+        except StepFailed:
+            return False
+        except (KeyError, TypeError, ValueError) as e:
+            with self._lock:
+                self.errors["unexpected_response"][repr(e)[:100]] += 1
+            return False
+        return True
+
+    def summary(self):
+        steps = {}
+        for step in list(STEPS) + sorted(set(self.timings) - set(STEPS)):
+            values = sorted(self.timings.get(step, []))
+            if not values:
+                continue
+            steps[step] = {
+                "count": len(values),
+                "errors": sum(self.errors[step].values()),
+                "p50_ms": round(percentile(values, 0.50), 1),
+                "p95_ms": round(percentile(values, 0.95), 1),
+                "p99_ms": round(percentile(values, 0.99), 1),
+                "max_ms": round(values[-1], 1),
+            }
+        errors = {step: dict(counts) for step, counts in self.errors.items() if counts}
+        return steps, errors
+
+
+def stub_stats(stubs_url):
+    response = requests.get(f"{stubs_url}/_stubs/stats", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def stats_delta(before, after):
+    """Stub activity between two /_stubs/stats snapshots"""
+    delta = {}
+    for key, value in after.items():
+        if key in ("since", "behaviour"):
+            continue
+        if isinstance(value, dict):
+            delta[key] = {
+                name: count - before.get(key, {}).get(name, 0)
+                for name, count in value.items()
+            }
+        else:
+            delta[key] = value - before.get(key, 0)
+    delta["behaviour"] = after.get("behaviour")
+    return delta
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent customer flows (quote, EU shipping, shipment, Stripe "
+        "checkout, payment webhook, invoice and emails) against a running app "
+        "that uses the service stubs (run_service_stubs + SERVICE_STUBS_URL) "
+        "and report throughput and per-step latency as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="URL of the running app (default: http://127.0.0.1:8000)",
+        )
+        parser.add_argument(
+            "--stubs-url",
+            default=settings.SERVICE_STUBS_URL or "http://127.0.0.1:8090",
+            help="URL of the service stubs (default: SERVICE_STUBS_URL)",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=10,
+            help="Concurrent virtual users (default: 10)",
+        )
+        parser.add_argument(
+            "--flows",
+            type=int,
+            default=100,
+            help="Customer flows to run in total (default: 100)",
+        )
+        parser.add_argument(
+            "--parcels",
+            type=int,
+            default=2,
+            help="Parcels per shipment (default: 2)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Timeout of a single request in seconds (default: 60)",
+        )
+        parser.add_argument(
+            "--email-wait",
+            type=float,
+            default=30,
+            help="Seconds to wait for the background emails after the last "
+            "flow (default: 30)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=1,
+            help="Random seed of the parcels (default: 1)",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the JSON report to this file instead of stdout",
+        )
+
+    def wait_for_emails(self, stubs_url, timeout, settle=3.0):
+        """Wait until the stub SMTP server stopped receiving emails"""
+        deadline = time.monotonic() + timeout
+        last = stub_stats(stubs_url)["emails"]
+        last_change = time.monotonic()
+        while time.monotonic() < deadline:
+            time.sleep(0.5)
+            emails = stub_stats(stubs_url)["emails"]
+            if emails != last:
+                last, last_change = emails, time.monotonic()
+            elif time.monotonic() - last_change >= settle:
+                break
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        stubs_url = options["stubs_url"].rstrip("/")
+        users = max(options["users"], 1)
+        flows = max(options["flows"], 1)
+
+        try:
+            stats_before = stub_stats(stubs_url)
+        except requests.exceptions.RequestException as e:
+            raise CommandError(
+                f"Service stubs are not reachable at {stubs_url} ({type(e).__name__}); "
+                "start them with manage.py run_service_stubs"
+            )
+
+        products, packaging = catalog(self.stderr)
+        accounts = virtual_users(users)
+        scenario = Scenario(
+            base_url,
+            stubs_url,
+            max(options["parcels"], 1),
+            products,
+            packaging,
+            options["timeout"],
+        )
+
+        def virtual_user(index):
+            user, token = accounts[index]
+            rng = random.Random(options["seed"] * 1000 + index)
+            session = requests.Session()
+            session.headers["Authorization"] = f"Bearer {token}"
+            completed = 0
+            # Flows are spread evenly over the virtual users
+            for _ in range(index, flows, users):
+                completed += scenario.run(session, user, rng)
+            return completed
+
+        self.stderr.write(f"Running {flows} flows with {users} virtual users...")
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            completed = sum(executor.map(virtual_user, range(users)))
+        duration = time.perf_counter() - started
+
+        self.stderr.write("Waiting for background emails...")
+        self.wait_for_emails(stubs_url, options["email_wait"])
+
+        steps, errors = scenario.summary()
+        requests_made = sum(step["count"] for step in steps.values())
+        report = {
+            "meta": {
+                "created_at": timezone.now().isoformat(),
+                "base_url": base_url,
+                "stubs_url": stubs_url,
+                "users": users,
+                "flows": flows,
+                "parcels": options["parcels"],
+                "seed": options["seed"],
+            },
+            "summary": {
+                "completed": completed,
+                "failed": flows - completed,
+                "duration_s": round(duration, 2),
+                "flows_per_second": round(completed / duration, 2),
+                "requests": requests_made,
+                "requests_per_second": round(requests_made / duration, 2),
+            },
+            "steps": steps,
+            "errors": errors,
+            "stubs": stats_delta(stats_before, stub_stats(stubs_url)),
+        }
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        self.stderr.write(
+            f"{completed}/{flows} flows completed in {duration:.1f}s "
+            f"({report['summary']['flows_per_second']} flows/s), "
+            f"{report['stubs']['emails']} emails received"
+        )
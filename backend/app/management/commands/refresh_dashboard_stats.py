@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from backend.app.models import DailyShipmentStats
+
+
+class Command(BaseCommand):
+    help = "Bring the admin dashboard daily rollup up to date"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every day instead of only the changed ones",
+        )
+
+    def handle(self, *args, **options):
+        days = DailyShipmentStats.refresh(full=options["full"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed {days} days"))
@@ -0,0 +1,128 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.app.service_stubs import (
+    SERVICES,
+    ServiceStubs,
+    StubBehaviour,
+    parse_overrides,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run local stand-ins for Sendcloud, Stripe, Twilio, reCAPTCHA and SMTP "
+        "with configurable latency and errors. Start the app with "
+        "SERVICE_STUBS_URL=http://<host>:<port> to use them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host", default="127.0.0.1", help="Listen address (default: 127.0.0.1)"
+        )
+        parser.add_argument(
+            "--port", type=int, default=8090, help="HTTP port (default: 8090)"
+        )
+        parser.add_argument(
+            "--smtp-port",
+            type=int,
+            default=settings.SERVICE_STUBS_SMTP_PORT,
+            help=f"SMTP port (default: {settings.SERVICE_STUBS_SMTP_PORT})",
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Latency added to every stub call (default: 0)",
+        )
+        parser.add_argument(
+            "--jitter-ms",
+            type=float,
+            default=0,
+            help="Random +/- variation of the latency (default: 0)",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Fraction of calls answered with an error (default: 0)",
+        )
+        parser.add_argument(
+            "--error-status",
+            type=int,
+            default=503,
+            help="HTTP status of injected errors (default: 503)",
+        )
+        for option in ("latency-ms", "error-rate"):
+            parser.add_argument(
+                f"--service-{option}",
+                action="append",
+                metavar="SERVICE=VALUE",
+                help=f"{option} of one service ({', '.join(SERVICES)}); "
+                "can be repeated",
+            )
+        parser.add_argument(
+            "--stripe-webhook-url",
+            default="http://127.0.0.1:8000/api/stripe/webhook/",
+            help="App endpoint receiving the Stripe webhooks "
+            "(default: http://127.0.0.1:8000/api/stripe/webhook/)",
+        )
+        parser.add_argument(
+            "--stripe-webhook-secret",
+            default=settings.STRIPE_WEBHOOK_SECRET or "whsec_stub",
+            help="Secret signing the Stripe webhooks (default: STRIPE_WEBHOOK_SECRET)",
+        )
+
+    def handle(self, *args, **options):
+        behaviour = StubBehaviour(
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            error_status=options["error_status"],
+        )
+        try:
+            services = {}
+            for field in ("latency_ms", "error_rate"):
+                for service, value in parse_overrides(
+                    options[f"service_{field}"]
+                ).items():
+                    services.setdefault(service, {})[field] = value
+            behaviour.update({"services": services})
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        try:
+            stubs = ServiceStubs(
+                host=options["host"],
+                port=options["port"],
+                smtp_port=options["smtp_port"],
+                behaviour=behaviour,
+                stripe_webhook_url=options["stripe_webhook_url"],
+                stripe_webhook_secret=options["stripe_webhook_secret"],
+            )
+        except OSError as e:
+            raise CommandError(f"Cannot start the service stubs: {e}")
+
+        stubs.start()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Service stubs on {stubs.url} (SMTP port {stubs.smtp_port}), "
+                f"Stripe webhooks to {options['stripe_webhook_url']}"
+            )
+        )
+        self.stdout.write(f"Behaviour: {behaviour.as_dict()}")
+        self.stdout.write(
+            f"Start the app with SERVICE_STUBS_URL={stubs.url} "
+            f"SERVICE_STUBS_SMTP_PORT={stubs.smtp_port}; Ctrl-C to stop"
+        )
+
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stubs.stop()
+            self.stdout.write(f"Stats: {stubs.state.as_dict()}")
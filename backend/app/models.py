@@ -1,5 +1,15 @@
+import copy
+import uuid
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
 
 
 class ContactMessage(models.Model):
@@ -413,6 +423,25 @@ class FCLQuote(models.Model):
         verbose_name = "FCL Quote"
         verbose_name_plural = "FCL Quotes"
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the quote lists (admin / per user)
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["user", "-created_at", "-id"]),
+            # Admin status filter, newest first
+            models.Index(fields=["status", "-created_at"]),
+            # Stripe success page / webhook lookups by checkout session
+            models.Index(
+                fields=["payment_id"],
+                name="fcl_payment_id_idx",
+                condition=models.Q(payment_id__isnull=False),
+            ),
+            # Quotes that still have to be paid
+            models.Index(
+                fields=["-created_at"],
+                name="fcl_unpaid_created_idx",
+                condition=~models.Q(payment_status="paid"),
+            ),
+        ]
 
     def __str__(self):
         return f"FCL Quote - {self.full_name} ({self.port_of_loading} → {self.port_of_discharge}) - {self.created_at.strftime('%Y-%m-%d')}"
@@ -737,6 +766,65 @@ class CheckoutSessionRecord(models.Model):
     is_completed = models.BooleanField(default=False)
 
 
+class NumberSequence(models.Model):
+    """
+    Counter per document number prefix (e.g. "LCL-20250131", "FCL-2025")
+
+    Numbers are handed out with one UPDATE ... RETURNING on the counter row,
+    so concurrent creates never get the same number and no existing numbers
+    have to be scanned. Numbers of failed inserts are not reused.
+    """
+
+    key = models.CharField(max_length=50, unique=True, verbose_name="Key")
+    last_value = models.PositiveIntegerField(default=0, verbose_name="Last Value")
+
+    class Meta:
+        verbose_name = "Number Sequence"
+        verbose_name_plural = "Number Sequences"
+
+    def __str__(self):
+        return f"{self.key}: {self.last_value}"
+
+    @classmethod
+    def next_value(cls, key, count=1, seed=None):
+        """
+        Reserve the next `count` numbers of a sequence
+
+        Args:
+            key: Sequence key (usually the number prefix)
+            count: How many consecutive numbers to reserve
+            seed: Optional callable returning the last number already in use,
+                called once when the sequence is created (numbers issued
+                before the sequence existed)
+
+        Returns:
+            First reserved number
+        """
+        last_value = cls._increment(key, count)
+
+        if last_value is None:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(key=key, last_value=seed() if seed else 0)
+            except IntegrityError:
+                pass  # Created by a concurrent request
+            last_value = cls._increment(key, count)
+
+        return last_value - count + 1
+
+    @classmethod
+    def _increment(cls, key, count):
+        table = connection.ops.quote_name(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET last_value = last_value + %s "
+                f"WHERE {connection.ops.quote_name('key')} = %s RETURNING last_value",
+                [count, key],
+            )
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+
 class LCLShipment(models.Model):
     """Model to store LCL shipment requests"""
 
@@ -815,6 +903,23 @@ class LCLShipment(models.Model):
     # Parcels (stored as JSON)
     parcels = models.JSONField(default=list, help_text="List of parcel objects")
 
+    # Parcel totals, recomputed by save() whenever parcels change
+    total_cbm = models.DecimalField(
+        max_digits=14, decimal_places=6, default=0, help_text="Total CBM of all parcels"
+    )
+    total_weight_kg = models.DecimalField(
+        max_digits=14, decimal_places=3, default=0, help_text="Total actual weight"
+    )
+    chargeable_weight_kg = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        default=0,
+        help_text="Total of max(actual, volumetric) weight per parcel",
+    )
+    parcel_count = models.PositiveIntegerField(
+        default=0, help_text="Number of physical parcels (repeat counts included)"
+    )
+
     # EU Pickup (for eu-sy direction) - Sendcloud Parcel Form Fields
     eu_pickup_name = models.CharField(
         max_length=255, blank=True, help_text="Name for Sendcloud parcel"
@@ -865,6 +970,17 @@ class LCLShipment(models.Model):
     # Tracking
     tracking_number = models.CharField(max_length=255, blank=True, default="")
     sendcloud_id = models.IntegerField(null=True, blank=True)
+    sendcloud_status = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        help_text="Last parcel status message received from Sendcloud",
+    )
+    sendcloud_status_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Timestamp of the last applied Sendcloud webhook event",
+    )
     sendcloud_label_url = models.URLField(
         max_length=500,
         blank=True,
@@ -911,10 +1027,36 @@ class LCLShipment(models.Model):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["user", "-created_at"]),
-            models.Index(fields=["status"]),
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["status", "-created_at"]),
+            models.Index(fields=["direction", "-created_at"]),
             models.Index(fields=["shipment_number"]),
+            models.Index(fields=["sendcloud_id"]),
+            # Stripe webhook lookups; most shipments have no session
+            models.Index(
+                fields=["stripe_session_id"],
+                name="lcl_stripe_session_idx",
+                condition=~models.Q(stripe_session_id=""),
+            ),
+            # Shipments that still have to be paid
+            models.Index(
+                fields=["-created_at"],
+                name="lcl_unpaid_created_idx",
+                condition=~models.Q(payment_status="paid"),
+            ),
+            models.Index(fields=["status", "total_cbm"]),
+            models.Index(fields=["status", "total_weight_kg"]),
+            # Incremental refresh of DailyShipmentStats
+            models.Index(fields=["updated_at"]),
         ]
 
+    TOTAL_FIELDS = (
+        "total_cbm",
+        "total_weight_kg",
+        "chargeable_weight_kg",
+        "parcel_count",
+    )
+
     def __str__(self):
         return f"LCL Shipment #{self.id} - {self.shipment_number or 'N/A'} - {self.get_status_display()}"
 
@@ -923,6 +1065,13 @@ class LCLShipment(models.Model):
         Determine shipment type based on parcels.
         Returns: 'personal' or 'commercial'
         """
+        if self.pk:
+            # Parcel rows hold the normalized types; read them in SQL
+            parcel_types = Parcel.shipment_types_by_shipment([self.pk]).get(self.pk)
+            if parcel_types is not None:
+                parcel_types &= {"personal", "commercial"}
+                return sorted(parcel_types)[0] if parcel_types else None
+
         if not self.parcels or len(self.parcels) == 0:
             return None
 
@@ -956,28 +1105,712 @@ class LCLShipment(models.Model):
     def save(self, *args, **kwargs):
         if not self.shipment_number:
             # Generate shipment number: LCL-YYYYMMDD-XXXX
-            from django.utils import timezone
-
             date_str = timezone.now().strftime("%Y%m%d")
-            # Use select_related and only to optimize query
-            last_shipment = (
-                LCLShipment.objects.filter(
-                    shipment_number__startswith=f"LCL-{date_str}"
+            prefix = f"LCL-{date_str}"
+
+            def last_issued_number():
+                # Numbers issued today before the sequence existed
+                last_shipment = (
+                    LCLShipment.objects.filter(shipment_number__startswith=prefix)
+                    .only("shipment_number")
+                    .order_by("-shipment_number")
+                    .first()
                 )
-                .only("shipment_number")
-                .order_by("-shipment_number")
-                .first()
+                try:
+                    return int(last_shipment.shipment_number.split("-")[-1])
+                except (AttributeError, ValueError, IndexError):
+                    return 0
+
+            next_num = NumberSequence.next_value(prefix, seed=last_issued_number)
+            self.shipment_number = f"{prefix}-{next_num:04d}"
+
+        if self._parcels_changed(kwargs.get("update_fields")):
+            for field, value in self.compute_totals().items():
+                setattr(self, field, value)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = set(kwargs["update_fields"]) | set(
+                    self.TOTAL_FIELDS
+                )
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                Parcel.sync_shipment(self)
+            self._loaded_parcels = copy.deepcopy(self.parcels)
+        else:
+            super().save(*args, **kwargs)
+
+    def compute_totals(self):
+        """
+        Compute the parcel totals from the parcels JSON
+
+        Returns:
+            Dict with total_cbm, total_weight_kg, chargeable_weight_kg and
+            parcel_count. CBM and weights are per piece in the JSON and are
+            multiplied by repeatCount; volumetric weight is L x W x H / 6000.
+        """
+        totals = {
+            "total_cbm": Decimal("0"),
+            "total_weight_kg": Decimal("0"),
+            "chargeable_weight_kg": Decimal("0"),
+            "parcel_count": 0,
+        }
+        for parcel in self.parcels or []:
+            if not isinstance(parcel, dict):
+                continue
+
+            repeat_count = Parcel._positive_int(parcel.get("repeatCount"))
+            weight = Parcel._decimal(parcel.get("weight"), 12, 3)
+            volumetric_weight = (
+                Parcel._decimal(parcel.get("length"), 10, 2)
+                * Parcel._decimal(parcel.get("width"), 10, 2)
+                * Parcel._decimal(parcel.get("height"), 10, 2)
+                / 6000
             )
 
-            if last_shipment and last_shipment.shipment_number:
-                try:
-                    last_num = int(last_shipment.shipment_number.split("-")[-1])
-                    next_num = last_num + 1
-                except (ValueError, IndexError):
-                    next_num = 1
-            else:
-                next_num = 1
+            totals["total_cbm"] += (
+                Parcel._decimal(parcel.get("cbm"), 12, 6) * repeat_count
+            )
+            totals["total_weight_kg"] += weight * repeat_count
+            totals["chargeable_weight_kg"] += (
+                max(weight, volumetric_weight) * repeat_count
+            )
+            totals["parcel_count"] += repeat_count
+
+        totals["chargeable_weight_kg"] = totals["chargeable_weight_kg"].quantize(
+            Decimal("0.001")
+        )
+        return totals
+
+    def get_totals(self):
+        """
+        Stored parcel totals, computed on the fly for shipments that have
+        parcels but were not backfilled yet (see backfill_shipment_totals)
+        """
+        if not self.parcel_count and self.parcels:
+            return self.compute_totals()
+        return {field: getattr(self, field) for field in self.TOTAL_FIELDS}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored parcels so save() only rewrites Parcel rows
+        # when the JSON really changed
+        if "parcels" in instance.__dict__:
+            instance._loaded_parcels = copy.deepcopy(instance.parcels)
+        return instance
+
+    def _parcels_changed(self, update_fields=None):
+        """Whether this save writes parcels that differ from the stored ones"""
+        if "parcels" not in self.__dict__:
+            return False  # Deferred, not written
+        if update_fields is not None and "parcels" not in update_fields:
+            return False
+        if not hasattr(self, "_loaded_parcels"):
+            # New instance (or loaded without parcels)
+            return bool(self.parcels) or not self._state.adding
+        return self.parcels != self._loaded_parcels
+
+
+class Parcel(models.Model):
+    """
+    One entry of LCLShipment.parcels as a typed row
 
-            self.shipment_number = f"LCL-{date_str}-{next_num:04d}"
+    The JSON field stays the source of truth (the frontend reads and writes
+    it). LCLShipment.save() rewrites a shipment's rows whenever its parcels
+    change, so weights, CBM and products can be aggregated in SQL. Existing
+    shipments are filled in by the backfill_parcels management command.
+    """
+
+    shipment = models.ForeignKey(
+        LCLShipment,
+        on_delete=models.CASCADE,
+        related_name="parcel_rows",
+        verbose_name="Shipment",
+    )
+    position = models.PositiveIntegerField(
+        verbose_name="Position", help_text="Index in LCLShipment.parcels"
+    )
+    product = models.ForeignKey(
+        Price,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="parcels",
+        verbose_name="Product",
+    )
+    custom_product_name = models.CharField(
+        max_length=255, blank=True, verbose_name="Custom Product Name"
+    )
+    packaging = models.ForeignKey(
+        PackagingPrice,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="parcels",
+        verbose_name="Packaging",
+    )
+    shipment_type = models.CharField(
+        max_length=20, blank=True, verbose_name="Shipment Type"
+    )
+    hs_code = models.CharField(max_length=50, blank=True, verbose_name="HS Code")
+
+    # Per piece; multiply by repeat_count for the parcel line
+    weight = models.DecimalField(
+        max_digits=12, decimal_places=3, default=0, verbose_name="Weight (kg)"
+    )
+    length = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, verbose_name="Length (cm)"
+    )
+    width = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, verbose_name="Width (cm)"
+    )
+    height = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, verbose_name="Height (cm)"
+    )
+    cbm = models.DecimalField(
+        max_digits=12, decimal_places=6, default=0, verbose_name="CBM"
+    )
+    quantity = models.PositiveIntegerField(default=1, verbose_name="Quantity")
+    repeat_count = models.PositiveIntegerField(default=1, verbose_name="Repeat Count")
+
+    is_electronics = models.BooleanField(default=False, verbose_name="Is Electronics")
+    wants_insurance = models.BooleanField(default=False, verbose_name="Wants Insurance")
+    declared_value = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, verbose_name="Declared Value (€)"
+    )
+
+    class Meta:
+        verbose_name = "Parcel"
+        verbose_name_plural = "Parcels"
+        ordering = ["shipment", "position"]
+        unique_together = [("shipment", "position")]
+        indexes = [
+            models.Index(fields=["product"]),
+            models.Index(fields=["packaging"]),
+            models.Index(fields=["hs_code"]),
+            models.Index(fields=["shipment_type"]),
+        ]
+
+    def __str__(self):
+        return f"Parcel {self.position + 1} of shipment #{self.shipment_id}"
+
+    @staticmethod
+    def _decimal(value, max_digits, decimal_places):
+        """Parse a JSON number; invalid or out of range values become 0"""
+        try:
+            number = Decimal(str(value)).quantize(Decimal(1).scaleb(-decimal_places))
+        except (InvalidOperation, TypeError, ValueError):
+            return Decimal(0)
+        if not number.is_finite() or abs(number) >= 10 ** (max_digits - decimal_places):
+            return Decimal(0)
+        return max(number, Decimal(0))
+
+    @staticmethod
+    def _positive_int(value, default=1):
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return default
+        return number if number > 0 else default
+
+    @classmethod
+    def _referenced_ids(cls, parcels, key):
+        """IDs referenced under key by the parcels JSON"""
+        ids = set()
+        for parcel in parcels or []:
+            if isinstance(parcel, dict):
+                value = cls._positive_int(parcel.get(key), None)
+                if value is not None:
+                    ids.add(value)
+        return ids
+
+    @classmethod
+    def rows_for_shipment(cls, shipment, product_ids=None, packaging_ids=None):
+        """
+        Build (unsaved) Parcel rows from a shipment's parcels JSON
+
+        Args:
+            shipment: LCLShipment with parcels loaded
+            product_ids: Existing Price IDs (looked up if not given)
+            packaging_ids: Existing PackagingPrice IDs (looked up if not given)
+        """
+        if not any(isinstance(parcel, dict) for parcel in shipment.parcels or []):
+            return []
+
+        if product_ids is None:
+            product_ids = set(
+                Price.objects.filter(
+                    id__in=cls._referenced_ids(shipment.parcels, "productCategory")
+                ).values_list("id", flat=True)
+            )
+        if packaging_ids is None:
+            packaging_ids = set(
+                PackagingPrice.objects.filter(
+                    id__in=cls._referenced_ids(shipment.parcels, "packagingType")
+                ).values_list("id", flat=True)
+            )
+
+        rows = []
+        for position, parcel in enumerate(shipment.parcels or []):
+            if not isinstance(parcel, dict):
+                continue
+
+            product_id = cls._positive_int(parcel.get("productCategory"), None)
+            packaging_id = cls._positive_int(parcel.get("packagingType"), None)
+            shipment_type = (
+                parcel.get("shipmentType")
+                or parcel.get("shipment_type")
+                or parcel.get("shipmenttype")
+                or ""
+            )
+
+            rows.append(
+                cls(
+                    shipment_id=shipment.id,
+                    position=position,
+                    product_id=product_id if product_id in product_ids else None,
+                    custom_product_name=str(parcel.get("customProductName") or "")[
+                        :255
+                    ],
+                    packaging_id=(
+                        packaging_id if packaging_id in packaging_ids else None
+                    ),
+                    shipment_type=str(shipment_type).lower().strip()[:20],
+                    hs_code=str(parcel.get("hs_code") or "")[:50],
+                    weight=cls._decimal(parcel.get("weight"), 12, 3),
+                    length=cls._decimal(parcel.get("length"), 10, 2),
+                    width=cls._decimal(parcel.get("width"), 10, 2),
+                    height=cls._decimal(parcel.get("height"), 10, 2),
+                    cbm=cls._decimal(parcel.get("cbm"), 12, 6),
+                    quantity=cls._positive_int(parcel.get("quantity")),
+                    repeat_count=cls._positive_int(parcel.get("repeatCount")),
+                    is_electronics=bool(parcel.get("isElectronicsShipment")),
+                    wants_insurance=bool(parcel.get("wantsInsurance")),
+                    declared_value=cls._decimal(
+                        parcel.get("declaredShipmentValue")
+                        or parcel.get("declaredValue"),
+                        12,
+                        2,
+                    ),
+                )
+            )
+
+        return rows
+
+    @classmethod
+    def sync_shipment(cls, shipment):
+        """Replace a shipment's Parcel rows with its current parcels JSON"""
+        cls.objects.filter(shipment_id=shipment.id).delete()
+        cls.objects.bulk_create(cls.rows_for_shipment(shipment))
+
+    @classmethod
+    def totals_by_shipment(cls, shipment_ids):
+        """
+        Total CBM and weight per shipment, computed in one SQL aggregate
+
+        Returns:
+            {shipment_id: {"cbm": Decimal, "weight": Decimal}} for shipments
+            that have Parcel rows
+        """
+        line_cbm = models.ExpressionWrapper(
+            models.F("cbm") * models.F("repeat_count"),
+            output_field=models.DecimalField(max_digits=20, decimal_places=6),
+        )
+        line_weight = models.ExpressionWrapper(
+            models.F("weight") * models.F("repeat_count"),
+            output_field=models.DecimalField(max_digits=20, decimal_places=3),
+        )
+        rows = (
+            cls.objects.filter(shipment_id__in=shipment_ids)
+            .order_by()
+            .values("shipment_id")
+            .annotate(cbm=models.Sum(line_cbm), weight=models.Sum(line_weight))
+        )
+        return {
+            row["shipment_id"]: {"cbm": row["cbm"], "weight": row["weight"]}
+            for row in rows
+        }
+
+    @classmethod
+    def shipment_types_by_shipment(cls, shipment_ids):
+        """
+        Distinct parcel shipment types per shipment, in one SQL query
+
+        Returns:
+            {shipment_id: set of types} for shipments that have Parcel rows;
+            parcels without a type contribute nothing to the set
+        """
+        types = {}
+        rows = (
+            cls.objects.filter(shipment_id__in=shipment_ids)
+            .order_by()
+            .values_list("shipment_id", "shipment_type")
+            .distinct()
+        )
+        for shipment_id, shipment_type in rows:
+            shipment_types = types.setdefault(shipment_id, set())
+            if shipment_type:
+                shipment_types.add(shipment_type)
+        return types
+
+
+class SendcloudWebhookEvent(models.Model):
+    """
+    Sendcloud webhook event waiting to be applied to its LCL shipment
+
+    The webhook view stores the parsed event before acknowledging it, because
+    Sendcloud does not redeliver acknowledged events. The worker in
+    sendcloud_webhooks applies pending events in batches and deletes them;
+    events that fail MAX_ATTEMPTS times stay in the table with their last
+    error.
+    """
+
+    MAX_ATTEMPTS = 5
+
+    sendcloud_id = models.BigIntegerField(verbose_name="Sendcloud Parcel ID")
+    tracking_number = models.CharField(
+        max_length=100, blank=True, verbose_name="Tracking Number"
+    )
+    status = models.CharField(max_length=50, blank=True, verbose_name="Status")
+    status_id = models.IntegerField(null=True, blank=True, verbose_name="Status ID")
+    carrier = models.CharField(max_length=50, blank=True, verbose_name="Carrier")
+    timestamp = models.DateTimeField(
+        null=True, blank=True, verbose_name="Event Timestamp"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+
+    class Meta:
+        verbose_name = "Sendcloud Webhook Event"
+        verbose_name_plural = "Sendcloud Webhook Events"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["attempts", "id"]),
+        ]
+
+    def __str__(self):
+        return f"Sendcloud event for parcel {self.sendcloud_id}: {self.status}"
+
+    @classmethod
+    def from_event(cls, event):
+        """Unsaved row for a parsed event (see sendcloud_service.parse_webhook_data)"""
+        return cls(
+            sendcloud_id=event["sendcloud_id"],
+            tracking_number=event.get("tracking_number") or "",
+            status=event.get("status") or "",
+            status_id=event.get("status_id"),
+            carrier=event.get("carrier") or "",
+            timestamp=event.get("timestamp"),
+        )
+
+    def as_event(self):
+        """The parsed event this row was stored from"""
+        return {
+            "sendcloud_id": self.sendcloud_id,
+            "tracking_number": self.tracking_number,
+            "status": self.status,
+            "status_id": self.status_id,
+            "carrier": self.carrier,
+            "timestamp": self.timestamp,
+        }
+
+
+class DailyShipmentStats(models.Model):
+    """
+    Daily rollup of LCL shipments for the admin dashboard
+
+    One row per creation day and combination of status, payment status,
+    direction and Syrian province. refresh() only recomputes the days whose
+    shipments changed since the previous refresh, so the dashboard reads a
+    few hundred rows per year instead of every shipment.
+    """
+
+    DIMENSIONS = ("status", "payment_status", "direction", "syria_province")
+
+    date = models.DateField(verbose_name="Date")
+    status = models.CharField(max_length=50, verbose_name="Status")
+    payment_status = models.CharField(max_length=50, verbose_name="Payment Status")
+    direction = models.CharField(max_length=10, verbose_name="Direction")
+    syria_province = models.CharField(
+        max_length=255, blank=True, verbose_name="Syrian Province"
+    )
+    shipment_count = models.PositiveIntegerField(
+        default=0, verbose_name="Shipment Count"
+    )
+    total_price = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Total Price (EUR)"
+    )
+    amount_paid = models.DecimalField(
+        max_digits=14, decimal_places=2, default=0, verbose_name="Amount Paid (EUR)"
+    )
+    outstanding_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="Outstanding Amount (EUR)",
+        help_text="Sum of unpaid remainders (overpayments are not subtracted)",
+    )
+    total_cbm = models.DecimalField(
+        max_digits=16, decimal_places=6, default=0, verbose_name="Total CBM"
+    )
+    total_weight_kg = models.DecimalField(
+        max_digits=16, decimal_places=3, default=0, verbose_name="Total Weight (kg)"
+    )
+    refreshed_at = models.DateTimeField(verbose_name="Refreshed At")
+
+    class Meta:
+        verbose_name = "Daily Shipment Stats"
+        verbose_name_plural = "Daily Shipment Stats"
+        ordering = ["-date"]
+        unique_together = [
+            ("date", "status", "payment_status", "direction", "syria_province")
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+            models.Index(fields=["refreshed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.status}/{self.payment_status}: {self.shipment_count}"
+
+    @classmethod
+    def refresh(cls, full=False):
+        """
+        Bring the rollup up to date
+
+        Days with shipments created or updated since the last refresh are
+        recomputed. Deleted shipments do not touch updated_at, so when the
+        rollup total no longer matches the shipment count afterwards, the
+        per-day counts are compared and the mismatching days recomputed.
+
+        Args:
+            full: Recompute every day instead
+
+        Returns:
+            Number of days recomputed
+        """
+        started = timezone.now()
+        shipments = LCLShipment.objects.annotate(day=TruncDate("created_at"))
+        watermark = cls.objects.aggregate(last=models.Max("refreshed_at"))["last"]
+
+        if full or watermark is None:
+            days = set(shipments.values_list("day", flat=True).distinct())
+            days |= set(cls.objects.values_list("date", flat=True).distinct())
+        else:
+            days = set(
+                shipments.filter(updated_at__gte=watermark)
+                .values_list("day", flat=True)
+                .distinct()
+            )
+        cls._recompute_days(days, started)
+
+        rollup_total = cls.objects.aggregate(total=models.Sum("shipment_count"))
+        if (rollup_total["total"] or 0) != LCLShipment.objects.count():
+            live_counts = dict(
+                shipments.order_by()
+                .values("day")
+                .annotate(count=models.Count("id"))
+                .values_list("day", "count")
+            )
+            rollup_counts = dict(
+                cls.objects.order_by()
+                .values("date")
+                .annotate(count=models.Sum("shipment_count"))
+                .values_list("date", "count")
+            )
+            stale_days = {
+                day
+                for day in set(live_counts) | set(rollup_counts)
+                if live_counts.get(day) != rollup_counts.get(day)
+            }
+            cls._recompute_days(stale_days, started)
+            days |= stale_days
+
+        return len(days)
+
+    @classmethod
+    def _recompute_days(cls, days, refreshed_at, chunk_size=31):
+        """Replace the rollup rows of the given days"""
+        days = sorted(days)
+        for start in range(0, len(days), chunk_size):
+            chunk = days[start : start + chunk_size]
+            # Range on created_at so the index is used; day__in does the rest
+            since = timezone.make_aware(datetime.combine(chunk[0], time.min))
+            until = timezone.make_aware(
+                datetime.combine(chunk[-1] + timedelta(days=1), time.min)
+            )
+            rows = (
+                LCLShipment.objects.filter(created_at__gte=since, created_at__lt=until)
+                .annotate(day=TruncDate("created_at"))
+                .filter(day__in=chunk)
+                .order_by()
+                .values("day", *cls.DIMENSIONS)
+                .annotate(
+                    shipment_count=models.Count("id"),
+                    total_price_sum=models.Sum("total_price"),
+                    amount_paid_sum=models.Sum("amount_paid"),
+                    outstanding_sum=models.Sum(
+                        Greatest(
+                            models.F("total_price") - models.F("amount_paid"),
+                            Decimal("0"),
+                        )
+                    ),
+                    total_cbm_sum=models.Sum("total_cbm"),
+                    total_weight_sum=models.Sum("total_weight_kg"),
+                )
+            )
+            stats = [
+                cls(
+                    date=row["day"],
+                    status=row["status"],
+                    payment_status=row["payment_status"],
+                    direction=row["direction"],
+                    syria_province=row["syria_province"],
+                    shipment_count=row["shipment_count"],
+                    total_price=row["total_price_sum"] or 0,
+                    amount_paid=row["amount_paid_sum"] or 0,
+                    outstanding_amount=row["outstanding_sum"] or 0,
+                    total_cbm=row["total_cbm_sum"] or 0,
+                    total_weight_kg=row["total_weight_sum"] or 0,
+                    refreshed_at=refreshed_at,
+                )
+                for row in rows
+            ]
+            with transaction.atomic():
+                cls.objects.filter(date__in=chunk).delete()
+                cls.objects.bulk_create(stats)
+
+
+class ArchivedRecord(models.Model):
+    """
+    Read-only copy of a shipment, quote or contact message moved out of the
+    live tables by the archive_records management command
+
+    `data` holds the original fields (FCL quotes include their edit request
+    messages), `files` the archived media moved to ARCHIVE_MEDIA_ROOT.
+    """
+
+    RECORD_TYPE_CHOICES = [
+        ("lcl_shipment", "LCL Shipment"),
+        ("fcl_quote", "FCL Quote"),
+        ("contact_message", "Contact Message"),
+    ]
+
+    record_type = models.CharField(
+        max_length=20, choices=RECORD_TYPE_CHOICES, verbose_name="Record Type"
+    )
+    original_id = models.PositiveBigIntegerField(verbose_name="Original ID")
+    reference = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Reference",
+        help_text="Shipment/quote number or message subject",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_records",
+        verbose_name="User",
+    )
+    status = models.CharField(max_length=50, blank=True, verbose_name="Status")
+    created_at = models.DateTimeField(
+        verbose_name="Created At", help_text="Creation time of the original record"
+    )
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Archived At")
+    data = models.JSONField(encoder=DjangoJSONEncoder, verbose_name="Data")
+    files = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Files",
+        help_text='[{"field": ..., "path": ...}] relative to ARCHIVE_MEDIA_ROOT',
+    )
+
+    class Meta:
+        verbose_name = "Archived Record"
+        verbose_name_plural = "Archived Records"
+        ordering = ["-created_at"]
+        unique_together = [("record_type", "original_id")]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"]),
+            models.Index(fields=["record_type", "-created_at", "-id"]),
+            models.Index(fields=["user", "-created_at", "-id"]),
+            models.Index(fields=["reference"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_record_type_display()} #{self.original_id} ({self.reference or 'N/A'})"
+
+
+class UploadSession(models.Model):
+    """
+    Resumable, chunked upload of a parcel or electronics photo
+
+    Chunks are appended to a partial file in UPLOAD_SESSION_ROOT at the
+    offset the client sends; a client that lost its connection asks for
+    `received_size` and continues from there. Completing the session stores
+    the photo (see photo_storage.store_photo), and the shipment create call
+    then references the session ID instead of sending the file again.
+    """
+
+    STATUS_UPLOADING = "uploading"
+    STATUS_COMPLETE = "complete"
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, "Uploading"),
+        (STATUS_COMPLETE, "Complete"),
+    ]
+
+    KIND_CHOICES = [
+        ("parcel_photo", "Parcel Photo"),
+        ("electronics_photo", "Electronics Photo"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+        verbose_name="User",
+    )
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+        default="parcel_photo",
+        verbose_name="Kind",
+    )
+    filename = models.CharField(max_length=255, blank=True, verbose_name="Filename")
+    total_size = models.PositiveBigIntegerField(verbose_name="Total Size")
+    received_size = models.PositiveBigIntegerField(
+        default=0, verbose_name="Received Size"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_UPLOADING,
+        verbose_name="Status",
+    )
+    stored_name = models.CharField(
+        max_length=500,
+        blank=True,
+        verbose_name="Stored Name",
+        help_text="Storage name of the photo once the upload is complete",
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+
+    class Meta:
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.received_size}/{self.total_size} bytes)"
 
-        super().save(*args, **kwargs)
+    @property
+    def part_path(self) -> Path:
+        """Partial file the chunks are written to"""
+        return Path(settings.UPLOAD_SESSION_ROOT) / f"{self.id}.part"
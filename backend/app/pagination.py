@@ -0,0 +1,20 @@
+"""
+Pagination classes for large admin lists
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (-created_at, -id)
+
+    Pages are fetched with `WHERE created_at < <cursor>` instead of OFFSET and
+    without a COUNT(*), so page latency does not grow with the table size.
+    Responses have "next", "previous" and "results" (no "count").
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
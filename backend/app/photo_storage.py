@@ -0,0 +1,346 @@
+"""
+Content-addressed storage of uploaded parcel photos
+
+Photos are read from the upload in small chunks and written to a temporary
+file while metadata is stripped and the SHA-256 of the cleaned image is
+computed, all in one streaming pass. The result is stored once under
+
+    <prefix>/<sha256[:2]>/<sha256>.<ext>
+
+so the same photo uploaded twice (or for several shipments) is stored
+once, and names never collide. Large uploads are spooled to disk by
+Django's upload handlers (FILE_UPLOAD_MAX_MEMORY_SIZE), so an image is
+never held in memory as a whole.
+
+Supported formats are JPEG, PNG, WebP and GIF. EXIF/XMP/IPTC metadata and
+text chunks (GPS position, camera, owner) are removed; for JPEG the EXIF
+orientation is kept so photos are not shown rotated.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+PARCEL_PHOTO_PREFIX = "parcel_photos"
+ELECTRONICS_PHOTO_PREFIX = "electronics_photos"
+
+
+class PhotoValidationError(Exception):
+    """Uploaded file is not an accepted image"""
+
+    pass
+
+
+class _HashingWriter:
+    """Writes to a file while hashing everything written"""
+
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.file.write(data)
+        self.sha256.update(data)
+        self.size += len(data)
+
+
+def _read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise PhotoValidationError("Image file is truncated")
+    return data
+
+
+def _copy_bytes(source, writer, size):
+    """Copy exactly `size` bytes in chunks"""
+    while size > 0:
+        chunk = source.read(min(CHUNK_SIZE, size))
+        if not chunk:
+            raise PhotoValidationError("Image file is truncated")
+        writer.write(chunk)
+        size -= len(chunk)
+
+
+def _copy_rest(source, writer):
+    while True:
+        chunk = source.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        writer.write(chunk)
+
+
+# ---------------------------------------------------------------------------
+# JPEG
+# ---------------------------------------------------------------------------
+
+# APP1 (EXIF/XMP), APP12 (Ducky), APP13 (IPTC/Photoshop) and comments
+JPEG_DROPPED_MARKERS = {0xE1, 0xEC, 0xED, 0xFE}
+
+
+def _exif_orientation(segment):
+    """Orientation tag (0x0112) of an EXIF APP1 payload, or None"""
+    if not segment.startswith(b"Exif\x00\x00") or len(segment) < 14:
+        return None
+    tiff = segment[6:]
+    if tiff[:2] == b"II":
+        endian = "<"
+    elif tiff[:2] == b"MM":
+        endian = ">"
+    else:
+        return None
+    try:
+        (ifd_offset,) = struct.unpack(endian + "I", tiff[4:8])
+        (entry_count,) = struct.unpack(endian + "H", tiff[ifd_offset : ifd_offset + 2])
+        for index in range(entry_count):
+            entry = tiff[ifd_offset + 2 + index * 12 : ifd_offset + 14 + index * 12]
+            tag, value_type = struct.unpack(endian + "HH", entry[:4])
+            if tag == 0x0112 and value_type == 3:
+                (orientation,) = struct.unpack(endian + "H", entry[8:10])
+                return orientation if 1 <= orientation <= 8 else None
+    except struct.error:
+        return None
+    return None
+
+
+def _orientation_segment(orientation):
+    """Minimal EXIF APP1 segment holding only the orientation"""
+    payload = (
+        b"Exif\x00\x00"
+        + b"II*\x00"
+        + struct.pack("<I", 8)  # IFD0 right after the header
+        + struct.pack("<H", 1)  # one entry
+        + struct.pack("<HHIHH", 0x0112, 3, 1, orientation, 0)
+        + struct.pack("<I", 0)  # no next IFD
+    )
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _strip_jpeg(source, writer):
+    writer.write(_read_exact(source, 2))  # SOI, checked by the caller
+    orientation_written = False
+
+    while True:
+        byte = _read_exact(source, 1)
+        if byte != b"\xff":
+            raise PhotoValidationError("Invalid JPEG file")
+        marker = _read_exact(source, 1)[0]
+        while marker == 0xFF:  # Fill bytes
+            marker = _read_exact(source, 1)[0]
+
+        if marker == 0xD9:  # EOI
+            writer.write(b"\xff\xd9")
+            return
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # No length
+            writer.write(bytes((0xFF, marker)))
+            continue
+
+        length_bytes = _read_exact(source, 2)
+        (length,) = struct.unpack(">H", length_bytes)
+        if length < 2:
+            raise PhotoValidationError("Invalid JPEG file")
+
+        if marker in JPEG_DROPPED_MARKERS:
+            if marker == 0xE1 and not orientation_written:
+                # Metadata segments are at most 64 KB
+                orientation = _exif_orientation(_read_exact(source, length - 2))
+                if orientation and orientation != 1:
+                    writer.write(_orientation_segment(orientation))
+                    orientation_written = True
+            else:
+                source.seek(length - 2, os.SEEK_CUR)
+            continue
+
+        writer.write(bytes((0xFF, marker)) + length_bytes)
+        _copy_bytes(source, writer, length - 2)
+
+        if marker == 0xDA:  # SOS: entropy-coded data up to EOI follows
+            _copy_rest(source, writer)
+            return
+
+
+# ---------------------------------------------------------------------------
+# PNG
+# ---------------------------------------------------------------------------
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_DROPPED_CHUNKS = {b"eXIf", b"tEXt", b"zTXt", b"iTXt", b"tIME"}
+
+
+def _strip_png(source, writer):
+    writer.write(_read_exact(source, 8))
+    while True:
+        header = _read_exact(source, 8)
+        length, chunk_type = struct.unpack(">I4s", header)
+        if chunk_type in PNG_DROPPED_CHUNKS:
+            source.seek(length + 4, os.SEEK_CUR)  # Data and CRC
+            continue
+        writer.write(header)
+        _copy_bytes(source, writer, length + 4)
+        if chunk_type == b"IEND":
+            return
+
+
+# ---------------------------------------------------------------------------
+# WebP
+# ---------------------------------------------------------------------------
+
+WEBP_DROPPED_CHUNKS = {b"EXIF", b"XMP "}
+
+
+def _strip_webp(source, writer, output):
+    """RIFF chunks; the RIFF size is patched in the output once known"""
+    header = _read_exact(source, 12)
+    (riff_size,) = struct.unpack("<I", header[4:8])
+    start = output.tell()
+    writer.write(header)
+
+    remaining = riff_size - 4
+    while remaining > 0:
+        chunk_header = _read_exact(source, 8)
+        fourcc, size = struct.unpack("<4sI", chunk_header)
+        padded = size + (size & 1)
+        remaining -= 8 + padded
+        if fourcc in WEBP_DROPPED_CHUNKS:
+            source.seek(padded, os.SEEK_CUR)
+            continue
+        if fourcc == b"VP8X":
+            data = bytearray(_read_exact(source, padded))
+            data[0] &= ~0x0C & 0xFF  # Clear the EXIF and XMP flags
+            writer.write(chunk_header)
+            writer.write(bytes(data))
+            continue
+        writer.write(chunk_header)
+        _copy_bytes(source, writer, padded)
+
+    end = output.tell()
+    output.seek(start + 4)
+    output.write(struct.pack("<I", end - start - 8))
+    output.seek(end)
+
+
+def _detect_format(head):
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(PNG_SIGNATURE):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return None
+
+
+def _process(source, output):
+    """
+    Strip metadata from `source` into `output`
+
+    Returns:
+        Tuple (sha256 hex digest, extension, size)
+    """
+    head = source.read(12)
+    image_format = _detect_format(head)
+    if image_format is None:
+        raise PhotoValidationError(
+            "Unsupported image format (JPEG, PNG, WebP or GIF expected)"
+        )
+    source.seek(0)
+
+    writer = _HashingWriter(output)
+    try:
+        if image_format == "jpg":
+            _strip_jpeg(source, writer)
+        elif image_format == "png":
+            _strip_png(source, writer)
+        elif image_format == "webp":
+            _strip_webp(source, writer, output)
+        else:
+            _copy_rest(source, writer)
+    except struct.error:
+        raise PhotoValidationError("Invalid image file")
+
+    if image_format == "webp":
+        # The RIFF size was patched after hashing; hash the final bytes
+        output.flush()
+        output.seek(0)
+        sha256 = hashlib.sha256()
+        for chunk in iter(lambda: output.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+        return sha256.hexdigest(), image_format, writer.size
+
+    return writer.sha256.hexdigest(), image_format, writer.size
+
+
+def photo_name(prefix, digest, extension):
+    """Storage name of a content-addressed photo"""
+    return f"{prefix}/{digest[:2]}/{digest}.{extension}"
+
+
+def store_photo(uploaded_file, prefix=PARCEL_PHOTO_PREFIX):
+    """
+    Validate an uploaded photo, strip its metadata and store it by content
+
+    Args:
+        uploaded_file: Django UploadedFile (in memory or spooled to disk)
+        prefix: Storage directory (PARCEL_PHOTO_PREFIX or ELECTRONICS_PHOTO_PREFIX)
+
+    Returns:
+        Storage name of the photo (an existing one if it was stored before)
+
+    Raises:
+        PhotoValidationError: If the file is too large or not a supported image
+    """
+    max_size = settings.MAX_PHOTO_UPLOAD_SIZE
+    if uploaded_file.size > max_size:
+        raise PhotoValidationError(
+            f"Photo is larger than {max_size // (1024 * 1024)} MB"
+        )
+
+    try:
+        media_dir = Path(default_storage.path(prefix))
+    except NotImplementedError:
+        media_dir = None  # Remote storage: upload the temporary file
+
+    if media_dir is not None:
+        # Same filesystem as the final path, so storing is a rename
+        media_dir.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=media_dir, suffix=".upload")
+    try:
+        with os.fdopen(fd, "w+b") as output:
+            uploaded_file.seek(0)
+            digest, extension, size = _process(uploaded_file, output)
+
+        name = photo_name(prefix, digest, extension)
+        if default_storage.exists(name):
+            logger.info(f"Photo {name} already stored ({size} bytes), reusing it")
+            if media_dir is not None:
+                # Marks the photo as in use for archiving (PHOTO_REUSE_GRACE)
+                os.utime(default_storage.path(name))
+            return name
+
+        if media_dir is not None:
+            final_path = Path(default_storage.path(name))
+            final_path.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, final_path)
+        else:
+            with open(tmp_path, "rb") as tmp_file:
+                name = default_storage.save(name, File(tmp_file))
+
+        logger.info(f"Stored photo {name} ({size} bytes)")
+        return name
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
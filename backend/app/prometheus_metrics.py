@@ -0,0 +1,249 @@
+"""
+Prometheus metrics for business and system counters
+
+Counters and histograms for pricing calculations, outbound calls (Sendcloud,
+reCAPTCHA), document rendering, emails and the Stripe/Sendcloud webhooks,
+served in the Prometheus text format at /metrics (internal networks only).
+
+Under gunicorn every worker is a separate process: backend/gunicorn.conf.py
+sets PROMETHEUS_MULTIPROC_DIR, each worker writes its values there and
+/metrics adds up the values of all workers, whichever worker answers the
+scrape. Without the variable (runserver, manage.py) values stay in process.
+
+prometheus_client is optional: without it the metrics below do nothing and
+/metrics answers 503.
+"""
+
+import functools
+import ipaddress
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    Counter = Gauge = Histogram = None
+    PROMETHEUS_AVAILABLE = False
+    logger.warning(
+        "prometheus_client library not available. Prometheus metrics will be disabled."
+    )
+
+
+class _NoopMetric:
+    """Stands in for a metric when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+def _metric(metric_class, *args, **kwargs):
+    if not PROMETHEUS_AVAILABLE:
+        return _NoopMetric()
+    return metric_class(*args, **kwargs)
+
+
+ENDPOINT_REQUESTS = _metric(
+    Counter,
+    "app_endpoint_requests_total",
+    "Requests to instrumented endpoints (pricing, webhooks) by response status",
+    ["endpoint", "status"],
+)
+ENDPOINT_DURATION = _metric(
+    Histogram,
+    "app_endpoint_duration_seconds",
+    "Time to answer instrumented endpoints",
+    ["endpoint"],
+)
+EXTERNAL_REQUEST_DURATION = _metric(
+    Histogram,
+    "app_external_request_duration_seconds",
+    "Outbound HTTP requests by service and outcome (2xx, 4xx, 5xx, error)",
+    ["service", "outcome"],
+)
+DOCUMENT_RENDER_DURATION = _metric(
+    Histogram,
+    "app_document_render_seconds",
+    "Time to generate a PDF/Word document",
+    ["document"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+DOCUMENT_RENDER_FAILURES = _metric(
+    Counter,
+    "app_document_render_failures_total",
+    "Document generations that raised an error",
+    ["document"],
+)
+EMAILS = _metric(
+    Counter,
+    "app_emails_total",
+    "Emails by sender function and outcome (sent, failed, error)",
+    ["email", "outcome"],
+)
+EMAIL_DURATION = _metric(
+    Histogram,
+    "app_email_send_seconds",
+    "Time to build and send an email",
+    ["email"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+EMAILS_IN_PROGRESS = _metric(
+    Gauge,
+    "app_emails_in_progress",
+    "Emails being sent right now (mostly from background threads)",
+    multiprocess_mode="livesum",
+)
+SENDCLOUD_WEBHOOK_QUEUE = _metric(
+    Gauge,
+    "app_sendcloud_webhook_queue_depth",
+    "Sendcloud webhook events waiting to be applied",
+    # Every process reports the same table count
+    multiprocess_mode="livemax",
+)
+
+
+def observe_external_request(service: str, outcome: str, seconds: float) -> None:
+    """Record one outbound HTTP request (see request_metrics adapters)"""
+    EXTERNAL_REQUEST_DURATION.labels(service, outcome).observe(seconds)
+
+
+def instrument_endpoint(endpoint: str):
+    """
+    Count the responses and time of a view
+
+    Apply above @api_view so the status of every response is recorded.
+
+    Args:
+        endpoint: Label of the view in the metrics ('pricing', 'stripe_webhook', ...)
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            started = time.perf_counter()
+            status_code = 500
+            try:
+                response = view(request, *args, **kwargs)
+                status_code = response.status_code
+                return response
+            finally:
+                ENDPOINT_REQUESTS.labels(endpoint, str(status_code)).inc()
+                ENDPOINT_DURATION.labels(endpoint).observe(
+                    time.perf_counter() - started
+                )
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_document(func):
+    """Record the render time of a document generator, labelled by its name"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            DOCUMENT_RENDER_FAILURES.labels(func.__name__).inc()
+            raise
+        finally:
+            DOCUMENT_RENDER_DURATION.labels(func.__name__).observe(
+                time.perf_counter() - started
+            )
+
+    return wrapper
+
+
+def instrument_email(func):
+    """
+    Record an email sender: outcome, duration and emails in progress
+
+    The senders return False when the email could not be sent.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        EMAILS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = func(*args, **kwargs)
+            outcome = "failed" if result is False else "sent"
+            return result
+        finally:
+            EMAILS_IN_PROGRESS.dec()
+            EMAILS.labels(func.__name__, outcome).inc()
+            EMAIL_DURATION.labels(func.__name__).observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def _is_internal(request) -> bool:
+    """Whether the request comes directly from an allowed (internal) network"""
+    # Requests through nginx carry X-Forwarded-For; scrapers connect directly
+    if request.META.get("HTTP_X_FORWARDED_FOR"):
+        return False
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in settings.PROMETHEUS_METRICS_ALLOWED_NETWORKS
+    )
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint
+
+    GET /metrics
+    Only answered for internal addresses (PROMETHEUS_METRICS_ALLOWED_NETWORKS);
+    nginx does not route /metrics to Django.
+    """
+    if not _is_internal(request):
+        return HttpResponseNotFound()
+
+    if not PROMETHEUS_AVAILABLE:
+        return HttpResponse(
+            "prometheus_client is not installed\n",
+            status=503,
+            content_type="text/plain",
+        )
+
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        generate_latest,
+        multiprocess,
+    )
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
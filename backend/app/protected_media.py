@@ -0,0 +1,87 @@
+"""
+Serving of protected files (invoices, receipts, transfer slips, labels,
+archived media) after the view has checked who may download them
+
+Behind nginx (USE_X_ACCEL_REDIRECT) the view only answers with an
+X-Accel-Redirect header pointing at an internal location; nginx then sends
+the file itself with sendfile and Range/conditional request support, and
+the Python worker is free as soon as the headers are written. Without
+nginx (runserver, tests) the file is streamed with a FileResponse.
+
+The directories below are denied on the public /media/ location (see
+nginx/nginx.conf), so these views are the only way to reach them.
+"""
+
+import mimetypes
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+# Media directories that are only served through authenticated views
+PROTECTED_MEDIA_DIRS = ("invoices", "receipts", "transfer_slips", "sendcloud_labels")
+
+# root -> (filesystem root setting, internal nginx location)
+ROOTS = {
+    "media": ("MEDIA_ROOT", "PROTECTED_MEDIA_LOCATION"),
+    "archive": ("ARCHIVE_MEDIA_ROOT", "PROTECTED_ARCHIVE_LOCATION"),
+}
+
+
+def resolve_protected_path(name: str, root: str = "media") -> Optional[Path]:
+    """Absolute path of an existing file below a root, or None"""
+    base = Path(getattr(settings, ROOTS[root][0])).resolve()
+    path = (base / name).resolve()
+    if not path.is_relative_to(base) or not path.is_file():
+        return None
+    return path
+
+
+def protected_file_response(
+    name: str,
+    root: str = "media",
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    as_attachment: bool = False,
+):
+    """
+    Response sending a stored file, or None if the file does not exist
+
+    Args:
+        name: Path of the file relative to the root (e.g. FieldFile.name)
+        root: 'media' (MEDIA_ROOT) or 'archive' (ARCHIVE_MEDIA_ROOT)
+        filename: Download filename (default: the file's own name)
+        content_type: MIME type (default: guessed from the filename)
+        as_attachment: Content-Disposition attachment instead of inline
+    """
+    path = resolve_protected_path(name, root)
+    if path is None:
+        return None
+
+    filename = filename or path.name
+    content_type = (
+        content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    )
+
+    if not settings.USE_X_ACCEL_REDIRECT:
+        return FileResponse(
+            path.open("rb"),
+            as_attachment=as_attachment,
+            filename=filename,
+            content_type=content_type,
+        )
+
+    base = Path(getattr(settings, ROOTS[root][0])).resolve()
+    location = getattr(settings, ROOTS[root][1]).rstrip("/")
+    response = HttpResponse(content_type=content_type)
+    response["X-Accel-Redirect"] = (
+        f"{location}/{quote(path.relative_to(base).as_posix())}"
+    )
+    response["Content-Disposition"] = content_disposition_header(
+        as_attachment, filename
+    )
+    response["Cache-Control"] = "private, no-cache"
+    return response
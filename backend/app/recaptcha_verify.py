@@ -1,14 +1,70 @@
 """
 reCAPTCHA verification utility (supports both Enterprise and standard v3)
+
+Verification can run in the background (verify_recaptcha_token_async) so
+views validate the request while Google answers; wait_for_recaptcha_result
+then applies the RECAPTCHA_FAIL_OPEN_SECONDS budget. Successful results are
+cached for RECAPTCHA_CACHE_SECONDS because Google rejects a token the second
+time it is verified, which would break client retries.
+
+averify_recaptcha_token is the asyncio counterpart used by the ASGI views.
 """
 
+import contextvars
+import hashlib
 import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
+
+from .request_metrics import InstrumentedHTTPAdapter
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of verifications running at the same time per process
+MAX_CONCURRENT_VERIFICATIONS = 8
+
+# Timeout of a single call to Google
+REQUEST_TIMEOUT_SECONDS = 10
+
+_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_VERIFICATIONS, thread_name_prefix="recaptcha"
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Shared HTTP session so verifications reuse connections to Google"""
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = InstrumentedHTTPAdapter(
+                    service="recaptcha",
+                    pool_connections=MAX_CONCURRENT_VERIFICATIONS,
+                    pool_maxsize=MAX_CONCURRENT_VERIFICATIONS,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
+
+
+def _cache_key(token: str, action: str = None) -> str:
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return f"recaptcha:{token_hash}:{action or ''}"
+
 
 def verify_recaptcha_v3_token(token: str, action: str = None) -> dict:
     """
@@ -30,67 +86,21 @@ def verify_recaptcha_v3_token(token: str, action: str = None) -> dict:
     if not token:
         return {"success": False, "error": "Token is required"}
 
-    # Standard reCAPTCHA v3 verification endpoint
-    url = "https://www.google.com/recaptcha/api/siteverify"
+    # A retry of an already verified submission: Google would now answer
+    # "timeout-or-duplicate", so reuse the first result
+    cached_result = cache.get(_cache_key(token, action))
+    if cached_result is not None:
+        return cached_result
 
     data = {"secret": secret_key, "response": token}
 
     try:
-        response = requests.post(url, data=data, timeout=10)
+        response = get_session().post(
+            settings.RECAPTCHA_VERIFY_URL, data=data, timeout=REQUEST_TIMEOUT_SECONDS
+        )
 
         if response.status_code == 200:
-            result = response.json()
-
-            success = result.get("success", False)
-            score = result.get("score", 0.0)
-            action_returned = result.get("action")
-
-            # Verify action matches if provided
-            action_match = True
-            if action:
-                action_match = action_returned == action
-
-            # Get score threshold from settings (default 0.3 for better user experience)
-            score_threshold = getattr(settings, "RECAPTCHA_SCORE_THRESHOLD", 0.3)
-
-            # Consider valid if success, action matches, and score meets threshold (>= for inclusive)
-            is_valid = success and action_match and score >= score_threshold
-
-            # Build error message if validation failed
-            error_message = None
-            if not is_valid:
-                error_parts = []
-                if not success:
-                    error_codes = result.get("error-codes", [])
-                    if error_codes:
-                        error_parts.append(
-                            f"Google API errors: {', '.join(error_codes)}"
-                        )
-                    else:
-                        error_parts.append("Google API returned success=false")
-                if not action_match:
-                    error_parts.append(
-                        f"Action mismatch: expected '{action}', got '{action_returned}'"
-                    )
-                if score < score_threshold:
-                    error_parts.append(
-                        f"Score too low: {score} (minimum {score_threshold} required)"
-                    )
-                error_message = (
-                    "; ".join(error_parts) if error_parts else "Verification failed"
-                )
-
-            result_dict = {
-                "success": is_valid,
-                "score": score,
-                "action": action_returned,
-                "action_match": action_match,
-                "error_codes": result.get("error-codes", []),
-            }
-            if error_message:
-                result_dict["error"] = error_message
-
-            return result_dict
+            return _v3_result(response.json(), token, action)
         else:
             logger.error(
                 f"reCAPTCHA v3 API error: {response.status_code} - {response.text}"
@@ -105,6 +115,109 @@ def verify_recaptcha_v3_token(token: str, action: str = None) -> dict:
         return {"success": False, "error": f"Verification error: {str(e)}"}
 
 
+def _v3_result(result: dict, token: str, action: str = None) -> dict:
+    """Verification result of a siteverify response; successes are cached"""
+    success = result.get("success", False)
+    score = result.get("score", 0.0)
+    action_returned = result.get("action")
+
+    # Verify action matches if provided
+    action_match = True
+    if action:
+        action_match = action_returned == action
+
+    # Get score threshold from settings (default 0.3 for better user experience)
+    score_threshold = getattr(settings, "RECAPTCHA_SCORE_THRESHOLD", 0.3)
+
+    # Consider valid if success, action matches, and score meets threshold (>= for inclusive)
+    is_valid = success and action_match and score >= score_threshold
+
+    # Build error message if validation failed
+    error_message = None
+    if not is_valid:
+        error_parts = []
+        if not success:
+            error_codes = result.get("error-codes", [])
+            if error_codes:
+                error_parts.append(f"Google API errors: {', '.join(error_codes)}")
+            else:
+                error_parts.append("Google API returned success=false")
+        if not action_match:
+            error_parts.append(
+                f"Action mismatch: expected '{action}', got '{action_returned}'"
+            )
+        if score < score_threshold:
+            error_parts.append(
+                f"Score too low: {score} (minimum {score_threshold} required)"
+            )
+        error_message = "; ".join(error_parts) if error_parts else "Verification failed"
+
+    result_dict = {
+        "success": is_valid,
+        "score": score,
+        "action": action_returned,
+        "action_match": action_match,
+        "error_codes": result.get("error-codes", []),
+    }
+    if error_message:
+        result_dict["error"] = error_message
+    else:
+        cache.set(
+            _cache_key(token, action),
+            result_dict,
+            getattr(settings, "RECAPTCHA_CACHE_SECONDS", 120),
+        )
+
+    return result_dict
+
+
+async def averify_recaptcha_token(token: str, action: str = None) -> dict:
+    """
+    Verify a reCAPTCHA v3 token with the async HTTP client (ASGI views)
+
+    Same result as verify_recaptcha_token(); the event loop serves other
+    requests while Google answers.
+    """
+    import httpx
+
+    from .async_http import get_async_client
+
+    secret_key = getattr(settings, "RECAPTCHA_SECRET_KEY", None)
+
+    if not secret_key:
+        logger.warning("reCAPTCHA secret key not configured")
+        return {"success": False, "error": "reCAPTCHA secret key not configured"}
+
+    if not token:
+        return {"success": False, "error": "Token is required"}
+
+    cached_result = await cache.aget(_cache_key(token, action))
+    if cached_result is not None:
+        return cached_result
+
+    data = {"secret": secret_key, "response": token}
+
+    try:
+        response = await get_async_client("recaptcha").post(
+            settings.RECAPTCHA_VERIFY_URL, data=data, timeout=REQUEST_TIMEOUT_SECONDS
+        )
+
+        if response.status_code == 200:
+            return await sync_to_async(_v3_result)(response.json(), token, action)
+
+        logger.error(
+            f"reCAPTCHA v3 API error: {response.status_code} - {response.text}"
+        )
+        return {"success": False, "error": f"API error: {response.status_code}"}
+
+    except httpx.HTTPError as e:
+        logger.error(f"reCAPTCHA v3 verification failed: {str(e)}")
+        return {"success": False, "error": f"Request failed: {str(e)}"}
+    except Exception as e:
+        logger.error(f"reCAPTCHA v3 verification error: {str(e)}")
+        return {"success": False, "error": f"Verification error: {str(e)}"}
+
+
 def verify_recaptcha_enterprise_token(token: str, action: str = None) -> dict:
     """
     Verify reCAPTCHA Enterprise token using Google Cloud API
@@ -141,14 +254,14 @@ def verify_recaptcha_enterprise_token(token: str, action: str = None) -> dict:
         request_body["event"]["expectedAction"] = action
 
     # Make API request
-    url = f"https://recaptchaenterprise.googleapis.com/v1/projects/{project_id}/assessments?key={api_key}"
+    url = f"{settings.RECAPTCHA_ENTERPRISE_API_URL}/projects/{project_id}/assessments?key={api_key}"
 
     try:
-        response = requests.post(
+        response = get_session().post(
             url,
             json=request_body,
             headers={"Content-Type": "application/json"},
-            timeout=10,
+            timeout=REQUEST_TIMEOUT_SECONDS,
         )
 
         if response.status_code == 200:
@@ -201,3 +314,82 @@ def verify_recaptcha_token(token: str, action: str = None) -> dict:
         return {"success": False, "error": "Token is required"}
 
     return verify_recaptcha_v3_token(token, action)
+
+
+class _Started(threading.Event):
+    """Set (with the monotonic start time) when a worker picks a job up"""
+
+    at = None
+
+    def mark(self):
+        self.at = time.monotonic()
+        self.set()
+
+
+def _run_verification(started: _Started, token: str, action: str = None) -> dict:
+    started.mark()
+    return verify_recaptcha_token(token, action)
+
+
+def verify_recaptcha_token_async(token: str, action: str = None) -> Future:
+    """
+    Start verifying a reCAPTCHA v3 token in a background thread
+
+    Args:
+        token: The token from grecaptcha.execute()
+        action: Optional action name to verify against
+
+    Returns:
+        Future resolving to the verify_recaptcha_token() result
+    """
+    # Run in the request's context so the call counts as its outbound HTTP time
+    context = contextvars.copy_context()
+    started = _Started()
+    future = _executor.submit(context.run, _run_verification, started, token, action)
+    future.started = started
+    return future
+
+
+def wait_for_recaptcha_result(future: Future, timeout: float = None) -> dict:
+    """
+    Wait for a verification started with verify_recaptcha_token_async
+
+    If Google has not answered within the fail-open budget, the token is
+    accepted so form submissions are not held up by a slow Google API. The
+    verification keeps running and caches its result for retries. The budget
+    starts when a worker picks the verification up: one that is still queued
+    after the budget (more submissions than workers) fails closed, so a
+    flood of submissions cannot skip reCAPTCHA.
+
+    Args:
+        future: Future returned by verify_recaptcha_token_async()
+        timeout: Fail-open budget in seconds (default: RECAPTCHA_FAIL_OPEN_SECONDS,
+            0 waits for the result)
+
+    Returns:
+        dict with 'success' (bool); 'fail_open' is True if the budget ran out
+    """
+    if timeout is None:
+        timeout = getattr(settings, "RECAPTCHA_FAIL_OPEN_SECONDS", 3.0)
+    if timeout <= 0:
+        return future.result()
+
+    started = getattr(future, "started", None)
+    remaining = timeout
+    if started is not None:
+        if not started.wait(timeout):
+            future.cancel()
+            logger.warning(
+                f"⚠️ reCAPTCHA verification not started within {timeout}s "
+                f"(all {MAX_CONCURRENT_VERIFICATIONS} workers busy), rejecting token"
+            )
+            return {"success": False, "error": "Verification queue is full"}
+        remaining = started.at + timeout - time.monotonic()
+
+    try:
+        return future.result(timeout=max(remaining, 0))
+    except FutureTimeoutError:
+        logger.warning(
+            f"⚠️ reCAPTCHA verification took longer than {timeout}s, accepting token (fail-open)"
+        )
+        return {"success": True, "fail_open": True}
@@ -0,0 +1,339 @@
+"""
+Per-request performance instrumentation
+
+RequestMetricsMiddleware measures every request: wall time, database
+queries (count and time, through a connection execute wrapper), outbound
+HTTP time (Sendcloud, reCAPTCHA) and document rendering time (PDF/Word).
+The numbers are sent back in a Server-Timing header, written as one JSON
+log line per request, and aggregated per route for the admin metrics
+endpoint (GET /api/admin/metrics/).
+
+Code outside a request (background threads, management commands) is not
+measured: the timers below only record while a request is active.
+"""
+
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from .prometheus_metrics import observe_external_request
+
+logger = logging.getLogger(__name__)
+
+# Kinds of time measured besides the wall time (Server-Timing metric names)
+SECTIONS = ("db", "http", "render")
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """Time spent per section during one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(SECTIONS, 0.0)
+        self.counts = dict.fromkeys(SECTIONS, 0)
+        self._active = set()
+
+    def add(self, section: str, seconds: float) -> None:
+        self.durations[section] += seconds
+        self.counts[section] += 1
+
+    @property
+    def wall(self) -> float:
+        return time.perf_counter() - self.started
+
+
+@contextmanager
+def timed(section: str):
+    """
+    Record the time of a block under a section of the current request
+
+    Nested blocks of the same section (e.g. a document generator calling
+    another one) are only counted once.
+    """
+    timings = _current.get()
+    if timings is None or section in timings._active:
+        yield
+        return
+
+    timings._active.add(section)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings._active.discard(section)
+        timings.add(section, time.perf_counter() - started)
+
+
+def timed_function(section: str):
+    """Decorator form of timed()"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(section):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _record_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - started)
+
+
+def install_query_recorder(db_connection=connection) -> None:
+    """Add the query timer to a database connection (once)"""
+    if _record_query not in db_connection.execute_wrappers:
+        db_connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+# Connections opened in other threads (e.g. sync views under ASGI) get the
+# recorder as well; the current request is found through the context
+connection_created.connect(_on_connection_created)
+
+
+def _outcome(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class InstrumentedHTTPAdapter(HTTPAdapter):
+    """
+    requests HTTPAdapter recording its requests as outbound HTTP time of the
+    current request and in the Prometheus metrics of the service
+    """
+
+    def __init__(self, *args, service: str = "external", **kwargs):
+        self.service = service
+        super().__init__(*args, **kwargs)
+
+    def send(self, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with timed("http"):
+                response = super().send(*args, **kwargs)
+            outcome = _outcome(response.status_code)
+            return response
+        finally:
+            observe_external_request(
+                self.service, outcome, time.perf_counter() - started
+            )
+
+
+def instrumented_async_transport(service: str = "external", **kwargs):
+    """httpx AsyncHTTPTransport doing what InstrumentedHTTPAdapter does"""
+    import httpx
+
+    class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                with timed("http"):
+                    response = await super().handle_async_request(request)
+                outcome = _outcome(response.status_code)
+                return response
+            finally:
+                observe_external_request(
+                    service, outcome, time.perf_counter() - started
+                )
+
+    return InstrumentedAsyncTransport(**kwargs)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+class RouteMetrics:
+    """
+    Recent samples per route of this worker process
+
+    The newest REQUEST_METRICS_SAMPLES requests are kept per route, so the
+    percentiles describe recent traffic and memory stays bounded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(self._new_route)
+        self.since = timezone.now()
+
+    @staticmethod
+    def _new_route():
+        return {
+            "count": 0,
+            "errors": 0,
+            "samples": deque(maxlen=settings.REQUEST_METRICS_SAMPLES),
+        }
+
+    def add(self, key, record: Dict) -> None:
+        with self._lock:
+            route = self._samples[key]
+            route["count"] += 1
+            if record["status"] >= 500:
+                route["errors"] += 1
+            route["samples"].append(
+                (
+                    record["wall_ms"],
+                    record["db_ms"],
+                    record["db_queries"],
+                    record["http_ms"],
+                    record["render_ms"],
+                )
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self.since = timezone.now()
+
+    def summary(self) -> List[Dict]:
+        """Per route: request count and p50/p95/p99 of each measured time"""
+        with self._lock:
+            routes = [
+                (key, route["count"], route["errors"], list(route["samples"]))
+                for key, route in self._samples.items()
+            ]
+
+        summary = []
+        for (method, route), count, errors, samples in routes:
+            columns = list(zip(*samples))
+            entry = {
+                "route": route,
+                "method": method,
+                "count": count,
+                "errors": errors,
+                "samples": len(samples),
+            }
+            for index, name in (
+                (0, "wall_ms"),
+                (1, "db_ms"),
+                (3, "http_ms"),
+                (4, "render_ms"),
+            ):
+                values = sorted(columns[index])
+                entry[name] = {
+                    "p50": round(percentile(values, 0.50), 2),
+                    "p95": round(percentile(values, 0.95), 2),
+                    "p99": round(percentile(values, 0.99), 2),
+                    "max": round(values[-1], 2),
+                }
+            entry["db_queries_avg"] = round(sum(columns[2]) / len(samples), 2)
+            summary.append(entry)
+
+        return sorted(summary, key=lambda entry: entry["wall_ms"]["p95"], reverse=True)
+
+
+route_metrics = RouteMetrics()
+
+
+def _route_of(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "(unmatched)"
+    return "/" + match.route
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure each request and report it (Server-Timing, log, route metrics)
+
+    Works with sync (WSGI) and async (ASGI) request handling.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        install_query_recorder()
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._report(request, response, timings)
+        return response
+
+    def _report(self, request, response, timings: RequestTimings) -> None:
+        wall = timings.wall
+        record = {
+            "method": request.method,
+            "route": _route_of(request),
+            "path": request.path,
+            "status": response.status_code,
+            "wall_ms": round(wall * 1000, 2),
+            "db_queries": timings.counts["db"],
+            "db_ms": round(timings.durations["db"] * 1000, 2),
+            "http_calls": timings.counts["http"],
+            "http_ms": round(timings.durations["http"] * 1000, 2),
+            "render_ms": round(timings.durations["render"] * 1000, 2),
+            "pid": os.getpid(),
+        }
+
+        if settings.REQUEST_METRICS_SERVER_TIMING:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f"app;dur={record['wall_ms']}",
+                    f'db;dur={record["db_ms"]};desc="{record["db_queries"]} queries"',
+                    f'http;dur={record["http_ms"]};desc="{record["http_calls"]} calls"',
+                    f"render;dur={record['render_ms']}",
+                ]
+            )
+
+        logger.info(f"request_metrics {json.dumps(record, separators=(',', ':'))}")
+        route_metrics.add((record["method"], record["route"]), record)
@@ -0,0 +1,144 @@
+"""
+Async Sendcloud calls for the ASGI views (see async_views.py)
+
+Same requests, validation and error mapping as sendcloud_service, sent
+with httpx so a worker waiting on Sendcloud keeps serving other requests.
+"""
+
+import logging
+from typing import Dict, List
+
+from django.conf import settings
+
+from .async_http import get_async_client
+from .sendcloud_service import (
+    SendcloudAPIError,
+    SendcloudValidationError,
+    filter_shipping_methods,
+    filter_shipping_methods_simple,
+    label_url,
+    parse_shipping_catalog,
+    validate_country_code,
+    validate_shipping_quote,
+    validate_weight,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _client():
+    if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
+        logger.error("Sendcloud API keys are not configured")
+        raise SendcloudAPIError("Sendcloud API credentials are missing")
+
+    return get_async_client(
+        "sendcloud",
+        auth=(settings.SENDCLOUD_PUBLIC_KEY, settings.SENDCLOUD_SECRET_KEY),
+    )
+
+
+async def _get(url: str, timeout: float = 10, **kwargs):
+    """
+    GET a Sendcloud URL
+
+    Raises:
+        SendcloudAPIError: On an HTTP error status, timeout or connection error
+    """
+    import httpx
+
+    client = _client()
+    try:
+        response = await client.get(url, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        return response
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        logger.error(f"Sendcloud API HTTP error: Status {status_code}")
+        raise SendcloudAPIError(f"Sendcloud API error (status {status_code})")
+    except httpx.TimeoutException:
+        logger.error(f"Sendcloud API request timeout after {timeout} seconds")
+        raise SendcloudAPIError("Sendcloud API request timeout")
+    except httpx.HTTPError as e:
+        logger.error(f"Sendcloud API request failed: {type(e).__name__}")
+        raise SendcloudAPIError("Failed to connect to Sendcloud API")
+
+
+async def _get_catalog(params: Dict) -> List[Dict]:
+    response = await _get(
+        f"{settings.SENDCLOUD_API_URL}shipping_methods",
+        params=params,
+        headers={"Accept": "application/json"},
+    )
+    try:
+        data = response.json()
+    except ValueError:
+        logger.error("Sendcloud API returned invalid JSON")
+        raise SendcloudAPIError("Invalid JSON response from Sendcloud API")
+    return parse_shipping_catalog(data)
+
+
+async def afetch_shipping_catalog() -> List[Dict]:
+    """Async fetch_shipping_catalog()"""
+    return await _get_catalog({"is_return": "false"})
+
+
+async def aget_shipping_methods(**quote) -> List[Dict]:
+    """
+    Async get_shipping_methods(); takes the same keyword arguments
+
+    Raises:
+        SendcloudAPIError: If API call fails
+        SendcloudValidationError: If input validation fails
+    """
+    quote = validate_shipping_quote(**quote)
+    logger.info(
+        f"Requesting Sendcloud shipping methods: {quote['sender_country']} → {quote['receiver_country']}, Weight: {quote['weight']}kg"
+    )
+
+    shipping_methods = await afetch_shipping_catalog()
+    if not shipping_methods:
+        logger.warning("No shipping methods available for given parameters")
+        return []
+
+    return filter_shipping_methods(
+        shipping_methods, quote["receiver_country"], quote["weight"]
+    )
+
+
+async def aget_shipping_methods_simple(weight: float, country: str) -> List[Dict]:
+    """
+    Async get_shipping_methods_simple()
+
+    Raises:
+        SendcloudAPIError: If API call fails
+        SendcloudValidationError: If input validation fails
+    """
+    try:
+        weight = validate_weight(weight)
+        country = validate_country_code(country)
+    except SendcloudValidationError as e:
+        logger.warning(f"Input validation failed: {str(e)}")
+        raise
+
+    # Use test=1 parameter only in development (DEBUG=True)
+    shipping_methods = await _get_catalog({"test": "1"} if settings.DEBUG else {})
+    if not shipping_methods:
+        logger.warning("No shipping methods available")
+        return []
+
+    return filter_shipping_methods_simple(shipping_methods, weight, country)
+
+
+async def adownload_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
+    """
+    Async download_label()
+
+    Raises:
+        SendcloudAPIError: If download fails
+        SendcloudValidationError: If input is invalid
+    """
+    url = label_url(parcel_id, label_type)
+    logger.info(f"Downloading {label_type} label for parcel {int(parcel_id)}")
+
+    response = await _get(url, timeout=15, headers={"Accept": "application/pdf"})
+    return response.content
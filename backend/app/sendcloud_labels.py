@@ -0,0 +1,162 @@
+"""
+Local cache of Sendcloud label PDFs
+
+A parcel's label never changes once it has been announced, so labels are
+downloaded from Sendcloud once and kept under MEDIA_ROOT/sendcloud_labels/,
+keyed by parcel ID and label type:
+
+    sendcloud_labels/<label_type>/<sendcloud_id>.pdf
+
+Labels contain customer addresses: the directory must not be served by the
+public /media/ location (see nginx/nginx.conf), only through the
+authenticated download view.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .sendcloud_service import SendcloudValidationError, download_label
+
+logger = logging.getLogger(__name__)
+
+LABEL_TYPES = ("normal_printer", "label")
+
+LABEL_CACHE_DIR = "sendcloud_labels"
+
+
+def label_cache_path(parcel_id: int, label_type: str) -> Path:
+    """Path of the cached label PDF for a parcel"""
+    if label_type not in LABEL_TYPES:
+        raise SendcloudValidationError(f"Invalid label type: {label_type}")
+
+    try:
+        parcel_id_int = int(parcel_id)
+    except (TypeError, ValueError):
+        raise SendcloudValidationError("Invalid parcel ID")
+    if parcel_id_int <= 0:
+        raise SendcloudValidationError("Parcel ID must be positive")
+
+    return (
+        Path(settings.MEDIA_ROOT)
+        / LABEL_CACHE_DIR
+        / label_type
+        / f"{parcel_id_int}.pdf"
+    )
+
+
+def label_etag(content: bytes) -> str:
+    """Strong ETag for label content"""
+    return f'"{hashlib.md5(content).hexdigest()}"'
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write a file so concurrent readers never see a partial PDF"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def get_label(parcel_id: int, label_type: str = "normal_printer") -> Tuple[bytes, str]:
+    """
+    Get a label PDF, downloading it from Sendcloud only if it is not cached yet
+
+    Args:
+        parcel_id: Sendcloud parcel ID
+        label_type: 'normal_printer' (A4) or 'label' (A6)
+
+    Returns:
+        Tuple (label content, ETag)
+
+    Raises:
+        SendcloudAPIError: If the label is not cached and the download fails
+        SendcloudValidationError: If input is invalid
+    """
+    path = label_cache_path(parcel_id, label_type)
+
+    try:
+        content = path.read_bytes()
+        return content, label_etag(content)
+    except FileNotFoundError:
+        pass
+
+    content = download_label(parcel_id, label_type)
+
+    try:
+        _write_atomic(path, content)
+        logger.info(f"Cached {label_type} label for parcel {parcel_id}")
+    except OSError as e:
+        # Caching is best effort; the caller still gets the label
+        logger.warning(f"⚠️ Could not cache label for parcel {parcel_id}: {str(e)}")
+
+    return content, label_etag(content)
+
+
+async def aget_label(
+    parcel_id: int, label_type: str = "normal_printer"
+) -> Tuple[bytes, str]:
+    """
+    Async get_label() for the ASGI views; file access runs in a thread
+
+    Raises:
+        SendcloudAPIError: If the label is not cached and the download fails
+        SendcloudValidationError: If input is invalid
+    """
+    from .sendcloud_async import adownload_label
+
+    path = label_cache_path(parcel_id, label_type)
+
+    try:
+        content = await sync_to_async(path.read_bytes, thread_sensitive=False)()
+        return content, label_etag(content)
+    except FileNotFoundError:
+        pass
+
+    content = await adownload_label(parcel_id, label_type)
+
+    try:
+        await sync_to_async(_write_atomic, thread_sensitive=False)(path, content)
+        logger.info(f"Cached {label_type} label for parcel {parcel_id}")
+    except OSError as e:
+        logger.warning(f"⚠️ Could not cache label for parcel {parcel_id}: {str(e)}")
+
+    return content, label_etag(content)
+
+
+def _prefetch(parcel_ids) -> None:
+    for parcel_id in parcel_ids:
+        for label_type in LABEL_TYPES:
+            try:
+                get_label(parcel_id, label_type)
+            except Exception as e:
+                logger.warning(
+                    f"⚠️ Failed to prefetch {label_type} label for parcel {parcel_id}: {str(e)}"
+                )
+
+
+def prefetch_labels(parcel_ids: Iterable[int]) -> None:
+    """
+    Download and cache the labels of new parcels in a background thread
+
+    Args:
+        parcel_ids: Sendcloud parcel IDs (empty values are ignored)
+    """
+    parcel_ids = [parcel_id for parcel_id in parcel_ids if parcel_id]
+    if not parcel_ids:
+        return
+
+    threading.Thread(target=_prefetch, args=(parcel_ids,), daemon=True).start()
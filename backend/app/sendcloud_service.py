@@ -14,14 +14,23 @@ Security Features:
 
 import hashlib
 import hmac
+import io
 import logging
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Dict, List, Optional, Tuple
 
 import requests
 from django.conf import settings
 from requests.auth import HTTPBasicAuth
 
+from .request_metrics import InstrumentedHTTPAdapter
+
 logger = logging.getLogger(__name__)
 
 # EU country codes (ISO 3166-1 alpha-2)
@@ -63,6 +72,15 @@ MAX_WEIGHT_KG = 1000  # 1000 kg max per parcel
 MAX_DIMENSION_CM = 300  # 3 meters max
 MAX_STRING_LENGTH = 500  # Max length for text fields
 
+# Bulk operations
+BULK_PARCEL_CHUNK_SIZE = 50  # Parcels per multi-parcel POST /parcels request
+BULK_LABEL_CHUNK_SIZE = 20  # Parcel IDs per bulk label request
+BULK_TIMEOUT_SECONDS = 60
+MAX_CONCURRENT_REQUESTS = 8  # Also the connection pool size of the session
+MAX_BULK_QUOTES = 50  # Parcels priced per get_shipping_methods_bulk call
+RATE_LIMIT_RETRIES = 3  # Retries of a bulk request answered with HTTP 429
+RATE_LIMIT_MAX_WAIT_SECONDS = 30
+
 
 class SendcloudAPIError(Exception):
     """Custom exception for Sendcloud API errors"""
@@ -76,6 +94,44 @@ class SendcloudValidationError(Exception):
     pass
 
 
+class SendcloudRejectedError(SendcloudAPIError):
+    """Sendcloud refused a request (4xx), so nothing was created"""
+
+    pass
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Shared HTTP session for Sendcloud API calls
+
+    Keeps TCP/TLS connections alive between calls and sizes the connection
+    pool for the concurrent bulk helpers.
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.auth = HTTPBasicAuth(
+                    settings.SENDCLOUD_PUBLIC_KEY, settings.SENDCLOUD_SECRET_KEY
+                )
+                adapter = InstrumentedHTTPAdapter(
+                    service="sendcloud",
+                    pool_connections=MAX_CONCURRENT_REQUESTS,
+                    pool_maxsize=MAX_CONCURRENT_REQUESTS,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+
+    return _session
+
+
 def validate_country_code(country: str) -> str:
     """
     Validate and sanitize country code
@@ -289,6 +345,7 @@ def get_shipping_methods(
     length: Optional[float] = None,
     width: Optional[float] = None,
     height: Optional[float] = None,
+    catalog: Optional[List[Dict]] = None,
 ) -> List[Dict]:
     """
     Get available shipping methods and prices from Sendcloud
@@ -306,6 +363,7 @@ def get_shipping_methods(
         length: Package length in cm (optional)
         width: Package width in cm (optional)
         height: Package height in cm (optional)
+        catalog: Already fetched fetch_shipping_catalog() result (optional)
 
     Returns:
         List of shipping methods with prices:
@@ -328,6 +386,61 @@ def get_shipping_methods(
     """
 
     # ✅ STEP 1: Validate all inputs before sending to API
+    quote = validate_shipping_quote(
+        sender_address=sender_address,
+        sender_city=sender_city,
+        sender_postal_code=sender_postal_code,
+        sender_country=sender_country,
+        receiver_address=receiver_address,
+        receiver_city=receiver_city,
+        receiver_postal_code=receiver_postal_code,
+        receiver_country=receiver_country,
+        weight=weight,
+        length=length,
+        width=width,
+        height=height,
+    )
+
+    # ✅ STEP 2: Secure logging (no personal data)
+    logger.info(
+        f"Requesting Sendcloud shipping methods: {quote['sender_country']} → {quote['receiver_country']}, Weight: {quote['weight']}kg"
+    )
+
+    shipping_methods = catalog if catalog is not None else fetch_shipping_catalog()
+
+    if not shipping_methods:
+        logger.warning("No shipping methods available for given parameters")
+        return []
+
+    # ✅ STEP 3: Filter by weight and destination country
+    return filter_shipping_methods(
+        shipping_methods, quote["receiver_country"], quote["weight"]
+    )
+
+
+def validate_shipping_quote(
+    sender_address: str,
+    sender_city: str,
+    sender_postal_code: str,
+    sender_country: str,
+    receiver_address: str,
+    receiver_city: str,
+    receiver_postal_code: str,
+    receiver_country: str,
+    weight: float,
+    length: Optional[float] = None,
+    width: Optional[float] = None,
+    height: Optional[float] = None,
+) -> Dict:
+    """
+    Validate and normalize the parameters of a shipping quote
+
+    Returns:
+        Dict with the same keys as the arguments, validated
+
+    Raises:
+        SendcloudValidationError: If input validation fails
+    """
     try:
         sender_address = validate_text_field(
             sender_address, "Sender address", max_length=200
@@ -356,6 +469,35 @@ def get_shipping_methods(
         logger.warning(f"Input validation failed: {str(e)}")
         raise
 
+    return {
+        "sender_address": sender_address,
+        "sender_city": sender_city,
+        "sender_postal_code": sender_postal_code,
+        "sender_country": sender_country,
+        "receiver_address": receiver_address,
+        "receiver_city": receiver_city,
+        "receiver_postal_code": receiver_postal_code,
+        "receiver_country": receiver_country,
+        "weight": weight,
+        "length": length,
+        "width": width,
+        "height": height,
+    }
+
+
+def fetch_shipping_catalog() -> List[Dict]:
+    """
+    Fetch the full catalog of outgoing Sendcloud shipping methods
+
+    The catalog does not depend on the parcel, so callers pricing several
+    parcels fetch it once and filter it per parcel (filter_shipping_methods).
+
+    Returns:
+        Raw shipping methods as returned by GET /shipping_methods
+
+    Raises:
+        SendcloudAPIError: If API call fails
+    """
     # ✅ Check if API keys are configured
     if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
         logger.error("Sendcloud API keys are not configured in .env file")
@@ -366,7 +508,7 @@ def get_shipping_methods(
     # ✅ Using real Sendcloud API
     logger.info(f"🚀 Using Sendcloud API for shipping rates")
 
-    # ✅ STEP 2: Prepare API request
+    # ✅ STEP 1: Prepare API request
     # API Documentation: GET /api/v2/shipping_methods
     # Accepted parameters: sender_address (ID), service_point_id, is_return
     # We call without sender_address ID and filter results locally
@@ -383,13 +525,8 @@ def get_shipping_methods(
     params = {"is_return": "false"}  # We only want outgoing shipping methods
 
     try:
-        # ✅ STEP 2: Secure logging (no personal data)
-        logger.info(
-            f"Requesting Sendcloud shipping methods: {sender_country} → {receiver_country}, Weight: {weight}kg"
-        )
-
         # Make API request
-        response = requests.get(
+        response = get_session().get(
             url,
             auth=auth,
             params=params,
@@ -400,170 +537,18 @@ def get_shipping_methods(
         # Check response status
         response.raise_for_status()
 
-        # ✅ STEP 3: Validate response is valid JSON
+        # ✅ STEP 2: Validate response is valid JSON
         try:
             data = response.json()
         except ValueError:
             logger.error("Sendcloud API returned invalid JSON")
             raise SendcloudAPIError("Invalid JSON response from Sendcloud API")
 
-        # ✅ STEP 4: Validate response structure
-        if not isinstance(data, dict):
-            logger.error("Sendcloud API response is not a dictionary")
-            raise SendcloudAPIError("Invalid response structure from Sendcloud API")
-
-        # Extract shipping methods
-        shipping_methods = data.get("shipping_methods", [])
-
-        if not isinstance(shipping_methods, list):
-            logger.error("shipping_methods is not a list")
-            raise SendcloudAPIError("Invalid shipping_methods format in response")
-
-        if not shipping_methods:
-            logger.warning("No shipping methods available for given parameters")
-            return []
-
-        # ✅ STEP 5: Filter and format shipping methods
-        # According to Sendcloud API documentation, each method has:
-        # - id, name, carrier, min_weight, max_weight
-        # - countries array with price per country
-        # We filter based on weight and destination country
-
-        formatted_methods = []
-        for idx, method in enumerate(shipping_methods):
-            try:
-                # Validate method is a dictionary
-                if not isinstance(method, dict):
-                    logger.warning(
-                        f"Shipping method {idx} is not a dictionary, skipping"
-                    )
-                    continue
-
-                method_id = method.get("id")
-                method_name = method.get("name")
-                method_carrier = method.get("carrier")
-                min_weight_str = method.get("min_weight")
-                max_weight_str = method.get("max_weight")
-                countries = method.get("countries", [])
-
-                # Skip if essential fields are missing
-                if not method_id or not method_name:
-                    logger.warning(
-                        f"Shipping method {idx} missing id or name, skipping"
-                    )
-                    continue
-
-                # ✅ Filter 1: Check weight range (if provided)
-                if min_weight_str and max_weight_str:
-                    try:
-                        min_weight = float(min_weight_str)
-                        max_weight = float(max_weight_str)
-
-                        # Check if parcel weight is within method's weight range
-                        if weight < min_weight or weight > max_weight:
-                            # Weight out of range, skip this method
-                            continue
-                    except (TypeError, ValueError):
-                        # Invalid weight format, skip weight check but continue
-                        logger.warning(
-                            f"Method {method_id} has invalid weight format, skipping weight filter"
-                        )
-
-                # ✅ Filter 2: Check if destination country is supported
-                if not isinstance(countries, list):
-                    # No countries data or invalid format, skip this method
-                    logger.warning(
-                        f"Method {method_id} has invalid countries data, skipping"
-                    )
-                    continue
-
-                # If countries array is empty, skip (no price info available)
-                if not countries:
-                    continue
-
-                # Find the destination country in the countries array
-                country_data = None
-                for country in countries:
-                    if (
-                        isinstance(country, dict)
-                        and country.get("iso_2") == receiver_country
-                    ):
-                        country_data = country
-                        break
-
-                if not country_data:
-                    # Destination country not supported by this method, skip
-                    continue
-
-                # ✅ Extract price from country data
-                price = country_data.get("price")
-                if price is None:
-                    logger.warning(
-                        f"Method {method_id} has no price for {receiver_country}, skipping"
-                    )
-                    continue
-
-                try:
-                    price_float = float(price)
-                    if price_float < 0:
-                        logger.warning(
-                            f"Method {method_id} has negative price, skipping"
-                        )
-                        continue
-                except (TypeError, ValueError):
-                    logger.warning(
-                        f"Method {method_id} has invalid price format, skipping"
-                    )
-                    continue
-
-                # ✅ Extract delivery time from country data (if available)
-                lead_time_hours = country_data.get("lead_time_hours")
-                delivery_days = "N/A"
-                if lead_time_hours:
-                    try:
-                        days = int(lead_time_hours) // 24
-                        delivery_days = f"{days}" if days > 0 else "1"
-                    except (TypeError, ValueError):
-                        pass
-
-                # ✅ Add formatted method to results
-                formatted_methods.append(
-                    {
-                        "id": int(method_id),
-                        "name": str(method_name)[:100],  # Limit name length
-                        "carrier": (
-                            str(method_carrier)[:50] if method_carrier else "unknown"
-                        ),
-                        "price": round(price_float, 2),  # Round to 2 decimals
-                        "currency": "EUR",  # Sendcloud uses EUR for EU shipping
-                        "min_weight": str(min_weight_str) if min_weight_str else "0",
-                        "max_weight": str(max_weight_str) if max_weight_str else "N/A",
-                        "delivery_days": delivery_days,
-                        "service_point_input": str(
-                            method.get("service_point_input", "none")
-                        )[:20],
-                    }
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"Error processing shipping method {idx}: {type(e).__name__}"
-                )
-                continue  # Skip this method and continue with others
-
-        if not formatted_methods:
-            logger.warning(
-                f"No shipping methods available for {receiver_country} with weight {weight}kg after filtering"
-            )
-            return []
-
-        logger.info(
-            f"Successfully filtered {len(formatted_methods)} shipping methods (from {len(shipping_methods)} total) for {receiver_country}"
-        )
-        return formatted_methods
+        # ✅ STEP 3: Validate response structure
+        return parse_shipping_catalog(data)
 
     except requests.exceptions.HTTPError as e:
-        # ✅ STEP 6: Secure error logging (no sensitive data exposure)
+        # ✅ STEP 4: Secure error logging (no sensitive data exposure)
         status_code = e.response.status_code if e.response else "N/A"
         logger.error(f"Sendcloud API HTTP error: Status {status_code}")
 
@@ -592,17 +577,215 @@ def get_shipping_methods(
         logger.error(f"Sendcloud API request failed: {error_type}")
         raise SendcloudAPIError("Failed to connect to Sendcloud API")
 
-    except SendcloudValidationError:
-        # Re-raise validation errors (already logged)
-        raise
-
     except Exception as e:
         # Catch-all for unexpected errors
         error_type = type(e).__name__
-        logger.error(f"Unexpected error in get_shipping_methods: {error_type}")
+        logger.error(f"Unexpected error in fetch_shipping_catalog: {error_type}")
         raise SendcloudAPIError("Unexpected error while fetching shipping methods")
 
 
+def parse_shipping_catalog(data) -> List[Dict]:
+    """
+    Shipping methods of a GET /shipping_methods response body
+
+    Raises:
+        SendcloudAPIError: If the response structure is invalid
+    """
+    if not isinstance(data, dict):
+        logger.error("Sendcloud API response is not a dictionary")
+        raise SendcloudAPIError("Invalid response structure from Sendcloud API")
+
+    # Extract shipping methods
+    shipping_methods = data.get("shipping_methods", [])
+
+    if not isinstance(shipping_methods, list):
+        logger.error("shipping_methods is not a list")
+        raise SendcloudAPIError("Invalid shipping_methods format in response")
+
+    return shipping_methods
+
+
+def filter_shipping_methods(
+    shipping_methods: List[Dict], receiver_country: str, weight: float
+) -> List[Dict]:
+    """
+    Select and format the catalog methods that can ship a parcel
+
+    Args:
+        shipping_methods: Catalog from fetch_shipping_catalog()
+        receiver_country: Validated receiver country code
+        weight: Validated package weight in kg
+
+    Returns:
+        Shipping methods with prices (see get_shipping_methods)
+    """
+    # ✅ Filter and format shipping methods
+    # According to Sendcloud API documentation, each method has:
+    # - id, name, carrier, min_weight, max_weight
+    # - countries array with price per country
+    # We filter based on weight and destination country
+
+    formatted_methods = []
+    for idx, method in enumerate(shipping_methods):
+        try:
+            # Validate method is a dictionary
+            if not isinstance(method, dict):
+                logger.warning(f"Shipping method {idx} is not a dictionary, skipping")
+                continue
+
+            method_id = method.get("id")
+            method_name = method.get("name")
+            method_carrier = method.get("carrier")
+            min_weight_str = method.get("min_weight")
+            max_weight_str = method.get("max_weight")
+            countries = method.get("countries", [])
+
+            # Skip if essential fields are missing
+            if not method_id or not method_name:
+                logger.warning(f"Shipping method {idx} missing id or name, skipping")
+                continue
+
+            # ✅ Filter 1: Check weight range (if provided)
+            if min_weight_str and max_weight_str:
+                try:
+                    min_weight = float(min_weight_str)
+                    max_weight = float(max_weight_str)
+
+                    # Check if parcel weight is within method's weight range
+                    if weight < min_weight or weight > max_weight:
+                        # Weight out of range, skip this method
+                        continue
+                except (TypeError, ValueError):
+                    # Invalid weight format, skip weight check but continue
+                    logger.warning(
+                        f"Method {method_id} has invalid weight format, skipping weight filter"
+                    )
+
+            # ✅ Filter 2: Check if destination country is supported
+            if not isinstance(countries, list):
+                # No countries data or invalid format, skip this method
+                logger.warning(
+                    f"Method {method_id} has invalid countries data, skipping"
+                )
+                continue
+
+            # If countries array is empty, skip (no price info available)
+            if not countries:
+                continue
+
+            # Find the destination country in the countries array
+            country_data = None
+            for country in countries:
+                if (
+                    isinstance(country, dict)
+                    and country.get("iso_2") == receiver_country
+                ):
+                    country_data = country
+                    break
+
+            if not country_data:
+                # Destination country not supported by this method, skip
+                continue
+
+            # ✅ Extract price from country data
+            price = country_data.get("price")
+            if price is None:
+                logger.warning(
+                    f"Method {method_id} has no price for {receiver_country}, skipping"
+                )
+                continue
+
+            try:
+                price_float = float(price)
+                if price_float < 0:
+                    logger.warning(f"Method {method_id} has negative price, skipping")
+                    continue
+            except (TypeError, ValueError):
+                logger.warning(f"Method {method_id} has invalid price format, skipping")
+                continue
+
+            # ✅ Extract delivery time from country data (if available)
+            lead_time_hours = country_data.get("lead_time_hours")
+            delivery_days = "N/A"
+            if lead_time_hours:
+                try:
+                    days = int(lead_time_hours) // 24
+                    delivery_days = f"{days}" if days > 0 else "1"
+                except (TypeError, ValueError):
+                    pass
+
+            # ✅ Add formatted method to results
+            formatted_methods.append(
+                {
+                    "id": int(method_id),
+                    "name": str(method_name)[:100],  # Limit name length
+                    "carrier": (
+                        str(method_carrier)[:50] if method_carrier else "unknown"
+                    ),
+                    "price": round(price_float, 2),  # Round to 2 decimals
+                    "currency": "EUR",  # Sendcloud uses EUR for EU shipping
+                    "min_weight": str(min_weight_str) if min_weight_str else "0",
+                    "max_weight": str(max_weight_str) if max_weight_str else "N/A",
+                    "delivery_days": delivery_days,
+                    "service_point_input": str(
+                        method.get("service_point_input", "none")
+                    )[:20],
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Error processing shipping method {idx}: {type(e).__name__}")
+            continue  # Skip this method and continue with others
+
+    if not formatted_methods:
+        logger.warning(
+            f"No shipping methods available for {receiver_country} with weight {weight}kg after filtering"
+        )
+        return []
+
+    logger.info(
+        f"Successfully filtered {len(formatted_methods)} shipping methods (from {len(shipping_methods)} total) for {receiver_country}"
+    )
+    return formatted_methods
+
+
+def get_shipping_methods_bulk(quotes: List[Dict]) -> List[Dict]:
+    """
+    Get shipping methods and prices for many parcels at once
+
+    The catalog is fetched once and every parcel is priced against it, so a
+    batch costs one Sendcloud request instead of one per parcel.
+
+    Args:
+        quotes: Dicts with the get_shipping_methods() arguments
+
+    Returns:
+        One dict per quote, in input order:
+        {'success': True, 'shipping_methods': [...]} or
+        {'success': False, 'error': '...'} for invalid quotes
+
+    Raises:
+        SendcloudAPIError: If the catalog cannot be fetched
+        SendcloudValidationError: If there are too many quotes
+    """
+    if len(quotes) > MAX_BULK_QUOTES:
+        raise SendcloudValidationError(
+            f"Too many quotes (maximum {MAX_BULK_QUOTES} per request)"
+        )
+
+    catalog = fetch_shipping_catalog()
+
+    results = []
+    for quote in quotes:
+        try:
+            shipping_methods = get_shipping_methods(**quote, catalog=catalog)
+            results.append({"success": True, "shipping_methods": shipping_methods})
+        except SendcloudValidationError as e:
+            results.append({"success": False, "error": str(e)})
+
+    return results
+
+
 def get_shipping_methods_simple(
     weight: float,
     country: str,
@@ -662,7 +845,7 @@ def get_shipping_methods_simple(
             f"Requesting Sendcloud shipping methods ({mode_str}): Weight={weight}kg, Country={country}"
         )
 
-        response = requests.get(
+        response = get_session().get(
             url,
             auth=auth,
             params=params,
@@ -683,125 +866,7 @@ def get_shipping_methods_simple(
             logger.warning("No shipping methods available")
             return []
 
-        # Filter by weight and country
-        filtered_methods = []
-        country_upper = country.upper()
-
-        for method in shipping_methods:
-            if not isinstance(method, dict):
-                continue
-
-            method_id = method.get("id")
-            method_name = method.get("name")
-            min_weight_str = method.get("min_weight")
-            max_weight_str = method.get("max_weight")
-            countries = method.get("countries", [])
-
-            if not method_id or not method_name:
-                continue
-
-            # Debug: Log method structure to understand carrier format
-            if not filtered_methods:  # Only log first method to avoid spam
-                logger.debug(f"Sample method structure: {list(method.keys())}")
-                logger.debug(
-                    f"Carrier field type: {type(method.get('carrier'))}, value: {method.get('carrier')}"
-                )
-
-            # Filter by weight - weight must be between min_weight and max_weight (inclusive)
-            weight_valid = True
-            if min_weight_str and max_weight_str:
-                try:
-                    min_weight = float(min_weight_str)
-                    max_weight = float(max_weight_str)
-                    # Weight must be >= min_weight and <= max_weight
-                    if weight < min_weight or weight > max_weight:
-                        weight_valid = False
-                except (TypeError, ValueError):
-                    # If weight values are invalid, skip weight check
-                    pass
-
-            if not weight_valid:
-                continue
-
-            # Filter by country - check if country is in the countries array and extract price
-            country_data_found = None
-            if isinstance(countries, list):
-                for country_data in countries:
-                    if isinstance(country_data, dict):
-                        country_code = country_data.get("iso_2")
-                        if country_code and country_code.upper() == country_upper:
-                            country_data_found = country_data
-                            break
-
-            if not country_data_found:
-                continue
-
-            # Extract carrier code - handle multiple formats
-            carrier = "unknown"
-            carrier_obj = method.get("carrier")
-
-            if carrier_obj:
-                if isinstance(carrier_obj, dict):
-                    # Carrier is a dict with 'code', 'name', or 'code_name' field
-                    carrier = (
-                        carrier_obj.get("code")
-                        or carrier_obj.get("name")
-                        or carrier_obj.get("code_name")
-                        or "unknown"
-                    )
-                elif isinstance(carrier_obj, str) and carrier_obj.lower() != "unknown":
-                    # Carrier is already a string (and not "unknown")
-                    carrier = carrier_obj
-                else:
-                    # Try to convert to string if it's something else
-                    carrier = (
-                        str(carrier_obj)
-                        if str(carrier_obj).lower() != "unknown"
-                        else "unknown"
-                    )
-
-            # If still unknown, try to extract from method name (e.g., "DHL Parcel Connect" -> "DHL")
-            if carrier == "unknown" and method_name:
-                # Common carrier prefixes in method names
-                carrier_prefixes = [
-                    "DHL",
-                    "UPS",
-                    "FedEx",
-                    "DPD",
-                    "PostNL",
-                    "GLS",
-                    "TNT",
-                    "DHL Express",
-                ]
-                for prefix in carrier_prefixes:
-                    if method_name.upper().startswith(prefix.upper()):
-                        carrier = prefix
-                        break
-
-            # Extract price for this country
-            country_price = country_data_found.get("price", 0)
-
-            # Add to filtered methods with country-specific price
-            filtered_methods.append(
-                {
-                    "id": method_id,
-                    "name": method_name,
-                    "carrier": carrier,
-                    "min_weight": min_weight_str,
-                    "max_weight": max_weight_str,
-                    "price": float(country_price) if country_price else 0,
-                    "currency": "EUR",  # Default currency
-                    "country_price_breakdown": country_data_found.get(
-                        "price_breakdown", []
-                    ),
-                    "countries": countries,  # Keep full countries array for reference
-                }
-            )
-
-        logger.info(
-            f"Filtered {len(filtered_methods)} shipping methods for weight={weight}kg, country={country}"
-        )
-        return filtered_methods
+        return filter_shipping_methods_simple(shipping_methods, weight, country)
 
     except requests.exceptions.HTTPError as e:
         status_code = e.response.status_code if e.response else "N/A"
@@ -820,36 +885,154 @@ def get_shipping_methods_simple(
         raise SendcloudAPIError("Unexpected error while fetching shipping methods")
 
 
-def create_parcel(
-    shipment_data: Dict,
-    selected_shipping_method: int,
-) -> Dict:
+def filter_shipping_methods_simple(
+    shipping_methods: List[Dict], weight: float, country: str
+) -> List[Dict]:
     """
-    Create a parcel in Sendcloud after payment confirmation
+    Methods of a shipping catalog available for a weight and country
 
     Args:
-        shipment_data: Dictionary containing shipment details
-        selected_shipping_method: ID of selected shipping method
+        shipping_methods: Raw shipping methods as returned by GET /shipping_methods
+        weight: Validated package weight in kg
+        country: Validated destination country code
 
     Returns:
-        {
-            'sendcloud_id': 12345,
-            'tracking_number': '3SABCD123456789',
-            'tracking_url': 'https://...',
-            'label_url': 'https://...',
-            'status': 'announced'
-        }
+        Methods with the destination's price, as get_shipping_methods_simple
+    """
+    filtered_methods = []
+    country_upper = country.upper()
+
+    for method in shipping_methods:
+        if not isinstance(method, dict):
+            continue
+
+        method_id = method.get("id")
+        method_name = method.get("name")
+        min_weight_str = method.get("min_weight")
+        max_weight_str = method.get("max_weight")
+        countries = method.get("countries", [])
+
+        if not method_id or not method_name:
+            continue
+
+        # Debug: Log method structure to understand carrier format
+        if not filtered_methods:  # Only log first method to avoid spam
+            logger.debug(f"Sample method structure: {list(method.keys())}")
+            logger.debug(
+                f"Carrier field type: {type(method.get('carrier'))}, value: {method.get('carrier')}"
+            )
 
-    Raises:
-        SendcloudAPIError: If API call fails
-        SendcloudValidationError: If input validation fails
+        # Filter by weight - weight must be between min_weight and max_weight (inclusive)
+        weight_valid = True
+        if min_weight_str and max_weight_str:
+            try:
+                min_weight = float(min_weight_str)
+                max_weight = float(max_weight_str)
+                # Weight must be >= min_weight and <= max_weight
+                if weight < min_weight or weight > max_weight:
+                    weight_valid = False
+            except (TypeError, ValueError):
+                # If weight values are invalid, skip weight check
+                pass
+
+        if not weight_valid:
+            continue
+
+        # Filter by country - check if country is in the countries array and extract price
+        country_data_found = None
+        if isinstance(countries, list):
+            for country_data in countries:
+                if isinstance(country_data, dict):
+                    country_code = country_data.get("iso_2")
+                    if country_code and country_code.upper() == country_upper:
+                        country_data_found = country_data
+                        break
+
+        if not country_data_found:
+            continue
+
+        # Extract carrier code - handle multiple formats
+        carrier = "unknown"
+        carrier_obj = method.get("carrier")
+
+        if carrier_obj:
+            if isinstance(carrier_obj, dict):
+                # Carrier is a dict with 'code', 'name', or 'code_name' field
+                carrier = (
+                    carrier_obj.get("code")
+                    or carrier_obj.get("name")
+                    or carrier_obj.get("code_name")
+                    or "unknown"
+                )
+            elif isinstance(carrier_obj, str) and carrier_obj.lower() != "unknown":
+                # Carrier is already a string (and not "unknown")
+                carrier = carrier_obj
+            else:
+                # Try to convert to string if it's something else
+                carrier = (
+                    str(carrier_obj)
+                    if str(carrier_obj).lower() != "unknown"
+                    else "unknown"
+                )
+
+        # If still unknown, try to extract from method name (e.g., "DHL Parcel Connect" -> "DHL")
+        if carrier == "unknown" and method_name:
+            # Common carrier prefixes in method names
+            carrier_prefixes = [
+                "DHL",
+                "UPS",
+                "FedEx",
+                "DPD",
+                "PostNL",
+                "GLS",
+                "TNT",
+                "DHL Express",
+            ]
+            for prefix in carrier_prefixes:
+                if method_name.upper().startswith(prefix.upper()):
+                    carrier = prefix
+                    break
+
+        # Extract price for this country
+        country_price = country_data_found.get("price", 0)
+
+        # Add to filtered methods with country-specific price
+        filtered_methods.append(
+            {
+                "id": method_id,
+                "name": method_name,
+                "carrier": carrier,
+                "min_weight": min_weight_str,
+                "max_weight": max_weight_str,
+                "price": float(country_price) if country_price else 0,
+                "currency": "EUR",  # Default currency
+                "country_price_breakdown": country_data_found.get(
+                    "price_breakdown", []
+                ),
+                "countries": countries,  # Keep full countries array for reference
+            }
+        )
+
+    logger.info(
+        f"Filtered {len(filtered_methods)} shipping methods for weight={weight}kg, country={country}"
+    )
+    return filtered_methods
+
+
+def build_parcel_payload(shipment_data: Dict, selected_shipping_method: int) -> Dict:
     """
+    Validate shipment data and build the Sendcloud "parcel" object
 
-    # Validate API credentials
-    if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
-        logger.error("Sendcloud API credentials not configured")
-        raise SendcloudAPIError("Sendcloud API credentials missing")
+    Args:
+        shipment_data: Dictionary containing shipment details
+        selected_shipping_method: ID of selected shipping method
+
+    Returns:
+        Parcel dictionary ready to be sent to POST /parcels
 
+    Raises:
+        SendcloudValidationError: If input validation fails
+    """
     # ✅ Validate shipment_data structure
     if not isinstance(shipment_data, dict):
         raise SendcloudValidationError("shipment_data must be a dictionary")
@@ -929,55 +1112,47 @@ def create_parcel(
         logger.warning(f"Parcel data validation failed: {str(e)}")
         raise
 
-    # API endpoint
-    url = f"{settings.SENDCLOUD_API_URL}parcels"
-
-    # Prepare authentication
-    auth = HTTPBasicAuth(settings.SENDCLOUD_PUBLIC_KEY, settings.SENDCLOUD_SECRET_KEY)
-
     # ✅ Prepare parcel data with validated fields - using new Sendcloud format
-    parcel_data = {
-        "parcel": {
-            "name": receiver_name,
-            "address": receiver_address,
-            "city": receiver_city,
-            "postal_code": receiver_postal_code,
-            "country": receiver_country,
-            "weight": str(weight),
-            "shipping_method": shipping_method_id,
-            "request_label": True,
-        }
+    parcel = {
+        "name": receiver_name,
+        "address": receiver_address,
+        "city": receiver_city,
+        "postal_code": receiver_postal_code,
+        "country": receiver_country,
+        "weight": str(weight),
+        "shipping_method": shipping_method_id,
+        "request_label": True,
     }
 
     # ✅ Add house_number - Sendcloud requires this field
     # If not provided, try to extract from address or use default "1"
     if house_number and house_number.strip():
         house_number_clean = validate_text_field(house_number, "House number", 50)
-        parcel_data["parcel"]["house_number"] = house_number_clean
+        parcel["house_number"] = house_number_clean
     else:
         # Try to extract house number from address (common format: "Street 123" or "Street, 123")
         house_num_match = re.search(r"\b(\d+[a-zA-Z]?)\b", receiver_address)
         if house_num_match:
-            parcel_data["parcel"]["house_number"] = house_num_match.group(1)[:50]
+            parcel["house_number"] = house_num_match.group(1)[:50]
         else:
             # Use default "1" if we can't extract it
-            parcel_data["parcel"]["house_number"] = "1"
+            parcel["house_number"] = "1"
 
     # ✅ Add optional validated fields
     if company_name:
         company_name_clean = validate_text_field(company_name, "Company name", 100)
-        parcel_data["parcel"]["company_name"] = company_name_clean
+        parcel["company_name"] = company_name_clean
 
     if email:
         # Basic email validation (regex)
         email_clean = str(email).strip()
         if re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email_clean):
-            parcel_data["parcel"]["email"] = email_clean[:200]
+            parcel["email"] = email_clean[:200]
 
     if telephone:
         # Basic phone validation (remove non-digits, limit length)
         phone_clean = re.sub(r"[^\d\+\s\-\(\)]", "", str(telephone))
-        parcel_data["parcel"]["telephone"] = phone_clean[:30]
+        parcel["telephone"] = phone_clean[:30]
 
     # Add order_number if available (from shipment_number)
     order_number = shipment_data.get("order_number") or shipment_data.get(
@@ -985,20 +1160,160 @@ def create_parcel(
     )
     if order_number:
         order_number_clean = validate_text_field(order_number, "Order number", 50)
-        parcel_data["parcel"]["order_number"] = order_number_clean
+        parcel["order_number"] = order_number_clean
+
+    return parcel
+
+
+def parse_parcel_response(parcel: Dict) -> Dict:
+    """
+    Build the validated result for a parcel returned by Sendcloud
+
+    Args:
+        parcel: "parcel" object from a Sendcloud parcels response
+
+    Returns:
+        Same structure as create_parcel()
+
+    Raises:
+        SendcloudAPIError: If the parcel data is invalid
+    """
+    if not isinstance(parcel, dict):
+        logger.error("Parcel data is not a dictionary")
+        raise SendcloudAPIError("Invalid parcel data in response")
+
+    # ✅ Validate required fields in response
+    parcel_id = parcel.get("id")
+    if not parcel_id:
+        logger.error("Sendcloud did not return parcel ID")
+        raise SendcloudAPIError("Missing parcel ID in Sendcloud response")
+
+    # ✅ Build validated result
+    result = {
+        "sendcloud_id": int(parcel_id),
+        "tracking_number": str(parcel.get("tracking_number", ""))[:100],
+        "tracking_url": str(parcel.get("tracking_url", ""))[:500],
+        "label_url": None,
+        "status": "announced",
+        "carrier": (
+            str(parcel.get("carrier", {}).get("code", "unknown"))[:50]
+            if isinstance(parcel.get("carrier"), dict)
+            else "unknown"
+        ),
+        "order_number": str(parcel.get("order_number") or "")[:50],
+    }
+
+    # ✅ Extract label URL safely
+    label_data = parcel.get("label", {})
+    if isinstance(label_data, dict):
+        normal_printer = label_data.get("normal_printer")
+        if isinstance(normal_printer, list) and len(normal_printer) > 0:
+            result["label_url"] = str(normal_printer[0])[:500]
+
+    # ✅ Extract status safely
+    status_data = parcel.get("status", {})
+    if isinstance(status_data, dict):
+        status_message = status_data.get("message")
+        if status_message:
+            result["status"] = str(status_message)[:50]
+
+    # ✅ Extract normal_printer labels (A4 labels) - these are URLs that need authentication
+    normal_printer_labels = []
+    if isinstance(label_data, dict):
+        normal_printer = label_data.get("normal_printer")
+        if isinstance(normal_printer, list):
+            # Store the URLs - we'll need to proxy these through our backend
+            normal_printer_labels = [str(url)[:500] for url in normal_printer if url]
+
+    result["normal_printer_labels"] = normal_printer_labels
+
+    return result
+
+
+def _http_error_details(e: requests.exceptions.HTTPError):
+    """Extract (status_code, error_details) from a Sendcloud HTTP error"""
+    status_code = "N/A"
+    error_details = None
+
+    if e.response is not None:
+        try:
+            status_code = e.response.status_code
+        except (AttributeError, TypeError):
+            status_code = "N/A"
+
+        # Try to get error details from response
+        if status_code in [400, 401, 403, 422]:
+            try:
+                error_data = e.response.json()
+                if isinstance(error_data, dict):
+                    # Try different error message formats
+                    error_msg = (
+                        error_data.get("error", {}).get("message")
+                        or error_data.get("message")
+                        or str(error_data.get("error", ""))
+                    )
+                    if error_msg:
+                        error_details = str(error_msg)[:200]
+                        logger.error(f"Sendcloud error details: {error_details}")
+            except (ValueError, AttributeError, TypeError):
+                # If JSON parsing fails, try to get text
+                try:
+                    error_text = e.response.text[:200]
+                    if error_text:
+                        error_details = error_text
+                        logger.error(f"Sendcloud error response: {error_details}")
+                except:
+                    pass
+
+    return status_code, error_details
+
+
+def create_parcel(
+    shipment_data: Dict,
+    selected_shipping_method: int,
+) -> Dict:
+    """
+    Create a parcel in Sendcloud after payment confirmation
+
+    Args:
+        shipment_data: Dictionary containing shipment details
+        selected_shipping_method: ID of selected shipping method
+
+    Returns:
+        {
+            'sendcloud_id': 12345,
+            'tracking_number': '3SABCD123456789',
+            'tracking_url': 'https://...',
+            'label_url': 'https://...',
+            'status': 'announced'
+        }
+
+    Raises:
+        SendcloudAPIError: If API call fails
+        SendcloudValidationError: If input validation fails
+    """
+
+    # Validate API credentials
+    if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
+        logger.error("Sendcloud API credentials not configured")
+        raise SendcloudAPIError("Sendcloud API credentials missing")
+
+    parcel = build_parcel_payload(shipment_data, selected_shipping_method)
+    parcel_data = {"parcel": parcel}
+
+    # API endpoint
+    url = f"{settings.SENDCLOUD_API_URL}parcels"
 
     try:
         # ✅ Secure logging (no personal data)
         logger.info(
-            f"Creating parcel in Sendcloud: Method {shipping_method_id}, Weight {weight}kg, Country {receiver_country}"
+            f"Creating parcel in Sendcloud: Method {parcel['shipping_method']}, Weight {parcel['weight']}kg, Country {parcel['country']}"
         )
         logger.debug(f"Sendcloud API URL: {url}")
-        logger.debug(
-            f"Parcel data structure: {list(parcel_data.get('parcel', {}).keys())}"
-        )
+        logger.debug(f"Parcel data structure: {list(parcel.keys())}")
         # Log non-sensitive fields for debugging
         logger.debug(
-            f"Parcel fields - City: {receiver_city}, Postal Code: {receiver_postal_code}, House Number: {parcel_data['parcel'].get('house_number', 'N/A')}"
+            f"Parcel fields - City: {parcel['city']}, Postal Code: {parcel['postal_code']}, House Number: {parcel.get('house_number', 'N/A')}"
         )
 
         # Add test=1 parameter only in development (DEBUG=True)
@@ -1008,9 +1323,8 @@ def create_parcel(
 
         # Make API request
         try:
-            response = requests.post(
+            response = get_session().post(
                 url,
-                auth=auth,
                 json=parcel_data,
                 params=params,
                 headers={
@@ -1050,107 +1364,14 @@ def create_parcel(
             logger.error("Sendcloud parcel creation response is not a dictionary")
             raise SendcloudAPIError("Invalid response structure from Sendcloud API")
 
-        parcel = data.get("parcel", {})
-
-        if not isinstance(parcel, dict):
-            logger.error("Parcel data is not a dictionary")
-            raise SendcloudAPIError("Invalid parcel data in response")
-
-        # ✅ Validate required fields in response
-        parcel_id = parcel.get("id")
-        if not parcel_id:
-            logger.error("Sendcloud did not return parcel ID")
-            raise SendcloudAPIError("Missing parcel ID in Sendcloud response")
-
-        # ✅ Build validated result
-        result = {
-            "sendcloud_id": int(parcel_id),
-            "tracking_number": str(parcel.get("tracking_number", ""))[:100],
-            "tracking_url": str(parcel.get("tracking_url", ""))[:500],
-            "label_url": None,
-            "status": "announced",
-            "carrier": (
-                str(parcel.get("carrier", {}).get("code", "unknown"))[:50]
-                if isinstance(parcel.get("carrier"), dict)
-                else "unknown"
-            ),
-        }
-
-        # ✅ Extract label URL safely
-        label_data = parcel.get("label", {})
-        if isinstance(label_data, dict):
-            normal_printer = label_data.get("normal_printer")
-            if isinstance(normal_printer, list) and len(normal_printer) > 0:
-                result["label_url"] = str(normal_printer[0])[:500]
-
-        # ✅ Extract status safely
-        status_data = parcel.get("status", {})
-        if isinstance(status_data, dict):
-            status_message = status_data.get("message")
-            if status_message:
-                result["status"] = str(status_message)[:50]
-
-        # ✅ Extract normal_printer labels (A4 labels) - these are URLs that need authentication
-        normal_printer_labels = []
-        if isinstance(label_data, dict):
-            normal_printer = label_data.get("normal_printer")
-            if isinstance(normal_printer, list):
-                # Store the URLs - we'll need to proxy these through our backend
-                normal_printer_labels = [
-                    str(url)[:500] for url in normal_printer if url
-                ]
-
-        result["normal_printer_labels"] = normal_printer_labels
-
-        # ✅ Extract normal_printer labels (A4 labels) - these are URLs that need authentication
-        normal_printer_labels = []
-        if isinstance(label_data, dict):
-            normal_printer = label_data.get("normal_printer")
-            if isinstance(normal_printer, list):
-                # Store the URLs - we'll need to proxy these through our backend
-                normal_printer_labels = [
-                    str(url)[:500] for url in normal_printer if url
-                ]
-
-        result["normal_printer_labels"] = normal_printer_labels
+        result = parse_parcel_response(data.get("parcel", {}))
 
         logger.info(f"✅ Successfully created parcel with ID {result['sendcloud_id']}")
         return result
 
     except requests.exceptions.HTTPError as e:
         # ✅ Secure error logging
-        status_code = "N/A"
-        error_details = None
-
-        if e.response is not None:
-            try:
-                status_code = e.response.status_code
-            except (AttributeError, TypeError):
-                status_code = "N/A"
-
-            # Try to get error details from response
-            if status_code in [400, 401, 403, 422]:
-                try:
-                    error_data = e.response.json()
-                    if isinstance(error_data, dict):
-                        # Try different error message formats
-                        error_msg = (
-                            error_data.get("error", {}).get("message")
-                            or error_data.get("message")
-                            or str(error_data.get("error", ""))
-                        )
-                        if error_msg:
-                            error_details = str(error_msg)[:200]
-                            logger.error(f"Sendcloud error details: {error_details}")
-                except (ValueError, AttributeError, TypeError):
-                    # If JSON parsing fails, try to get text
-                    try:
-                        error_text = e.response.text[:200]
-                        if error_text:
-                            error_details = error_text
-                            logger.error(f"Sendcloud error response: {error_details}")
-                    except:
-                        pass
+        status_code, error_details = _http_error_details(e)
 
         logger.error(
             f"Sendcloud API HTTP error while creating parcel: Status {status_code}"
@@ -1162,7 +1383,7 @@ def create_parcel(
         else:
             raise SendcloudAPIError(f"Failed to create parcel (HTTP {status_code})")
 
-    except SendcloudValidationError:
+    except (SendcloudValidationError, SendcloudAPIError):
         raise
 
     except Exception as e:
@@ -1180,6 +1401,230 @@ def create_parcel(
         )
 
 
+def create_parcels_bulk(items: List[Tuple[Dict, int]]) -> List[Dict]:
+    """
+    Create many parcels in Sendcloud with as few HTTP calls as possible
+
+    Uses the multi-parcel form of POST /parcels ({"parcels": [...]}) in
+    chunks of BULK_PARCEL_CHUNK_SIZE. If Sendcloud rejects a bulk call as a
+    whole (4xx), the parcels of that chunk are created one by one,
+    concurrently, over the pooled session. After a timeout, connection
+    error, 5xx or unreadable answer the chunk may already exist in
+    Sendcloud, so its parcels are reported as failed instead of created twice.
+
+    Args:
+        items: List of (shipment_data, selected_shipping_method) tuples
+
+    Returns:
+        One entry per item, in input order: either the create_parcel() result
+        or {'error': '...'} for parcels that could not be created
+
+    Raises:
+        SendcloudAPIError: If API credentials are missing
+    """
+    if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
+        logger.error("Sendcloud API credentials not configured")
+        raise SendcloudAPIError("Sendcloud API credentials missing")
+
+    results: List[Optional[Dict]] = [None] * len(items)
+
+    # ✅ Validate everything up front; invalid items never reach Sendcloud
+    payloads = []
+    for index, (shipment_data, method_id) in enumerate(items):
+        try:
+            payloads.append((index, build_parcel_payload(shipment_data, method_id)))
+        except SendcloudValidationError as e:
+            results[index] = {"error": str(e)}
+
+    for start in range(0, len(payloads), BULK_PARCEL_CHUNK_SIZE):
+        chunk = payloads[start : start + BULK_PARCEL_CHUNK_SIZE]
+        try:
+            created = _post_parcels_chunk([parcel for _, parcel in chunk])
+        except SendcloudRejectedError as e:
+            logger.warning(
+                f"Bulk parcel creation rejected ({str(e)}), falling back to concurrent single creates"
+            )
+            fallback = _create_parcels_concurrently(
+                [items[index] for index, _ in chunk]
+            )
+            for (index, _), result in zip(chunk, fallback):
+                results[index] = result
+            continue
+        except SendcloudAPIError as e:
+            logger.error(
+                f"Bulk parcel creation outcome unknown ({str(e)}), not retrying {len(chunk)} parcels"
+            )
+            for index, _ in chunk:
+                results[index] = {
+                    "error": f"{str(e)}. The parcel may have been created in Sendcloud; check it before retrying."
+                }
+            continue
+
+        for position, (index, _) in enumerate(chunk):
+            results[index] = created[position]
+
+    logger.info(
+        f"✅ Bulk parcel creation finished: {sum(1 for r in results if r and 'error' not in r)}/{len(items)} created"
+    )
+    return results
+
+
+def _post_parcels_chunk(parcels: List[Dict]) -> List[Dict]:
+    """
+    Send one multi-parcel POST /parcels request
+
+    Sendcloud answers with the created "parcels" and any "failed_parcels".
+    Results are matched back to the request by order_number; a requested
+    parcel that cannot be matched unambiguously gets an error instead of
+    another parcel's result. Rate-limited requests (HTTP 429) are retried
+    after the Retry-After delay.
+
+    Returns:
+        One result or {'error': ...} per requested parcel, in request order
+
+    Raises:
+        SendcloudRejectedError: If Sendcloud refused the request (4xx other
+            than 429)
+        SendcloudAPIError: If the outcome is unknown (timeout, connection
+            error, 5xx, invalid response) or Sendcloud kept rate limiting
+    """
+    url = f"{settings.SENDCLOUD_API_URL}parcels"
+    params = {"errors": "verbose-carrier"}
+    if settings.DEBUG:
+        params["test"] = "1"
+
+    logger.info(f"Creating {len(parcels)} parcels in Sendcloud (bulk)")
+
+    try:
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            response = get_session().post(
+                url,
+                json={"parcels": parcels},
+                params=params,
+                headers={
+                    "Content-Type": "application/json",
+                    "Accept": "application/json",
+                },
+                timeout=BULK_TIMEOUT_SECONDS,
+            )
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                break
+            wait = _retry_after_seconds(response, attempt)
+            logger.warning(
+                f"⚠️ Sendcloud rate limited the bulk request, retrying in {wait}s"
+            )
+            time.sleep(wait)
+        response.raise_for_status()
+        data = response.json()
+    except requests.exceptions.HTTPError as e:
+        status_code, error_details = _http_error_details(e)
+        # Nothing was created on a 4xx, but a rate limit (429) is not a
+        # rejection of the parcels: retrying them one by one would only hit it
+        # again
+        error_class = (
+            SendcloudRejectedError
+            if isinstance(status_code, int)
+            and 400 <= status_code < 500
+            and status_code != 429
+            else SendcloudAPIError
+        )
+        raise error_class(
+            f"Failed to create parcels (HTTP {status_code}): {error_details or ''}".strip()
+        )
+    except requests.exceptions.Timeout:
+        raise SendcloudAPIError("Sendcloud API request timeout")
+    except requests.exceptions.RequestException as e:
+        raise SendcloudAPIError(
+            f"Failed to connect to Sendcloud API: {type(e).__name__}"
+        )
+    except ValueError:
+        raise SendcloudAPIError("Invalid JSON response from Sendcloud API")
+
+    if not isinstance(data, dict) or not isinstance(data.get("parcels", []), list):
+        raise SendcloudAPIError("Invalid response structure from Sendcloud API")
+
+    by_order_number = {}
+    unmatched = []
+    for parcel in data.get("parcels", []):
+        try:
+            result = parse_parcel_response(parcel)
+        except SendcloudAPIError as e:
+            logger.warning(f"Skipping invalid parcel in bulk response: {str(e)}")
+            unmatched.append(parcel.get("id") if isinstance(parcel, dict) else None)
+            continue
+        if result["order_number"] and result["order_number"] not in by_order_number:
+            by_order_number[result["order_number"]] = result
+        else:
+            unmatched.append(result["sendcloud_id"])
+
+    failed_by_order_number = {}
+    for failed in data.get("failed_parcels", []) or []:
+        if not isinstance(failed, dict):
+            continue
+        failed_parcel = failed.get("parcel") or {}
+        order_number = str(failed_parcel.get("order_number") or "")[:50]
+        errors = failed.get("errors")
+        failed_by_order_number[order_number] = {
+            "error": f"Failed to create parcel: {str(errors)[:200]}"
+        }
+
+    requested = Counter(parcel.get("order_number", "") for parcel in parcels)
+    results = []
+    for parcel in parcels:
+        order_number = parcel.get("order_number", "")
+        if order_number and requested[order_number] > 1:
+            results.append(
+                {
+                    "error": "Several parcels of the bulk request share this order number, "
+                    "so the Sendcloud result cannot be matched. The parcel may have "
+                    "been created in Sendcloud; check it before retrying."
+                }
+            )
+        elif order_number and order_number in by_order_number:
+            results.append(by_order_number[order_number])
+        elif order_number and order_number in failed_by_order_number:
+            results.append(failed_by_order_number[order_number])
+        elif unmatched:
+            results.append(
+                {
+                    "error": "Parcel could not be matched in the Sendcloud bulk response. "
+                    "It may have been created in Sendcloud; check it before retrying."
+                }
+            )
+        else:
+            results.append({"error": "Parcel missing from Sendcloud bulk response"})
+
+    if unmatched:
+        logger.warning(
+            f"⚠️ Sendcloud bulk response had parcels without a matching order number: {unmatched}"
+        )
+
+    return results
+
+
+def _retry_after_seconds(response, attempt: int) -> float:
+    """Delay before retrying a rate-limited request (Retry-After, else exponential)"""
+    try:
+        wait = float(response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        wait = 2**attempt
+    return min(max(wait, 0), RATE_LIMIT_MAX_WAIT_SECONDS)
+
+
+def _create_parcels_concurrently(items: List[Tuple[Dict, int]]) -> List[Dict]:
+    """Create parcels one request each, in parallel over the pooled session"""
+
+    def create_one(item):
+        shipment_data, method_id = item
+        try:
+            return create_parcel(shipment_data, method_id)
+        except (SendcloudAPIError, SendcloudValidationError) as e:
+            return {"error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        return list(executor.map(create_one, items))
+
+
 def verify_webhook_signature(payload: bytes, signature: str) -> bool:
     """
     Verify Sendcloud webhook signature to prevent fake webhooks
@@ -1226,6 +1671,35 @@ def verify_webhook_signature(payload: bytes, signature: str) -> bool:
         return False
 
 
+def parse_webhook_timestamp(value) -> Optional[datetime]:
+    """
+    Parse the event timestamp sent by Sendcloud
+
+    Sendcloud sends milliseconds since the epoch, but ISO 8601 strings are
+    accepted as well.
+
+    Args:
+        value: Raw "timestamp" value from the webhook payload
+
+    Returns:
+        Timezone-aware datetime, or None if missing or unparseable
+    """
+    if value is None or value == "":
+        return None
+
+    try:
+        if isinstance(value, (int, float)) or str(value).isdigit():
+            return datetime.fromtimestamp(int(value) / 1000, tz=dt_timezone.utc)
+
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_timezone.utc)
+        return parsed
+    except (TypeError, ValueError, OverflowError, OSError):
+        logger.warning("Could not parse Sendcloud webhook timestamp")
+        return None
+
+
 def parse_webhook_data(data: Dict) -> Dict:
     """
     Parse and validate Sendcloud webhook data
@@ -1257,7 +1731,9 @@ def parse_webhook_data(data: Dict) -> Dict:
             "sendcloud_id": int(parcel_id),
             "tracking_number": str(parcel.get("tracking_number", ""))[:100],
             "status": "unknown",
+            "status_id": None,
             "carrier": "unknown",
+            "timestamp": parse_webhook_timestamp(data.get("timestamp")),
         }
 
         # Extract status safely
@@ -1266,6 +1742,9 @@ def parse_webhook_data(data: Dict) -> Dict:
             status_message = status_data.get("message")
             if status_message:
                 validated_data["status"] = str(status_message)[:50]
+            status_id = status_data.get("id")
+            if status_id is not None:
+                validated_data["status_id"] = int(status_id)
 
         # Extract carrier safely
         carrier_data = parcel.get("carrier", {})
@@ -1280,19 +1759,12 @@ def parse_webhook_data(data: Dict) -> Dict:
         raise SendcloudValidationError(f"Failed to parse webhook data: {str(e)}")
 
 
-def download_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
+def label_url(parcel_id: int, label_type: str = "normal_printer") -> str:
     """
-    Download a label from Sendcloud with authentication
-
-    Args:
-        parcel_id: Sendcloud parcel ID
-        label_type: Type of label to download ('normal_printer' for A4, 'label' for A6)
-
-    Returns:
-        Label file content as bytes (PDF)
+    Sendcloud URL of a parcel's label PDF
 
     Raises:
-        SendcloudAPIError: If download fails
+        SendcloudAPIError: If the API credentials are not configured
         SendcloudValidationError: If input is invalid
     """
     # Validate inputs
@@ -1321,6 +1793,27 @@ def download_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
         test_param = "?test=1" if settings.DEBUG else ""
         url = f"{settings.SENDCLOUD_API_URL}parcels/{parcel_id_int}/documents/label{test_param}"
 
+    return url
+
+
+def download_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
+    """
+    Download a label from Sendcloud with authentication
+
+    Args:
+        parcel_id: Sendcloud parcel ID
+        label_type: Type of label to download ('normal_printer' for A4, 'label' for A6)
+
+    Returns:
+        Label file content as bytes (PDF)
+
+    Raises:
+        SendcloudAPIError: If download fails
+        SendcloudValidationError: If input is invalid
+    """
+    url = label_url(parcel_id, label_type)
+    parcel_id_int = int(parcel_id)
+
     # Prepare authentication
     auth = HTTPBasicAuth(settings.SENDCLOUD_PUBLIC_KEY, settings.SENDCLOUD_SECRET_KEY)
 
@@ -1330,7 +1823,7 @@ def download_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
             f"Downloading {label_type} label for parcel {parcel_id_int} ({mode_str})"
         )
 
-        response = requests.get(
+        response = get_session().get(
             url,
             auth=auth,
             headers={"Accept": "application/pdf"},
@@ -1354,3 +1847,126 @@ def download_label(parcel_id: int, label_type: str = "normal_printer") -> bytes:
             f"Unexpected error downloading label: {type(e).__name__}: {str(e)}"
         )
         raise SendcloudAPIError(f"Unexpected error downloading label: {str(e)[:200]}")
+
+
+def download_labels_bulk(parcel_ids: List[int], label_type: str = "normal_printer"):
+    """
+    Download the labels of many parcels as a single merged PDF
+
+    Each chunk of parcel IDs is fetched with Sendcloud's bulk label endpoint
+    (GET /labels/{normal_printer|label_printer}?ids=...). When a bulk call
+    fails, the labels of that chunk are downloaded one by one, concurrently,
+    over the pooled session. The resulting PDFs are merged with PyPDF2.
+
+    Args:
+        parcel_ids: Sendcloud parcel IDs, in print order
+        label_type: 'normal_printer' (A4) or 'label' (A6)
+
+    Returns:
+        Tuple (merged PDF bytes, list of parcel IDs whose label failed)
+
+    Raises:
+        SendcloudAPIError: If no label could be downloaded
+        SendcloudValidationError: If input is invalid
+    """
+    from PyPDF2 import PdfReader, PdfWriter
+
+    if label_type not in ["normal_printer", "label"]:
+        raise SendcloudValidationError(f"Invalid label type: {label_type}")
+
+    try:
+        ids = [int(parcel_id) for parcel_id in parcel_ids]
+    except (TypeError, ValueError):
+        raise SendcloudValidationError("Invalid parcel ID")
+
+    if not ids or any(parcel_id <= 0 for parcel_id in ids):
+        raise SendcloudValidationError("Parcel IDs must be positive")
+
+    if not settings.SENDCLOUD_PUBLIC_KEY or not settings.SENDCLOUD_SECRET_KEY:
+        logger.error("Sendcloud API credentials not configured")
+        raise SendcloudAPIError("Sendcloud API credentials missing")
+
+    writer = PdfWriter()
+    failed_ids = []
+
+    for start in range(0, len(ids), BULK_LABEL_CHUNK_SIZE):
+        chunk = ids[start : start + BULK_LABEL_CHUNK_SIZE]
+
+        try:
+            documents = [_download_labels_chunk(chunk, label_type)]
+        except SendcloudAPIError as e:
+            logger.warning(
+                f"Bulk label download failed ({str(e)}), falling back to concurrent downloads"
+            )
+            documents = []
+            for parcel_id, content in zip(
+                chunk, _download_labels_concurrently(chunk, label_type)
+            ):
+                if content is None:
+                    failed_ids.append(parcel_id)
+                else:
+                    documents.append(content)
+
+        # Pages are appended as each document arrives, so only one
+        # chunk of source PDFs is held in memory at a time
+        for content in documents:
+            for page in PdfReader(io.BytesIO(content)).pages:
+                writer.add_page(page)
+
+    if not writer.pages:
+        raise SendcloudAPIError("Failed to download any label from Sendcloud")
+
+    output = io.BytesIO()
+    writer.write(output)
+
+    logger.info(
+        f"✅ Merged {label_type} labels for {len(ids) - len(failed_ids)}/{len(ids)} parcels"
+    )
+    return output.getvalue(), failed_ids
+
+
+def _download_labels_chunk(parcel_ids: List[int], label_type: str) -> bytes:
+    """Fetch one merged label PDF for several parcels from Sendcloud"""
+    printer = "normal_printer" if label_type == "normal_printer" else "label_printer"
+    params = {"ids": ",".join(str(parcel_id) for parcel_id in parcel_ids)}
+    if printer == "normal_printer":
+        params["start_from"] = "0"
+    if settings.DEBUG:
+        params["test"] = "1"
+
+    try:
+        response = get_session().get(
+            f"{settings.SENDCLOUD_API_URL}labels/{printer}",
+            params=params,
+            headers={"Accept": "application/pdf"},
+            timeout=BULK_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+    except requests.exceptions.HTTPError as e:
+        status_code = e.response.status_code if e.response is not None else "N/A"
+        raise SendcloudAPIError(f"Failed to download labels (HTTP {status_code})")
+    except requests.exceptions.RequestException as e:
+        raise SendcloudAPIError(
+            f"Failed to download labels from Sendcloud: {type(e).__name__}"
+        )
+
+    if not response.content.startswith(b"%PDF"):
+        raise SendcloudAPIError("Sendcloud bulk label response is not a PDF")
+
+    return response.content
+
+
+def _download_labels_concurrently(
+    parcel_ids: List[int], label_type: str
+) -> List[Optional[bytes]]:
+    """Download labels one request each, in parallel; None for failures"""
+
+    def download_one(parcel_id):
+        try:
+            return download_label(parcel_id, label_type)
+        except (SendcloudAPIError, SendcloudValidationError) as e:
+            logger.error(f"Failed to download label for parcel {parcel_id}: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        return list(executor.map(download_one, parcel_ids))
@@ -0,0 +1,310 @@
+"""
+Sendcloud webhook event processing
+
+Webhook requests parse the event and store it as a SendcloudWebhookEvent
+before Sendcloud gets its 200; a background worker applies the stored events
+in batches to LCLShipment by `sendcloud_id` and deletes them.
+
+- One indexed `sendcloud_id__in` query per batch instead of one per event
+- Last-write-wins on the Sendcloud event timestamp (late or duplicate
+  deliveries never overwrite newer data)
+- Customer/admin notifications only when the shipment status really changes
+
+Stored events survive restarts and deploys: every worker also polls the table,
+so events left by a stopped process are applied once a worker runs again.
+Workers of several processes lock the rows they apply (SKIP LOCKED).
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+
+from .models import LCLShipment, SendcloudWebhookEvent
+from .prometheus_metrics import SENDCLOUD_WEBHOOK_QUEUE
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of events applied in one database round trip
+BATCH_SIZE = 100
+
+# How long the worker waits for more events before applying a partial batch
+BATCH_WAIT_SECONDS = 0.5
+
+# How often the worker looks for stored events nobody woke it up for
+POLL_SECONDS = 30
+
+# Sendcloud parcel status IDs mapped to LCLShipment statuses.
+# Sendcloud parcels cover the EU pickup leg (customer → Wattweg 5), so they
+# can only move a shipment towards ARRIVED_WATTWEG_5.
+SENDCLOUD_STATUS_MAP = {
+    3: "IN_TRANSIT_TO_WATTWEG_5",  # En route to sorting center
+    5: "IN_TRANSIT_TO_WATTWEG_5",  # Sorted
+    7: "IN_TRANSIT_TO_WATTWEG_5",  # Being sorted
+    22: "IN_TRANSIT_TO_WATTWEG_5",  # Shipment picked up by driver
+    91: "IN_TRANSIT_TO_WATTWEG_5",  # Parcel en route
+    92: "IN_TRANSIT_TO_WATTWEG_5",  # Driver en route
+    11: "ARRIVED_WATTWEG_5",  # Delivered
+    93: "ARRIVED_WATTWEG_5",  # Shipment collected by customer
+}
+
+# Statuses a webhook must never move a shipment out of
+FINAL_STATUSES = {"DELIVERED", "CANCELLED"}
+
+_STATUS_ORDER = {
+    code: index for index, (code, _) in enumerate(LCLShipment.STATUS_CHOICES)
+}
+
+_wakeup = threading.Event()
+_worker_lock = threading.Lock()
+_worker: Optional[threading.Thread] = None
+
+
+def enqueue_event(event: Dict) -> None:
+    """
+    Store a parsed webhook event for background processing
+
+    Returns once the event is saved, so the webhook can be acknowledged.
+
+    Args:
+        event: Output of sendcloud_service.parse_webhook_data()
+    """
+    SendcloudWebhookEvent.from_event(event).save()
+    _ensure_worker()
+    _wakeup.set()
+
+
+def _ensure_worker() -> None:
+    """Start the batch worker thread for this process if it is not running"""
+    global _worker
+
+    if _worker is not None and _worker.is_alive():
+        return
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_run_worker, name="sendcloud-webhooks", daemon=True
+            )
+            _worker.start()
+            logger.info("Started Sendcloud webhook worker thread")
+
+
+def _run_worker() -> None:
+    """Apply stored events forever, in batches"""
+    while True:
+        if _wakeup.wait(POLL_SECONDS):
+            # Give events arriving together the chance to share a batch
+            _wakeup.wait(BATCH_WAIT_SECONDS)
+        _wakeup.clear()
+
+        close_old_connections()
+        try:
+            while apply_pending_events() == BATCH_SIZE:
+                pass
+        except Exception as e:
+            logger.error(
+                f"Failed to apply stored Sendcloud webhook events: {type(e).__name__}: {str(e)}",
+                exc_info=True,
+            )
+        finally:
+            close_old_connections()
+
+
+def apply_pending_events(limit: int = BATCH_SIZE) -> int:
+    """
+    Apply one batch of stored webhook events and delete them
+
+    If the batch fails as a whole, its events are applied one by one so a
+    single bad event cannot hold the others back; failing events are kept
+    with their error and retried up to SendcloudWebhookEvent.MAX_ATTEMPTS.
+
+    Returns:
+        Number of events applied (less than limit once the backlog is done
+        or an event failed; failed events wait for the next run)
+    """
+    with transaction.atomic():
+        rows = list(
+            SendcloudWebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=SendcloudWebhookEvent.MAX_ATTEMPTS)
+            .order_by("id")[:limit]
+        )
+        if not rows:
+            return 0
+
+        try:
+            with transaction.atomic():
+                apply_tracking_events([row.as_event() for row in rows])
+            done = rows
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Batch of {len(rows)} Sendcloud events failed ({type(e).__name__}), "
+                "applying them one by one"
+            )
+            done = []
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        apply_tracking_events([row.as_event()])
+                    done.append(row)
+                except Exception as row_error:
+                    logger.error(
+                        f"Failed to apply Sendcloud event {row.id} for parcel {row.sendcloud_id}: "
+                        f"{type(row_error).__name__}: {str(row_error)}"
+                    )
+                    SendcloudWebhookEvent.objects.filter(id=row.id).update(
+                        attempts=models.F("attempts") + 1,
+                        last_error=f"{type(row_error).__name__}: {row_error}"[:1000],
+                    )
+
+        SendcloudWebhookEvent.objects.filter(id__in=[row.id for row in done]).delete()
+
+    SENDCLOUD_WEBHOOK_QUEUE.set(
+        SendcloudWebhookEvent.objects.filter(
+            attempts__lt=SendcloudWebhookEvent.MAX_ATTEMPTS
+        ).count()
+    )
+    return len(done)
+
+
+def _latest_events(events: List[Dict]) -> Dict[int, Dict]:
+    """Keep only the newest event per parcel (events without a timestamp lose)"""
+    latest = {}
+    for event in events:
+        sendcloud_id = event.get("sendcloud_id")
+        if not sendcloud_id:
+            continue
+
+        current = latest.get(sendcloud_id)
+        if current is None or _is_newer(event, current.get("timestamp")):
+            latest[sendcloud_id] = event
+
+    return latest
+
+
+def _is_newer(event: Dict, applied_at) -> bool:
+    """Last-write-wins check against the timestamp of the applied event"""
+    timestamp = event.get("timestamp")
+    if applied_at is None:
+        return True
+    if timestamp is None:
+        return False
+    return timestamp > applied_at
+
+
+def _target_status(shipment: LCLShipment, event: Dict) -> Optional[str]:
+    """Shipment status implied by the event, if it moves the shipment forward"""
+    new_status = SENDCLOUD_STATUS_MAP.get(event.get("status_id"))
+    if not new_status or shipment.status in FINAL_STATUSES:
+        return None
+
+    if _STATUS_ORDER.get(new_status, -1) <= _STATUS_ORDER.get(shipment.status, -1):
+        return None
+
+    return new_status
+
+
+def apply_tracking_events(events: List[Dict]) -> List[tuple]:
+    """
+    Apply a batch of parsed Sendcloud webhook events to LCL shipments
+
+    Args:
+        events: Parsed webhook events (see sendcloud_service.parse_webhook_data)
+
+    Returns:
+        List of (shipment, old_status, new_status) for real status transitions
+    """
+    latest = _latest_events(events)
+    if not latest:
+        return []
+
+    transitions = []
+    updated = []
+    now = timezone.now()
+
+    with transaction.atomic():
+        shipments = (
+            LCLShipment.objects.select_for_update(of=("self",))
+            .select_related("user")
+            .filter(sendcloud_id__in=list(latest.keys()))
+        )
+
+        for shipment in shipments:
+            event = latest[shipment.sendcloud_id]
+
+            if not _is_newer(event, shipment.sendcloud_status_updated_at):
+                logger.info(
+                    f"Skipping stale Sendcloud event for parcel {shipment.sendcloud_id}"
+                )
+                continue
+
+            if event.get("tracking_number"):
+                shipment.tracking_number = event["tracking_number"]
+            shipment.sendcloud_status = event.get("status", "")[:50]
+            if event.get("timestamp"):
+                shipment.sendcloud_status_updated_at = event["timestamp"]
+
+            new_status = _target_status(shipment, event)
+            if new_status:
+                transitions.append((shipment, shipment.status, new_status))
+                shipment.status = new_status
+
+            # bulk_update skips auto_now; updated_at drives the dashboard rollup
+            shipment.updated_at = now
+            updated.append(shipment)
+
+        if updated:
+            LCLShipment.objects.bulk_update(
+                updated,
+                [
+                    "tracking_number",
+                    "sendcloud_status",
+                    "sendcloud_status_updated_at",
+                    "status",
+                    "updated_at",
+                ],
+            )
+
+    unknown = set(latest.keys()) - {shipment.sendcloud_id for shipment in updated}
+    if unknown:
+        logger.info(f"No shipment updated for Sendcloud parcels: {sorted(unknown)}")
+
+    logger.info(
+        f"✅ Applied {len(updated)} Sendcloud events ({len(transitions)} status changes)"
+    )
+
+    # Only notify once the caller's transaction (if any) has committed
+    for shipment, old_status, new_status in transitions:
+        transaction.on_commit(
+            lambda shipment=shipment, old_status=old_status, new_status=new_status: (
+                _notify_status_change(shipment, old_status, new_status)
+            )
+        )
+
+    return transitions
+
+
+def _notify_status_change(shipment: LCLShipment, old_status: str, new_status: str):
+    """Send the same status notifications as the admin status update endpoint"""
+    from .email_service import (
+        send_lcl_shipment_status_update_email,
+        send_lcl_shipment_status_update_notification_to_admin,
+    )
+
+    try:
+        send_lcl_shipment_status_update_email(
+            shipment=shipment,
+            old_status=old_status,
+            new_status=new_status,
+        )
+        send_lcl_shipment_status_update_notification_to_admin(
+            shipment=shipment,
+            old_status=old_status,
+            new_status=new_status,
+        )
+    except Exception as email_error:
+        logger.error(
+            f"Failed to send status update emails for shipment {shipment.id}: {str(email_error)}"
+        )
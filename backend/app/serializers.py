@@ -1,8 +1,10 @@
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
+from django.db.models import Prefetch
 from rest_framework import serializers
 
 from .models import (
+    ArchivedRecord,
     City,
     ContactMessage,
     Country,
@@ -135,8 +137,14 @@ class ChangePasswordSerializer(serializers.Serializer):
 
 
 class FCLQuoteSerializer(serializers.ModelSerializer):
-    """Serializer for FCL Quote requests"""
+    """
+    Serializer for FCL Quote requests
 
+    Querysets should go through setup_eager_loading() so listing quotes costs
+    a constant number of queries.
+    """
+
+    user = UserSerializer(read_only=True)
     edit_request_messages = serializers.SerializerMethodField()
 
     class Meta:
@@ -155,7 +163,16 @@ class FCLQuoteSerializer(serializers.ModelSerializer):
             "invoice_file",
             "invoice_generated_at",
         )
-        depth = 1  # Include user details in nested format
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load the user and the edit request messages with their senders"""
+        return queryset.select_related("user").prefetch_related(
+            Prefetch(
+                "edit_request_messages",
+                queryset=EditRequestMessage.objects.select_related("sender"),
+            )
+        )
 
     def get_edit_request_messages(self, obj):
         """Get all edit request messages for this quote"""
@@ -327,6 +344,41 @@ class FCLQuoteSerializer(serializers.ModelSerializer):
         return fcl_quote
 
 
+class FCLQuoteListSerializer(serializers.ModelSerializer):
+    """
+    Compact FCL quote representation for list pages
+
+    Only plain columns (Meta.fields is also used for .only() in the list
+    view); the full quote is loaded from FCLQuoteDetailView when opened.
+    """
+
+    class Meta:
+        model = FCLQuote
+        fields = (
+            "id",
+            "quote_number",
+            "status",
+            "origin_country",
+            "origin_city",
+            "destination_country",
+            "destination_city",
+            "container_type",
+            "number_of_containers",
+            "cargo_ready_date",
+            "full_name",
+            "company_name",
+            "email",
+            "total_price",
+            "amount_paid",
+            "payment_status",
+            "user_response",
+            "edit_request_status",
+            "created_at",
+            "user",
+        )
+        read_only_fields = fields
+
+
 class EditRequestMessageSerializer(serializers.ModelSerializer):
     """Serializer for Edit Request Messages"""
 
@@ -553,8 +605,61 @@ class LCLShipmentSerializer(serializers.ModelSerializer):
             and representation["total_price"] is not None
         ):
             representation["total_price"] = float(representation["total_price"])
+        self._add_derivative_urls(instance, representation)
         return representation
 
+    def _add_derivative_urls(self, instance, representation):
+        """Add thumbnail/web variant URLs next to the original image URLs"""
+        from django.urls import reverse
+
+        from .image_derivatives import (
+            PHOTO_VARIANTS,
+            SIGNATURE_VARIANTS,
+            derivative_urls,
+            media_name_from_url,
+        )
+
+        if "transfer_slip" in representation:
+            # Slips are not public media; they are downloaded through the API
+            slip_url = None
+            slip_derivatives = {}
+            if instance.transfer_slip:
+                slip_url = reverse("app:lcl_shipment_transfer_slip", args=[instance.pk])
+                request = self.context.get("request")
+                if request is not None:
+                    slip_url = request.build_absolute_uri(slip_url)
+                slip_derivatives = {
+                    variant: f"{slip_url}?variant={variant}"
+                    for variant in derivative_urls(
+                        instance.transfer_slip.name, PHOTO_VARIANTS
+                    )
+                }
+            representation["transfer_slip"] = slip_url
+            representation["transfer_slip_derivatives"] = slip_derivatives
+        if "invoice_signature" in representation:
+            representation["invoice_signature_derivatives"] = derivative_urls(
+                instance.invoice_signature.name, SIGNATURE_VARIANTS
+            )
+
+        if not isinstance(representation.get("parcels"), list):
+            return
+        # Copy, the JSON is the instance's own list
+        representation["parcels"] = [
+            dict(parcel) if isinstance(parcel, dict) else parcel
+            for parcel in representation["parcels"]
+        ]
+        for parcel in representation["parcels"]:
+            if not isinstance(parcel, dict):
+                continue
+            parcel["photo_derivatives"] = [
+                derivative_urls(media_name_from_url(url), PHOTO_VARIANTS)
+                for url in parcel.get("photo_urls") or []
+            ]
+            for key in ("device_photo", "electronics_picture"):
+                parcel[f"{key}_derivatives"] = derivative_urls(
+                    media_name_from_url(parcel.get(f"{key}_url")), PHOTO_VARIANTS
+                )
+
     def create(self, validated_data):
         """Create LCL shipment and ensure all EU pickup fields are saved"""
         import logging
@@ -677,6 +782,10 @@ class LCLShipmentSerializer(serializers.ModelSerializer):
             "receiver_postal_code",
             "receiver_country",
             "parcels",
+            "total_cbm",
+            "total_weight_kg",
+            "chargeable_weight_kg",
+            "parcel_count",
             "shipment_type",
             "eu_pickup_name",
             "eu_pickup_company_name",
@@ -719,6 +828,10 @@ class LCLShipmentSerializer(serializers.ModelSerializer):
             "user_username",
             "user_email",
             "shipment_number",
+            "total_cbm",
+            "total_weight_kg",
+            "chargeable_weight_kg",
+            "parcel_count",
             "created_at",
             "updated_at",
             "paid_at",
@@ -759,3 +872,95 @@ class LCLShipmentSerializer(serializers.ModelSerializer):
             "selected_eu_shipping_method": {"required": False, "allow_null": True},
             "selected_eu_shipping_name": {"required": False, "allow_blank": True},
         }
+
+
+class LCLShipmentListSerializer(serializers.ModelSerializer):
+    """
+    Compact LCL shipment representation for list pages
+
+    Leaves out the parcels JSON, addresses and files (Meta.fields is also
+    used for .only() in the list view); the full shipment is loaded from
+    LCLShipmentDetailView when opened.
+    """
+
+    user_username = serializers.CharField(source="user.username", read_only=True)
+
+    class Meta:
+        model = LCLShipment
+        fields = (
+            "id",
+            "user",
+            "user_username",
+            "shipment_number",
+            "direction",
+            "shipment_type",
+            "sender_name",
+            "sender_country",
+            "receiver_name",
+            "receiver_country",
+            "total_cbm",
+            "total_weight_kg",
+            "parcel_count",
+            "payment_method",
+            "payment_status",
+            "total_price",
+            "amount_paid",
+            "status",
+            "tracking_number",
+            "created_at",
+            "updated_at",
+            "paid_at",
+        )
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        """Convert DecimalField to float for JSON serialization"""
+        representation = super().to_representation(instance)
+        for field in ("amount_paid", "total_price"):
+            if representation.get(field) is not None:
+                representation[field] = float(representation[field])
+        return representation
+
+
+class ArchivedRecordListSerializer(serializers.ModelSerializer):
+    """Archived record without its data, for the archive list"""
+
+    user_username = serializers.CharField(
+        source="user.username", read_only=True, default=None
+    )
+
+    class Meta:
+        model = ArchivedRecord
+        fields = (
+            "id",
+            "record_type",
+            "original_id",
+            "reference",
+            "user",
+            "user_username",
+            "status",
+            "created_at",
+            "archived_at",
+        )
+        read_only_fields = fields
+
+
+class ArchivedRecordSerializer(ArchivedRecordListSerializer):
+    """Archived record with its original fields and archived files"""
+
+    files = serializers.SerializerMethodField()
+
+    class Meta(ArchivedRecordListSerializer.Meta):
+        fields = ArchivedRecordListSerializer.Meta.fields + ("data", "files")
+        read_only_fields = fields
+
+    def get_files(self, obj):
+        """Archived files with their download index (see archived_record_file_view)"""
+        return [
+            {
+                "index": index,
+                "field": file["field"],
+                "name": file["path"].rsplit("/", 1)[-1],
+            }
+            for index, file in enumerate(obj.files or [])
+        ]
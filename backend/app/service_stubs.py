@@ -0,0 +1,817 @@
+"""
+Local stand-ins for the external services, for load testing
+
+One HTTP server answers for Sendcloud (shipping methods, parcels, labels),
+Stripe (checkout sessions and the checkout.session.completed webhook),
+Twilio (WhatsApp messages) and reCAPTCHA (v3 siteverify and Enterprise
+assessments); a small SMTP server accepts the emails. Started with
+manage.py run_service_stubs; the app uses them when SERVICE_STUBS_URL is set
+(see settings.py).
+
+Every service has a configurable latency (with jitter) and error rate, so
+load tests can reproduce slow or failing providers. Control endpoints:
+
+    GET  /_stubs/stats              requests and injected errors per service
+    POST /_stubs/config             change latency/error settings (JSON)
+    POST /_stubs/reset              reset the statistics
+    POST /stripe/_stubs/checkout/<session_id>/pay
+                                    pay a checkout session and deliver the
+                                    signed webhook to the app
+
+reCAPTCHA tokens of the form "stub:<action>" or "stub:<action>:<nonce>"
+pass verification for that action; any other token fails.
+"""
+
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import random
+import re
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SERVICES = ("sendcloud", "stripe", "twilio", "recaptcha", "smtp")
+
+# Shipping methods of the stub Sendcloud catalog and the countries they serve
+SHIPPING_METHODS = (
+    (8, "PostNL Standard 0-23kg", "postnl", "0.001", "23.001", 6.95, 24),
+    (9, "PostNL Standard 23-31.5kg", "postnl", "23.001", "31.501", 12.95, 24),
+    (1001, "DHL Parcel Connect 0-31.5kg", "dhl", "0.001", "31.501", 9.45, 48),
+    (1002, "DPD Classic 0-31.5kg", "dpd", "0.001", "31.501", 8.25, 48),
+    (1003, "UPS Standard 0-70kg", "ups", "0.001", "70.001", 18.50, 72),
+)
+SHIPPING_COUNTRIES = (
+    "NL BE DE FR LU AT IT ES PT DK SE FI PL CZ IE GR HU RO BG HR".split()
+)
+
+
+def parse_overrides(values, cast=float):
+    """
+    Parse per-service overrides given as "service=value"
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown service
+    """
+    overrides = {}
+    for value in values or ():
+        service, separator, number = value.partition("=")
+        service = service.strip().lower()
+        if not separator or service not in SERVICES:
+            raise ValueError(
+                f"Invalid override '{value}', expected <service>=<value> with "
+                f"service one of {', '.join(SERVICES)}"
+            )
+        overrides[service] = cast(number)
+    return overrides
+
+
+class StubBehaviour:
+    """Latency and error injection of the stubs, per service"""
+
+    FIELDS = ("latency_ms", "jitter_ms", "error_rate", "error_status")
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, error_status=503):
+        self._lock = threading.Lock()
+        self._defaults = {
+            "latency_ms": float(latency_ms),
+            "jitter_ms": float(jitter_ms),
+            "error_rate": float(error_rate),
+            "error_status": int(error_status),
+        }
+        self._services = {service: {} for service in SERVICES}
+        self._random = random.Random()
+
+    def update(self, settings: dict) -> None:
+        """
+        Apply {"latency_ms": .., "services": {"sendcloud": {"error_rate": ..}}}
+
+        Raises:
+            ValueError: On unknown services or fields
+        """
+        services = settings.get("services") or {}
+        unknown = set(settings) - set(self.FIELDS) - {"services"}
+        unknown |= set(services) - set(SERVICES)
+        for values in services.values():
+            unknown |= set(values) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown settings: {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            for field in self.FIELDS:
+                if field in settings:
+                    self._defaults[field] = type(self._defaults[field])(settings[field])
+            for service, values in services.items():
+                for field, value in values.items():
+                    self._services[service][field] = type(self._defaults[field])(value)
+
+    def for_service(self, service: str) -> dict:
+        with self._lock:
+            return {**self._defaults, **self._services[service]}
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                **self._defaults,
+                "services": {
+                    service: dict(values)
+                    for service, values in self._services.items()
+                    if values
+                },
+            }
+
+    def apply(self, service: str):
+        """
+        Wait the service's latency, then decide whether to fail the call
+
+        Returns:
+            Status code of the injected error, or None
+        """
+        behaviour = self.for_service(service)
+        with self._lock:
+            jitter = self._random.uniform(-1, 1) * behaviour["jitter_ms"]
+            failed = self._random.random() < behaviour["error_rate"]
+        delay = max(behaviour["latency_ms"] + jitter, 0) / 1000
+        if delay:
+            time.sleep(delay)
+        return behaviour["error_status"] if failed else None
+
+
+class StubState:
+    """Statistics and the objects created through the stubs (in memory)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.checkout_sessions = {}
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started = time.time()
+            self.requests = {service: 0 for service in SERVICES}
+            self.errors = {service: 0 for service in SERVICES}
+            self.parcels = 0
+            self.messages = 0
+            self.emails = 0
+            self.email_recipients = 0
+            self.webhooks = {"delivered": 0, "failed": 0}
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def count(self, service: str, error: bool = False) -> None:
+        with self._lock:
+            self.requests[service] += 1
+            if error:
+                self.errors[service] += 1
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def webhook(self, delivered: bool) -> None:
+        with self._lock:
+            self.webhooks["delivered" if delivered else "failed"] += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "since": self.started,
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "parcels": self.parcels,
+                "checkout_sessions": len(self.checkout_sessions),
+                "stripe_webhooks": dict(self.webhooks),
+                "whatsapp_messages": self.messages,
+                "emails": self.emails,
+                "email_recipients": self.email_recipients,
+            }
+
+
+def label_pdf(text: str) -> bytes:
+    """A valid one-page PDF showing `text`, standing in for a label"""
+    text = re.sub(r"[^A-Za-z0-9 #:.\-]", "", text)
+    stream = f"BT /F1 18 Tf 40 760 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return pdf
+
+
+def stripe_signature(payload: bytes, secret: str, timestamp: int = None) -> str:
+    """Stripe-Signature header value of a webhook payload"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    signed = f"{timestamp}.".encode() + payload
+    digest = hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def _form_to_nested(pairs):
+    """Decode Stripe's form encoding (a[b][0][c]=v) into dicts and lists"""
+    root = {}
+    for key, value in pairs:
+        parts = re.findall(r"[^\[\]]+", key)
+        node = root
+        for part, following in zip(parts, parts[1:]):
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+
+    def listify(node):
+        if not isinstance(node, dict):
+            return node
+        if node and all(key.isdigit() for key in node):
+            return [listify(node[key]) for key in sorted(node, key=int)]
+        return {key: listify(value) for key, value in node.items()}
+
+    return listify(root)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes the stub HTTP requests; self.server.stubs is the ServiceStubs"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ServiceStubs/1.0"
+
+    ROUTES = (
+        ("GET", r"/_stubs/stats", None, "stats"),
+        ("POST", r"/_stubs/config", None, "config"),
+        ("POST", r"/_stubs/reset", None, "reset"),
+        ("GET", r"/sendcloud/api/v2/shipping_methods", "sendcloud", "shipping_methods"),
+        ("POST", r"/sendcloud/api/v2/parcels", "sendcloud", "create_parcels"),
+        ("GET", r"/sendcloud/api/v2/labels/normal_printer/(\d+)", "sendcloud", "label"),
+        (
+            "GET",
+            r"/sendcloud/api/v2/parcels/(\d+)/documents/label",
+            "sendcloud",
+            "label",
+        ),
+        (
+            "GET",
+            r"/sendcloud/api/v2/labels/(?:normal|label)_printer",
+            "sendcloud",
+            "labels",
+        ),
+        ("POST", r"/stripe/v1/checkout/sessions", "stripe", "create_session"),
+        ("GET", r"/stripe/v1/checkout/sessions", "stripe", "list_sessions"),
+        ("GET", r"/stripe/v1/checkout/sessions/([\w-]+)", "stripe", "get_session"),
+        ("POST", r"/stripe/_stubs/checkout/([\w-]+)/pay", None, "pay_session"),
+        (
+            "POST",
+            r"/twilio/2010-04-01/Accounts/(\w+)/Messages\.json",
+            "twilio",
+            "message",
+        ),
+        ("POST", r"/recaptcha/api/siteverify", "recaptcha", "siteverify"),
+        (
+            "POST",
+            r"/recaptcha-enterprise/v1/projects/([\w-]+)/assessments",
+            "recaptcha",
+            "assessment",
+        ),
+    )
+
+    def log_message(self, format, *args):
+        logger.debug("stub %s - %s", self.address_string(), format % args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        self.query = dict(parse_qsl(url.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        self.body = self.rfile.read(length) if length else b""
+
+        for route_method, pattern, service, name in self.ROUTES:
+            match = re.fullmatch(pattern, url.path)
+            if match and route_method == method:
+                break
+        else:
+            self._json({"error": {"message": f"No stub for {method} {url.path}"}}, 404)
+            return
+
+        stubs = self.server.stubs
+        if service is not None:
+            error_status = stubs.behaviour.apply(service)
+            stubs.state.count(service, error=error_status is not None)
+            if error_status is not None:
+                self._json(
+                    {
+                        "error": {
+                            "type": "api_error",
+                            "code": error_status,
+                            "message": f"Injected {service} stub error",
+                        },
+                        "status": error_status,
+                        "message": f"Injected {service} stub error",
+                    },
+                    error_status,
+                )
+                return
+
+        try:
+            getattr(self, f"_{name}")(*match.groups())
+        except Exception as e:
+            logger.error(f"Service stub {name} failed: {type(e).__name__}: {e}")
+            self._json({"error": {"message": f"Stub failure: {e}"}}, 500)
+
+    def _json(self, data, status=200):
+        self._send(json.dumps(data).encode(), status, "application/json")
+
+    def _send(self, body, status=200, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json_body(self):
+        return json.loads(self.body or b"{}")
+
+    # Control
+
+    def _stats(self):
+        self._json(
+            {
+                **self.server.stubs.state.as_dict(),
+                "behaviour": self.server.stubs.behaviour.as_dict(),
+            }
+        )
+
+    def _config(self):
+        try:
+            self.server.stubs.behaviour.update(self._json_body())
+        except (ValueError, TypeError, AttributeError) as e:
+            self._json({"error": {"message": str(e)}}, 400)
+            return
+        self._json(self.server.stubs.behaviour.as_dict())
+
+    def _reset(self):
+        self.server.stubs.state.reset()
+        self._json({"success": True})
+
+    # Sendcloud
+
+    def _shipping_methods(self):
+        self._json(
+            {
+                "shipping_methods": [
+                    {
+                        "id": method_id,
+                        "name": name,
+                        "carrier": carrier,
+                        "min_weight": min_weight,
+                        "max_weight": max_weight,
+                        "service_point_input": "none",
+                        "price": 0,
+                        "countries": [
+                            {
+                                "id": index,
+                                "iso_2": country,
+                                "name": country,
+                                "price": price,
+                                "lead_time_hours": lead_time_hours,
+                            }
+                            for index, country in enumerate(SHIPPING_COUNTRIES, 1)
+                        ],
+                    }
+                    for method_id, name, carrier, min_weight, max_weight, price, lead_time_hours in SHIPPING_METHODS
+                ]
+            }
+        )
+
+    def _parcel(self, data):
+        state = self.server.stubs.state
+        parcel_id = 900000000 + state.next_id()
+        state.add("parcels")
+        method = (data.get("shipment") or {}).get("id")
+        carrier = next(
+            (m[2] for m in SHIPPING_METHODS if m[0] == method), SHIPPING_METHODS[0][2]
+        )
+        base = f"http://{self.headers.get('Host')}/sendcloud/api/v2"
+        tracking_number = f"3SSTUB{parcel_id}"
+        return {
+            **{key: value for key, value in data.items() if key != "request_label"},
+            "id": parcel_id,
+            "tracking_number": tracking_number,
+            "tracking_url": f"https://tracking.example.com/{tracking_number}",
+            "carrier": {"code": carrier},
+            "status": {"id": 1000, "message": "Ready to send"},
+            "label": {
+                "normal_printer": [
+                    f"{base}/labels/normal_printer/{parcel_id}?start_from={position}"
+                    for position in range(4)
+                ],
+                "label_printer": f"{base}/labels/label_printer/{parcel_id}",
+            },
+            "order_number": str(data.get("order_number") or ""),
+        }
+
+    def _create_parcels(self):
+        data = self._json_body()
+        if "parcels" in data:
+            self._json(
+                {
+                    "parcels": [self._parcel(parcel) for parcel in data["parcels"]],
+                    "failed_parcels": [],
+                }
+            )
+        else:
+            self._json({"parcel": self._parcel(data.get("parcel") or {})})
+
+    def _label(self, parcel_id):
+        self._send(
+            label_pdf(f"Label parcel {parcel_id}"), content_type="application/pdf"
+        )
+
+    def _labels(self):
+        self._send(
+            label_pdf(f"Labels {self.query.get('ids', '')}"),
+            content_type="application/pdf",
+        )
+
+    # Stripe
+
+    def _session_url(self, session_id):
+        return f"http://{self.headers.get('Host')}/stripe/_stubs/checkout/{session_id}"
+
+    def _create_session(self):
+        data = _form_to_nested(parse_qsl(self.body.decode(), keep_blank_values=True))
+        line_items = data.get("line_items") or []
+        amount = sum(
+            int((item.get("price_data") or {}).get("unit_amount") or 0)
+            * int(item.get("quantity") or 1)
+            for item in line_items
+        )
+        currency = next(
+            (
+                (item.get("price_data") or {}).get("currency")
+                for item in line_items
+                if item.get("price_data")
+            ),
+            "eur",
+        )
+        session_id = f"cs_test_stub{self.server.stubs.state.next_id():010d}"
+        session = {
+            "id": session_id,
+            "object": "checkout.session",
+            "amount_subtotal": amount,
+            "amount_total": amount,
+            "currency": currency,
+            "customer_email": data.get("customer_email"),
+            "created": int(time.time()),
+            "expires_at": int(data.get("expires_at") or time.time() + 86400),
+            "livemode": False,
+            "metadata": data.get("metadata") or {},
+            "mode": data.get("mode", "payment"),
+            "payment_intent": None,
+            "payment_status": "unpaid",
+            "status": "open",
+            "success_url": data.get("success_url"),
+            "cancel_url": data.get("cancel_url"),
+            "url": self._session_url(session_id),
+        }
+        self.server.stubs.state.checkout_sessions[session_id] = session
+        self._json(session)
+
+    def _get_session(self, session_id):
+        session = self.server.stubs.state.checkout_sessions.get(session_id)
+        if session is None:
+            self._json(
+                {
+                    "error": {
+                        "type": "invalid_request_error",
+                        "code": "resource_missing",
+                        "message": f"No such checkout.session: '{session_id}'",
+                    }
+                },
+                404,
+            )
+            return
+        self._json(session)
+
+    def _list_sessions(self):
+        sessions = list(self.server.stubs.state.checkout_sessions.values())
+        for key in ("payment_intent", "status", "customer_email"):
+            if key in self.query:
+                sessions = [s for s in sessions if s.get(key) == self.query[key]]
+        limit = int(self.query.get("limit") or 10)
+        self._json(
+            {
+                "object": "list",
+                "url": "/v1/checkout/sessions",
+                "has_more": len(sessions) > limit,
+                "data": sessions[-limit:][::-1],
+            }
+        )
+
+    def _pay_session(self, session_id):
+        stubs = self.server.stubs
+        session = stubs.state.checkout_sessions.get(session_id)
+        if session is None:
+            self._json({"error": {"message": f"No such session {session_id}"}}, 404)
+            return
+
+        session.update(
+            status="complete",
+            payment_status="paid",
+            payment_intent=f"pi_stub{stubs.state.next_id():010d}",
+        )
+        try:
+            webhook_status = stubs.send_stripe_webhook(
+                "checkout.session.completed", session
+            )
+        except requests.exceptions.RequestException as e:
+            stubs.state.webhook(delivered=False)
+            self._json({"error": {"message": f"Webhook failed: {e}"}}, 502)
+            return
+        stubs.state.webhook(delivered=webhook_status < 300)
+        self._json({"session": session, "webhook_status": webhook_status})
+
+    # Twilio
+
+    def _message(self, account_sid):
+        data = dict(parse_qsl(self.body.decode()))
+        state = self.server.stubs.state
+        state.add("messages")
+        message_sid = f"SM{state.next_id():032d}"
+        now = time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime())
+        self._json(
+            {
+                "sid": message_sid,
+                "account_sid": account_sid,
+                "api_version": "2010-04-01",
+                "body": data.get("Body", ""),
+                "from": data.get("From"),
+                "to": data.get("To"),
+                "status": "queued",
+                "direction": "outbound-api",
+                "num_segments": "1",
+                "num_media": "0",
+                "date_created": now,
+                "date_updated": now,
+                "date_sent": None,
+                "price": None,
+                "price_unit": "USD",
+                "error_code": None,
+                "error_message": None,
+                "uri": f"/2010-04-01/Accounts/{account_sid}/Messages/{message_sid}.json",
+                "subresource_uris": {},
+            },
+            201,
+        )
+
+    # reCAPTCHA
+
+    @staticmethod
+    def _token_action(token):
+        if token and token.startswith("stub:"):
+            return token.split(":")[1] or None
+        return None
+
+    def _siteverify(self):
+        token = dict(parse_qsl(self.body.decode())).get("response")
+        action = self._token_action(token)
+        if action is None:
+            self._json({"success": False, "error-codes": ["invalid-input-response"]})
+            return
+        self._json(
+            {
+                "success": True,
+                "score": 0.9,
+                "action": action,
+                "challenge_ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "hostname": "localhost",
+            }
+        )
+
+    def _assessment(self, project_id):
+        event = self._json_body().get("event") or {}
+        action = self._token_action(event.get("token"))
+        self._json(
+            {
+                "name": f"projects/{project_id}/assessments/stub",
+                "event": event,
+                "riskAnalysis": {"score": 0.9 if action else 0.0, "reasons": []},
+                "tokenProperties": {
+                    "valid": action is not None,
+                    "invalidReason": (
+                        "INVALID_REASON_UNSPECIFIED" if action else "MALFORMED"
+                    ),
+                    "action": action,
+                    "hostname": "localhost",
+                },
+            }
+        )
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP server: accepts every message (as Django's SMTP backend
+    sends them) and only counts it. No TLS; AUTH accepts any credentials.
+    """
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def _readline(self):
+        line = self.rfile.readline(65536)
+        if not line:
+            raise ConnectionError("SMTP client disconnected")
+        return line.decode("utf-8", "replace").rstrip("\r\n")
+
+    def handle(self):
+        stubs = self.server.stubs
+        recipients = []
+        self._reply("220 localhost ESMTP service stubs")
+        try:
+            while True:
+                line = self._readline()
+                command, _, argument = line.partition(" ")
+                command = command.upper()
+                if command == "EHLO":
+                    self._reply("250-localhost")
+                    self._reply("250-AUTH PLAIN LOGIN")
+                    self._reply("250-8BITMIME")
+                    self._reply("250 SIZE 52428800")
+                elif command == "HELO":
+                    self._reply("250 localhost")
+                elif command == "AUTH":
+                    mechanism, _, initial = argument.partition(" ")
+                    if mechanism.upper() == "LOGIN":
+                        if not initial:
+                            self._reply(
+                                "334 " + base64.b64encode(b"Username:").decode()
+                            )
+                            self._readline()
+                        self._reply("334 " + base64.b64encode(b"Password:").decode())
+                        self._readline()
+                    elif not initial:
+                        self._reply("334 ")
+                        self._readline()
+                    self._reply("235 2.7.0 Authentication successful")
+                elif command == "MAIL":
+                    recipients = []
+                    self._reply("250 2.1.0 OK")
+                elif command == "RCPT":
+                    recipients.append(argument)
+                    self._reply("250 2.1.5 OK")
+                elif command == "DATA":
+                    self._reply("354 End data with <CR><LF>.<CR><LF>")
+                    while self._readline() != ".":
+                        pass
+                    error_status = stubs.behaviour.apply("smtp")
+                    stubs.state.count("smtp", error=error_status is not None)
+                    if error_status is not None:
+                        self._reply("451 4.3.0 Injected smtp stub error")
+                    else:
+                        stubs.state.add("emails")
+                        stubs.state.add("email_recipients", len(recipients))
+                        self._reply("250 2.0.0 OK: queued")
+                    recipients = []
+                elif command in ("RSET", "NOOP"):
+                    recipients = []
+                    self._reply("250 2.0.0 OK")
+                elif command == "STARTTLS":
+                    self._reply("454 4.7.0 TLS not available")
+                elif command == "QUIT":
+                    self._reply("221 2.0.0 Bye")
+                    return
+                else:
+                    self._reply("502 5.5.2 Command not recognized")
+        except (ConnectionError, OSError):
+            return
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ServiceStubs:
+    """
+    The stub HTTP and SMTP servers
+
+    Args:
+        host: Address to listen on
+        port: HTTP port
+        smtp_port: SMTP port (None to not start the SMTP server)
+        behaviour: StubBehaviour (latency/error injection)
+        stripe_webhook_url: URL of the app's Stripe webhook endpoint
+        stripe_webhook_secret: Secret used to sign the webhooks
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8090,
+        smtp_port=8025,
+        behaviour=None,
+        stripe_webhook_url="",
+        stripe_webhook_secret="",
+    ):
+        self.behaviour = behaviour or StubBehaviour()
+        self.state = StubState()
+        self.stripe_webhook_url = stripe_webhook_url
+        self.stripe_webhook_secret = stripe_webhook_secret
+        self._webhook_session = requests.Session()
+
+        self.http_server = ThreadingHTTPServer((host, port), _StubHandler)
+        self.http_server.daemon_threads = True
+        self.http_server.stubs = self
+        self.smtp_server = None
+        if smtp_port is not None:
+            self.smtp_server = _ThreadingSMTPServer((host, smtp_port), _SMTPHandler)
+            self.smtp_server.stubs = self
+        self._threads = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def smtp_port(self):
+        return self.smtp_server.server_address[1] if self.smtp_server else None
+
+    def send_stripe_webhook(self, event_type: str, data_object: dict) -> int:
+        """
+        POST a signed Stripe event to the app
+
+        Returns:
+            HTTP status of the app's answer
+        """
+        if not self.stripe_webhook_url:
+            raise requests.exceptions.InvalidURL("No Stripe webhook URL configured")
+        event = {
+            "id": f"evt_stub{self.state.next_id():010d}",
+            "object": "event",
+            "api_version": "2024-06-20",
+            "created": int(time.time()),
+            "livemode": False,
+            "type": event_type,
+            "data": {"object": data_object},
+        }
+        payload = json.dumps(event).encode()
+        response = self._webhook_session.post(
+            self.stripe_webhook_url,
+            data=payload,
+            headers={
+                "Content-Type": "application/json",
+                "Stripe-Signature": stripe_signature(
+                    payload, self.stripe_webhook_secret
+                ),
+            },
+            timeout=60,
+        )
+        return response.status_code
+
+    def start(self) -> None:
+        """Serve in background (daemon) threads"""
+        servers = [self.http_server] + ([self.smtp_server] if self.smtp_server else [])
+        for server in servers:
+            thread = threading.Thread(
+                target=server.serve_forever, name="service-stubs", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        for server in (self.http_server, self.smtp_server):
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
@@ -1,3 +1,73 @@
+from datetime import date
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import EditRequestMessage, FCLQuote
+
+
+class FCLQuoteQueryCountTests(TestCase):
+    """Listing FCL quotes must not issue queries per quote or per message"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", "x")
+        cls.customer = User.objects.create_user("customer", "customer@example.com", "x")
+
+    def create_quotes(self, count):
+        for _ in range(count):
+            quote = FCLQuote.objects.create(
+                user=self.customer,
+                origin_country="NL",
+                origin_city="Bergen op Zoom",
+                port_of_loading="Rotterdam",
+                destination_country="SY",
+                destination_city="Latakia",
+                port_of_discharge="Latakia",
+                container_type="20ft_standard",
+                cargo_ready_date=date(2025, 1, 31),
+                commodity_type="Furniture",
+                usage_type="personal",
+                total_weight=1000,
+                total_volume=20,
+                cargo_value=5000,
+                full_name="Customer",
+                country="NL",
+                phone="+31600000000",
+                email="customer@example.com",
+                preferred_contact="email",
+            )
+            EditRequestMessage.objects.create(
+                quote=quote, sender=self.customer, message="Please change the date"
+            )
+            EditRequestMessage.objects.create(
+                quote=quote, sender=self.admin, message="Done", is_admin=True
+            )
+
+    def list_quotes(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get("/api/fcl/quotes/")
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_query_count_is_constant(self):
+        # Quotes joined with their users, then messages joined with senders
+        self.create_quotes(2)
+        with self.assertNumQueries(2):
+            response = self.list_quotes()
+        self.assertEqual(len(response.data["results"]), 2)
+
+        self.create_quotes(10)
+        with self.assertNumQueries(2):
+            response = self.list_quotes()
+        self.assertEqual(len(response.data["results"]), 12)
 
-# Create your tests here.
+        quote = response.data["results"][0]
+        self.assertEqual(quote["user"]["username"], "customer")
+        self.assertNotIn("password", quote["user"])
+        self.assertEqual(
+            [message["sender_name"] for message in quote["edit_request_messages"]],
+            ["customer", "admin"],
+        )
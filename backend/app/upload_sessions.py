@@ -0,0 +1,313 @@
+"""
+Resumable chunked photo uploads
+
+Large electronics shipments used to send every photo in the shipment POST,
+which is limited by nginx's client_max_body_size and has to be repeated
+entirely when a mobile connection drops. Instead, each photo can be
+uploaded on its own:
+
+    POST /api/uploads/                      {"filename", "size", "kind"}
+    PUT  /api/uploads/<id>/?offset=<n>      raw chunk bytes
+    GET  /api/uploads/<id>/                 current offset, to resume
+    POST /api/uploads/<id>/complete/        store the photo
+
+and the shipment create call references the completed uploads by ID
+(see attach_uploaded_photos).
+"""
+
+import logging
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .image_derivatives import generate_derivatives_in_background
+from .models import UploadSession
+from .photo_storage import (
+    CHUNK_SIZE,
+    ELECTRONICS_PHOTO_PREFIX,
+    PARCEL_PHOTO_PREFIX,
+    PhotoValidationError,
+    store_photo,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_PREFIXES = {
+    "parcel_photo": PARCEL_PHOTO_PREFIX,
+    "electronics_photo": ELECTRONICS_PHOTO_PREFIX,
+}
+
+
+class UploadSessionError(Exception):
+    """Invalid upload request; `status_code` is the HTTP status to answer with"""
+
+    def __init__(self, message, status_code=400, **details):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+def create_session(user, filename: str, total_size, kind: str = "parcel_photo"):
+    """
+    Start an upload session
+
+    Raises:
+        UploadSessionError: If the size or kind is not acceptable
+    """
+    try:
+        total_size = int(total_size)
+    except (TypeError, ValueError):
+        raise UploadSessionError("size must be the file size in bytes")
+    if total_size <= 0:
+        raise UploadSessionError("size must be greater than 0")
+    max_size = settings.MAX_PHOTO_UPLOAD_SIZE
+    if total_size > max_size:
+        raise UploadSessionError(
+            f"Photo is larger than {max_size // (1024 * 1024)} MB", status_code=413
+        )
+    if kind not in KIND_PREFIXES:
+        raise UploadSessionError(f"kind must be one of: {', '.join(KIND_PREFIXES)}")
+
+    return UploadSession.objects.create(
+        user=user,
+        kind=kind,
+        filename=os.path.basename(filename or "")[:255],
+        total_size=total_size,
+    )
+
+
+def write_chunk(session_id, user, offset, stream, length) -> UploadSession:
+    """
+    Write a chunk at `offset` of the partial file
+
+    The offset must equal the number of bytes received so far; if the client
+    disconnects mid-chunk, the bytes that did arrive are kept and the client
+    resumes from the new received_size.
+
+    Args:
+        session_id: UploadSession ID
+        user: Owner of the session
+        offset: Position of the chunk in the file
+        stream: File-like request body
+        length: Chunk size (Content-Length)
+
+    Raises:
+        UploadSessionError: On an unknown session, wrong offset or size
+    """
+    try:
+        offset = int(offset)
+        length = int(length)
+    except (TypeError, ValueError):
+        raise UploadSessionError("offset and Content-Length are required")
+    if length <= 0:
+        raise UploadSessionError("Empty chunk")
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadSessionError(
+            f"Chunks are limited to {settings.UPLOAD_CHUNK_MAX_SIZE} bytes",
+            status_code=413,
+        )
+
+    with transaction.atomic():
+        # Row lock: concurrent PUTs of the same session are serialized
+        session = get_session(session_id, user, for_update=True)
+        if session.status != UploadSession.STATUS_UPLOADING:
+            raise UploadSessionError("Upload is already complete", status_code=409)
+        if offset != session.received_size:
+            raise UploadSessionError(
+                "Chunk offset does not match the received size",
+                status_code=409,
+                offset=session.received_size,
+            )
+        if offset + length > session.total_size:
+            raise UploadSessionError("Chunk exceeds the declared file size")
+
+        part_path = session.part_path
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(part_path, "r+b" if part_path.exists() else "wb") as part:
+            # Drop bytes of an earlier chunk that was not recorded
+            part.seek(offset)
+            part.truncate()
+            while written < length:
+                data = stream.read(min(CHUNK_SIZE, length - written))
+                if not data:
+                    break
+                part.write(data)
+                written += len(data)
+
+        session.received_size = offset + written
+        session.save(update_fields=["received_size", "updated_at"])
+
+    if written < length:
+        logger.warning(
+            f"⚠️ Upload {session.id}: chunk interrupted after {written}/{length} bytes"
+        )
+    return session
+
+
+def complete_session(session_id, user) -> UploadSession:
+    """
+    Validate and store a fully received upload
+
+    Completing an already complete session returns it unchanged, so a client
+    can safely retry the call.
+
+    Raises:
+        UploadSessionError: If bytes are missing or the file is not a photo
+    """
+    with transaction.atomic():
+        session = get_session(session_id, user, for_update=True)
+        if session.status == UploadSession.STATUS_COMPLETE:
+            return session
+        if session.received_size != session.total_size:
+            raise UploadSessionError(
+                "Upload is incomplete",
+                status_code=409,
+                offset=session.received_size,
+            )
+
+        part_path = session.part_path
+        invalid = None
+        try:
+            with open(part_path, "rb") as part:
+                stored_name = store_photo(
+                    File(part, name=session.filename),
+                    KIND_PREFIXES[session.kind],
+                )
+        except FileNotFoundError:
+            raise UploadSessionError("Uploaded data is missing", status_code=410)
+        except PhotoValidationError as e:
+            invalid = str(e)
+        else:
+            session.status = UploadSession.STATUS_COMPLETE
+            session.stored_name = stored_name
+            session.save(update_fields=["status", "stored_name", "updated_at"])
+
+    part_path.unlink(missing_ok=True)
+    if invalid is not None:
+        # The bytes will never become a valid photo; the client starts over
+        UploadSession.objects.filter(id=session.id).delete()
+        raise UploadSessionError(invalid)
+
+    generate_derivatives_in_background([stored_name])
+    logger.info(f"✅ Upload {session.id} stored as {stored_name}")
+    return session
+
+
+def get_session(session_id, user, for_update=False) -> UploadSession:
+    """
+    Upload session of a user
+
+    Raises:
+        UploadSessionError: 404 if it does not exist or belongs to someone else
+    """
+    queryset = UploadSession.objects.filter(user=user)
+    if for_update:
+        queryset = queryset.select_for_update()
+    try:
+        return queryset.get(id=uuid.UUID(str(session_id)))
+    except (UploadSession.DoesNotExist, ValueError):
+        raise UploadSessionError("Upload not found", status_code=404)
+
+
+def stored_names(user, upload_ids) -> Dict[str, str]:
+    """
+    Storage names of completed uploads of a user, by upload ID
+
+    Raises:
+        UploadSessionError: If an ID is unknown or its upload not complete
+    """
+    try:
+        upload_ids = {
+            str(uuid.UUID(str(upload_id))) for upload_id in upload_ids if upload_id
+        }
+    except ValueError:
+        raise UploadSessionError("Invalid upload ID")
+    if not upload_ids:
+        return {}
+
+    sessions = UploadSession.objects.filter(
+        user=user, id__in=upload_ids, status=UploadSession.STATUS_COMPLETE
+    ).values_list("id", "stored_name")
+    names = {str(upload_id): name for upload_id, name in sessions}
+    missing = upload_ids - set(names)
+    if missing:
+        raise UploadSessionError(
+            f"Uploads not found or not complete: {', '.join(sorted(missing))}"
+        )
+    return names
+
+
+def attach_uploaded_photos(parcels, user) -> List[str]:
+    """
+    Resolve upload IDs in the parcels of a shipment to photo URLs
+
+    Parcels may reference completed uploads with `photo_upload_ids`,
+    `device_photo_upload_id` and `electronics_picture_upload_id`; their URLs
+    are added to photo_urls, device_photo_url and electronics_picture_url.
+
+    Returns:
+        Storage names of the attached photos
+
+    Raises:
+        UploadSessionError: If an upload ID is unknown or not complete
+    """
+    parcels = [parcel for parcel in parcels or [] if isinstance(parcel, dict)]
+    upload_ids = []
+    for parcel in parcels:
+        upload_ids += list(parcel.get("photo_upload_ids") or [])
+        upload_ids += [
+            parcel.get("device_photo_upload_id"),
+            parcel.get("electronics_picture_upload_id"),
+        ]
+    names = stored_names(user, upload_ids)
+    if not names:
+        return []
+
+    for parcel in parcels:
+        photo_ids = parcel.pop("photo_upload_ids", None) or []
+        if photo_ids:
+            parcel["photo_urls"] = list(parcel.get("photo_urls") or []) + [
+                default_storage.url(names[str(uuid.UUID(str(upload_id)))])
+                for upload_id in photo_ids
+            ]
+        for key in ("device_photo", "electronics_picture"):
+            upload_id = parcel.pop(f"{key}_upload_id", None)
+            if upload_id:
+                parcel[f"{key}_url"] = default_storage.url(
+                    names[str(uuid.UUID(str(upload_id)))]
+                )
+
+    return list(names.values())
+
+
+def cleanup_expired_sessions(hours=None) -> int:
+    """
+    Delete sessions not touched for `hours` (unfinished ones with their
+    partial files, completed ones only as rows; their photos stay stored)
+
+    Returns:
+        Number of sessions deleted
+    """
+    if hours is None:
+        hours = settings.UPLOAD_SESSION_EXPIRY_HOURS
+    cutoff = timezone.now() - timedelta(hours=hours)
+    expired = UploadSession.objects.filter(updated_at__lt=cutoff)
+
+    for session_id in expired.filter(status=UploadSession.STATUS_UPLOADING).values_list(
+        "id", flat=True
+    ):
+        (Path(settings.UPLOAD_SESSION_ROOT) / f"{session_id}.part").unlink(
+            missing_ok=True
+        )
+
+    deleted, _ = expired.delete()
+    return deleted
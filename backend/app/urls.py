@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 
@@ -8,6 +9,8 @@ from .admin_views import (
     PriceListCreateView,
 )
 from .views import (
+    ArchivedRecordDetailView,
+    ArchivedRecordListView,
     ChangePasswordView,
     ContactMessageView,
     FCLQuoteDetailView,
@@ -20,12 +23,18 @@ from .views import (
     RegisterView,
     UserProfileView,
     admin_all_product_requests_view,
+    admin_dashboard_view,
+    admin_export_view,
+    admin_metrics_view,
     admin_shipping_settings_view,
     admin_syrian_province_detail_view,
     admin_syrian_provinces_view,
+    approve_eu_shipping_bulk_view,
     approve_eu_shipping_view,
     approve_or_decline_edit_request_view,
+    archived_record_file_view,
     calculate_cbm_view,
+    calculate_eu_shipping_bulk_view,
     calculate_eu_shipping_view,
     calculate_pricing_view,
     calculate_syria_transport_view,
@@ -43,7 +52,9 @@ from .views import (
     download_receipt_view,
     generate_bulk_customs_documents_view,
     download_sendcloud_label_view,
+    download_sendcloud_labels_bulk_view,
     download_shipping_labels_view,
+    download_transfer_slip_view,
     get_packaging_prices_view,
     get_per_piece_products_view,
     get_prices_view,
@@ -64,14 +75,37 @@ from .views import (
     update_fcl_quote_status_view,
     update_lcl_shipment_status_view,
     update_product_request_view,
+    upload_session_complete_view,
+    upload_session_create_view,
+    upload_session_view,
     user_product_requests_view,
 )
 
+# In ASGI mode the endpoints that mostly wait on Sendcloud/Google are served
+# by async views, and reCAPTCHA tokens are verified before the form views run
+register_view = RegisterView.as_view()
+fcl_quote_view = FCLQuoteView.as_view()
+lcl_shipment_create_view = LCLShipmentView.as_view()
+eu_shipping_endpoint = calculate_eu_shipping_view
+shipping_methods_simple_endpoint = get_shipping_methods_simple_view
+sendcloud_label_endpoint = download_sendcloud_label_view
+if settings.SERVER_MODE == "asgi":
+    from . import async_views
+
+    eu_shipping_endpoint = async_views.calculate_eu_shipping_view
+    shipping_methods_simple_endpoint = async_views.get_shipping_methods_simple_view
+    sendcloud_label_endpoint = async_views.download_sendcloud_label_view
+    register_view = async_views.with_recaptcha_precheck(register_view, "register")
+    fcl_quote_view = async_views.with_recaptcha_precheck(fcl_quote_view, "fcl_quote")
+    lcl_shipment_create_view = async_views.with_recaptcha_precheck(
+        lcl_shipment_create_view, "create_shipment"
+    )
+
 app_name = "app"
 
 urlpatterns = [
     # Authentication endpoints
-    path("register/", RegisterView.as_view(), name="register"),
+    path("register/", register_view, name="register"),
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", logout_view, name="logout"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
@@ -82,7 +116,7 @@ urlpatterns = [
     # Contact endpoint
     path("contact/", ContactMessageView.as_view(), name="contact"),
     # FCL endpoints
-    path("fcl/quote/", FCLQuoteView.as_view(), name="fcl_quote"),
+    path("fcl/quote/", fcl_quote_view, name="fcl_quote"),
     path("fcl/quotes/", FCLQuoteListView.as_view(), name="fcl_quote_list"),
     path(
         "fcl/quotes/<int:pk>/status/",
@@ -127,8 +161,16 @@ urlpatterns = [
         name="fcl_quote_initiate_stripe_payment",
     ),
     path("fcl/quotes/<int:pk>/", FCLQuoteDetailView.as_view(), name="fcl_quote_detail"),
+    # Resumable photo uploads (referenced by ID when creating a shipment)
+    path("uploads/", upload_session_create_view, name="upload_session_create"),
+    path("uploads/<uuid:upload_id>/", upload_session_view, name="upload_session"),
+    path(
+        "uploads/<uuid:upload_id>/complete/",
+        upload_session_complete_view,
+        name="upload_session_complete",
+    ),
     # LCL Shipment endpoints
-    path("shipments/", LCLShipmentView.as_view(), name="lcl_shipment_create"),
+    path("shipments/", lcl_shipment_create_view, name="lcl_shipment_create"),
     path("shipments/list/", LCLShipmentListView.as_view(), name="lcl_shipment_list"),
     path(
         "shipments/<int:pk>/",
@@ -140,6 +182,16 @@ urlpatterns = [
         update_lcl_shipment_status_view,
         name="lcl_shipment_status",
     ),
+    path(
+        "shipments/approve-eu-shipping/bulk/",
+        approve_eu_shipping_bulk_view,
+        name="approve_eu_shipping_bulk",
+    ),
+    path(
+        "shipments/sendcloud-labels/bulk/",
+        download_sendcloud_labels_bulk_view,
+        name="download_sendcloud_labels_bulk",
+    ),
     path(
         "shipments/<int:shipment_id>/approve-eu-shipping/",
         approve_eu_shipping_view,
@@ -152,9 +204,14 @@ urlpatterns = [
     ),
     path(
         "shipments/<int:shipment_id>/download-sendcloud-label/",
-        download_sendcloud_label_view,
+        sendcloud_label_endpoint,
         name="download_sendcloud_label",
     ),
+    path(
+        "shipments/<int:pk>/transfer-slip/",
+        download_transfer_slip_view,
+        name="lcl_shipment_transfer_slip",
+    ),
     path(
         "shipments/<int:pk>/invoice/",
         download_invoice_view,
@@ -242,12 +299,17 @@ urlpatterns = [
     # Sendcloud Shipping endpoints
     path(
         "calculate-eu-shipping/",
-        calculate_eu_shipping_view,
+        eu_shipping_endpoint,
         name="calculate_eu_shipping",
     ),
+    path(
+        "calculate-eu-shipping/bulk/",
+        calculate_eu_shipping_bulk_view,
+        name="calculate_eu_shipping_bulk",
+    ),
     path(
         "sendcloud/shipping-methods-simple/",
-        get_shipping_methods_simple_view,
+        shipping_methods_simple_endpoint,
         name="get_shipping_methods_simple",
     ),
     path("sendcloud/webhook/", sendcloud_webhook_view, name="sendcloud_webhook"),
@@ -270,11 +332,26 @@ urlpatterns = [
         name="admin_syrian_province_detail",
     ),
     # Admin Shipping Settings endpoint
+    path(
+        "admin/dashboard/",
+        admin_dashboard_view,
+        name="admin_dashboard",
+    ),
+    path(
+        "admin/export/<str:dataset>/",
+        admin_export_view,
+        name="admin_export",
+    ),
     path(
         "admin/shipping-settings/",
         admin_shipping_settings_view,
         name="admin_shipping_settings",
     ),
+    path(
+        "admin/metrics/",
+        admin_metrics_view,
+        name="admin_metrics",
+    ),
     # Shipment checkout session (for payment)
     path(
         "shipments/create-checkout-session/",
@@ -299,4 +376,16 @@ urlpatterns = [
         send_lcl_shipment_payment_reminder_view,
         name="lcl_shipment_send_payment_reminder",
     ),
+    # Archive (read-only)
+    path("archive/", ArchivedRecordListView.as_view(), name="archived_record_list"),
+    path(
+        "archive/<int:pk>/",
+        ArchivedRecordDetailView.as_view(),
+        name="archived_record_detail",
+    ),
+    path(
+        "archive/<int:pk>/files/<int:index>/",
+        archived_record_file_view,
+        name="archived_record_file",
+    ),
 ]
@@ -0,0 +1,98 @@
+"""
+API views, one module per domain
+
+Heavy libraries (Stripe, Twilio, and WeasyPrint/python-docx through
+document_service) are imported inside the views that use them, so importing
+the API at worker boot stays cheap. Names are re-exported here for urls.py.
+"""
+
+from .archive import (
+    ArchivedRecordDetailView,
+    ArchivedRecordListView,
+    archived_record_file_view,
+)
+from .auth import (
+    ChangePasswordView,
+    LoginView,
+    RegisterView,
+    UserProfileView,
+    current_user_view,
+    logout_view,
+)
+from .contact import ContactMessageView
+from .dashboard import (
+    admin_dashboard_view,
+    admin_export_view,
+    admin_metrics_view,
+    admin_shipping_settings_view,
+)
+from .documents import (
+    download_consolidated_export_invoice_view,
+    download_invoice_view,
+    download_packing_list_view,
+    download_receipt_view,
+    download_shipping_labels_view,
+    download_transfer_slip_view,
+    generate_bulk_customs_documents_view,
+)
+from .fcl import (
+    FCLQuoteDetailView,
+    FCLQuoteListView,
+    FCLQuoteView,
+    approve_or_decline_edit_request_view,
+    respond_to_offer_view,
+    send_edit_request_reply_view,
+    send_payment_reminder_view,
+    update_fcl_quote_status_view,
+)
+from .locations import cities_list_view, countries_list_view, ports_list_view
+from .payments import (
+    confirm_fcl_quote_payment_view,
+    confirm_shipment_payment_view,
+    create_shipment_checkout_session,
+    initiate_stripe_payment_view,
+    payment_status_view,
+    stripe_webhook_view,
+)
+from .pricing import (
+    admin_syrian_province_detail_view,
+    admin_syrian_provinces_view,
+    calculate_cbm_view,
+    calculate_pricing_view,
+    calculate_syria_transport_view,
+    get_packaging_prices_view,
+    get_per_piece_products_view,
+    get_prices_view,
+    get_regular_products_view,
+    get_syrian_provinces_view,
+)
+from .product_requests import (
+    admin_all_product_requests_view,
+    delete_product_request_view,
+    request_new_product_view,
+    update_product_request_view,
+    user_product_requests_view,
+)
+from .sendcloud import (
+    approve_eu_shipping_bulk_view,
+    approve_eu_shipping_view,
+    calculate_eu_shipping_bulk_view,
+    calculate_eu_shipping_view,
+    delete_eu_shipping_view,
+    download_sendcloud_label_view,
+    download_sendcloud_labels_bulk_view,
+    get_shipping_methods_simple_view,
+    sendcloud_webhook_view,
+)
+from .shipments import (
+    LCLShipmentDetailView,
+    LCLShipmentListView,
+    LCLShipmentView,
+    send_lcl_shipment_payment_reminder_view,
+    update_lcl_shipment_status_view,
+)
+from .uploads import (
+    upload_session_complete_view,
+    upload_session_create_view,
+    upload_session_view,
+)
@@ -0,0 +1,84 @@
+"""
+Archive (read-only)
+"""
+
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ..models import ArchivedRecord
+from ..pagination import CreatedAtCursorPagination
+from ..serializers import ArchivedRecordListSerializer, ArchivedRecordSerializer
+
+
+def _archived_records_for(user):
+    """Archived records visible to a user: all for admins, otherwise their own"""
+    if user.is_superuser:
+        return ArchivedRecord.objects.all()
+    return ArchivedRecord.objects.filter(user=user)
+
+
+class ArchivedRecordListView(generics.ListAPIView):
+    """
+    List archived shipments, quotes and contact messages
+
+    GET /api/archive/?record_type=lcl_shipment
+    """
+
+    serializer_class = ArchivedRecordListSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def get_queryset(self):
+        queryset = _archived_records_for(self.request.user).select_related("user")
+        record_type = self.request.query_params.get("record_type")
+        if record_type:
+            queryset = queryset.filter(record_type=record_type)
+        reference = self.request.query_params.get("reference")
+        if reference:
+            queryset = queryset.filter(reference=reference)
+        return queryset.defer("data", "files")
+
+
+class ArchivedRecordDetailView(generics.RetrieveAPIView):
+    """Retrieve an archived record with its original data"""
+
+    serializer_class = ArchivedRecordSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return _archived_records_for(self.request.user).select_related("user")
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def archived_record_file_view(request, pk, index):
+    """
+    Download a file of an archived record from cold storage
+
+    GET /api/archive/<pk>/files/<index>/
+    """
+    from ..archive_service import archived_file_path
+    from ..protected_media import protected_file_response
+
+    record = _archived_records_for(request.user).filter(pk=pk).first()
+    if not record:
+        return Response(
+            {"success": False, "error": "Archived record not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    path = archived_file_path(record, index)
+    if path is None:
+        return Response(
+            {"success": False, "error": "File not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    return protected_file_response(
+        record.files[index]["path"], root="archive", as_attachment=True
+    )
@@ -0,0 +1,160 @@
+"""
+Registration, login and user account endpoints
+"""
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from ..serializers import ChangePasswordSerializer, RegisterSerializer, UserSerializer
+from .common import _finish_recaptcha_check, _start_recaptcha_check
+
+
+class RegisterView(generics.CreateAPIView):
+    queryset = User.objects.all()
+    permission_classes = (AllowAny,)
+    serializer_class = RegisterSerializer
+
+    def create(self, request, *args, **kwargs):
+        # Verify reCAPTCHA v3 token if provided
+        recaptcha_token = request.data.get("recaptcha_token")
+
+        # Check if reCAPTCHA is configured (standard v3 only)
+        from django.conf import settings
+
+        has_recaptcha_config = getattr(settings, "RECAPTCHA_SECRET_KEY", None)
+
+        if has_recaptcha_config:
+            # reCAPTCHA is configured, so token is required
+            if not recaptcha_token:
+                return Response(
+                    {
+                        "error": "reCAPTCHA verification is required. Please complete the reCAPTCHA verification.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Verify the token in the background while the data is validated
+        # (also when not configured - might be test key)
+        recaptcha_check = _start_recaptcha_check(recaptcha_token, "register", request)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        recaptcha_error = _finish_recaptcha_check(
+            recaptcha_check, bool(has_recaptcha_config), "registration"
+        )
+        if recaptcha_error:
+            return recaptcha_error
+
+        user = serializer.save()
+
+        # Generate tokens
+        refresh = RefreshToken.for_user(user)
+
+        return Response(
+            {
+                "user": UserSerializer(user).data,
+                "tokens": {
+                    "refresh": str(refresh),
+                    "access": str(refresh.access_token),
+                },
+                "message": "User registered successfully",
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class LoginView(TokenObtainPairView):
+    def post(self, request, *args, **kwargs):
+        username = request.data.get("username")
+        password = request.data.get("password")
+
+        if not username or not password:
+            return Response(
+                {"error": "Username and password are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user = authenticate(username=username, password=password)
+        if not user:
+            return Response(
+                {"error": "Invalid credentials"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        refresh = RefreshToken.for_user(user)
+
+        return Response(
+            {
+                "user": UserSerializer(user).data,
+                "tokens": {
+                    "refresh": str(refresh),
+                    "access": str(refresh.access_token),
+                },
+                "message": "Login successful",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def logout_view(request):
+    try:
+        refresh_token = request.data.get("refresh_token")
+        if refresh_token:
+            try:
+                token = RefreshToken(refresh_token)
+                token.blacklist()
+            except Exception:
+                # Token might already be blacklisted or invalid
+                pass
+        return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
+    except Exception:
+        return Response({"error": "Invalid token"}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class UserProfileView(generics.RetrieveUpdateAPIView):
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_object(self):
+        return self.request.user
+
+    def update(self, request, *args, **kwargs):
+        """Override update to allow partial updates"""
+        partial = kwargs.pop("partial", True)
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(serializer.data)
+
+
+class ChangePasswordView(generics.UpdateAPIView):
+    serializer_class = ChangePasswordSerializer
+    permission_classes = [IsAuthenticated]
+
+    def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(
+            {"message": "Password changed successfully"},
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def current_user_view(request):
+    serializer = UserSerializer(request.user)
+    return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,72 @@
+"""
+Helpers shared by the view modules
+"""
+
+import logging
+
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def _start_recaptcha_check(recaptcha_token, action, request=None):
+    """
+    Start verifying a reCAPTCHA token while the request is being validated
+
+    In ASGI mode the token may already have been verified asynchronously
+    (async_views.with_recaptcha_precheck); that result is used instead.
+    """
+    if not recaptcha_token:
+        return None
+
+    from ..async_views import recaptcha_precheck_future
+    from ..recaptcha_verify import verify_recaptcha_token_async
+
+    prechecked = recaptcha_precheck_future(request, recaptcha_token, action)
+    if prechecked is not None:
+        return prechecked
+
+    return verify_recaptcha_token_async(token=recaptcha_token, action=action)
+
+
+def _finish_recaptcha_check(recaptcha_check, required, context, error_fields=None):
+    """
+    Wait for a check started with _start_recaptcha_check
+
+    Args:
+        recaptcha_check: Future from _start_recaptcha_check (None if no token)
+        required: Whether reCAPTCHA is configured and must pass
+        context: Submission name used in log messages
+        error_fields: Extra fields for the error response body
+
+    Returns:
+        Error Response if verification failed and is required, else None
+    """
+    if recaptcha_check is None:
+        return None
+
+    from ..recaptcha_verify import wait_for_recaptcha_result
+
+    logger = logging.getLogger(__name__)
+    verification_result = wait_for_recaptcha_result(recaptcha_check)
+
+    if verification_result.get("success"):
+        return None
+
+    if not required:
+        # Token provided but reCAPTCHA not configured - log but don't block
+        logger.warning(
+            f"reCAPTCHA token provided but verification failed (reCAPTCHA may not be configured): {verification_result.get('error')}"
+        )
+        return None
+
+    logger.warning(
+        f"reCAPTCHA verification failed for {context}: {verification_result.get('error')}"
+    )
+    return Response(
+        {
+            **(error_fields or {}),
+            "error": "reCAPTCHA verification failed. Please try again.",
+            "details": verification_result.get("error", "Unknown error"),
+        },
+        status=status.HTTP_400_BAD_REQUEST,
+    )
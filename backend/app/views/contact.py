@@ -0,0 +1,56 @@
+"""
+Contact form endpoint
+"""
+
+import logging
+
+from rest_framework import generics, status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ..email_service import send_contact_form_notification
+from ..models import ContactMessage
+from ..serializers import ContactMessageSerializer
+from ..whatsapp_service import send_contact_form_whatsapp_notification
+
+
+class ContactMessageView(generics.CreateAPIView):
+    """API endpoint for submitting contact form messages"""
+
+    queryset = ContactMessage.objects.all()
+    serializer_class = ContactMessageSerializer
+    permission_classes = [AllowAny]  # Allow anyone to submit contact form
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        contact_message = serializer.save()
+
+        # Send email notification to admin
+        try:
+            send_contact_form_notification(contact_message)
+        except Exception as email_error:
+            logger = logging.getLogger(__name__)
+            logger.error(
+                f"Failed to send contact form notification: {str(email_error)}"
+            )
+            # Don't fail the request if email fails
+
+        # Send WhatsApp notification to admin
+        try:
+            send_contact_form_whatsapp_notification(contact_message)
+        except Exception as whatsapp_error:
+            logger = logging.getLogger(__name__)
+            logger.error(
+                f"Failed to send contact form WhatsApp notification: {str(whatsapp_error)}"
+            )
+            # Don't fail the request if WhatsApp fails
+
+        return Response(
+            {
+                "success": True,
+                "message": "Your message has been sent successfully. We will contact you soon.",
+                "id": contact_message.id,
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -0,0 +1,382 @@
+"""
+Admin shipping settings, dashboard statistics, exports and request metrics
+"""
+
+import logging
+import traceback
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from ..models import FCLQuote
+
+
+@api_view(["GET", "PUT"])
+@permission_classes([IsAdminUser])
+def admin_shipping_settings_view(request):
+    """
+    Admin endpoint to get or update shipping settings
+
+    GET /api/admin/shipping-settings/
+    Returns the shipping settings (singleton)
+
+    PUT /api/admin/shipping-settings/
+    Update shipping settings
+    Body: {
+        "sendcloud_profit_margin": 10.00
+    }
+    """
+    from ..models import ShippingSettings
+
+    if request.method == "GET":
+        try:
+            settings = ShippingSettings.get_settings()
+
+            return Response(
+                {
+                    "success": True,
+                    "settings": {
+                        "id": settings.id,
+                        "sendcloud_profit_margin": float(
+                            settings.sendcloud_profit_margin
+                        ),
+                        "created_at": settings.created_at,
+                        "updated_at": settings.updated_at,
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error fetching shipping settings (admin): {str(e)}")
+            return Response(
+                {"success": False, "error": "Failed to fetch shipping settings"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    elif request.method == "PUT":
+        try:
+            settings = ShippingSettings.get_settings()
+
+            # Get profit margin from request
+            profit_margin = request.data.get("sendcloud_profit_margin")
+
+            if profit_margin is None:
+                return Response(
+                    {"success": False, "error": "sendcloud_profit_margin is required"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Validate profit margin
+            try:
+                profit_margin = float(profit_margin)
+                if profit_margin < 0:
+                    return Response(
+                        {"success": False, "error": "Profit margin cannot be negative"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+            except (ValueError, TypeError):
+                return Response(
+                    {"success": False, "error": "Invalid profit margin value"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Update settings
+            settings.sendcloud_profit_margin = profit_margin
+            settings.save()
+
+            logger = logging.getLogger(__name__)
+            logger.info(f"✅ Admin updated Sendcloud profit margin to {profit_margin}%")
+
+            return Response(
+                {
+                    "success": True,
+                    "message": "Shipping settings updated successfully",
+                    "settings": {
+                        "id": settings.id,
+                        "sendcloud_profit_margin": float(
+                            settings.sendcloud_profit_margin
+                        ),
+                        "updated_at": settings.updated_at,
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error updating shipping settings (admin): {str(e)}")
+            logger.error(traceback.format_exc())
+            return Response(
+                {"success": False, "error": "Failed to update shipping settings"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+# ============================================================================
+# ADMIN DASHBOARD API
+# ============================================================================
+
+
+def _sum_by(queryset, field, value="shipment_count"):
+    """{field value: summed value} for a rollup queryset"""
+    rows = (
+        queryset.order_by()
+        .values(field)
+        .annotate(total=Sum(value))
+        .values_list(field, "total")
+    )
+    return {key: total for key, total in rows}
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def admin_dashboard_view(request):
+    """
+    Admin dashboard counters computed in SQL
+
+    GET /api/admin/dashboard/?days=30
+
+    LCL figures are read from the DailyShipmentStats rollup, which is brought
+    up to date incrementally first; FCL quotes are few and aggregated live.
+    `days` (default 30, max 366) is the length of the daily series.
+    """
+    from ..models import DailyShipmentStats
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        days = min(max(int(request.query_params.get("days", 30)), 1), 366)
+    except (TypeError, ValueError):
+        return Response(
+            {"success": False, "error": "days must be a number"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        DailyShipmentStats.refresh()
+    except Exception as e:
+        # A concurrent refresh wins; serve the rollup as it is
+        logger.warning(f"⚠️ Dashboard rollup refresh failed: {str(e)}")
+
+    try:
+        stats = DailyShipmentStats.objects.all()
+        totals = stats.aggregate(
+            shipments=Coalesce(Sum("shipment_count"), 0),
+            total_price=Coalesce(Sum("total_price"), Decimal("0")),
+            paid=Coalesce(Sum("amount_paid"), Decimal("0")),
+            total_cbm=Coalesce(Sum("total_cbm"), Decimal("0")),
+            total_weight_kg=Coalesce(Sum("total_weight_kg"), Decimal("0")),
+        )
+        outstanding = stats.exclude(status="CANCELLED").aggregate(
+            total=Coalesce(Sum("outstanding_amount"), Decimal("0"))
+        )["total"]
+
+        since = timezone.localdate() - timedelta(days=days - 1)
+        series = (
+            stats.filter(date__gte=since)
+            .order_by("date")
+            .values("date")
+            .annotate(
+                shipments=Sum("shipment_count"),
+                total_price=Sum("total_price"),
+                paid=Sum("amount_paid"),
+            )
+        )
+
+        fcl_quotes = FCLQuote.objects.order_by()
+        fcl_totals = fcl_quotes.aggregate(
+            quotes=Count("id"),
+            total_price=Coalesce(Sum("total_price"), Decimal("0")),
+            paid=Coalesce(Sum("amount_paid"), Decimal("0")),
+        )
+        fcl_outstanding = (
+            fcl_quotes.exclude(status="CANCELLED")
+            .filter(total_price__gt=Coalesce("amount_paid", Decimal("0")))
+            .aggregate(
+                total=Coalesce(
+                    Sum(F("total_price") - Coalesce("amount_paid", Decimal("0"))),
+                    Decimal("0"),
+                )
+            )["total"]
+        )
+
+        return Response(
+            {
+                "success": True,
+                "lcl": {
+                    "total_shipments": totals["shipments"],
+                    "by_status": _sum_by(stats, "status"),
+                    "by_payment_status": _sum_by(stats, "payment_status"),
+                    "by_direction": _sum_by(stats, "direction"),
+                    "by_province": _sum_by(
+                        stats.exclude(syria_province=""), "syria_province"
+                    ),
+                    "revenue": {
+                        "total": float(totals["total_price"]),
+                        "paid": float(totals["paid"]),
+                        "outstanding": float(outstanding),
+                    },
+                    "total_cbm": float(totals["total_cbm"]),
+                    "total_weight_kg": float(totals["total_weight_kg"]),
+                    "daily": [
+                        {
+                            "date": row["date"],
+                            "shipments": row["shipments"],
+                            "total_price": float(row["total_price"]),
+                            "paid": float(row["paid"]),
+                        }
+                        for row in series
+                    ],
+                },
+                "fcl": {
+                    "total_quotes": fcl_totals["quotes"],
+                    "by_status": dict(
+                        fcl_quotes.values("status")
+                        .annotate(count=Count("id"))
+                        .values_list("status", "count")
+                    ),
+                    "by_payment_status": dict(
+                        fcl_quotes.values("payment_status")
+                        .annotate(count=Count("id"))
+                        .values_list("payment_status", "count")
+                    ),
+                    "revenue": {
+                        "total": float(fcl_totals["total_price"]),
+                        "paid": float(fcl_totals["paid"]),
+                        "outstanding": float(fcl_outstanding),
+                    },
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger.error(f"Error building admin dashboard: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to load dashboard"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def admin_export_view(request, dataset):
+    """
+    Stream LCL shipments or FCL quotes as CSV or XLSX
+
+    GET /api/admin/export/lcl-shipments/?file_format=xlsx
+    GET /api/admin/export/fcl-quotes/?file_format=csv&status=PAID
+
+    Query params:
+        file_format: "csv" (default) or "xlsx"
+        status: Only rows with this status
+        date_from, date_to: Creation date range (YYYY-MM-DD, inclusive)
+    """
+    from ..export_service import EXPORTS, export_rows, stream_csv, stream_xlsx
+
+    if dataset not in EXPORTS:
+        return Response(
+            {"success": False, "error": "Unknown export"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    model, columns = EXPORTS[dataset]
+
+    file_format = request.query_params.get("file_format", "csv")
+    if file_format not in ("csv", "xlsx"):
+        return Response(
+            {"success": False, "error": "file_format must be csv or xlsx"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    queryset = model.objects.all()
+    if request.query_params.get("status"):
+        queryset = queryset.filter(status=request.query_params["status"])
+    try:
+        if request.query_params.get("date_from"):
+            date_from = datetime.strptime(request.query_params["date_from"], "%Y-%m-%d")
+            queryset = queryset.filter(created_at__gte=timezone.make_aware(date_from))
+        if request.query_params.get("date_to"):
+            date_to = datetime.strptime(request.query_params["date_to"], "%Y-%m-%d")
+            queryset = queryset.filter(
+                created_at__lt=timezone.make_aware(date_to + timedelta(days=1))
+            )
+    except ValueError:
+        return Response(
+            {"success": False, "error": "Dates must be in YYYY-MM-DD format"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    header = [title for title, _ in columns]
+    rows = export_rows(queryset, columns)
+    filename = f"{dataset}-{timezone.now().strftime('%Y%m%d-%H%M%S')}.{file_format}"
+
+    if file_format == "xlsx":
+        response = StreamingHttpResponse(
+            stream_xlsx(header, rows, sheet_name=dataset),
+            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+    else:
+        response = StreamingHttpResponse(
+            stream_csv(header, rows), content_type="text/csv; charset=utf-8"
+        )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    # Let nginx pass chunks through instead of buffering the whole file
+    response["X-Accel-Buffering"] = "no"
+
+    logging.getLogger(__name__).info(
+        f"📤 Admin {request.user.username} exported {dataset} as {file_format}"
+    )
+    return response
+
+
+@api_view(["GET", "DELETE"])
+@permission_classes([IsAdminUser])
+def admin_metrics_view(request):
+    """
+    Request timings per route of the worker process answering the request
+
+    GET /api/admin/metrics/
+    Returns, per route and method, the request count and p50/p95/p99/max of
+    wall, DB, outbound HTTP and document render time (ms) over the most
+    recent REQUEST_METRICS_SAMPLES requests
+
+    DELETE /api/admin/metrics/
+    Clears the collected samples
+    """
+    import os
+
+    from ..request_metrics import route_metrics
+
+    if not settings.REQUEST_METRICS_ENABLED:
+        return Response(
+            {"success": False, "error": "Request metrics are disabled"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "DELETE":
+        route_metrics.reset()
+        logging.getLogger(__name__).info(
+            f"🧹 Admin {request.user.username} reset request metrics"
+        )
+        return Response({"success": True})
+
+    return Response(
+        {
+            "success": True,
+            "pid": os.getpid(),
+            "since": route_metrics.since,
+            "routes": route_metrics.summary(),
+        }
+    )
@@ -0,0 +1,1040 @@
+"""
+Shipment documents: invoices, receipts, packing lists, labels and transfer slips
+"""
+
+import logging
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import LCLShipment
+
+
+def _email_stored_document_in_background(
+    shipment, name, document, send_to_user, send_to_admin
+):
+    """
+    Email a stored invoice/receipt PDF to the user and admin in a background
+    thread, so the download request does not wait for SMTP
+
+    Args:
+        shipment: LCLShipment the document belongs to
+        name: Storage name of the PDF
+        document: 'Invoice' or 'Receipt' (for log messages)
+        send_to_user: email_service function sending it to the user
+        send_to_admin: email_service function sending it to the admin
+    """
+    import threading
+
+    from django.core.files.storage import default_storage
+    from django.db import connection
+
+    logger = logging.getLogger(__name__)
+
+    def send_emails():
+        try:
+            with default_storage.open(name, "rb") as pdf_file:
+                pdf_bytes = pdf_file.read()
+            if send_to_user(shipment, pdf_bytes):
+                logger.info(
+                    f"✅ {document} email sent to user for shipment {shipment.id}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ {document} email to user failed for shipment {shipment.id} (check email config or user email)"
+                )
+            if send_to_admin(shipment, pdf_bytes):
+                logger.info(
+                    f"✅ {document} email sent to admin for shipment {shipment.id}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ {document} email to admin failed for shipment {shipment.id} (check email config)"
+                )
+        except Exception as email_error:
+            logger.error(
+                f"❌ Failed to send {document.lower()} emails: {str(email_error)}",
+                exc_info=True,
+            )
+        finally:
+            connection.close()
+
+    threading.Thread(target=send_emails, daemon=True).start()
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_transfer_slip_view(request, pk):
+    """
+    Download the transfer slip of an LCL shipment (owner or admin)
+    GET /api/shipments/{id}/transfer-slip/?variant=thumb|web
+    """
+    from ..image_derivatives import PHOTO_VARIANTS, derivative_name
+    from ..protected_media import protected_file_response
+
+    shipment = (
+        LCLShipment.objects.filter(pk=pk).only("id", "user_id", "transfer_slip").first()
+    )
+    if not shipment or (
+        shipment.user_id != request.user.id and not request.user.is_superuser
+    ):
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    name = shipment.transfer_slip.name if shipment.transfer_slip else ""
+    variant = request.query_params.get("variant")
+    if variant:
+        if variant not in PHOTO_VARIANTS:
+            return Response(
+                {
+                    "success": False,
+                    "error": f"variant must be one of: {', '.join(PHOTO_VARIANTS)}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        name = name and derivative_name(name, variant)
+
+    response = protected_file_response(name) if name else None
+    if response is None:
+        return Response(
+            {"success": False, "error": "Transfer slip not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_invoice_view(request, pk):
+    """
+    Download invoice PDF for LCL shipment.
+    GET /api/shipments/{id}/invoice/
+
+    Requirements:
+    - Shipment status must not be PENDING_PAYMENT
+    - Payment status must be 'paid'
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check permissions: user must own the shipment or be admin
+        if shipment.user != request.user and not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "You can only download invoices for your own shipments.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Validate shipment status
+        if shipment.status == "PENDING_PAYMENT":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Invoice can only be generated after payment is confirmed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate payment status
+        if shipment.payment_status != "paid":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Payment must be confirmed before generating invoice.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Import document service
+        from ..document_service import generate_invoice, save_invoice_to_storage
+
+        # Get language from request (default: 'ar')
+        language = request.GET.get("language", "ar")
+        if language not in ["ar", "en"]:
+            language = "ar"
+
+        # If the invoice file exists, let nginx send it and email it in the
+        # background instead of reading the PDF in the request
+        if shipment.invoice_file:
+            from ..email_service import (
+                send_invoice_email_to_admin,
+                send_invoice_email_to_user,
+            )
+            from ..protected_media import protected_file_response
+
+            response = protected_file_response(
+                shipment.invoice_file.name,
+                filename=f"Invoice-{shipment.shipment_number}.pdf",
+                content_type="application/pdf",
+            )
+            if response is not None:
+                # Send emails even if invoice already exists (same as shipping labels)
+                logger.info(
+                    f"📧 Invoice file exists, sending emails for shipment {shipment.id}"
+                )
+                _email_stored_document_in_background(
+                    shipment,
+                    shipment.invoice_file.name,
+                    "Invoice",
+                    send_invoice_email_to_user,
+                    send_invoice_email_to_admin,
+                )
+                return response
+            logger.warning(
+                f"Invoice file {shipment.invoice_file.name} is missing, will regenerate"
+            )
+
+        # Generate invoice PDF
+        try:
+            pdf_bytes = generate_invoice(shipment, language=language)
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as gen_error:
+            logger.error(
+                f"Error generating invoice PDF: {str(gen_error)}", exc_info=True
+            )
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Failed to generate invoice: {str(gen_error)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Save to storage if not already saved (always try to save)
+        invoice_saved = False
+        if not shipment.invoice_file:
+            try:
+                save_invoice_to_storage(shipment, pdf_bytes)
+                logger.info(f"✅ Invoice saved to storage for shipment {shipment.id}")
+                invoice_saved = True
+            except Exception as save_error:
+                logger.error(
+                    f"Failed to save invoice to storage: {str(save_error)}",
+                    exc_info=True,
+                )
+                # Continue anyway - we can still return the PDF
+
+        # Send emails if invoice was just generated (not already existed)
+        if invoice_saved:
+            try:
+                from ..email_service import (
+                    send_invoice_email_to_admin,
+                    send_invoice_email_to_user,
+                )
+
+                user_sent = send_invoice_email_to_user(shipment, pdf_bytes)
+                admin_sent = send_invoice_email_to_admin(shipment, pdf_bytes)
+                if user_sent:
+                    logger.info(
+                        f"✅ Invoice email sent to user for shipment {shipment.id}"
+                    )
+                else:
+                    logger.warning(
+                        f"⚠️ Invoice email to user failed for shipment {shipment.id} (check email config or user email)"
+                    )
+                if admin_sent:
+                    logger.info(
+                        f"✅ Invoice email sent to admin for shipment {shipment.id}"
+                    )
+                else:
+                    logger.warning(
+                        f"⚠️ Invoice email to admin failed for shipment {shipment.id} (check email config)"
+                    )
+            except Exception as email_error:
+                logger.error(
+                    f"❌ Failed to send invoice emails: {str(email_error)}",
+                    exc_info=True,
+                )
+                # Don't fail if email fails
+
+        # Return PDF as response
+        response = HttpResponse(pdf_bytes, content_type="application/pdf")
+        response["Content-Disposition"] = (
+            f'inline; filename="Invoice-{shipment.shipment_number}.pdf"'
+        )
+        return response
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error generating invoice: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while generating invoice: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_consolidated_export_invoice_view(request, pk):
+    """
+    Download Consolidated Export Invoice PDF for LCL shipment.
+    GET /api/shipments/{id}/consolidated-export-invoice/
+
+    Only available for admin users.
+    Requirements:
+    - User must be admin (is_superuser)
+    - Payment status must be 'paid'
+    - Status must not be PENDING_PAYMENT
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check permissions: only admin can download consolidated export invoice
+        if not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Only admin users can download consolidated export invoice.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Validate shipment status
+        if shipment.status == "PENDING_PAYMENT":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Consolidated export invoice can only be generated after payment is confirmed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate payment status
+        if shipment.payment_status != "paid":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Payment must be confirmed before generating consolidated export invoice.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Import document service
+        from ..document_service import generate_consolidated_export_invoice_word
+
+        # Get language from request (default: 'en' for export invoice)
+        language = request.GET.get("language", "en")
+        if language not in ["ar", "en"]:
+            language = "en"
+
+        # Generate consolidated export invoice Word document
+        try:
+            docx_bytes = generate_consolidated_export_invoice_word(
+                shipment, language=language
+            )
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as gen_error:
+            logger.error(
+                f"Error generating consolidated export invoice Word document: {str(gen_error)}",
+                exc_info=True,
+            )
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Failed to generate consolidated export invoice: {str(gen_error)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Send consolidated export invoice by email to admin
+        try:
+            from ..email_service import send_consolidated_export_invoice_email_to_admin
+
+            admin_sent = send_consolidated_export_invoice_email_to_admin(
+                shipment, docx_bytes
+            )
+            if admin_sent:
+                logger.info(
+                    f"✅ Consolidated export invoice email sent to admin for shipment {shipment.id}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ Consolidated export invoice email to admin failed for shipment {shipment.id} (check email config)"
+                )
+        except Exception as email_error:
+            logger.error(
+                f"❌ Failed to send consolidated export invoice email: {str(email_error)}",
+                exc_info=True,
+            )
+            # Don't fail if email fails - still return the Word document
+
+        # Return Word document as response
+        response = HttpResponse(
+            docx_bytes,
+            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+        response["Content-Disposition"] = (
+            f'inline; filename="Consolidated-Export-Invoice-{shipment.shipment_number}.docx"'
+        )
+        return response
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(
+            f"Error generating consolidated export invoice: {str(e)}", exc_info=True
+        )
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while generating consolidated export invoice: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_packing_list_view(request, pk):
+    """
+    Download Packing List PDF for LCL shipment.
+    GET /api/shipments/{id}/packing-list/
+
+    Only available for admin users.
+    Requirements:
+    - User must be admin (is_superuser)
+    - Payment status must be 'paid'
+    - Status must not be PENDING_PAYMENT
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check permissions: only admin can download packing list
+        if not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Only admin users can download packing list.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Validate shipment status
+        if shipment.status == "PENDING_PAYMENT":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Packing list can only be generated after payment is confirmed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate payment status
+        if shipment.payment_status != "paid":
+            return Response(
+                {
+                    "success": False,
+                    "error": "Payment must be confirmed before generating packing list.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Import document service
+        from ..document_service import generate_packing_list_word
+
+        # Get language from request (default: 'en' for packing list)
+        language = request.GET.get("language", "en")
+        if language not in ["ar", "en"]:
+            language = "en"
+
+        # Generate packing list Word document
+        try:
+            docx_bytes = generate_packing_list_word(shipment, language=language)
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as gen_error:
+            logger.error(
+                f"Error generating packing list Word document: {str(gen_error)}",
+                exc_info=True,
+            )
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Failed to generate packing list: {str(gen_error)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Send packing list by email to admin
+        try:
+            from ..email_service import send_packing_list_email_to_admin
+
+            send_packing_list_email_to_admin(shipment, docx_bytes)
+            logger.info(
+                f"✅ Packing list email sent to admin for shipment {shipment.id}"
+            )
+        except Exception as email_error:
+            logger.warning(f"Failed to send packing list email: {str(email_error)}")
+            # Don't fail if email fails - still return the Word document
+
+        # Return Word document as response
+        response = HttpResponse(
+            docx_bytes,
+            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        )
+        response["Content-Disposition"] = (
+            f'inline; filename="Packing-List-{shipment.shipment_number}.docx"'
+        )
+        return response
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error generating packing list: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while generating packing list: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def generate_bulk_customs_documents_view(request):
+    """
+    Generate consolidated Packing List or Consolidated Export Invoice for multiple LCL shipments.
+    POST /api/customs-documents/bulk/
+
+    Body:
+    {
+        "document_type": "packing_list" or "consolidated_export_invoice",
+        "shipment_ids": [1, 2, 3, ...],
+        "language": "en" (optional, default: "en")
+    }
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        document_type = request.data.get("document_type")
+        shipment_ids = request.data.get("shipment_ids", [])
+        language = request.data.get("language", "en")
+
+        if not document_type:
+            return Response(
+                {
+                    "success": False,
+                    "error": "document_type is required (packing_list or consolidated_export_invoice)",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if document_type not in ["packing_list", "consolidated_export_invoice"]:
+            return Response(
+                {
+                    "success": False,
+                    "error": "document_type must be 'packing_list' or 'consolidated_export_invoice'",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not shipment_ids or not isinstance(shipment_ids, list):
+            return Response(
+                {"success": False, "error": "shipment_ids must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get shipments
+        shipments = LCLShipment.objects.filter(id__in=shipment_ids)
+
+        if not shipments.exists():
+            return Response(
+                {"success": False, "error": "No shipments found with provided IDs"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Validate all shipments are paid
+        unpaid_shipments = shipments.exclude(payment_status="paid")
+        if unpaid_shipments.exists():
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Some shipments are not paid. Shipment IDs: {list(unpaid_shipments.values_list('id', flat=True))}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Convert to list for document generation
+        shipments_list = list(shipments)
+
+        # Generate document
+        from ..document_service import (
+            generate_consolidated_export_invoice_bulk_word,
+            generate_consolidated_packing_list_bulk_word,
+            generate_multiple_consolidated_invoices_word,
+            generate_multiple_consolidated_packing_lists_word,
+            shipment_totals_by_id,
+            split_shipments_by_limits,
+        )
+
+        if document_type == "packing_list":
+            # Calculate total CBM and weight first
+            shipment_totals = shipment_totals_by_id(shipments_list).values()
+            total_cbm = sum(totals["cbm"] for totals in shipment_totals)
+            total_weight = sum(totals["weight"] for totals in shipment_totals)
+
+            # Check if total exceeds limits - if so, always split into multiple packing lists
+            max_cbm_limit = 65.0
+            max_weight_limit = 24000.0
+
+            if total_cbm > max_cbm_limit or total_weight > max_weight_limit:
+                # Total exceeds limits - split into multiple packing lists
+                zip_bytes = generate_multiple_consolidated_packing_lists_word(
+                    shipments_list,
+                    language=language,
+                    max_cbm=max_cbm_limit,
+                    max_weight_kg=max_weight_limit,
+                )
+                filename = f"Consolidated-Packing-Lists-{timezone.now().strftime('%Y%m%d')}.zip"
+                response = HttpResponse(zip_bytes, content_type="application/zip")
+                response["Content-Disposition"] = f'attachment; filename="{filename}"'
+                response["Content-Length"] = str(len(zip_bytes))
+                response["Content-Transfer-Encoding"] = "binary"
+                return response
+            else:
+                # Total within limits - check if splitting is needed
+                groups = split_shipments_by_limits(
+                    shipments_list,
+                    max_cbm=max_cbm_limit,
+                    max_weight_kg=max_weight_limit,
+                )
+
+                if len(groups) == 1:
+                    # Only one group - return as Word document
+                    date_str = timezone.now().strftime("%Y%m%d")
+                    packing_list_number = f"PL-{date_str}-001"
+                    docx_bytes = generate_consolidated_packing_list_bulk_word(
+                        groups[0],
+                        language=language,
+                        packing_list_number=packing_list_number,
+                    )
+                    filename = f"Consolidated-Packing-List-{packing_list_number}.docx"
+                    response = HttpResponse(
+                        docx_bytes,
+                        content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    )
+                    response["Content-Disposition"] = f'inline; filename="{filename}"'
+                    return response
+                else:
+                    # Multiple groups - return as ZIP
+                    zip_bytes = generate_multiple_consolidated_packing_lists_word(
+                        shipments_list,
+                        language=language,
+                        max_cbm=max_cbm_limit,
+                        max_weight_kg=max_weight_limit,
+                    )
+                    filename = f"Consolidated-Packing-Lists-{timezone.now().strftime('%Y%m%d')}.zip"
+                    response = HttpResponse(zip_bytes, content_type="application/zip")
+                    response["Content-Disposition"] = (
+                        f'attachment; filename="{filename}"'
+                    )
+                    response["Content-Length"] = str(len(zip_bytes))
+                    response["Content-Transfer-Encoding"] = "binary"
+                    return response
+        else:  # consolidated_export_invoice
+            # Calculate total CBM and weight first
+            shipment_totals = shipment_totals_by_id(shipments_list).values()
+            total_cbm = sum(totals["cbm"] for totals in shipment_totals)
+            total_weight = sum(totals["weight"] for totals in shipment_totals)
+
+            # Check if total exceeds limits - if so, always split into multiple invoices
+            max_cbm_limit = 65.0
+            max_weight_limit = 24000.0
+
+            if total_cbm > max_cbm_limit or total_weight > max_weight_limit:
+                # Total exceeds limits - split into multiple invoices
+                zip_bytes = generate_multiple_consolidated_invoices_word(
+                    shipments_list,
+                    language=language,
+                    max_cbm=max_cbm_limit,
+                    max_weight_kg=max_weight_limit,
+                )
+                filename = f"Consolidated-Export-Invoices-{timezone.now().strftime('%Y%m%d')}.zip"
+                response = HttpResponse(zip_bytes, content_type="application/zip")
+                response["Content-Disposition"] = f'attachment; filename="{filename}"'
+                response["Content-Length"] = str(len(zip_bytes))
+                response["Content-Transfer-Encoding"] = "binary"
+                return response
+            else:
+                # Total within limits - check if splitting is needed
+                groups = split_shipments_by_limits(
+                    shipments_list,
+                    max_cbm=max_cbm_limit,
+                    max_weight_kg=max_weight_limit,
+                )
+
+                if len(groups) == 1:
+                    # Only one group - return as Word document
+                    date_str = timezone.now().strftime("%Y%m%d")
+                    invoice_number = f"INV-{date_str}-001"
+                    docx_bytes = generate_consolidated_export_invoice_bulk_word(
+                        groups[0], language=language, invoice_number=invoice_number
+                    )
+                    filename = f"Consolidated-Export-Invoice-{invoice_number}.docx"
+                    response = HttpResponse(
+                        docx_bytes,
+                        content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    )
+                    response["Content-Disposition"] = f'inline; filename="{filename}"'
+                    return response
+                else:
+                    # Multiple groups - return as ZIP
+                    zip_bytes = generate_multiple_consolidated_invoices_word(
+                        shipments_list,
+                        language=language,
+                        max_cbm=max_cbm_limit,
+                        max_weight_kg=max_weight_limit,
+                    )
+                    filename = f"Consolidated-Export-Invoices-{timezone.now().strftime('%Y%m%d')}.zip"
+                    response = HttpResponse(zip_bytes, content_type="application/zip")
+                    response["Content-Disposition"] = (
+                        f'attachment; filename="{filename}"'
+                    )
+                    response["Content-Length"] = str(len(zip_bytes))
+                    response["Content-Transfer-Encoding"] = "binary"
+                    return response
+
+    except Exception as e:
+        logger.error(
+            f"Error generating bulk customs documents: {str(e)}", exc_info=True
+        )
+        return Response(
+            {"success": False, "error": f"An error occurred: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_receipt_view(request, pk):
+    """
+    Download receipt PDF for LCL shipment.
+    GET /api/shipments/{id}/receipt/
+
+    Requirements:
+    - Shipment status must not be PENDING_PAYMENT
+    - Payment status must be 'paid'
+    - Or status must be ARRIVED_WATTWEG_5 (for receipt generation)
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check permissions: user must own the shipment or be admin
+        if shipment.user != request.user and not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "You can only download receipts for your own shipments.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Validate shipment status - receipt can be generated when:
+        # 1. Payment is confirmed (paid) and status is not PENDING_PAYMENT
+        # 2. Or shipment has arrived at warehouse (ARRIVED_WATTWEG_5)
+        can_generate_receipt = (
+            shipment.payment_status == "paid" and shipment.status != "PENDING_PAYMENT"
+        ) or (shipment.status == "ARRIVED_WATTWEG_5")
+
+        if not can_generate_receipt:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Receipt can only be generated after payment is confirmed or when shipment arrives at warehouse.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Import document service
+        from ..document_service import generate_receipt, save_receipt_to_storage
+
+        # Get language from request (default: 'en' for receipt)
+        language = request.GET.get("language", "en")
+        if language not in ["ar", "en"]:
+            language = "en"
+
+        # If the receipt file exists, let nginx send it and email it in the
+        # background instead of reading the PDF in the request
+        if shipment.receipt_file:
+            from ..email_service import (
+                send_receipt_email_to_admin,
+                send_receipt_email_to_user,
+            )
+            from ..protected_media import protected_file_response
+
+            response = protected_file_response(
+                shipment.receipt_file.name,
+                filename=f"Receipt-{shipment.shipment_number}.pdf",
+                content_type="application/pdf",
+            )
+            if response is not None:
+                # Send emails even if receipt already exists (same as invoice)
+                logger.info(
+                    f"📧 Receipt file exists, sending emails for shipment {shipment.id}"
+                )
+                _email_stored_document_in_background(
+                    shipment,
+                    shipment.receipt_file.name,
+                    "Receipt",
+                    send_receipt_email_to_user,
+                    send_receipt_email_to_admin,
+                )
+                return response
+            logger.warning(
+                f"Receipt file {shipment.receipt_file.name} is missing, will regenerate"
+            )
+
+        # Generate receipt PDF
+        try:
+            pdf_bytes = generate_receipt(shipment, language=language)
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as gen_error:
+            logger.error(
+                f"Error generating receipt PDF: {str(gen_error)}", exc_info=True
+            )
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Failed to generate receipt: {str(gen_error)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Save to storage if not already saved (always try to save)
+        receipt_saved = False
+        if not shipment.receipt_file:
+            try:
+                save_receipt_to_storage(shipment, pdf_bytes)
+                logger.info(f"✅ Receipt saved to storage for shipment {shipment.id}")
+                receipt_saved = True
+            except Exception as save_error:
+                logger.error(
+                    f"Failed to save receipt to storage: {str(save_error)}",
+                    exc_info=True,
+                )
+                # Continue anyway - we can still return the PDF
+
+        # Send emails if receipt was just generated (not already existed)
+        if receipt_saved:
+            try:
+                from ..email_service import (
+                    send_receipt_email_to_admin,
+                    send_receipt_email_to_user,
+                )
+
+                user_sent = send_receipt_email_to_user(shipment, pdf_bytes)
+                admin_sent = send_receipt_email_to_admin(shipment, pdf_bytes)
+                if user_sent:
+                    logger.info(
+                        f"✅ Receipt email sent to user for shipment {shipment.id}"
+                    )
+                else:
+                    logger.warning(
+                        f"⚠️ Receipt email to user failed for shipment {shipment.id} (check email config or user email)"
+                    )
+                if admin_sent:
+                    logger.info(
+                        f"✅ Receipt email sent to admin for shipment {shipment.id}"
+                    )
+                else:
+                    logger.warning(
+                        f"⚠️ Receipt email to admin failed for shipment {shipment.id} (check email config)"
+                    )
+            except Exception as email_error:
+                logger.error(
+                    f"❌ Failed to send receipt emails: {str(email_error)}",
+                    exc_info=True,
+                )
+                # Don't fail if email fails
+
+        # Return PDF as response
+        response = HttpResponse(pdf_bytes, content_type="application/pdf")
+        response["Content-Disposition"] = (
+            f'inline; filename="Receipt-{shipment.shipment_number}.pdf"'
+        )
+        return response
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error downloading receipt: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while generating receipt: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_shipping_labels_view(request, pk):
+    """
+    Download shipping labels PDF for LCL shipment.
+    GET /api/shipments/{id}/shipping-labels/
+
+    Generates one label per parcel (including repeat_count for electronics).
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check permissions: user must own the shipment or be admin
+        if shipment.user != request.user and not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "You can only download shipping labels for your own shipments.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Import document service
+        from ..document_service import generate_shipping_labels
+
+        # Get language from request (default: 'ar')
+        language = request.GET.get("language", "ar")
+        if language not in ["ar", "en"]:
+            language = "ar"
+
+        # Get number of labels from request (optional)
+        num_labels = request.GET.get("num_labels")
+        if num_labels:
+            try:
+                num_labels = int(num_labels)
+                if num_labels <= 0:
+                    num_labels = None
+            except (ValueError, TypeError):
+                num_labels = None
+        else:
+            num_labels = None
+
+        # Generate shipping labels PDF
+        try:
+            pdf_bytes = generate_shipping_labels(
+                shipment, language=language, num_labels=num_labels
+            )
+        except ValueError as e:
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as gen_error:
+            logger.error(
+                f"Error generating shipping labels PDF: {str(gen_error)}", exc_info=True
+            )
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Failed to generate shipping labels: {str(gen_error)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Send shipping labels by email
+        try:
+            from ..email_service import (
+                send_shipping_labels_email_to_admin,
+                send_shipping_labels_email_to_user,
+            )
+
+            user_sent = send_shipping_labels_email_to_user(
+                shipment, pdf_bytes, num_labels=num_labels
+            )
+            admin_sent = send_shipping_labels_email_to_admin(
+                shipment, pdf_bytes, num_labels=num_labels
+            )
+            if user_sent:
+                logger.info(
+                    f"✅ Shipping labels email sent to user for shipment {shipment.id}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ Shipping labels email to user failed for shipment {shipment.id} (check email config or user email)"
+                )
+            if admin_sent:
+                logger.info(
+                    f"✅ Shipping labels email sent to admin for shipment {shipment.id}"
+                )
+            else:
+                logger.warning(
+                    f"⚠️ Shipping labels email to admin failed for shipment {shipment.id} (check email config)"
+                )
+        except Exception as email_error:
+            logger.error(
+                f"❌ Failed to send shipping labels emails: {str(email_error)}",
+                exc_info=True,
+            )
+            # Don't fail if email fails
+
+        # Return PDF as response
+        response = HttpResponse(pdf_bytes, content_type="application/pdf")
+        response["Content-Disposition"] = (
+            f'inline; filename="Shipping-Labels-{shipment.shipment_number}.pdf"'
+        )
+        return response
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error generating shipping labels: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while generating shipping labels: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,1148 @@
+"""
+FCL quote endpoints: submission, listing, status updates, offers and edit requests
+"""
+
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Max
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ..email_service import (
+    send_edit_request_confirmation_to_user,
+    send_fcl_quote_confirmation_email,
+    send_fcl_quote_notification,
+    send_payment_reminder_email,
+    send_payment_reminder_notification_to_admin,
+    send_status_update_email,
+    send_status_update_notification_to_admin,
+)
+from ..models import EditRequestMessage, FCLQuote, NumberSequence
+from ..pagination import CreatedAtCursorPagination
+from ..serializers import (
+    EditRequestMessageSerializer,
+    FCLQuoteListSerializer,
+    FCLQuoteSerializer,
+)
+from ..whatsapp_service import send_fcl_quote_whatsapp_notification
+from .common import _finish_recaptcha_check, _start_recaptcha_check
+
+
+class FCLQuoteView(generics.CreateAPIView):
+    """API endpoint for submitting FCL quote requests"""
+
+    queryset = FCLQuote.objects.all()
+    serializer_class = FCLQuoteSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def perform_create(self, serializer):
+        # ensures user is always set on the quote
+        serializer.save(user=self.request.user)
+
+    def get_serializer_context(self):
+        """Add request to serializer context"""
+        context = super().get_serializer_context()
+        context["request"] = self.request
+        return context
+
+    def create(self, request, *args, **kwargs):
+        logger = logging.getLogger(__name__)
+
+        if settings.DEBUG:
+            logger.debug(f"Request data keys: {list(request.data.keys())}")
+            logger.debug(
+                f"Authenticated user: {request.user} (ID: {request.user.id if request.user.is_authenticated else 'N/A'})"
+            )
+
+        if not request.user.is_authenticated:
+            return Response(
+                {"success": False, "error": "User not authenticated"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        # Verify reCAPTCHA v3 token if provided
+        recaptcha_token = request.data.get("recaptcha_token")
+
+        # Check if reCAPTCHA is configured (standard v3 only)
+        has_recaptcha_config = getattr(settings, "RECAPTCHA_SECRET_KEY", None)
+
+        if has_recaptcha_config:
+            # reCAPTCHA is configured, so token is required
+            if not recaptcha_token:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "reCAPTCHA verification is required. Please complete the reCAPTCHA verification.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Verify the token in the background while the data is validated
+        # (also when not configured - might be test key)
+        recaptcha_check = _start_recaptcha_check(recaptcha_token, "fcl_quote", request)
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        recaptcha_error = _finish_recaptcha_check(
+            recaptcha_check,
+            bool(has_recaptcha_config),
+            "FCL quote",
+            error_fields={"success": False},
+        )
+        if recaptcha_error:
+            return recaptcha_error
+
+        # perform_create sets the user
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        response = Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+        quote_id = response.data.get("id")
+
+        # Generate quote number in format: MF-{ORIGIN}-{DEST}-FCL-{YEAR}-{COUNTER}
+        quote_number = None
+        if quote_id is not None:
+            try:
+                # Get the quote object to access origin and destination countries
+                quote = FCLQuote.objects.get(id=quote_id)
+
+                # Helper function to get country code
+                def get_country_code(country_name):
+                    """Convert country name to 2-letter code"""
+                    if not country_name:
+                        return "XX"
+
+                    country_name_upper = country_name.upper().strip()
+
+                    # Common country mappings
+                    country_map = {
+                        # European countries
+                        "ROMANIA": "RO",
+                        "IRELAND": "IE",
+                        "GERMANY": "DE",
+                        "FRANCE": "FR",
+                        "ITALY": "IT",
+                        "SPAIN": "ES",
+                        "NETHERLANDS": "NL",
+                        "BELGIUM": "BE",
+                        "POLAND": "PL",
+                        "GREECE": "GR",
+                        "PORTUGAL": "PT",
+                        "AUSTRIA": "AT",
+                        "SWEDEN": "SE",
+                        "DENMARK": "DK",
+                        "FINLAND": "FI",
+                        "EUROPE": "EU",
+                        "EU": "EU",
+                        # Middle East
+                        "SYRIA": "SY",
+                        "LEBANON": "LB",
+                        "JORDAN": "JO",
+                        "TURKEY": "TR",
+                        "EGYPT": "EG",
+                        "SAUDI ARABIA": "SA",
+                        "UAE": "AE",
+                        "UNITED ARAB EMIRATES": "AE",
+                        # If already a 2-letter code, return as is
+                    }
+
+                    # Check if it's already a 2-letter code
+                    if len(country_name_upper) == 2:
+                        return country_name_upper
+
+                    # Check mapping
+                    if country_name_upper in country_map:
+                        return country_map[country_name_upper]
+
+                    # Try to extract first 2 letters if it's a common pattern
+                    # Otherwise return first 2 letters of the country name
+                    return (
+                        country_name_upper[:2] if len(country_name_upper) >= 2 else "XX"
+                    )
+
+                origin_code = get_country_code(quote.origin_country)
+                dest_code = get_country_code(quote.destination_country)
+                current_year = (
+                    quote.created_at.year if quote.created_at else datetime.now().year
+                )
+
+                def last_issued_counter():
+                    # Older quotes were numbered by ID, so a new yearly
+                    # sequence starts above the highest existing ID
+                    return FCLQuote.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+
+                counter = NumberSequence.next_value(
+                    f"FCL-{current_year}", seed=last_issued_counter
+                )
+
+                quote_number = (
+                    f"MF-{origin_code}-{dest_code}-FCL-{current_year}-{counter:05d}"
+                )
+
+                # Save quote number to database
+                quote.quote_number = quote_number
+                quote.save(update_fields=["quote_number"])
+
+            except Exception as e:
+                logger.error(f"Error generating quote number: {str(e)}")
+                # Fallback to simple format
+                quote_number = f"FCL-{quote_id:06d}" if quote_id is not None else None
+                if quote_number and quote_id:
+                    try:
+                        quote = FCLQuote.objects.get(id=quote_id)
+                        quote.quote_number = quote_number
+                        quote.save(update_fields=["quote_number"])
+                    except Exception:
+                        pass
+
+        # Send email notifications
+        if quote_id is not None:
+            try:
+                quote = FCLQuote.objects.get(id=quote_id)
+                # Send email to admin
+                send_fcl_quote_notification(quote)
+                # Send confirmation email to user
+                send_fcl_quote_confirmation_email(quote)
+            except Exception as email_error:
+                logger.error(
+                    f"Failed to send FCL quote email notifications: {str(email_error)}"
+                )
+                # Don't fail the request if email fails
+
+            # Send WhatsApp notifications to both admin and user
+            try:
+                quote = FCLQuote.objects.get(id=quote_id)
+                results = send_fcl_quote_whatsapp_notification(quote)
+                if results.get("admin"):
+                    logger.info(
+                        f"FCL quote WhatsApp notification sent to admin for quote {quote.id}"
+                    )
+                if results.get("user"):
+                    logger.info(
+                        f"FCL quote WhatsApp notification sent to user for quote {quote.id}"
+                    )
+            except Exception as whatsapp_error:
+                logger.error(
+                    f"Failed to send FCL quote WhatsApp notifications: {str(whatsapp_error)}"
+                )
+                # Don't fail the request if WhatsApp fails
+
+        return Response(
+            {
+                "success": True,
+                "message": "Your FCL quote request has been submitted successfully. We will contact you soon.",
+                "id": quote_id,
+                "quote_number": quote_number,
+            },
+            status=response.status_code,
+        )
+
+
+class FCLQuoteListView(generics.ListAPIView):
+    """
+    API endpoint to list user's FCL quotes (or all quotes for admin)
+
+    Cursor-paginated on (-created_at, -id). Pass ?view=summary for the
+    compact FCLQuoteListSerializer representation.
+    """
+
+    serializer_class = FCLQuoteSerializer
+    authentication_classes = [JWTAuthentication]  # Explicitly use JWT authentication
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def is_summary(self):
+        return self.request.query_params.get("view") == "summary"
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return FCLQuoteListSerializer
+        return FCLQuoteSerializer
+
+    def get_queryset(self):
+        """Return quotes for the authenticated user, or all quotes if admin"""
+        if settings.DEBUG:
+            logger = logging.getLogger(__name__)
+            logger.debug(
+                f"Fetching quotes for user: {self.request.user} (ID: {self.request.user.id if self.request.user.is_authenticated else 'N/A'})"
+            )
+
+        if not self.request.user.is_authenticated:
+            return FCLQuote.objects.none()
+
+        # If user is superuser, return all quotes
+        if self.request.user.is_superuser:
+            queryset = FCLQuote.objects.all().order_by("-created_at")
+            if settings.DEBUG:
+                logger.debug(f"Admin user - Found {queryset.count()} total quotes")
+        else:
+            # Regular user - only their quotes
+            queryset = FCLQuote.objects.filter(user=self.request.user).order_by(
+                "-created_at"
+            )
+            if settings.DEBUG:
+                logger.debug(
+                    f"Regular user - Found {queryset.count()} quotes for user {self.request.user.id}"
+                )
+
+        if self.is_summary():
+            return queryset.only(*FCLQuoteListSerializer.Meta.fields)
+
+        return FCLQuoteSerializer.setup_eager_loading(queryset)
+
+
+class FCLQuoteDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """API endpoint to retrieve, update, or delete a specific FCL quote"""
+
+    serializer_class = FCLQuoteSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def get_queryset(self):
+        """Return quotes for the authenticated user, or all quotes if admin"""
+        if not self.request.user.is_authenticated:
+            return FCLQuote.objects.none()
+        # Admin can access all quotes, regular users only their own
+        if self.request.user.is_superuser:
+            queryset = FCLQuote.objects.all()
+        else:
+            queryset = FCLQuote.objects.filter(user=self.request.user)
+        return FCLQuoteSerializer.setup_eager_loading(queryset)
+
+    def get_serializer_context(self):
+        """Add request to serializer context"""
+        context = super().get_serializer_context()
+        context["request"] = self.request
+        return context
+
+    def update(self, request, *args, **kwargs):
+        """Update FCL quote"""
+        instance = self.get_object()
+
+        # Check if user is not admin and quote status is PENDING_PAYMENT or later
+        if not request.user.is_superuser:
+            locked_statuses = [
+                "PENDING_PAYMENT",
+                "PENDING_PICKUP",
+                "IN_TRANSIT_TO_WATTWEG_5",
+                "ARRIVED_WATTWEG_5",
+                "SORTING_WATTWEG_5",
+                "READY_FOR_EXPORT",
+                "IN_TRANSIT_TO_DESTINATION",
+                "ARRIVED_DESTINATION",
+                "DESTINATION_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+                "CANCELLED",
+            ]
+            if instance.status in locked_statuses:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Cannot edit quote after payment process has started. Only admins can edit quotes in this status.",
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        partial = kwargs.pop("partial", False)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        return Response(
+            {
+                "success": True,
+                "message": "FCL quote updated successfully.",
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete FCL quote"""
+        instance = self.get_object()
+
+        # Check if user is not admin and quote status is PENDING_PAYMENT or later
+        if not request.user.is_superuser:
+            locked_statuses = [
+                "PENDING_PAYMENT",
+                "PENDING_PICKUP",
+                "IN_TRANSIT_TO_WATTWEG_5",
+                "ARRIVED_WATTWEG_5",
+                "SORTING_WATTWEG_5",
+                "READY_FOR_EXPORT",
+                "IN_TRANSIT_TO_DESTINATION",
+                "ARRIVED_DESTINATION",
+                "DESTINATION_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+                "CANCELLED",
+            ]
+            if instance.status in locked_statuses:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Cannot delete quote after payment process has started. Only admins can delete quotes in this status.",
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        self.perform_destroy(instance)
+        return Response(
+            {"success": True, "message": "FCL quote deleted successfully."},
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["PATCH"])
+@permission_classes([IsAuthenticated])
+def update_fcl_quote_status_view(request, pk):
+    """API endpoint for admin to update FCL quote status"""
+    logger = logging.getLogger(__name__)
+
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only superusers can update quote status."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+        new_status_raw = request.data.get("status")
+        # Normalize status: treat empty string, None, or whitespace as None
+        if isinstance(new_status_raw, str):
+            new_status_raw = new_status_raw.strip()
+            if new_status_raw == "":
+                new_status = None
+            else:
+                new_status = new_status_raw
+        else:
+            new_status = new_status_raw
+
+        offer_message = request.data.get("offer_message", "")
+
+        # Log incoming data for debugging
+        logger.info(
+            f"FCL Quote {pk} update request - data keys: {list(request.data.keys())}, status: {new_status}, amount_paid: {request.data.get('amount_paid')}, type: {type(request.data.get('amount_paid'))}, full_data: {request.data}"
+        )
+
+        # Check if we're only updating amount_paid or total_price (no status change)
+        # Handle QueryDict (form data) - get first value if it's a list
+        amount_paid_raw = request.data.get("amount_paid")
+        if isinstance(amount_paid_raw, list) and len(amount_paid_raw) > 0:
+            amount_paid = amount_paid_raw[0]
+        else:
+            amount_paid = amount_paid_raw
+
+        total_price_raw = request.data.get("total_price")
+        if isinstance(total_price_raw, list) and len(total_price_raw) > 0:
+            total_price = total_price_raw[0]
+        else:
+            total_price = total_price_raw
+
+        # Check if we're updating payment info (amount_paid or total_price)
+        is_updating_payment = amount_paid is not None or total_price is not None
+
+        # Check if we're updating status (new_status is provided and not empty)
+        is_updating_status = new_status is not None and new_status != ""
+
+        # If we're not updating anything, return error
+        if not is_updating_payment and not is_updating_status:
+            return Response(
+                {
+                    "success": False,
+                    "error": "At least one field (status, amount_paid, or total_price) must be provided.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Store old status for email notification
+        old_status = quote.status
+
+        # Only validate and update status if it's provided
+        if new_status:
+            # Validate status
+            valid_statuses = [choice[0] for choice in FCLQuote.STATUS_CHOICES]
+            if new_status not in valid_statuses:
+                return Response(
+                    {
+                        "success": False,
+                        "error": f"Invalid status. Valid statuses are: {', '.join(valid_statuses)}",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Check if payment is 100% before allowing status updates to IN_TRANSIT_TO_SYRIA and beyond
+            restricted_statuses = [
+                "IN_TRANSIT_TO_SYRIA",
+                "ARRIVED_SYRIA",
+                "SYRIA_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+            ]
+            if new_status in restricted_statuses:
+                if quote.total_price and quote.total_price > 0:
+                    payment_percentage = (
+                        (quote.amount_paid or 0) / quote.total_price * 100
+                        if quote.amount_paid
+                        else 0
+                    )
+                    if payment_percentage < 100:
+                        return Response(
+                            {
+                                "success": False,
+                                "error": f"Cannot update status to {new_status}. Payment must be 100% complete. Current payment: {payment_percentage:.1f}%",
+                            },
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
+
+            quote.status = new_status
+
+            # If status is OFFER_SENT, save message and timestamp
+            if new_status == "OFFER_SENT" and offer_message:
+                quote.offer_message = offer_message
+                from django.utils import timezone
+
+                quote.offer_sent_at = timezone.now()
+                quote.user_response = (
+                    "PENDING"  # Reset user response when new offer is sent
+                )
+
+        # Allow setting/updating total_price and amount_paid for any status (admin can update payment info anytime)
+        if amount_paid is not None or total_price is not None:
+            # Allow setting/updating total_price
+            if total_price is not None:
+                try:
+                    # Handle empty string, None, or whitespace
+                    if isinstance(total_price, str):
+                        total_price = total_price.strip()
+                        if total_price == "" or total_price.lower() == "none":
+                            total_price = None
+
+                    # If total_price is None or empty after processing, skip update
+                    if total_price is None or total_price == "":
+                        pass  # Don't update total_price if it's empty
+                    else:
+                        total_price_decimal = float(total_price)
+                        if total_price_decimal < 0:
+                            return Response(
+                                {
+                                    "success": False,
+                                    "error": "Total price cannot be negative.",
+                                },
+                                status=status.HTTP_400_BAD_REQUEST,
+                            )
+                        quote.total_price = total_price_decimal
+                except (ValueError, TypeError) as e:
+                    logger.error(
+                        f"Error converting total_price to float: {str(e)}, value: {total_price}, type: {type(total_price)}"
+                    )
+                    return Response(
+                        {
+                            "success": False,
+                            "error": f"Invalid total_price value: {total_price}. Please provide a valid number.",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+            # Allow setting/updating amount_paid
+            if amount_paid is not None:
+                # Save original value for error messages
+                original_amount_paid_value = amount_paid
+                try:
+                    # Log the incoming value for debugging
+                    logger.info(
+                        f"Processing amount_paid: value={amount_paid}, type={type(amount_paid)}, repr={repr(amount_paid)}"
+                    )
+
+                    # Handle different input types
+                    if isinstance(amount_paid, bool):
+                        # Boolean: convert to 0 or 1
+                        amount_paid_decimal = 1.0 if amount_paid else 0.0
+                    elif isinstance(amount_paid, (int, float, Decimal)):
+                        # Already a number, use directly
+                        # int, float, and Decimal should all convert to float without issues
+                        amount_paid_decimal = float(amount_paid)
+                    elif isinstance(amount_paid, str):
+                        # Handle string input
+                        original_amount_paid = (
+                            amount_paid  # Keep original for error messages
+                        )
+                        amount_paid_str = amount_paid.strip()
+                        if amount_paid_str == "" or amount_paid_str.lower() in (
+                            "none",
+                            "null",
+                            "undefined",
+                        ):
+                            amount_paid_decimal = 0.0
+                        else:
+                            # Remove any commas, spaces, or currency symbols
+                            amount_paid_cleaned = (
+                                amount_paid_str.replace(",", "")
+                                .replace(" ", "")
+                                .replace("€", "")
+                                .replace("EUR", "")
+                                .replace("$", "")
+                                .strip()
+                            )
+                            if amount_paid_cleaned == "":
+                                amount_paid_decimal = 0.0
+                            else:
+                                try:
+                                    amount_paid_decimal = float(amount_paid_cleaned)
+                                except ValueError as ve:
+                                    # If float() fails, try using regex to extract number
+                                    import re
+
+                                    numbers = re.findall(
+                                        r"-?\d+\.?\d*", amount_paid_cleaned
+                                    )
+                                    if numbers:
+                                        amount_paid_decimal = float(numbers[0])
+                                        logger.warning(
+                                            f"Extracted number {amount_paid_decimal} from string '{original_amount_paid}' using regex"
+                                        )
+                                    else:
+                                        raise ValueError(
+                                            f"Cannot convert string '{original_amount_paid}' to number"
+                                        )
+                    elif isinstance(amount_paid, (list, tuple)):
+                        # If it's a list/tuple, take the first element
+                        logger.warning(
+                            f"amount_paid is a list/tuple: {amount_paid}, using first element"
+                        )
+                        if len(amount_paid) > 0:
+                            amount_paid_decimal = float(amount_paid[0])
+                        else:
+                            amount_paid_decimal = 0.0
+                    elif isinstance(amount_paid, dict):
+                        # If it's a dict, try to get a value
+                        logger.warning(f"amount_paid is a dict: {amount_paid}")
+                        if "value" in amount_paid:
+                            amount_paid_decimal = float(amount_paid["value"])
+                        elif "amount" in amount_paid:
+                            amount_paid_decimal = float(amount_paid["amount"])
+                        else:
+                            # Try to convert the dict to string and parse
+                            raise ValueError(
+                                f"Cannot convert dict to number: {amount_paid}"
+                            )
+                    elif amount_paid is None:
+                        amount_paid_decimal = 0.0
+                    else:
+                        # For any other type, try to convert to string first
+                        logger.warning(
+                            f"Unexpected amount_paid type: {type(amount_paid)}, value: {amount_paid}"
+                        )
+                        amount_paid_str = str(amount_paid).strip()
+                        if amount_paid_str == "" or amount_paid_str.lower() in (
+                            "none",
+                            "null",
+                            "undefined",
+                        ):
+                            amount_paid_decimal = 0.0
+                        else:
+                            # Remove any commas, spaces, or currency symbols
+                            amount_paid_str = (
+                                amount_paid_str.replace(",", "")
+                                .replace(" ", "")
+                                .replace("€", "")
+                                .replace("EUR", "")
+                                .replace("$", "")
+                                .strip()
+                            )
+                            if amount_paid_str == "":
+                                amount_paid_decimal = 0.0
+                            else:
+                                amount_paid_decimal = float(amount_paid_str)
+
+                    if amount_paid_decimal < 0:
+                        return Response(
+                            {
+                                "success": False,
+                                "error": "Amount paid cannot be negative.",
+                            },
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
+                    # Allow small tolerance (0.01) for floating point precision errors
+                    tolerance = 0.01
+                    if quote.total_price:
+                        # Convert total_price to float for comparison
+                        total_price_float = float(quote.total_price)
+                        if amount_paid_decimal > total_price_float + tolerance:
+                            return Response(
+                                {
+                                    "success": False,
+                                    "error": "Amount paid cannot be greater than total price.",
+                                },
+                                status=status.HTTP_400_BAD_REQUEST,
+                            )
+                        # Cap amount_paid to total_price if it's slightly over due to rounding
+                        if amount_paid_decimal > total_price_float:
+                            amount_paid_decimal = total_price_float
+                    quote.amount_paid = amount_paid_decimal
+                except (ValueError, TypeError) as e:
+                    # Use original value for error message
+                    logger.error(
+                        f"Error converting amount_paid to float: {str(e)}, original_value={original_amount_paid_value}, original_type={type(original_amount_paid_value)}, repr={repr(original_amount_paid_value)}",
+                        exc_info=True,
+                    )
+                    # Try to provide more helpful error message
+                    error_msg = f"Invalid amount_paid value: {original_amount_paid_value} (type: {type(original_amount_paid_value).__name__}). Please provide a valid number."
+                    if isinstance(original_amount_paid_value, (list, dict)):
+                        error_msg = f"Invalid amount_paid value: expected a number, but received {type(original_amount_paid_value).__name__}. Please provide a valid number."
+                    elif isinstance(original_amount_paid_value, str):
+                        # Try to see if we can extract a number from the string
+                        try:
+                            # Remove all non-numeric characters except decimal point and minus sign
+                            import re
+
+                            cleaned = re.sub(r"[^\d.-]", "", original_amount_paid_value)
+                            if cleaned:
+                                test_float = float(cleaned)
+                                logger.warning(
+                                    f"Could extract number {test_float} from string '{original_amount_paid_value}', but original conversion failed"
+                                )
+                        except:
+                            pass
+                    return Response(
+                        {
+                            "success": False,
+                            "error": error_msg,
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+        quote.save()
+
+        # Send email notifications only if status was changed
+        if new_status and old_status != new_status:
+            try:
+                # Send email to user
+                send_status_update_email(
+                    quote=quote,
+                    old_status=old_status,
+                    new_status=new_status,
+                    offer_message=offer_message if new_status == "OFFER_SENT" else None,
+                )
+                # Send email to admin
+                send_status_update_notification_to_admin(
+                    quote=quote,
+                    old_status=old_status,
+                    new_status=new_status,
+                    offer_message=offer_message if new_status == "OFFER_SENT" else None,
+                )
+            except Exception as email_error:
+                # Log email error but don't fail the request
+                logger = logging.getLogger(__name__)
+                logger.error(
+                    f"Failed to send status update email notifications: {str(email_error)}"
+                )
+
+        # Refresh quote from database to ensure we have latest data (especially invoice fields)
+        quote.refresh_from_db()
+
+        # Get status display name
+        status_display = dict(FCLQuote.STATUS_CHOICES).get(
+            new_status or old_status, new_status or old_status
+        )
+
+        # Prepare response data
+        if new_status and old_status != new_status:
+            message = f"FCL quote status updated to {status_display} successfully."
+        elif amount_paid is not None or total_price is not None:
+            message = "FCL quote payment information updated successfully."
+        else:
+            message = "FCL quote updated successfully."
+
+        response_data = {
+            "success": True,
+            "message": message,
+            "data": FCLQuoteSerializer(quote).data,
+        }
+
+        # Log invoice status for debugging
+        logger.info(
+            f"📋 Quote {quote.id} final state - invoice_file: {quote.invoice_file}, invoice_generated_at: {quote.invoice_generated_at}"
+        )
+
+        return Response(
+            response_data,
+            status=status.HTTP_200_OK,
+        )
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error updating quote status: {str(e)}", exc_info=True)
+        # Return more detailed error message in development
+        error_message = "An error occurred while processing the request."
+        if settings.DEBUG:
+            error_message = f"Error: {str(e)}"
+        return Response(
+            {
+                "success": False,
+                "error": error_message,
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["PATCH"])
+@permission_classes([IsAuthenticated])
+def respond_to_offer_view(request, pk):
+    """API endpoint for users to accept or reject an offer"""
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+
+        # Check if user owns this quote
+        if quote.user != request.user:
+            return Response(
+                {"success": False, "error": "You can only respond to your own quotes."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Check if offer has been sent
+        if quote.status != "OFFER_SENT" or not quote.offer_message:
+            return Response(
+                {
+                    "success": False,
+                    "error": "No offer has been sent for this quote yet.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user_response = request.data.get("user_response")
+        edit_request_message = request.data.get("edit_request_message", "")
+
+        if user_response not in ["ACCEPTED", "REJECTED", "EDIT_REQUESTED"]:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Invalid response. Must be 'ACCEPTED', 'REJECTED', or 'EDIT_REQUESTED'.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate edit request message if requesting edit
+        if user_response == "EDIT_REQUESTED":
+            if not edit_request_message or not edit_request_message.strip():
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Edit request message is required when requesting edits.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            quote.edit_request_message = edit_request_message.strip()
+            quote.edit_request_status = "PENDING"
+            # Create the first message in the conversation thread
+            EditRequestMessage.objects.create(
+                quote=quote,
+                sender=request.user,
+                message=edit_request_message.strip(),
+                is_admin=False,
+            )
+            # Keep status as OFFER_SENT and notify admin and user
+            from ..email_service import send_edit_request_notification
+
+            try:
+                # Send email to admin
+                send_edit_request_notification(quote, edit_request_message.strip())
+                # Send confirmation email to user
+                send_edit_request_confirmation_to_user(
+                    quote, edit_request_message.strip()
+                )
+            except Exception as email_error:
+                logger = logging.getLogger(__name__)
+                logger.error(
+                    f"Failed to send edit request email notifications: {str(email_error)}"
+                )
+
+        quote.user_response = user_response
+
+        # If user accepts, change status to PENDING_PAYMENT
+        if user_response == "ACCEPTED":
+            quote.status = "PENDING_PAYMENT"
+        # If user rejects or requests edit, keep status as OFFER_SENT but mark response
+
+        quote.save()
+
+        return Response(
+            {
+                "success": True,
+                "message": f"Offer {user_response.lower()} successfully.",
+                "data": FCLQuoteSerializer(quote).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error responding to offer: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while processing the request.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def send_edit_request_reply_view(request, pk):
+    """API endpoint to send a reply in offer conversation (when offer is sent)"""
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+        message_text = request.data.get("message", "").strip()
+
+        if not message_text:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Message is required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check permissions
+        is_admin = request.user.is_superuser
+        is_owner = quote.user == request.user
+
+        if not (is_admin or is_owner):
+            return Response(
+                {
+                    "success": False,
+                    "error": "You can only reply to conversations for your own quotes or as an admin.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Check if offer has been sent (conversation is only available when offer is sent)
+        if quote.status != "OFFER_SENT" or not quote.offer_message:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Conversation is only available when an offer has been sent.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Create the message
+        message = EditRequestMessage.objects.create(
+            quote=quote,
+            sender=request.user,
+            message=message_text,
+            is_admin=is_admin,
+        )
+
+        serializer = EditRequestMessageSerializer(message, context={"request": request})
+
+        return Response(
+            {
+                "success": True,
+                "message": "Reply sent successfully.",
+                "data": serializer.data,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error sending edit request reply: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while processing the request.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def approve_or_decline_edit_request_view(request, pk):
+    """API endpoint for admin to approve or decline an edit request"""
+    if not request.user.is_superuser:
+        return Response(
+            {
+                "success": False,
+                "error": "Only admins can approve or decline edit requests.",
+            },
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+        action = request.data.get("action")  # "approve" or "decline"
+        message_text = request.data.get("message", "").strip()
+
+        if action not in ["approve", "decline"]:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Action must be 'approve' or 'decline'.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if quote.user_response != "EDIT_REQUESTED":
+            return Response(
+                {
+                    "success": False,
+                    "error": "This quote does not have an active edit request.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Update edit request status
+        if action == "approve":
+            quote.edit_request_status = "APPROVED"
+            # If approved, reset to CREATED status so admin can send a new offer
+            quote.status = "CREATED"
+            quote.user_response = "PENDING"
+            quote.edit_request_message = None
+        else:  # decline
+            quote.edit_request_status = "DECLINED"
+            # If declined, keep status as OFFER_SENT
+            quote.status = "OFFER_SENT"
+
+        # Create a message with the admin's decision
+        if message_text:
+            EditRequestMessage.objects.create(
+                quote=quote,
+                sender=request.user,
+                message=message_text,
+                is_admin=True,
+            )
+
+        quote.save()
+
+        return Response(
+            {
+                "success": True,
+                "message": f"Edit request {action}d successfully.",
+                "data": FCLQuoteSerializer(quote).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error approving/declining edit request: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while processing the request.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def send_payment_reminder_view(request, pk):
+    """API endpoint for admin to send payment reminder email to user"""
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can send payment reminders."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+
+        # Check if quote has total price set
+        if not quote.total_price or quote.total_price <= 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Cannot send payment reminder. Total price must be set first.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check if payment is already 100%
+        if quote.total_price > 0:
+            payment_percentage = (
+                (quote.amount_paid or 0) / quote.total_price * 100
+                if quote.amount_paid
+                else 0
+            )
+            if payment_percentage >= 100:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Payment is already 100% complete. No reminder needed.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Send payment reminder emails
+        email_sent = send_payment_reminder_email(quote)
+        # Also send notification to admin
+        send_payment_reminder_notification_to_admin(quote)
+
+        if email_sent:
+            return Response(
+                {
+                    "success": True,
+                    "message": "Payment reminder email sent successfully.",
+                },
+                status=status.HTTP_200_OK,
+            )
+        else:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Failed to send payment reminder email. Please check email configuration.",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error sending payment reminder: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while processing the request.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,49 @@
+"""
+Location APIs (Countries, Cities, Ports)
+"""
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from ..models import City, Country, Port
+from ..serializers import CitySerializer, CountrySerializer, PortSerializer
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def countries_list_view(request):
+    """Get list of all countries"""
+    countries = Country.objects.all()
+    serializer = CountrySerializer(countries, many=True)
+    return Response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def cities_list_view(request):
+    """Get list of cities, optionally filtered by country"""
+    country_code = request.query_params.get("country", None)
+
+    if country_code:
+        cities = City.objects.filter(country__code=country_code)
+    else:
+        cities = City.objects.all()
+
+    serializer = CitySerializer(cities, many=True)
+    return Response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def ports_list_view(request):
+    """Get list of ports, optionally filtered by country"""
+    country_code = request.query_params.get("country", None)
+
+    if country_code:
+        ports = Port.objects.filter(country__code=country_code)
+    else:
+        ports = Port.objects.all()
+
+    serializer = PortSerializer(ports, many=True)
+    return Response(serializer.data)
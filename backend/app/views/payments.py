@@ -0,0 +1,1858 @@
+"""
+Stripe payment endpoints for FCL quotes and LCL shipments
+"""
+
+import json
+import logging
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import FCLQuote, LCLShipment
+from ..prometheus_metrics import instrument_endpoint
+
+
+def _get_stripe():
+    """
+    The stripe module configured with STRIPE_SECRET_KEY, or None if the
+    package is not installed
+
+    Imported on first use instead of at startup: stripe (which pulls in
+    aiohttp) is the slowest import of the API and only these views need it.
+    """
+    try:
+        import stripe
+    except ImportError:
+        return None
+
+    stripe.api_key = settings.STRIPE_SECRET_KEY if settings.STRIPE_SECRET_KEY else None
+    stripe.api_base = settings.STRIPE_API_BASE
+    return stripe
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def payment_status_view(request, pk):
+    """API endpoint to check payment status for an FCL quote"""
+    logger = logging.getLogger(__name__)
+
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+
+        # Check if user owns this quote
+        if quote.user != request.user and not request.user.is_superuser:
+            return Response(
+                {
+                    "success": False,
+                    "error": "You can only check payment status for your own quotes.",
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Get latest payment status from Stripe if payment_method is stripe
+        payment_status_info = None
+        stripe = _get_stripe()
+        if quote.payment_id and quote.payment_method == "stripe" and stripe is not None:
+            try:
+                if settings.STRIPE_SECRET_KEY:
+                    # Retrieve Stripe checkout session
+                    session = stripe.checkout.Session.retrieve(quote.payment_id)
+                    payment_status_info = {
+                        "id": session.id,
+                        "status": session.payment_status,
+                        "amount_total": (
+                            session.amount_total / 100 if session.amount_total else 0
+                        ),  # Convert from cents
+                        "currency": session.currency.upper(),
+                        "url": session.url if hasattr(session, "url") else None,
+                    }
+                    # Update local status if different
+                    if quote.payment_status != session.payment_status:
+                        quote.payment_status = session.payment_status
+                        quote.payment_updated_at = timezone.now()
+                        quote.save()
+            except stripe.error.StripeError as e:
+                logger.warning(f"Could not fetch payment status from Stripe: {str(e)}")
+            except Exception as e:
+                logger.warning(f"Error fetching Stripe payment status: {str(e)}")
+
+        # Calculate payment info
+        total_price = float(quote.total_price) if quote.total_price else 0
+        amount_paid = float(quote.amount_paid) if quote.amount_paid else 0
+        remaining_amount = total_price - amount_paid
+        payment_percentage = (amount_paid / total_price * 100) if total_price > 0 else 0
+
+        return Response(
+            {
+                "success": True,
+                "quote_id": quote.id,
+                "quote_number": quote.quote_number,
+                "total_price": total_price,
+                "amount_paid": amount_paid,
+                "remaining_amount": max(0, remaining_amount),
+                "payment_percentage": round(payment_percentage, 2),
+                "payment_status": quote.payment_status,
+                "payment_method": quote.payment_method,
+                "payment_id": quote.payment_id,
+                "payment_created_at": (
+                    quote.payment_created_at.isoformat()
+                    if quote.payment_created_at
+                    else None
+                ),
+                "payment_updated_at": (
+                    quote.payment_updated_at.isoformat()
+                    if quote.payment_updated_at
+                    else None
+                ),
+                "stripe_payment": (
+                    payment_status_info if quote.payment_method == "stripe" else None
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error checking payment status: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while checking payment status.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def initiate_stripe_payment_view(request, pk):
+    """API endpoint to initiate Stripe payment for an FCL quote"""
+    logger = logging.getLogger(__name__)
+
+    stripe = _get_stripe()
+    if stripe is None:
+        return Response(
+            {
+                "success": False,
+                "error": "Stripe payment service is not available. Please install stripe.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    try:
+        quote = FCLQuote.objects.get(pk=pk)
+
+        # Check if user owns this quote
+        if quote.user != request.user:
+            return Response(
+                {"success": False, "error": "You can only pay for your own quotes."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Check if quote is in PENDING_PAYMENT status
+        if quote.status != "PENDING_PAYMENT":
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Payment can only be initiated for quotes with PENDING_PAYMENT status. Current status: {quote.status}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check if total_price is set
+        if not quote.total_price or quote.total_price <= 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Total price must be set before initiating payment.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Calculate remaining amount
+        amount_paid = quote.amount_paid or Decimal("0")
+        remaining_amount = quote.total_price - amount_paid
+
+        if remaining_amount <= 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Payment is already complete. No remaining amount to pay.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Ensure remaining amount is at least 0.50 EUR (Stripe minimum)
+        if remaining_amount < Decimal("0.50"):
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Remaining amount (€{remaining_amount:.2f}) is too small. Minimum payment is €0.50.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check Stripe API key
+        if not settings.STRIPE_SECRET_KEY:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Stripe API key is not configured. Please contact administrator.",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Create payment description
+        description = f"FCL Quote Payment - {quote.quote_number or f'#{quote.id}'}"
+        if amount_paid > 0:
+            description += f" (Remaining: €{remaining_amount:.2f})"
+
+        # Create Stripe Checkout Session
+        try:
+            # Ensure we have a valid amount (minimum 0.50 EUR = 50 cents)
+            amount_in_cents = max(50, int(remaining_amount * 100))
+
+            checkout_session = stripe.checkout.Session.create(
+                payment_method_types=["card"],
+                line_items=[
+                    {
+                        "price_data": {
+                            "currency": "eur",
+                            "product_data": {
+                                "name": f"FCL Quote {quote.quote_number or f'#{quote.id}'}",
+                                "description": description,
+                            },
+                            "unit_amount": amount_in_cents,
+                        },
+                        "quantity": 1,
+                    }
+                ],
+                mode="payment",
+                success_url=(
+                    request.data.get("success_url")
+                    or settings.STRIPE_REDIRECT_SUCCESS_URL
+                )
+                + (
+                    (
+                        "&"
+                        if "?"
+                        in (
+                            request.data.get("success_url")
+                            or settings.STRIPE_REDIRECT_SUCCESS_URL
+                        )
+                        else "?"
+                    )
+                    + f"type=quote&quote_id={quote.id}&session_id={{CHECKOUT_SESSION_ID}}"
+                ),
+                cancel_url=(
+                    request.data.get("cancel_url")
+                    or settings.STRIPE_REDIRECT_CANCEL_URL
+                )
+                + (
+                    (
+                        "&"
+                        if "?"
+                        in (
+                            request.data.get("cancel_url")
+                            or settings.STRIPE_REDIRECT_CANCEL_URL
+                        )
+                        else "?"
+                    )
+                    + f"type=quote&quote_id={quote.id}"
+                ),
+                metadata={
+                    "quote_id": str(quote.id),
+                    "quote_number": quote.quote_number or f"#{quote.id}",
+                    "user_id": str(request.user.id),
+                    "remaining_amount": str(remaining_amount),
+                },
+                customer_email=request.user.email if request.user.email else None,
+                expires_at=int(timezone.now().timestamp())
+                + (24 * 60 * 60),  # Expire in 24 hours
+            )
+
+            # Save payment information to quote
+            quote.payment_id = checkout_session.id
+            quote.payment_status = checkout_session.payment_status
+            quote.payment_method = "stripe"
+            quote.payment_created_at = timezone.now()
+            quote.payment_updated_at = timezone.now()
+            quote.save()
+
+            logger.info(
+                f"Stripe payment initiated for quote {quote.id}: Session ID {checkout_session.id}"
+            )
+
+            return Response(
+                {
+                    "success": True,
+                    "message": "Payment initiated successfully.",
+                    "checkout_url": checkout_session.url,
+                    "session_id": checkout_session.id,
+                    "amount": {
+                        "value": float(remaining_amount),
+                        "currency": "EUR",
+                    },
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        except stripe.error.StripeError as e:
+            logger.error(f"Stripe API error: {str(e)}", exc_info=True)
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Stripe payment error: {str(e)}",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    except FCLQuote.DoesNotExist:
+        return Response(
+            {"success": False, "error": "FCL quote not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger.error(f"Error initiating Stripe payment: {str(e)}", exc_info=True)
+        return Response(
+            {
+                "success": False,
+                "error": f"An error occurred while initiating payment: {str(e)}",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@instrument_endpoint("stripe_webhook")
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Stripe webhook doesn't use JWT
+@csrf_exempt  # Stripe webhooks don't include CSRF tokens
+def stripe_webhook_view(request):
+    """API endpoint to receive webhook notifications from Stripe"""
+    logger = logging.getLogger(__name__)
+
+    # Log immediately when endpoint is hit (before any checks)
+    logger.info("=" * 80)
+    logger.info(
+        "🔔 WEBHOOK ENDPOINT HIT - Method: %s, Path: %s, Full Path: %s",
+        request.method,
+        request.path,
+        request.get_full_path(),
+    )
+    logger.info("🔔 Request META keys: %s", list(request.META.keys())[:20])
+    logger.info("=" * 80)
+
+    stripe = _get_stripe()
+    if stripe is None:
+        logger.error("Stripe webhook received but Stripe API is not available")
+        return Response(
+            {"error": "Service unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+    try:
+        payload = request.body
+        sig_header = request.META.get("HTTP_STRIPE_SIGNATURE")
+
+        logger.info(
+            "🔔 Webhook received - Payload size: %d bytes, Signature header: %s",
+            len(payload),
+            "Present" if sig_header else "Missing",
+        )
+
+        if not sig_header:
+            return Response(
+                {"error": "Missing Stripe signature"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Verify webhook signature
+        webhook_secret = settings.STRIPE_WEBHOOK_SECRET
+        if not webhook_secret:
+            logger.error("❌ STRIPE_WEBHOOK_SECRET is not configured in settings")
+            logger.error("❌ Please set STRIPE_WEBHOOK_SECRET in .env file")
+            return Response(
+                {"error": "Webhook secret not configured"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(
+            "🔍 Verifying webhook signature - Secret length: %d, First 10 chars: %s...",
+            len(webhook_secret),
+            webhook_secret[:10] if len(webhook_secret) > 10 else webhook_secret,
+        )
+
+        try:
+            stripe.Webhook.construct_event(payload, sig_header, webhook_secret)
+            # The verified payload is handled as plain dicts: stripe>=15 event
+            # objects are no longer dicts (no .get())
+            event = json.loads(payload)
+            logger.info(
+                "✅ Webhook signature verified successfully - Event type: %s",
+                event.get("type", "unknown"),
+            )
+        except ValueError as e:
+            logger.error(f"❌ Invalid payload: {str(e)}")
+            logger.error(
+                f"❌ Payload preview: {payload[:200] if len(payload) > 200 else payload}"
+            )
+            return Response(
+                {"error": "Invalid payload"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        except stripe.error.SignatureVerificationError as e:
+            logger.error(f"❌ Invalid signature: {str(e)}")
+            logger.error(f"❌ Expected secret starts with: {webhook_secret[:10]}...")
+            logger.error(
+                f"❌ Signature header: {sig_header[:50] if sig_header else 'None'}..."
+            )
+            # Still return 200 to prevent Stripe from retrying with wrong secret
+            return Response(
+                {"error": "Invalid signature", "received": True},
+                status=status.HTTP_200_OK,
+            )
+
+        # Handle the event
+        if event["type"] == "checkout.session.completed":
+            session = event["data"]["object"]
+            session_id = session.get("id")
+            payment_status = session.get("payment_status")
+            metadata = session.get("metadata", {})
+            event_type = metadata.get("type", "")
+
+            logger.info(
+                f"🔔 Webhook received - event_type: {event['type']}, session_id: {session_id}, payment_status: {payment_status}, metadata: {metadata}"
+            )
+
+            # Check if this is a shipment payment
+            if event_type == "shipment":
+                shipment_id = metadata.get("shipment_id")
+
+                logger.info(
+                    f"🔍 Processing shipment webhook - session_id: {session_id}, shipment_id from metadata: {shipment_id}, payment_status: {payment_status}"
+                )
+
+                if not shipment_id:
+                    logger.warning(
+                        f"⚠️ Shipment ID missing in metadata for session {session_id}. Trying to find by stripe_session_id..."
+                    )
+                    # Try to find by stripe_session_id as fallback
+                    try:
+                        shipment = LCLShipment.objects.get(stripe_session_id=session_id)
+                        logger.info(
+                            f"✅ Found shipment by stripe_session_id: {shipment.id}"
+                        )
+                    except LCLShipment.DoesNotExist:
+                        logger.error(
+                            f"❌ LCL Shipment not found for Stripe session ID: {session_id}"
+                        )
+                        shipment = None
+                else:
+                    try:
+                        # Convert shipment_id to int if it's a string
+                        try:
+                            shipment_id_int = int(shipment_id)
+                        except (ValueError, TypeError):
+                            logger.warning(
+                                f"⚠️ Invalid shipment_id format: {shipment_id}, trying as string..."
+                            )
+                            shipment_id_int = shipment_id
+
+                        # Try to get shipment by ID first (more reliable)
+                        try:
+                            shipment = LCLShipment.objects.get(pk=shipment_id_int)
+                            logger.info(f"✅ Found shipment by ID: {shipment.id}")
+                        except LCLShipment.DoesNotExist:
+                            # Fallback to stripe_session_id if shipment_id doesn't work
+                            logger.warning(
+                                f"⚠️ Shipment not found by ID {shipment_id_int}, trying stripe_session_id..."
+                            )
+                            try:
+                                shipment = LCLShipment.objects.get(
+                                    stripe_session_id=session_id
+                                )
+                                logger.info(
+                                    f"✅ Found shipment by stripe_session_id: {shipment.id}"
+                                )
+                            except LCLShipment.DoesNotExist:
+                                logger.error(
+                                    f"❌ LCL Shipment not found for ID {shipment_id_int} or Stripe session ID: {session_id}"
+                                )
+                                shipment = None
+
+                        if shipment:
+                            old_amount_paid = shipment.amount_paid or Decimal("0")
+                            old_status = shipment.status
+                            old_payment_status = shipment.payment_status
+
+                            logger.info(
+                                f"📦 Found shipment {shipment.id} - Current state: amount_paid={old_amount_paid}, status={old_status}, payment_status={old_payment_status}"
+                            )
+
+                            # Update payment_status
+                            shipment.payment_status = payment_status
+
+                            # Update amount_paid and status if payment is completed
+                            if payment_status == "paid":
+                                # Get amount from session
+                                amount_total = session.get("amount_total")
+                                amount_subtotal = session.get("amount_subtotal")
+
+                                logger.info(
+                                    f"💰 Payment is PAID - amount_total: {amount_total}, amount_subtotal: {amount_subtotal}"
+                                )
+
+                                if amount_total:
+                                    # Convert from cents to decimal
+                                    paid_amount = Decimal(str(amount_total)) / 100
+                                    shipment.amount_paid = paid_amount
+                                    # Update status based on whether Sendcloud parcel exists
+                                    # If Sendcloud parcel exists, status should already be PENDING_PICKUP
+                                    # Otherwise, set to PENDING_PICKUP (payment is complete, waiting for pickup)
+                                    if not shipment.sendcloud_id:
+                                        shipment.status = "PENDING_PICKUP"
+                                    shipment.paid_at = timezone.now()
+
+                                    logger.info(
+                                        f"✅ Updated shipment {shipment.id} - amount_paid: {old_amount_paid} -> {paid_amount}, status: {old_status} -> {shipment.status}"
+                                    )
+                                elif amount_subtotal:
+                                    # Fallback to subtotal if total is missing
+                                    paid_amount = Decimal(str(amount_subtotal)) / 100
+                                    shipment.amount_paid = paid_amount
+                                    if not shipment.sendcloud_id:
+                                        shipment.status = "PENDING_PICKUP"
+                                    shipment.paid_at = timezone.now()
+
+                                    logger.info(
+                                        f"✅ Updated shipment {shipment.id} using subtotal - amount_paid: {old_amount_paid} -> {paid_amount}, status: {old_status} -> {shipment.status}"
+                                    )
+                                elif shipment.total_price and shipment.total_price > 0:
+                                    # Final fallback: use total_price
+                                    shipment.amount_paid = shipment.total_price
+                                    if not shipment.sendcloud_id:
+                                        shipment.status = "PENDING_PICKUP"
+                                    shipment.paid_at = timezone.now()
+
+                                    logger.warning(
+                                        f"⚠️ Using total_price as fallback for shipment {shipment.id} - amount_paid: {old_amount_paid} -> {shipment.total_price}, status: {old_status} -> {shipment.status}"
+                                    )
+                                else:
+                                    logger.error(
+                                        f"❌ Cannot determine payment amount for shipment {shipment.id} - no amount_total, amount_subtotal, or total_price"
+                                    )
+                            else:
+                                logger.warning(
+                                    f"⚠️ Payment status is '{payment_status}' (not paid) for shipment {shipment.id}. Not updating amount_paid."
+                                )
+
+                            # Save changes
+                            shipment.save()
+
+                            # Refresh from database to ensure we have the latest values
+                            shipment.refresh_from_db()
+
+                            logger.info(
+                                f"✅ Webhook processed successfully for LCL shipment {shipment.id}: "
+                                f"payment_status: {old_payment_status} -> {shipment.payment_status}, "
+                                f"amount_paid: {old_amount_paid} -> {shipment.amount_paid}, "
+                                f"status: {old_status} -> {shipment.status}"
+                            )
+
+                            # ✅ Create Sendcloud parcel if payment is paid and Sendcloud is configured
+                            if payment_status == "paid" and not shipment.sendcloud_id:
+                                try:
+                                    from ..sendcloud_labels import prefetch_labels
+                                    from ..sendcloud_service import (
+                                        SendcloudAPIError,
+                                        SendcloudValidationError,
+                                        create_parcel,
+                                    )
+
+                                    # Check if Sendcloud is needed (EU pickup with shipping method selected)
+                                    # Validate all required EU pickup fields with fallbacks
+                                    missing_fields = []
+
+                                    # Use fallback for name if missing (use receiver_name for EU pickup)
+                                    pickup_name = shipment.eu_pickup_name
+                                    if not pickup_name or not pickup_name.strip():
+                                        pickup_name = shipment.receiver_name
+                                        if not pickup_name or not pickup_name.strip():
+                                            missing_fields.append("name")
+
+                                    # Check address
+                                    if (
+                                        not shipment.eu_pickup_address
+                                        or not shipment.eu_pickup_address.strip()
+                                    ):
+                                        missing_fields.append("address")
+
+                                    # Check city
+                                    if (
+                                        not shipment.eu_pickup_city
+                                        or not shipment.eu_pickup_city.strip()
+                                    ):
+                                        missing_fields.append("city")
+
+                                    # Check postal_code
+                                    if (
+                                        not shipment.eu_pickup_postal_code
+                                        or not shipment.eu_pickup_postal_code.strip()
+                                    ):
+                                        missing_fields.append("postal_code")
+
+                                    # Check country
+                                    if (
+                                        not shipment.eu_pickup_country
+                                        or not shipment.eu_pickup_country.strip()
+                                    ):
+                                        missing_fields.append("country")
+
+                                    # Check weight
+                                    if (
+                                        not shipment.eu_pickup_weight
+                                        or float(shipment.eu_pickup_weight) <= 0
+                                    ):
+                                        missing_fields.append("weight")
+
+                                    # Only create Sendcloud parcel if all required fields are present
+                                    if (
+                                        shipment.selected_eu_shipping_method
+                                        and not missing_fields
+                                    ):
+                                        logger.info(
+                                            f"🚀 Attempting to automatically create Sendcloud parcel for shipment {shipment.id} after Stripe payment"
+                                        )
+
+                                        # Prepare shipment data for Sendcloud (using new form fields with fallbacks)
+                                        shipment_data = {
+                                            "name": pickup_name.strip(),
+                                            "address": shipment.eu_pickup_address.strip(),
+                                            "city": shipment.eu_pickup_city.strip(),
+                                            "postal_code": shipment.eu_pickup_postal_code.strip(),
+                                            "country": shipment.eu_pickup_country.strip(),
+                                            "weight": float(shipment.eu_pickup_weight),
+                                        }
+
+                                        # Add optional fields with fallbacks
+                                        if shipment.eu_pickup_company_name:
+                                            shipment_data["company_name"] = (
+                                                shipment.eu_pickup_company_name
+                                            )
+
+                                        if shipment.eu_pickup_house_number:
+                                            shipment_data["house_number"] = (
+                                                shipment.eu_pickup_house_number
+                                            )
+
+                                        # Use fallback for email if missing (use receiver_email)
+                                        pickup_email = shipment.eu_pickup_email
+                                        if not pickup_email or not pickup_email.strip():
+                                            pickup_email = shipment.receiver_email
+                                        if pickup_email and pickup_email.strip():
+                                            shipment_data["email"] = (
+                                                pickup_email.strip()
+                                            )
+
+                                        # Use fallback for telephone if missing (use receiver_phone)
+                                        pickup_telephone = shipment.eu_pickup_telephone
+                                        if (
+                                            not pickup_telephone
+                                            or not pickup_telephone.strip()
+                                        ):
+                                            pickup_telephone = shipment.receiver_phone
+                                        if (
+                                            pickup_telephone
+                                            and pickup_telephone.strip()
+                                        ):
+                                            shipment_data["telephone"] = (
+                                                pickup_telephone.strip()
+                                            )
+
+                                        if shipment.shipment_number:
+                                            shipment_data["order_number"] = (
+                                                shipment.shipment_number
+                                            )
+
+                                        # Create parcel in Sendcloud
+                                        sendcloud_result = create_parcel(
+                                            shipment_data=shipment_data,
+                                            selected_shipping_method=shipment.selected_eu_shipping_method,
+                                        )
+
+                                        # Update shipment with Sendcloud data
+                                        shipment.sendcloud_id = sendcloud_result.get(
+                                            "sendcloud_id"
+                                        )
+                                        tracking_number = sendcloud_result.get(
+                                            "tracking_number", ""
+                                        )
+                                        shipment.tracking_number = (
+                                            tracking_number if tracking_number else ""
+                                        )
+
+                                        tracking_url = sendcloud_result.get(
+                                            "tracking_url"
+                                        )
+                                        shipment.tracking_url = (
+                                            tracking_url if tracking_url else None
+                                        )
+
+                                        label_url_a6 = sendcloud_result.get(
+                                            "label_url_a6"
+                                        )
+                                        label_url = sendcloud_result.get("label_url")
+                                        shipment.sendcloud_label_url = (
+                                            label_url_a6 or label_url or None
+                                        )
+
+                                        # Store A4 labels
+                                        normal_printer_labels = sendcloud_result.get(
+                                            "normal_printer_labels", []
+                                        )
+                                        shipment.normal_printer_labels = (
+                                            normal_printer_labels
+                                            if normal_printer_labels
+                                            else []
+                                        )
+
+                                        # Update status to PENDING_PICKUP if parcel was created
+                                        if shipment.sendcloud_id:
+                                            shipment.status = "PENDING_PICKUP"
+                                            shipment.save()
+                                            prefetch_labels([shipment.sendcloud_id])
+
+                                            logger.info(
+                                                f"✅ Successfully automatically created Sendcloud parcel for shipment {shipment.id} after Stripe payment: "
+                                                f"sendcloud_id={shipment.sendcloud_id}, "
+                                                f"tracking_number={shipment.tracking_number}"
+                                            )
+
+                                            # TODO: Send email to user with tracking number and label URL
+                                        else:
+                                            logger.warning(
+                                                f"⚠️ Sendcloud parcel creation returned no sendcloud_id for shipment {shipment.id}"
+                                            )
+                                    else:
+                                        if missing_fields:
+                                            logger.info(
+                                                f"ℹ️ Skipping automatic Sendcloud parcel creation for shipment {shipment.id}: "
+                                                f"missing required fields: {', '.join(missing_fields)}"
+                                            )
+                                        elif not shipment.selected_eu_shipping_method:
+                                            logger.info(
+                                                f"ℹ️ Skipping automatic Sendcloud parcel creation for shipment {shipment.id}: "
+                                                f"no shipping method selected"
+                                            )
+
+                                except SendcloudValidationError as e:
+                                    logger.warning(
+                                        f"⚠️ Sendcloud validation error for shipment {shipment.id}: {str(e)}"
+                                    )
+                                    # Don't fail webhook - payment is still processed
+                                except SendcloudAPIError as e:
+                                    logger.error(
+                                        f"❌ Sendcloud API error for shipment {shipment.id}: {str(e)}"
+                                    )
+                                    # Don't fail webhook - payment is still processed
+                                except Exception as e:
+                                    logger.error(
+                                        f"❌ Unexpected error creating Sendcloud parcel for shipment {shipment.id}: {str(e)}",
+                                        exc_info=True,
+                                    )
+                                    # Don't fail webhook - payment is still processed
+
+                            # Return success response immediately for shipment payments
+                            return Response(
+                                {
+                                    "success": True,
+                                    "message": "Shipment payment processed",
+                                },
+                                status=status.HTTP_200_OK,
+                            )
+                        else:
+                            logger.error(
+                                f"❌ Shipment is None - cannot process payment for session {session_id}, shipment_id: {shipment_id}"
+                            )
+                    except Exception as e:
+                        logger.error(
+                            f"❌ Error processing shipment webhook: {str(e)}",
+                            exc_info=True,
+                        )
+
+            # Find quote by session_id (stored in payment_id) - for FCL quotes
+            try:
+                quote = FCLQuote.objects.get(payment_id=session_id)
+            except FCLQuote.DoesNotExist:
+                if event_type != "shipment":
+                    logger.warning(
+                        f"Quote not found for Stripe session ID: {session_id}"
+                    )
+                return Response({"success": True}, status=status.HTTP_200_OK)
+
+            # Update payment status
+            quote.payment_status = payment_status
+            quote.payment_updated_at = timezone.now()
+
+            # If payment is paid, update amount_paid
+            if payment_status == "paid" and session.get("amount_total"):
+                paid_amount = (
+                    Decimal(session["amount_total"]) / 100
+                )  # Convert from cents
+                current_amount_paid = quote.amount_paid or Decimal("0")
+                total_price = quote.total_price or Decimal("0")
+
+                # Prevent duplicate payment processing
+                # Check if this payment would exceed the total price
+                expected_new_total = current_amount_paid + paid_amount
+
+                if expected_new_total > total_price:
+                    # Cap at total price to prevent overpayment
+                    quote.amount_paid = total_price
+                    logger.warning(
+                        f"Payment for quote {quote.id} would exceed total price. Capped at €{total_price:.2f}"
+                    )
+                elif current_amount_paid < total_price:
+                    # Only add if this payment hasn't been processed yet
+                    # Check if the session was already processed by comparing amounts
+                    quote.amount_paid = expected_new_total
+                    logger.info(
+                        f"Payment received for quote {quote.id}: €{paid_amount:.2f}. Total paid: €{quote.amount_paid:.2f}"
+                    )
+                else:
+                    logger.info(
+                        f"Payment already processed for quote {quote.id}. Current paid: €{current_amount_paid:.2f}"
+                    )
+
+                # If payment is complete (100%), log it
+                if quote.total_price and quote.amount_paid >= quote.total_price:
+                    logger.info(
+                        f"Payment complete for quote {quote.id}: €{quote.amount_paid:.2f} / €{quote.total_price:.2f}"
+                    )
+
+            quote.save()
+
+            logger.info(
+                f"Webhook processed for quote {quote.id}: Stripe session {session_id} status updated to {payment_status}"
+            )
+
+        elif event["type"] == "checkout.session.async_payment_succeeded":
+            # Handle async payment succeeded (for delayed payment methods)
+            session = event["data"]["object"]
+            session_id = session.get("id")
+
+            try:
+                quote = FCLQuote.objects.get(payment_id=session_id)
+                quote.payment_status = "paid"
+                quote.payment_updated_at = timezone.now()
+
+                if session.get("amount_total"):
+                    paid_amount = Decimal(session["amount_total"]) / 100
+                    current_amount_paid = quote.amount_paid or Decimal("0")
+                    if current_amount_paid < quote.total_price:
+                        quote.amount_paid = current_amount_paid + paid_amount
+
+                quote.save()
+                logger.info(
+                    f"Async payment succeeded for quote {quote.id}: Stripe session {session_id}"
+                )
+            except FCLQuote.DoesNotExist:
+                logger.warning(
+                    f"Quote not found for async payment session ID: {session_id}"
+                )
+
+        elif event["type"] == "checkout.session.async_payment_failed":
+            # Handle async payment failed
+            session = event["data"]["object"]
+            session_id = session.get("id")
+
+            try:
+                quote = FCLQuote.objects.get(payment_id=session_id)
+                quote.payment_status = "failed"
+                quote.payment_updated_at = timezone.now()
+                quote.save()
+                logger.warning(
+                    f"Async payment failed for quote {quote.id}: Stripe session {session_id}"
+                )
+            except FCLQuote.DoesNotExist:
+                logger.warning(
+                    f"Quote not found for failed payment session ID: {session_id}"
+                )
+
+        elif event["type"] == "payment_intent.succeeded":
+            # Handle payment intent succeeded (backup handler)
+            payment_intent = event["data"]["object"]
+            payment_intent_id = payment_intent.get("id")
+
+            # Try to find quote by metadata if available
+            metadata = payment_intent.get("metadata", {})
+            quote_id = metadata.get("quote_id")
+
+            if quote_id:
+                try:
+                    quote = FCLQuote.objects.get(pk=quote_id)
+                    # Only update if we have a payment_id and it matches
+                    if quote.payment_id:
+                        # The checkout.session.completed event should handle this
+                        # But we log it for reference
+                        logger.info(
+                            f"Payment intent succeeded for quote {quote.id}: Payment Intent {payment_intent_id}"
+                        )
+                except FCLQuote.DoesNotExist:
+                    logger.warning(
+                        f"Quote {quote_id} not found for payment intent {payment_intent_id}"
+                    )
+            else:
+                logger.info(
+                    f"Payment intent succeeded: {payment_intent_id} (no quote_id in metadata)"
+                )
+
+        logger.info("✅ Webhook processing completed, returning 200 OK")
+        return Response({"success": True}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"❌ Error processing Stripe webhook: {str(e)}", exc_info=True)
+        logger.error(f"❌ Exception type: {type(e).__name__}")
+        import traceback
+
+        logger.error(f"❌ Traceback: {traceback.format_exc()}")
+        # Always return 200 OK to Stripe even on error (to prevent retries)
+        # But log the error for debugging
+        return Response(
+            {"error": "Internal server error", "received": True},
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_shipment_checkout_session(request):
+    """
+    Create Stripe checkout session for shipment payment
+    """
+    logger = logging.getLogger(__name__)
+
+    stripe = _get_stripe()
+    if stripe is None:
+        return Response(
+            {"success": False, "error": "Stripe is not available"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    if not settings.STRIPE_SECRET_KEY:
+        return Response(
+            {"success": False, "error": "Stripe API key is not configured"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    # Log API key type (test vs live)
+    api_key_type = (
+        "TEST" if settings.STRIPE_SECRET_KEY.startswith("sk_test_") else "LIVE"
+    )
+    logger.info(
+        f"🔑 Using Stripe {api_key_type} API key (first 10 chars: {settings.STRIPE_SECRET_KEY[:10]}...)"
+    )
+
+    if api_key_type == "LIVE":
+        logger.warning(
+            "⚠️ WARNING: Using LIVE Stripe API key! stripe listen only works with TEST keys!"
+        )
+
+    try:
+        shipment_id = request.data.get("shipment_id")
+        amount = float(request.data.get("amount", 0))
+        currency = request.data.get("currency", "eur")
+        metadata = request.data.get("metadata", {})
+
+        if not shipment_id:
+            return Response(
+                {"success": False, "error": "Shipment ID is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if amount <= 0:
+            return Response(
+                {"success": False, "error": "Amount must be greater than 0"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Ensure minimum amount (0.50 EUR = 50 cents)
+        amount_in_cents = max(50, int(amount * 100))
+
+        # Validate amount (Stripe has maximum limits)
+        if amount_in_cents > 99999999:  # 999,999.99 EUR
+            return Response(
+                {"success": False, "error": "Amount exceeds maximum limit"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Ensure shipment_id is in metadata (override if exists in metadata dict)
+        # Limit metadata to 20 keys (Stripe limit) and 500 chars per value
+        final_metadata = {
+            "user_id": str(request.user.id),
+            "amount": str(amount)[:500],
+            "type": "shipment",
+            "shipment_id": str(shipment_id)[
+                :500
+            ],  # Ensure shipment_id is always in metadata
+        }
+
+        # Add additional metadata from request (limit to prevent exceeding Stripe limits)
+        if metadata:
+            for key, value in list(metadata.items())[
+                :15
+            ]:  # Limit to 15 additional keys
+                if key not in final_metadata:  # Don't override existing keys
+                    final_metadata[key] = str(value)[:500]  # Limit value length
+
+        # Ensure shipment_id is still set correctly after merge
+        final_metadata["shipment_id"] = str(shipment_id)[:500]
+
+        # Build URLs - use from request if provided, otherwise use settings
+        success_url = (
+            request.data.get("success_url") or settings.STRIPE_REDIRECT_SUCCESS_URL
+        )
+        cancel_url = (
+            request.data.get("cancel_url") or settings.STRIPE_REDIRECT_CANCEL_URL
+        )
+
+        # Add query parameters if not already present
+        # Use {CHECKOUT_SESSION_ID} placeholder which Stripe will replace
+        if "type=shipment" not in success_url and "shipment_id" not in success_url:
+            success_url += (
+                ("&" if "?" in success_url else "?")
+                + f"type=shipment&shipment_id={shipment_id}&session_id={{CHECKOUT_SESSION_ID}}"
+            )
+        if "type=shipment" not in cancel_url and "shipment_id" not in cancel_url:
+            cancel_url += (
+                "&" if "?" in cancel_url else "?"
+            ) + f"type=shipment&shipment_id={shipment_id}"
+
+        # Validate URLs
+        if not success_url.startswith(("http://", "https://")):
+            logger.error(f"❌ Invalid success_url: {success_url}")
+            return Response(
+                {"success": False, "error": "Invalid success URL configuration"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if not cancel_url.startswith(("http://", "https://")):
+            logger.error(f"❌ Invalid cancel_url: {cancel_url}")
+            return Response(
+                {"success": False, "error": "Invalid cancel URL configuration"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        logger.info(
+            f"🔍 Creating checkout session for shipment {shipment_id}, amount: €{amount} ({amount_in_cents} cents), currency: {currency}"
+        )
+        logger.info(f"🔍 Success URL: {success_url}")
+        logger.info(f"🔍 Cancel URL: {cancel_url}")
+        logger.info(f"🔍 Metadata keys: {list(final_metadata.keys())}")
+
+        # Create Stripe Checkout Session
+        try:
+            checkout_session = stripe.checkout.Session.create(
+                payment_method_types=["card"],
+                line_items=[
+                    {
+                        "price_data": {
+                            "currency": currency.lower(),
+                            "product_data": {
+                                "name": f"Shipment Payment #{shipment_id}",
+                                "description": f"Payment for LCL shipment {shipment_id}",
+                            },
+                            "unit_amount": amount_in_cents,
+                        },
+                        "quantity": 1,
+                    }
+                ],
+                mode="payment",
+                success_url=success_url,
+                cancel_url=cancel_url,
+                metadata=final_metadata,
+                customer_email=request.user.email if request.user.email else None,
+                expires_at=int(timezone.now().timestamp())
+                + (24 * 60 * 60),  # Expire in 24 hours
+            )
+
+            logger.info(
+                f"✅ Checkout session created: {checkout_session.id}, URL: {checkout_session.url}"
+            )
+            logger.info(
+                f"📝 Session details - mode: {checkout_session.mode}, payment_status: {checkout_session.payment_status}"
+            )
+        except stripe.error.StripeError as e:
+            logger.error(
+                f"❌ Stripe API error creating checkout session: {str(e)}",
+                exc_info=True,
+            )
+            return Response(
+                {"success": False, "error": f"Stripe payment error: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        # Update the LCLShipment with the Stripe session ID
+        try:
+            lcl_shipment = LCLShipment.objects.get(pk=shipment_id)
+            lcl_shipment.stripe_session_id = checkout_session.id
+            lcl_shipment.payment_status = "pending"
+            lcl_shipment.save()
+            logger.info(
+                f"Updated LCLShipment {shipment_id} with Stripe session ID {checkout_session.id}"
+            )
+        except LCLShipment.DoesNotExist:
+            logger.warning(
+                f"LCLShipment with ID {shipment_id} not found for Stripe checkout session."
+            )
+
+        logger.info(
+            f"Created shipment checkout session {checkout_session.id} for user {request.user.id}, amount: €{amount}"
+        )
+
+        return Response(
+            {
+                "success": True,
+                "checkout_url": checkout_session.url,
+                "session_id": checkout_session.id,
+                "amount": {
+                    "value": float(amount),
+                    "currency": currency.upper(),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except ValueError as e:
+        logger.error(f"Invalid amount in create_shipment_checkout_session: {str(e)}")
+        return Response(
+            {"success": False, "error": "Invalid amount"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except stripe.error.StripeError as e:
+        logger.error(
+            f"Stripe API error in create_shipment_checkout_session: {str(e)}",
+            exc_info=True,
+        )
+        return Response(
+            {"success": False, "error": f"Stripe payment error: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    except Exception as e:
+        logger.error(
+            f"Error creating shipment checkout session: {str(e)}", exc_info=True
+        )
+        return Response(
+            {"success": False, "error": f"An error occurred: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def confirm_shipment_payment_view(request):
+    """
+    Confirm shipment payment after Stripe redirect
+    Verifies payment with Stripe and updates shipment status
+    """
+    logger = logging.getLogger(__name__)
+
+    stripe = _get_stripe()
+    if stripe is None:
+        return Response(
+            {"success": False, "error": "Stripe is not available"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    try:
+        shipment_id = request.data.get("shipment_id")
+        session_id = request.data.get("session_id")
+
+        if not shipment_id:
+            return Response(
+                {"success": False, "error": "Shipment ID is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get shipment
+        try:
+            shipment = LCLShipment.objects.get(pk=shipment_id, user=request.user)
+        except LCLShipment.DoesNotExist:
+            return Response(
+                {"success": False, "error": "Shipment not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # If session_id not provided, try to get it from shipment's stripe_session_id
+        if not session_id and shipment.stripe_session_id:
+            session_id = shipment.stripe_session_id
+            logger.info(
+                f"🔍 Using stripe_session_id from shipment {shipment_id}: {session_id}"
+            )
+
+        # If still no session_id, try to find it by searching Stripe checkout sessions with this shipment_id in metadata
+        if not session_id:
+            try:
+                logger.info(
+                    f"🔍 No session_id found, searching Stripe for checkout sessions with shipment_id={shipment_id} in metadata..."
+                )
+                # List recent checkout sessions and find one with this shipment_id
+                # We'll search the last 100 sessions (Stripe limit is 100 per page)
+                sessions = stripe.checkout.Session.list(
+                    limit=100,
+                )
+
+                for sess in sessions.data:
+                    sess_metadata = sess.get("metadata", {})
+                    if (
+                        sess_metadata.get("shipment_id") == str(shipment_id)
+                        and sess_metadata.get("type") == "shipment"
+                    ):
+                        session_id = sess.id
+                        logger.info(
+                            f"✅ Found Stripe session {session_id} for shipment {shipment_id}"
+                        )
+                        # Also update shipment with this session_id for future reference
+                        if not shipment.stripe_session_id:
+                            shipment.stripe_session_id = session_id
+                            shipment.save()
+                        break
+            except stripe.error.StripeError as e:
+                logger.warning(f"⚠️ Could not search Stripe for sessions: {str(e)}")
+            except Exception as e:
+                logger.warning(f"⚠️ Error searching for Stripe session: {str(e)}")
+
+        # If session_id available (from request, shipment, or Stripe search), verify with Stripe
+        if session_id:
+            try:
+                session = stripe.checkout.Session.retrieve(session_id)
+                payment_status = session.get("payment_status")
+                metadata = session.get("metadata") or {}
+                if (
+                    metadata.get("shipment_id") != str(shipment.id)
+                    or metadata.get("type") != "shipment"
+                ):
+                    logger.warning(
+                        f"⚠️ Stripe session {session_id} metadata does not match shipment {shipment_id}"
+                    )
+                    return Response(
+                        {
+                            "success": False,
+                            "error": "Invalid payment session for this shipment",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+                logger.info(
+                    f"🔍 Verifying payment for shipment {shipment_id} - session_id: {session_id}, payment_status: {payment_status}"
+                )
+
+                if payment_status == "paid":
+                    # Get amount from session
+                    amount_total = session.get("amount_total")
+                    if amount_total:
+                        paid_amount = Decimal(str(amount_total)) / 100
+                        shipment.amount_paid = paid_amount
+                        shipment.payment_status = "paid"
+                        # Update stripe_session_id if not already set
+                        if not shipment.stripe_session_id:
+                            shipment.stripe_session_id = session_id
+                        shipment.paid_at = timezone.now()
+                        shipment.save()
+
+                        logger.info(
+                            f"✅ Payment confirmed for shipment {shipment.id} - amount_paid: {paid_amount}, payment_status: {shipment.payment_status}"
+                        )
+
+                        # ✅ Automatically create Sendcloud parcel if payment is paid and Sendcloud is configured
+                        if not shipment.sendcloud_id:
+                            try:
+                                from ..sendcloud_labels import prefetch_labels
+                                from ..sendcloud_service import (
+                                    SendcloudAPIError,
+                                    SendcloudValidationError,
+                                    create_parcel,
+                                )
+
+                                # Validate all required EU pickup fields with fallbacks
+                                missing_fields = []
+
+                                # Use fallback for name if missing (use receiver_name for EU pickup)
+                                pickup_name = shipment.eu_pickup_name
+                                if not pickup_name or not pickup_name.strip():
+                                    pickup_name = shipment.receiver_name
+                                    if not pickup_name or not pickup_name.strip():
+                                        missing_fields.append("name")
+
+                                # Check address
+                                if (
+                                    not shipment.eu_pickup_address
+                                    or not shipment.eu_pickup_address.strip()
+                                ):
+                                    missing_fields.append("address")
+
+                                # Check city
+                                if (
+                                    not shipment.eu_pickup_city
+                                    or not shipment.eu_pickup_city.strip()
+                                ):
+                                    missing_fields.append("city")
+
+                                # Check postal_code
+                                if (
+                                    not shipment.eu_pickup_postal_code
+                                    or not shipment.eu_pickup_postal_code.strip()
+                                ):
+                                    missing_fields.append("postal_code")
+
+                                # Check country
+                                if (
+                                    not shipment.eu_pickup_country
+                                    or not shipment.eu_pickup_country.strip()
+                                ):
+                                    missing_fields.append("country")
+
+                                # Check weight
+                                if (
+                                    not shipment.eu_pickup_weight
+                                    or float(shipment.eu_pickup_weight) <= 0
+                                ):
+                                    missing_fields.append("weight")
+
+                                # Only create Sendcloud parcel if all required fields are present
+                                if (
+                                    shipment.selected_eu_shipping_method
+                                    and not missing_fields
+                                ):
+                                    logger.info(
+                                        f"🚀 Attempting to automatically create Sendcloud parcel for shipment {shipment.id} after payment confirmation"
+                                    )
+
+                                    # Prepare shipment data for Sendcloud (using new form fields with fallbacks)
+                                    shipment_data = {
+                                        "name": pickup_name.strip(),
+                                        "address": shipment.eu_pickup_address.strip(),
+                                        "city": shipment.eu_pickup_city.strip(),
+                                        "postal_code": shipment.eu_pickup_postal_code.strip(),
+                                        "country": shipment.eu_pickup_country.strip(),
+                                        "weight": float(shipment.eu_pickup_weight),
+                                    }
+
+                                    # Add optional fields with fallbacks
+                                    if shipment.eu_pickup_company_name:
+                                        shipment_data["company_name"] = (
+                                            shipment.eu_pickup_company_name
+                                        )
+
+                                    if shipment.eu_pickup_house_number:
+                                        shipment_data["house_number"] = (
+                                            shipment.eu_pickup_house_number
+                                        )
+
+                                    # Use fallback for email if missing (use receiver_email)
+                                    pickup_email = shipment.eu_pickup_email
+                                    if not pickup_email or not pickup_email.strip():
+                                        pickup_email = shipment.receiver_email
+                                    if pickup_email and pickup_email.strip():
+                                        shipment_data["email"] = pickup_email.strip()
+
+                                    # Use fallback for telephone if missing (use receiver_phone)
+                                    pickup_telephone = shipment.eu_pickup_telephone
+                                    if (
+                                        not pickup_telephone
+                                        or not pickup_telephone.strip()
+                                    ):
+                                        pickup_telephone = shipment.receiver_phone
+                                    if pickup_telephone and pickup_telephone.strip():
+                                        shipment_data["telephone"] = (
+                                            pickup_telephone.strip()
+                                        )
+
+                                    if shipment.shipment_number:
+                                        shipment_data["order_number"] = (
+                                            shipment.shipment_number
+                                        )
+
+                                    # Create parcel in Sendcloud
+                                    sendcloud_result = create_parcel(
+                                        shipment_data=shipment_data,
+                                        selected_shipping_method=shipment.selected_eu_shipping_method,
+                                    )
+
+                                    # Update shipment with Sendcloud data
+                                    shipment.sendcloud_id = sendcloud_result.get(
+                                        "sendcloud_id"
+                                    )
+                                    tracking_number = sendcloud_result.get(
+                                        "tracking_number", ""
+                                    )
+                                    shipment.tracking_number = (
+                                        tracking_number if tracking_number else ""
+                                    )
+
+                                    tracking_url = sendcloud_result.get("tracking_url")
+                                    shipment.tracking_url = (
+                                        tracking_url if tracking_url else None
+                                    )
+
+                                    label_url_a6 = sendcloud_result.get("label_url_a6")
+                                    label_url = sendcloud_result.get("label_url")
+                                    shipment.sendcloud_label_url = (
+                                        label_url_a6 or label_url or None
+                                    )
+
+                                    # Store A4 labels
+                                    normal_printer_labels = sendcloud_result.get(
+                                        "normal_printer_labels", []
+                                    )
+                                    shipment.normal_printer_labels = (
+                                        normal_printer_labels
+                                        if normal_printer_labels
+                                        else []
+                                    )
+
+                                    # Update status to PENDING_PICKUP if parcel was created
+                                    if shipment.sendcloud_id:
+                                        shipment.status = "PENDING_PICKUP"
+                                        shipment.save()
+                                        prefetch_labels([shipment.sendcloud_id])
+
+                                        logger.info(
+                                            f"✅ Successfully automatically created Sendcloud parcel for shipment {shipment.id} after payment confirmation: "
+                                            f"sendcloud_id={shipment.sendcloud_id}, "
+                                            f"tracking_number={shipment.tracking_number}"
+                                        )
+                                    else:
+                                        logger.warning(
+                                            f"⚠️ Sendcloud parcel creation returned no sendcloud_id for shipment {shipment.id}"
+                                        )
+                                else:
+                                    if missing_fields:
+                                        logger.info(
+                                            f"ℹ️ Skipping automatic Sendcloud parcel creation for shipment {shipment.id}: "
+                                            f"missing required fields: {', '.join(missing_fields)}"
+                                        )
+                                    elif not shipment.selected_eu_shipping_method:
+                                        logger.info(
+                                            f"ℹ️ Skipping automatic Sendcloud parcel creation for shipment {shipment.id}: "
+                                            f"no shipping method selected"
+                                        )
+                                    # If no Sendcloud parcel created, set status to PENDING_PICKUP anyway
+                                    if not shipment.sendcloud_id:
+                                        shipment.status = "PENDING_PICKUP"
+                                        shipment.save()
+                            except SendcloudValidationError as e:
+                                logger.warning(
+                                    f"⚠️ Sendcloud validation error for shipment {shipment.id}: {str(e)}"
+                                )
+                                # Don't fail payment confirmation - payment is still processed
+                                if not shipment.sendcloud_id:
+                                    shipment.status = "PENDING_PICKUP"
+                                    shipment.save()
+                            except SendcloudAPIError as e:
+                                logger.error(
+                                    f"❌ Sendcloud API error for shipment {shipment.id}: {str(e)}"
+                                )
+                                # Don't fail payment confirmation - payment is still processed
+                                if not shipment.sendcloud_id:
+                                    shipment.status = "PENDING_PICKUP"
+                                    shipment.save()
+                            except Exception as e:
+                                logger.error(
+                                    f"❌ Unexpected error creating Sendcloud parcel for shipment {shipment.id}: {str(e)}",
+                                    exc_info=True,
+                                )
+                                # Don't fail payment confirmation - payment is still processed
+                                if not shipment.sendcloud_id:
+                                    shipment.status = "PENDING_PICKUP"
+                                    shipment.save()
+                        else:
+                            # Sendcloud parcel already exists, just update status if needed
+                            shipment.refresh_from_db()
+                            if shipment.status == "PENDING_PAYMENT":
+                                shipment.status = "PENDING_PICKUP"
+                                shipment.save()
+
+                        # Refresh shipment from DB to get latest state
+                        shipment.refresh_from_db()
+
+                        return Response(
+                            {
+                                "success": True,
+                                "message": "Payment confirmed successfully",
+                                "shipment_id": shipment.id,
+                                "amount_paid": float(shipment.amount_paid),
+                                "status": shipment.status,
+                                "sendcloud_id": shipment.sendcloud_id,
+                                "tracking_number": shipment.tracking_number or None,
+                            }
+                        )
+                    else:
+                        logger.warning(
+                            f"⚠️ Payment is paid but amount_total is missing for session {session_id}"
+                        )
+                        # Still update payment_status even if amount is missing
+                        shipment.payment_status = "paid"
+                        if not shipment.stripe_session_id:
+                            shipment.stripe_session_id = session_id
+                        shipment.save()
+                elif payment_status == "pending":
+                    # Payment is still processing, check if webhook already updated it
+                    logger.info(
+                        f"ℹ️ Payment status is 'pending' for session {session_id}, checking if webhook already processed..."
+                    )
+                    # Refresh shipment from DB to get latest state
+                    shipment.refresh_from_db()
+                    # Check if webhook already updated the shipment
+                    if shipment.payment_status == "paid" and shipment.amount_paid:
+                        return Response(
+                            {
+                                "success": True,
+                                "message": "Payment already confirmed by webhook",
+                                "shipment_id": shipment.id,
+                                "amount_paid": float(shipment.amount_paid),
+                                "status": shipment.status,
+                            }
+                        )
+                    else:
+                        logger.warning(
+                            f"⚠️ Payment status is 'pending' for session {session_id} and webhook hasn't processed yet"
+                        )
+                else:
+                    logger.warning(
+                        f"⚠️ Payment status is '{payment_status}' (not paid) for session {session_id}"
+                    )
+            except stripe.error.StripeError as e:
+                logger.error(f"❌ Stripe API error: {str(e)}", exc_info=True)
+                return Response(
+                    {
+                        "success": False,
+                        "error": f"Stripe verification failed: {str(e)}",
+                    },
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        # If no session_id available, check current shipment status
+        if not session_id:
+            logger.warning(
+                f"⚠️ No session_id found for shipment {shipment_id} - checked request, shipment.stripe_session_id, and Stripe search"
+            )
+            # Check if payment is already confirmed (webhook might have processed it)
+            if shipment.payment_status == "paid" and shipment.amount_paid:
+                return Response(
+                    {
+                        "success": True,
+                        "message": "Payment already confirmed by webhook",
+                        "shipment_id": shipment.id,
+                        "amount_paid": float(shipment.amount_paid),
+                        "status": shipment.status,
+                    }
+                )
+            else:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Payment not confirmed. Could not find Stripe session. Please wait for webhook processing or provide session_id.",
+                        "current_payment_status": shipment.payment_status,
+                        "current_amount_paid": float(shipment.amount_paid or 0),
+                        "stripe_session_id": shipment.stripe_session_id or None,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # If we reach here, session_id was found but payment wasn't "paid" in Stripe
+        # Refresh shipment from DB to get latest state (webhook might have updated it)
+        shipment.refresh_from_db()
+
+        # Check if webhook already processed it (final fallback)
+        if shipment.payment_status == "paid" and shipment.amount_paid:
+            logger.info(
+                f"✅ Payment already confirmed by webhook for shipment {shipment_id}"
+            )
+            return Response(
+                {
+                    "success": True,
+                    "message": "Payment already confirmed by webhook",
+                    "shipment_id": shipment.id,
+                    "amount_paid": float(shipment.amount_paid),
+                    "status": shipment.status,
+                }
+            )
+
+        # Payment not confirmed yet
+        logger.warning(
+            f"⚠️ Payment verification failed for shipment {shipment_id} - session_id: {session_id}, Stripe payment_status might not be 'paid' yet"
+        )
+        return Response(
+            {
+                "success": False,
+                "error": "Payment not confirmed yet. Please wait a moment and refresh, or wait for webhook processing.",
+                "current_payment_status": shipment.payment_status,
+                "current_amount_paid": float(shipment.amount_paid or 0),
+                "stripe_session_id": shipment.stripe_session_id,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Error confirming payment: {str(e)}", exc_info=True)
+        return Response(
+            {"success": False, "error": "An error occurred while confirming payment"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def confirm_fcl_quote_payment_view(request):
+    """
+    Confirm FCL quote payment after Stripe redirect
+    Verifies payment with Stripe and updates quote status
+    """
+    logger = logging.getLogger(__name__)
+
+    stripe = _get_stripe()
+    if stripe is None:
+        return Response(
+            {"success": False, "error": "Stripe is not available"},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    try:
+        quote_id = request.data.get("quote_id")
+        session_id = request.data.get("session_id")
+
+        if not quote_id:
+            return Response(
+                {"success": False, "error": "Quote ID is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get quote
+        try:
+            quote = FCLQuote.objects.get(pk=quote_id, user=request.user)
+        except FCLQuote.DoesNotExist:
+            return Response(
+                {"success": False, "error": "Quote not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # If session_id not provided, try to get it from quote's payment_id
+        if not session_id and quote.payment_id:
+            session_id = quote.payment_id
+            logger.info(f"🔍 Using payment_id from quote {quote_id}: {session_id}")
+
+        # If still no session_id, try to find it by searching Stripe checkout sessions with this quote_id in metadata
+        if not session_id:
+            try:
+                logger.info(
+                    f"🔍 No session_id found, searching Stripe for checkout sessions with quote_id={quote_id} in metadata..."
+                )
+                # List recent checkout sessions and find one with this quote_id
+                # We'll search the last 100 sessions (Stripe limit is 100 per page)
+                sessions = stripe.checkout.Session.list(
+                    limit=100,
+                )
+
+                for sess in sessions.data:
+                    sess_metadata = sess.get("metadata", {})
+                    if (
+                        sess_metadata.get("quote_id") == str(quote_id)
+                        and sess_metadata.get("type") == "quote"
+                    ):
+                        session_id = sess.id
+                        logger.info(
+                            f"✅ Found Stripe session {session_id} for quote {quote_id}"
+                        )
+                        # Also update quote with this session_id for future reference
+                        if not quote.payment_id:
+                            quote.payment_id = session_id
+                            quote.save()
+                        break
+            except stripe.error.StripeError as e:
+                logger.warning(f"⚠️ Could not search Stripe for sessions: {str(e)}")
+            except Exception as e:
+                logger.warning(f"⚠️ Error searching for Stripe session: {str(e)}")
+
+        # If session_id available (from request, quote, or Stripe search), verify with Stripe
+        if session_id:
+            try:
+                session = stripe.checkout.Session.retrieve(session_id)
+                payment_status = session.get("payment_status")
+                metadata = session.get("metadata") or {}
+                if (
+                    metadata.get("quote_id") != str(quote.id)
+                    or metadata.get("type") != "quote"
+                ):
+                    logger.warning(
+                        f"⚠️ Stripe session {session_id} metadata does not match quote {quote_id}"
+                    )
+                    return Response(
+                        {
+                            "success": False,
+                            "error": "Invalid payment session for this quote",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+                logger.info(
+                    f"🔍 Verifying payment for quote {quote_id} - session_id: {session_id}, payment_status: {payment_status}"
+                )
+
+                if payment_status == "paid":
+                    # Get amount from session
+                    amount_total = session.get("amount_total")
+                    if amount_total:
+                        paid_amount = Decimal(str(amount_total)) / 100
+                        # Set amount_paid to the full paid amount (100% payment)
+                        quote.amount_paid = paid_amount
+                        quote.payment_status = "paid"
+                        # Update payment_id if not already set
+                        if not quote.payment_id:
+                            quote.payment_id = session_id
+                        quote.payment_updated_at = timezone.now()
+                        # Update status to PENDING_PAYMENT if it's still CREATED or OFFER_SENT
+                        if quote.status in ["CREATED", "OFFER_SENT"]:
+                            quote.status = "PENDING_PAYMENT"
+                        quote.save()
+
+                        logger.info(
+                            f"✅ Payment confirmed for quote {quote.id} - amount_paid: {paid_amount}, payment_status: {quote.payment_status}, status: {quote.status}"
+                        )
+
+                        return Response(
+                            {
+                                "success": True,
+                                "message": "Payment confirmed successfully",
+                                "quote_id": quote.id,
+                                "amount_paid": float(quote.amount_paid),
+                                "total_price": float(quote.total_price or 0),
+                                "payment_status": quote.payment_status,
+                                "status": quote.status,
+                            }
+                        )
+                    else:
+                        logger.warning(
+                            f"⚠️ Payment is paid but amount_total is missing for session {session_id}"
+                        )
+                        # Still update payment_status even if amount is missing
+                        quote.payment_status = "paid"
+                        if not quote.payment_id:
+                            quote.payment_id = session_id
+                        quote.save()
+                elif payment_status == "pending":
+                    # Payment is still processing, check if webhook already updated it
+                    logger.info(
+                        f"ℹ️ Payment status is 'pending' for session {session_id}, checking if webhook already processed..."
+                    )
+                    # Refresh quote from DB to get latest state
+                    quote.refresh_from_db()
+                    # Check if webhook already updated the quote
+                    if quote.payment_status == "paid" and quote.amount_paid:
+                        return Response(
+                            {
+                                "success": True,
+                                "message": "Payment already confirmed by webhook",
+                                "quote_id": quote.id,
+                                "amount_paid": float(quote.amount_paid),
+                                "total_price": float(quote.total_price or 0),
+                                "payment_status": quote.payment_status,
+                                "status": quote.status,
+                            }
+                        )
+                    else:
+                        logger.warning(
+                            f"⚠️ Payment status is 'pending' for session {session_id} and webhook hasn't processed yet"
+                        )
+                else:
+                    logger.warning(
+                        f"⚠️ Payment status is '{payment_status}' (not paid) for session {session_id}"
+                    )
+            except stripe.error.StripeError as e:
+                logger.error(f"❌ Stripe API error: {str(e)}", exc_info=True)
+                return Response(
+                    {
+                        "success": False,
+                        "error": f"Stripe verification failed: {str(e)}",
+                    },
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+
+        # If no session_id available, check current quote status
+        if not session_id:
+            logger.warning(
+                f"⚠️ No session_id found for quote {quote_id} - checked request, quote.payment_id, and Stripe search"
+            )
+            # Check if payment is already confirmed (webhook might have processed it)
+            if quote.payment_status == "paid" and quote.amount_paid:
+                return Response(
+                    {
+                        "success": True,
+                        "message": "Payment already confirmed by webhook",
+                        "quote_id": quote.id,
+                        "amount_paid": float(quote.amount_paid),
+                        "total_price": float(quote.total_price or 0),
+                        "payment_status": quote.payment_status,
+                        "status": quote.status,
+                    }
+                )
+            else:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Payment not confirmed. Could not find Stripe session. Please wait for webhook processing or provide session_id.",
+                        "current_payment_status": quote.payment_status,
+                        "current_amount_paid": float(quote.amount_paid or 0),
+                        "payment_id": quote.payment_id or None,
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # If we reach here, session_id was found but payment wasn't "paid" in Stripe
+        # Refresh quote from DB to get latest state (webhook might have updated it)
+        quote.refresh_from_db()
+
+        # Check if webhook already processed it (final fallback)
+        if quote.payment_status == "paid" and quote.amount_paid:
+            logger.info(f"✅ Payment already confirmed by webhook for quote {quote_id}")
+            return Response(
+                {
+                    "success": True,
+                    "message": "Payment already confirmed by webhook",
+                    "quote_id": quote.id,
+                    "amount_paid": float(quote.amount_paid),
+                    "total_price": float(quote.total_price or 0),
+                    "payment_status": quote.payment_status,
+                    "status": quote.status,
+                }
+            )
+
+        # Payment not confirmed yet
+        logger.warning(
+            f"⚠️ Payment verification failed for quote {quote_id} - session_id: {session_id}, Stripe payment_status might not be 'paid' yet"
+        )
+        return Response(
+            {
+                "success": False,
+                "error": "Payment not confirmed yet. Please wait a moment and refresh, or wait for webhook processing.",
+                "current_payment_status": quote.payment_status,
+                "current_amount_paid": float(quote.amount_paid or 0),
+                "payment_id": quote.payment_id,
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Error confirming payment: {str(e)}", exc_info=True)
+        return Response(
+            {"success": False, "error": "An error occurred while confirming payment"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,695 @@
+"""
+Price lists, CBM/pricing calculators and Syrian internal transport pricing
+"""
+
+import logging
+import traceback
+
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAdminUser
+from rest_framework.response import Response
+
+from ..models import PackagingPrice, Price, SyrianProvincePrice
+from ..prometheus_metrics import instrument_endpoint
+from ..serializers import (
+    PackagingPriceSerializer,
+    PriceSerializer,
+    SyrianProvincePriceSerializer,
+)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Allow anyone to calculate CBM
+def calculate_cbm_view(request):
+    """API endpoint to calculate CBM (Cubic Meters) from dimensions in centimeters"""
+    try:
+        length = float(request.data.get("length", 0))
+        width = float(request.data.get("width", 0))
+        height = float(request.data.get("height", 0))
+
+        # Validate inputs
+        if length <= 0 or width <= 0 or height <= 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Length, width, and height must be greater than 0",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Calculate CBM for display: (Length * Width * Height) / 1,000,000
+        cbm = (length * width * height) / 1000000
+
+        return Response(
+            {
+                "success": True,
+                "cbm": round(cbm, 6),  # Round to 6 decimal places
+                "formula": f"({length} × {width} × {height}) / 1,000,000 = {cbm:.6f} m³",
+            },
+            status=status.HTTP_200_OK,
+        )
+    except (ValueError, TypeError):
+        return Response(
+            {"success": False, "error": "Invalid input. Please provide valid numbers."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error calculating CBM: {str(e)}")
+        return Response(
+            {"success": False, "error": "An error occurred while calculating CBM."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@instrument_endpoint("pricing")
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Allow anyone to calculate pricing
+def calculate_pricing_view(request):
+    """API endpoint to calculate pricing based on parcels and Price table"""
+    try:
+        parcels_data = request.data.get("parcels", [])
+
+        if not parcels_data or len(parcels_data) == 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "No parcels provided",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        total_price_by_weight = 0
+        total_price_by_cbm = 0
+        total_packaging_cost = 0
+        calculations = []
+        packaging_calculations = []
+
+        # Calculate pricing for each parcel using Price table
+        for parcel_data in parcels_data:
+            product_id = parcel_data.get("productCategory")
+            packaging_id = parcel_data.get("packagingType")
+            weight = float(parcel_data.get("weight", 0))
+            cbm = float(parcel_data.get("cbm", 0))
+            repeat_count = int(parcel_data.get("repeatCount", 1))
+
+            # Calculate packaging cost even if no product category
+            if packaging_id:
+                try:
+                    packaging = PackagingPrice.objects.get(id=int(packaging_id))
+                    # Packaging cost is multiplied by repeat count
+                    packaging_cost = float(packaging.price) * repeat_count
+                    total_packaging_cost += packaging_cost
+
+                    packaging_calculations.append(
+                        {
+                            "packaging_id": packaging_id,
+                            "packaging_name": (
+                                packaging.ar_option
+                                if request.data.get("language") == "ar"
+                                else packaging.en_option
+                            ),
+                            "dimension": packaging.dimension,
+                            "price_per_unit": float(packaging.price),
+                            "repeat_count": repeat_count,
+                            "total_cost": round(packaging_cost, 2),
+                        }
+                    )
+                except PackagingPrice.DoesNotExist:
+                    logger = logging.getLogger(__name__)
+                    logger.warning(f"PackagingPrice with id {packaging_id} not found")
+                except (ValueError, TypeError) as e:
+                    logger = logging.getLogger(__name__)
+                    logger.warning(f"Invalid packaging data: {str(e)}")
+
+            # Skip product pricing if no product category
+            if not product_id:
+                continue
+
+            try:
+                # Get price from Price table
+                price = Price.objects.get(id=int(product_id))
+
+                # Skip new calculation for per_piece products (electronics) - keep as is
+                if price.minimum_shipping_unit == "per_piece":
+                    # Keep original calculation for electronics
+                    parcel_weight = weight * repeat_count
+                    parcel_cbm = cbm * repeat_count
+                    price_by_weight = parcel_weight * float(price.price_per_kg)
+                    price_by_cbm = parcel_cbm * float(price.price_per_kg)
+                    total_price_by_weight += price_by_weight
+                    total_price_by_cbm += price_by_cbm
+                    calculations.append(
+                        {
+                            "product_id": product_id,
+                            "product_name": (
+                                price.ar_item
+                                if request.data.get("language") == "ar"
+                                else price.en_item
+                            ),
+                            "weight": parcel_weight,
+                            "cbm": parcel_cbm,
+                            "price_per_kg": float(price.price_per_kg),
+                            "price_by_weight": round(price_by_weight, 2),
+                            "price_by_cbm": round(price_by_cbm, 2),
+                        }
+                    )
+                else:
+                    # New calculation for per_kg products
+                    # Get dimensions from parcel_data
+                    length = float(parcel_data.get("length", 0))
+                    width = float(parcel_data.get("width", 0))
+                    height = float(parcel_data.get("height", 0))
+
+                    # Calculate volumetric weight: (L × W × H) / 6,000
+                    volumetric_weight = (length * width * height) / 6000
+
+                    # Chargeable weight = max(actual_weight, volumetric_weight)
+                    chargeable_weight = max(weight, volumetric_weight)
+
+                    # Account for repeat count
+                    parcel_chargeable_weight = chargeable_weight * repeat_count
+
+                    # Price = chargeable_weight × price_per_kg
+                    parcel_price = parcel_chargeable_weight * float(price.price_per_kg)
+
+                    total_price_by_weight += parcel_price
+                    total_price_by_cbm += parcel_price  # Same value for compatibility
+
+                    calculations.append(
+                        {
+                            "product_id": product_id,
+                            "product_name": (
+                                price.ar_item
+                                if request.data.get("language") == "ar"
+                                else price.en_item
+                            ),
+                            "weight": weight,
+                            "volumetric_weight": round(volumetric_weight, 3),
+                            "chargeable_weight": round(chargeable_weight, 3),
+                            "parcel_chargeable_weight": round(
+                                parcel_chargeable_weight, 3
+                            ),
+                            "price_per_kg": float(price.price_per_kg),
+                            "price_by_weight": round(parcel_price, 2),
+                            "price_by_cbm": round(parcel_price, 2),
+                        }
+                    )
+            except Price.DoesNotExist:
+                logger = logging.getLogger(__name__)
+                logger.warning(f"Price with id {product_id} not found")
+                continue
+            except (ValueError, TypeError) as e:
+                logger = logging.getLogger(__name__)
+                logger.warning(f"Invalid data for parcel: {str(e)}")
+                continue
+
+        # Calculate Base LCL Price: max(priceByWeight, priceByCBM, 75)
+        base_lcl_price = max(total_price_by_weight, total_price_by_cbm, 75)
+
+        # Grand Total = Base LCL Price + packaging + insurance
+        calculation_total = base_lcl_price + total_packaging_cost
+
+        # Calculate insurance if declaredShipmentValue is provided
+        declared_shipment_value = float(
+            request.data.get("declaredShipmentValue", 0) or 0
+        )
+        insurance_cost = 0
+        if declared_shipment_value > 0:
+            # Insurance: (Base LCL Price + declared value) * 2%
+            insurance_cost = (base_lcl_price + declared_shipment_value) * 0.02
+
+        total_price = calculation_total + insurance_cost
+
+        formula_dict = {
+            "priceByWeight": f"Total Weight × Price per KG = {total_price_by_weight:.2f}",
+            "priceByCBM": f"Total CBM × Price per KG = {total_price_by_cbm:.2f}",
+            "baseLCLPrice": f"max({total_price_by_weight:.2f}, {total_price_by_cbm:.2f}, 75) = {base_lcl_price:.2f}",
+            "packagingCost": f"Total Packaging Cost = {total_packaging_cost:.2f}",
+            "calculation": f"{base_lcl_price:.2f} + {total_packaging_cost:.2f} = {calculation_total:.2f}",
+        }
+
+        if insurance_cost > 0:
+            formula_dict["insurance"] = (
+                f"({base_lcl_price:.2f} + {declared_shipment_value:.2f}) × 2% = {insurance_cost:.2f}"
+            )
+            formula_dict["totalPrice"] = (
+                f"{calculation_total:.2f} + {insurance_cost:.2f} = {total_price:.2f}"
+            )
+        else:
+            formula_dict["totalPrice"] = f"{calculation_total:.2f} = {total_price:.2f}"
+
+        return Response(
+            {
+                "success": True,
+                "priceByWeight": round(total_price_by_weight, 2),
+                "priceByCBM": round(total_price_by_cbm, 2),
+                "basePrice": round(base_lcl_price, 2),
+                "packagingCost": round(total_packaging_cost, 2),
+                "calculation": round(calculation_total, 2),
+                "insuranceCost": round(insurance_cost, 2),
+                "declaredShipmentValue": round(declared_shipment_value, 2),
+                "totalPrice": round(total_price, 2),
+                "calculations": calculations,
+                "packagingCalculations": packaging_calculations,
+                "formula": formula_dict,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except (ValueError, TypeError) as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error calculating pricing: {str(e)}")
+        return Response(
+            {"success": False, "error": f"Invalid input: {str(e)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error calculating pricing: {str(e)}", exc_info=True)
+        return Response(
+            {"success": False, "error": "An error occurred while calculating pricing."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def get_prices_view(request):
+    """API endpoint to get all prices"""
+    try:
+        prices = Price.objects.all().order_by("ar_item", "en_item")
+        serializer = PriceSerializer(prices, many=True)
+        return Response(
+            {"success": True, "prices": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching prices: {str(e)}")
+        return Response(
+            {"success": False, "error": "An error occurred while fetching prices."},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def get_packaging_prices_view(request):
+    """API endpoint to get all packaging prices"""
+    try:
+        packaging_prices = PackagingPrice.objects.all().order_by(
+            "ar_option", "en_option"
+        )
+        serializer = PackagingPriceSerializer(packaging_prices, many=True)
+        return Response(
+            {"success": True, "data": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching packaging prices: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while fetching packaging prices.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def get_regular_products_view(request):
+    """API endpoint to get regular products with per_kg pricing unit"""
+    try:
+        # Get all products where minimum_shipping_unit is 'per_kg'
+        # Convert to list immediately to bypass any pagination
+        regular_products = list(
+            Price.objects.filter(minimum_shipping_unit="per_kg")
+            .order_by("ar_item", "en_item")
+            .values(
+                "id",
+                "ar_item",
+                "en_item",
+                "price_per_kg",
+                "minimum_shipping_weight",
+                "minimum_shipping_unit",
+                "one_cbm",
+            )
+        )
+
+        return Response(
+            {
+                "success": True,
+                "products": regular_products,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching regular products: {str(e)}")
+        return Response(
+            {"success": False, "error": "Failed to fetch regular products"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def get_per_piece_products_view(request):
+    """API endpoint to get products with per_piece pricing unit (Electronics)"""
+    try:
+        # Get all products where minimum_shipping_unit is 'per_piece'
+        # Convert to list immediately to bypass any pagination
+        per_piece_products = list(
+            Price.objects.filter(minimum_shipping_unit="per_piece")
+            .order_by("ar_item", "en_item")
+            .values(
+                "id",
+                "ar_item",
+                "en_item",
+                "price_per_kg",
+                "minimum_shipping_weight",
+                "minimum_shipping_unit",
+            )
+        )
+
+        return Response(
+            {
+                "success": True,
+                "products": per_piece_products,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching per-piece products: {str(e)}")
+        return Response(
+            {"success": False, "error": "Failed to fetch products"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+# ============================================================================
+# SYRIAN INTERNAL TRANSPORT PRICING API ENDPOINTS
+# ============================================================================
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def get_syrian_provinces_view(request):
+    """
+    Get list of all active Syrian provinces with pricing
+
+    GET /api/syrian-provinces/
+
+    Response:
+    {
+        "success": true,
+        "provinces": [
+            {
+                "id": 1,
+                "province_code": "DAMASCUS",
+                "province_name_ar": "دمشق",
+                "province_name_en": "Damascus",
+                "min_price": "10.00",
+                "rate_per_kg": "0.07",
+                "is_active": true,
+                "display_order": 1
+            }
+        ]
+    }
+    """
+    try:
+        provinces = SyrianProvincePrice.objects.filter(is_active=True)
+        serializer = SyrianProvincePriceSerializer(provinces, many=True)
+
+        return Response(
+            {"success": True, "provinces": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error fetching Syrian provinces: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to fetch provinces"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def calculate_syria_transport_view(request):
+    """
+    Calculate Syrian internal transport price
+
+    POST /api/calculate-syria-transport/
+
+    Request Body:
+    {
+        "province_code": "DAMASCUS",
+        "weight": 100.5
+    }
+
+    Response:
+    {
+        "success": true,
+        "province": {
+            "code": "DAMASCUS",
+            "name_ar": "دمشق",
+            "name_en": "Damascus"
+        },
+        "weight": 100.5,
+        "min_price": 10.00,
+        "rate_per_kg": 0.07,
+        "calculated_price": 14.04,
+        "breakdown": {
+            "weight_cost": 7.04,
+            "min_price": 10.00,
+            "final_price": 14.04
+        }
+    }
+    """
+    try:
+        province_code = request.data.get("province_code")
+        weight = request.data.get("weight")
+
+        # Validation
+        if not province_code:
+            return Response(
+                {"success": False, "error": "Province code is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if weight is None or weight <= 0:
+            return Response(
+                {"success": False, "error": "Valid weight is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get province
+        try:
+            province = SyrianProvincePrice.objects.get(
+                province_code=province_code.upper(), is_active=True
+            )
+        except SyrianProvincePrice.DoesNotExist:
+            return Response(
+                {"success": False, "error": "Province not found or inactive"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Calculate price using model method
+        final_price = province.calculate_price(float(weight))
+        weight_cost = float(weight) * float(province.rate_per_kg)
+
+        return Response(
+            {
+                "success": True,
+                "province": {
+                    "code": province.province_code,
+                    "name_ar": province.province_name_ar,
+                    "name_en": province.province_name_en,
+                },
+                "weight": float(weight),
+                "min_price": float(province.min_price),
+                "rate_per_kg": float(province.rate_per_kg),
+                "calculated_price": round(final_price, 2),
+                "breakdown": {
+                    "weight_cost": round(weight_cost, 2),
+                    "min_price": float(province.min_price),
+                    "final_price": round(final_price, 2),
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error calculating Syria transport price: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to calculate price"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+# ============================================================================
+# ADMIN CRUD FOR SYRIAN PROVINCE PRICING
+# ============================================================================
+
+
+@api_view(["GET", "POST"])
+@permission_classes([IsAdminUser])
+def admin_syrian_provinces_view(request):
+    """
+    Admin endpoint to list all provinces or create new province
+
+    GET /api/admin/syrian-provinces/
+    Returns all provinces (active and inactive)
+
+    POST /api/admin/syrian-provinces/
+    Create new province
+    """
+    if request.method == "GET":
+        try:
+            provinces = SyrianProvincePrice.objects.all()
+            serializer = SyrianProvincePriceSerializer(provinces, many=True)
+
+            return Response(
+                {"success": True, "provinces": serializer.data},
+                status=status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error fetching all provinces (admin): {str(e)}")
+            return Response(
+                {"success": False, "error": "Failed to fetch provinces"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    elif request.method == "POST":
+        try:
+            serializer = SyrianProvincePriceSerializer(data=request.data)
+
+            if serializer.is_valid():
+                serializer.save()
+                logger = logging.getLogger(__name__)
+                logger.info(
+                    f"✅ Admin created new Syrian province: {serializer.data['province_code']}"
+                )
+
+                return Response(
+                    {
+                        "success": True,
+                        "message": "Province created successfully",
+                        "province": serializer.data,
+                    },
+                    status=status.HTTP_201_CREATED,
+                )
+            else:
+                return Response(
+                    {"success": False, "errors": serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error creating province (admin): {str(e)}")
+            logger.error(traceback.format_exc())
+            return Response(
+                {"success": False, "error": "Failed to create province"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@permission_classes([IsAdminUser])
+def admin_syrian_province_detail_view(request, pk):
+    """
+    Admin endpoint to retrieve, update or delete a specific province
+
+    GET /api/admin/syrian-provinces/<id>/
+    Retrieve province details
+
+    PUT /api/admin/syrian-provinces/<id>/
+    Update province
+
+    DELETE /api/admin/syrian-provinces/<id>/
+    Delete province
+    """
+    try:
+        province = SyrianProvincePrice.objects.get(pk=pk)
+    except SyrianProvincePrice.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Province not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    if request.method == "GET":
+        serializer = SyrianProvincePriceSerializer(province)
+        return Response(
+            {"success": True, "province": serializer.data},
+            status=status.HTTP_200_OK,
+        )
+
+    elif request.method == "PUT":
+        try:
+            serializer = SyrianProvincePriceSerializer(
+                province, data=request.data, partial=True
+            )
+
+            if serializer.is_valid():
+                serializer.save()
+                logger = logging.getLogger(__name__)
+                logger.info(
+                    f"✅ Admin updated Syrian province: {province.province_code}"
+                )
+
+                return Response(
+                    {
+                        "success": True,
+                        "message": "Province updated successfully",
+                        "province": serializer.data,
+                    },
+                    status=status.HTTP_200_OK,
+                )
+            else:
+                return Response(
+                    {"success": False, "errors": serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error updating province (admin): {str(e)}")
+            return Response(
+                {"success": False, "error": "Failed to update province"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    elif request.method == "DELETE":
+        try:
+            province_code = province.province_code
+            province.delete()
+
+            logger = logging.getLogger(__name__)
+            logger.info(f"✅ Admin deleted Syrian province: {province_code}")
+
+            return Response(
+                {"success": True, "message": "Province deleted successfully"},
+                status=status.HTTP_200_OK,
+            )
+
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.error(f"Error deleting province (admin): {str(e)}")
+            return Response(
+                {"success": False, "error": "Failed to delete province"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,269 @@
+"""
+Requests for products missing from the price lists
+"""
+
+import logging
+import traceback
+
+from django.contrib.auth.models import User
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import ProductRequest
+from ..serializers import ProductRequestSerializer
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def request_new_product_view(request):
+    """Handle user requests for new products to be added"""
+    try:
+        product_name = request.data.get("productName")
+        language = request.data.get("language", "en")
+
+        if not product_name:
+            return Response(
+                {"success": False, "error": "Product name is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get the user if authenticated
+        user = request.user if request.user.is_authenticated else None
+
+        # Create the product request
+        product_request = ProductRequest.objects.create(
+            user=user,
+            product_name=product_name,
+            language=language,
+            status="PENDING",
+        )
+
+        # Send email notification to admin
+        try:
+            from django.conf import settings
+            from django.core.mail import send_mail
+
+            # Get all superuser emails
+            admin_emails = list(
+                User.objects.filter(is_superuser=True).values_list("email", flat=True)
+            )
+
+            # Add ADMIN_EMAIL from settings if configured
+            if settings.ADMIN_EMAIL and settings.ADMIN_EMAIL not in admin_emails:
+                admin_emails.append(settings.ADMIN_EMAIL)
+
+            if admin_emails:
+                user_info = (
+                    f"{user.username} ({user.email})" if user else "Anonymous User"
+                )
+
+                subject = f"New Product Request - {product_name}"
+
+                # Different message based on whether user is authenticated
+                if user and user.email:
+                    message = f"""
+A new product has been requested:
+
+Product Name: {product_name}
+Language: {language}
+Requested by: {user_info}
+Request ID: {product_request.id}
+Date: {product_request.created_at.strftime("%Y-%m-%d %H:%M:%S")}
+
+IMPORTANT: Please reply to this user at {user.email} once you have added this product to the system.
+
+You can manage product requests in the admin panel.
+"""
+                else:
+                    message = f"""
+A new product has been requested:
+
+Product Name: {product_name}
+Language: {language}
+Requested by: Anonymous User (not logged in)
+Request ID: {product_request.id}
+Date: {product_request.created_at.strftime("%Y-%m-%d %H:%M:%S")}
+
+Note: This user was not logged in, so we cannot send them an email notification.
+Please add this product to the pricing system if appropriate.
+
+You can manage product requests in the admin panel.
+"""
+
+                send_mail(
+                    subject=subject,
+                    message=message,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    recipient_list=admin_emails,
+                    fail_silently=True,
+                )
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Failed to send product request email: {str(e)}")
+
+        return Response(
+            {
+                "success": True,
+                "message": "Product request submitted successfully",
+                "requestId": product_request.id,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in request_new_product_view: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to submit product request"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def user_product_requests_view(request):
+    """Get all product requests for the authenticated user"""
+    try:
+        # Get product requests for the current user
+        product_requests = ProductRequest.objects.filter(user=request.user).order_by(
+            "-created_at"
+        )
+
+        serializer = ProductRequestSerializer(product_requests, many=True)
+
+        return Response(
+            {
+                "success": True,
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in user_product_requests_view: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to fetch product requests"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def admin_all_product_requests_view(request):
+    """Get all product requests (Admin only)"""
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can view all product requests"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        # Get all product requests
+        product_requests = ProductRequest.objects.all().order_by("-created_at")
+
+        serializer = ProductRequestSerializer(product_requests, many=True)
+
+        return Response(
+            {
+                "success": True,
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in admin_all_product_requests_view: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to fetch product requests"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["PATCH"])
+@permission_classes([IsAuthenticated])
+def update_product_request_view(request, pk):
+    """Update product request status and admin notes (Admin only)"""
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can update product requests"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        product_request = ProductRequest.objects.get(pk=pk)
+
+        # Update status if provided
+        if "status" in request.data:
+            product_request.status = request.data["status"]
+
+        # Update admin notes if provided
+        if "admin_notes" in request.data:
+            product_request.admin_notes = request.data["admin_notes"]
+
+        product_request.save()
+
+        serializer = ProductRequestSerializer(product_request)
+
+        return Response(
+            {
+                "success": True,
+                "message": "Product request updated successfully",
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+    except ProductRequest.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Product request not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in update_product_request_view: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to update product request"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["DELETE"])
+@permission_classes([IsAuthenticated])
+def delete_product_request_view(request, pk):
+    """Delete product request (Admin only)"""
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can delete product requests"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        product_request = ProductRequest.objects.get(pk=pk)
+        product_name = product_request.product_name
+        product_request.delete()
+
+        return Response(
+            {
+                "success": True,
+                "message": f"Product request '{product_name}' deleted successfully",
+            },
+            status=status.HTTP_200_OK,
+        )
+    except ProductRequest.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Product request not found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in delete_product_request_view: {str(e)}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Failed to delete product request"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,1231 @@
+"""
+Sendcloud endpoints: EU shipping rates, EU pickups, labels and webhooks
+"""
+
+import logging
+import traceback
+from datetime import datetime
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import LCLShipment
+from ..prometheus_metrics import instrument_endpoint
+
+
+def _apply_sendcloud_profit_margin(shipping_methods):
+    """
+    Add profit_amount, profit_margin_percent and total_price to shipping methods
+
+    Reads the margin from ShippingSettings once and prices all methods in a
+    single pass, so batch quotes cost one settings lookup.
+    """
+    logger = logging.getLogger(__name__)
+
+    try:
+        from ..models import ShippingSettings
+
+        settings_obj = ShippingSettings.get_settings()
+        profit_margin_percent = float(
+            settings_obj.sendcloud_profit_margin
+        )  # Get percentage
+        margin_rate = profit_margin_percent / 100
+
+        logger.info(f"📊 Calculating profit margin: {profit_margin_percent}%")
+
+        for method in shipping_methods:
+            sendcloud_price = method["price"]  # Original Sendcloud price
+            profit_amount = round(sendcloud_price * margin_rate, 2)
+
+            # Add all prices to response
+            method["profit_amount"] = profit_amount
+            method["profit_margin_percent"] = profit_margin_percent
+            method["total_price"] = round(
+                sendcloud_price + profit_amount, 2
+            )  # Frontend just displays this
+
+        logger.info(f"✅ Calculated profit for {len(shipping_methods)} methods")
+    except Exception as e:
+        logger.error(f"❌ Could not calculate profit margin: {str(e)}")
+        logger.error(traceback.format_exc())
+        logger.warning("⚠️ Profit margin not added.")
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Allow authenticated users and guests
+def calculate_eu_shipping_view(request):
+    """
+    Calculate EU internal shipping rates using Sendcloud API
+
+    POST /api/calculate-eu-shipping/
+
+    Request Body:
+    {
+        "sender_address": "Wattweg 5",
+        "sender_city": "Bergen op Zoom",
+        "sender_postal_code": "4622RA",
+        "sender_country": "NL",
+        "receiver_address": "Main Street 123",
+        "receiver_city": "Amsterdam",
+        "receiver_postal_code": "1012AB",
+        "receiver_country": "NL",
+        "weight": 25.5,
+        "length": 50,  (optional)
+        "width": 40,   (optional)
+        "height": 30   (optional)
+    }
+
+    Response:
+    {
+        "success": true,
+        "shipping_methods": [
+            {
+                "id": 1,
+                "name": "PostNL",
+                "carrier": "postnl",
+                "price": 6.25,
+                "currency": "EUR",
+                "delivery_days": "2-3"
+            }
+        ]
+    }
+
+    Security:
+    - All inputs are validated and sanitized
+    - Only EU country codes accepted
+    - Weight/dimension limits enforced
+    - Secure logging (no personal data)
+    """
+    from ..sendcloud_service import (
+        SendcloudAPIError,
+        SendcloudValidationError,
+        get_shipping_methods,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        # ✅ Extract and validate request data
+        sender_address = request.data.get("sender_address")
+        sender_city = request.data.get("sender_city")
+        sender_postal_code = request.data.get("sender_postal_code")
+        sender_country = request.data.get("sender_country")
+        receiver_address = request.data.get("receiver_address")
+        receiver_city = request.data.get("receiver_city")
+        receiver_postal_code = request.data.get("receiver_postal_code")
+        receiver_country = request.data.get("receiver_country")
+        weight = request.data.get("weight")
+
+        # Optional dimensions
+        length = request.data.get("length")
+        width = request.data.get("width")
+        height = request.data.get("height")
+
+        # ✅ Check required fields
+        required_fields = {
+            "sender_address": sender_address,
+            "sender_city": sender_city,
+            "sender_postal_code": sender_postal_code,
+            "sender_country": sender_country,
+            "receiver_address": receiver_address,
+            "receiver_city": receiver_city,
+            "receiver_postal_code": receiver_postal_code,
+            "receiver_country": receiver_country,
+            "weight": weight,
+        }
+
+        missing_fields = [
+            field for field, value in required_fields.items() if not value
+        ]
+        if missing_fields:
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Missing required fields: {', '.join(missing_fields)}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # ✅ Call Sendcloud service (validation happens inside)
+        shipping_methods = get_shipping_methods(
+            sender_address=sender_address,
+            sender_city=sender_city,
+            sender_postal_code=sender_postal_code,
+            sender_country=sender_country,
+            receiver_address=receiver_address,
+            receiver_city=receiver_city,
+            receiver_postal_code=receiver_postal_code,
+            receiver_country=receiver_country,
+            weight=weight,
+            length=length,
+            width=width,
+            height=height,
+        )
+
+        logger.info(
+            f"✅ Retrieved {len(shipping_methods)} shipping methods from Sendcloud"
+        )
+
+        # ✅ Calculate profit margin from ShippingSettings
+        _apply_sendcloud_profit_margin(shipping_methods)
+
+        return Response(
+            {
+                "success": True,
+                "shipping_methods": shipping_methods,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except SendcloudValidationError as e:
+        # Input validation failed
+        logger.warning(f"Validation error in calculate_eu_shipping: {str(e)}")
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except SendcloudAPIError as e:
+        # Sendcloud API call failed
+        logger.error(f"Sendcloud API error in calculate_eu_shipping: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "Unable to fetch shipping rates. Please try again.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    except Exception as e:
+        # Unexpected error
+        logger.error(f"Unexpected error in calculate_eu_shipping: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Allow authenticated users and guests
+def calculate_eu_shipping_bulk_view(request):
+    """
+    Calculate EU internal shipping rates for many parcels in one request
+
+    POST /api/calculate-eu-shipping/bulk/
+
+    Request Body:
+    {
+        "quotes": [
+            { ...same fields as calculate-eu-shipping... },
+            ...
+        ]
+    }
+
+    Response:
+    {
+        "success": true,
+        "quotes": [
+            {"success": true, "shipping_methods": [...]},
+            {"success": false, "error": "Missing required fields: weight"}
+        ]
+    }
+
+    Results are in the same order as the quotes. Used when comparing pickup
+    addresses or parcel splits; the Sendcloud catalog is fetched once per batch.
+    """
+    from ..sendcloud_service import (
+        SendcloudAPIError,
+        SendcloudValidationError,
+        get_shipping_methods_bulk,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    required_fields = [
+        "sender_address",
+        "sender_city",
+        "sender_postal_code",
+        "sender_country",
+        "receiver_address",
+        "receiver_city",
+        "receiver_postal_code",
+        "receiver_country",
+        "weight",
+    ]
+    optional_fields = ["length", "width", "height"]
+
+    try:
+        quotes = request.data.get("quotes")
+        if not isinstance(quotes, list) or not quotes:
+            return Response(
+                {"success": False, "error": "quotes must be a non-empty list"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # ✅ Check required fields per quote, price the complete ones
+        results = [None] * len(quotes)
+        to_price = []
+        for index, quote in enumerate(quotes):
+            if not isinstance(quote, dict):
+                results[index] = {"success": False, "error": "Invalid quote"}
+                continue
+
+            missing_fields = [
+                field for field in required_fields if not quote.get(field)
+            ]
+            if missing_fields:
+                results[index] = {
+                    "success": False,
+                    "error": f"Missing required fields: {', '.join(missing_fields)}",
+                }
+                continue
+
+            to_price.append(
+                (
+                    index,
+                    {
+                        field: quote.get(field)
+                        for field in required_fields + optional_fields
+                    },
+                )
+            )
+
+        if to_price:
+            priced = get_shipping_methods_bulk([quote for _, quote in to_price])
+            for (index, _), result in zip(to_price, priced):
+                results[index] = result
+
+        # ✅ Apply the profit margin to all returned methods in one pass
+        _apply_sendcloud_profit_margin(
+            [
+                method
+                for result in results
+                if result["success"]
+                for method in result["shipping_methods"]
+            ]
+        )
+
+        logger.info(f"✅ Calculated EU shipping rates for {len(results)} quotes")
+
+        return Response(
+            {"success": True, "quotes": results},
+            status=status.HTTP_200_OK,
+        )
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Validation error in calculate_eu_shipping_bulk: {str(e)}")
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except SendcloudAPIError as e:
+        logger.error(f"Sendcloud API error in calculate_eu_shipping_bulk: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "Unable to fetch shipping rates. Please try again.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    except Exception as e:
+        logger.error(
+            f"Unexpected error in calculate_eu_shipping_bulk: {type(e).__name__}"
+        )
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_shipping_methods_simple_view(request):
+    """
+    Get shipping methods filtered by weight and country (using test=1)
+
+    GET /api/sendcloud/shipping-methods-simple/?weight=10&country=NL
+
+    Query params:
+    - weight: Package weight in kg (required)
+    - country: Destination country code (required)
+
+    Returns:
+    {
+        "success": true,
+        "shipping_methods": [
+            {
+                "id": 1,
+                "name": "PostNL",
+                "carrier": "postnl",
+                "min_weight": "0.0",
+                "max_weight": "30.0",
+                "countries": [...]
+            },
+            ...
+        ]
+    }
+    """
+    from ..sendcloud_service import (
+        SendcloudAPIError,
+        SendcloudValidationError,
+        get_shipping_methods_simple,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        weight = request.query_params.get("weight")
+        country = request.query_params.get("country")
+
+        if not weight:
+            return Response(
+                {"success": False, "error": "Weight parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not country:
+            return Response(
+                {"success": False, "error": "Country parameter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            weight_float = float(weight)
+        except (TypeError, ValueError):
+            return Response(
+                {"success": False, "error": "Invalid weight value"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        shipping_methods = get_shipping_methods_simple(
+            weight=weight_float,
+            country=country,
+        )
+
+        logger.info(
+            f"✅ Retrieved {len(shipping_methods)} shipping methods for weight={weight}kg, country={country}"
+        )
+
+        # ✅ Calculate profit margin from ShippingSettings (same as calculate_eu_shipping_view)
+        try:
+            from ..models import ShippingSettings
+
+            settings_obj = ShippingSettings.get_settings()
+            profit_margin_percent = float(
+                settings_obj.sendcloud_profit_margin
+            )  # Get percentage
+
+            logger.info(f"📊 Calculating profit margin: {profit_margin_percent}%")
+
+            for method in shipping_methods:
+                sendcloud_price = method.get("price", 0)  # Original Sendcloud price
+                profit_amount = round(
+                    sendcloud_price * (profit_margin_percent / 100), 2
+                )  # Calculate profit
+                total_price = round(
+                    sendcloud_price + profit_amount, 2
+                )  # Calculate total
+
+                # Add all prices to response
+                method["profit_amount"] = profit_amount
+                method["profit_margin_percent"] = profit_margin_percent
+                method["total_price"] = total_price  # Frontend uses this for pricing
+
+                logger.info(
+                    f"  💰 {method.get('name', 'Unknown')}: Sendcloud=€{sendcloud_price} + Profit=€{profit_amount} = Total=€{total_price}"
+                )
+
+            logger.info(
+                f"✅ Calculated profit for {len(shipping_methods)} shipping methods"
+            )
+        except Exception as e:
+            logger.error(f"❌ Could not calculate profit margin: {str(e)}")
+            logger.error(traceback.format_exc())
+            logger.warning("⚠️ Profit margin not added, using base prices only.")
+            # If profit calculation fails, set total_price to base price
+            for method in shipping_methods:
+                if "total_price" not in method:
+                    method["total_price"] = method.get("price", 0)
+                    method["profit_amount"] = 0
+                    method["profit_margin_percent"] = 0
+
+        return Response(
+            {
+                "success": True,
+                "shipping_methods": shipping_methods,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SendcloudAPIError as e:
+        logger.error(f"Sendcloud API error: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "Unable to fetch shipping methods. Please try again.",
+            },
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_sendcloud_label_view(request, shipment_id):
+    """
+    Download Sendcloud label for a shipment (proxy with authentication)
+
+    GET /api/shipments/<shipment_id>/download-sendcloud-label/?type=normal_printer
+
+    Query params:
+        type: 'normal_printer' (A4) or 'label' (A6), default: 'normal_printer'
+    """
+    from django.http import HttpResponse
+
+    from django.utils.http import parse_etags
+
+    from ..sendcloud_labels import LABEL_CACHE_DIR, LABEL_TYPES, get_label
+    from ..sendcloud_service import SendcloudAPIError, SendcloudValidationError
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        # Get shipment
+        shipment = LCLShipment.objects.filter(id=shipment_id).first()
+        if not shipment:
+            return Response(
+                {"success": False, "error": "Shipment not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Check if user has permission (owner or admin)
+        if not request.user.is_superuser and shipment.user != request.user:
+            return Response(
+                {"success": False, "error": "Permission denied"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Check if shipment has sendcloud_id
+        if not shipment.sendcloud_id:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Shipment does not have a Sendcloud parcel",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Get label type from query params
+        label_type = request.query_params.get("type", "normal_printer")
+
+        filename = f"label_{shipment.shipment_number or shipment.id}_{label_type}.pdf"
+
+        # Labels already cached are sent by nginx (with ETag and Range support)
+        if settings.USE_X_ACCEL_REDIRECT and label_type in LABEL_TYPES:
+            from ..protected_media import protected_file_response
+
+            response = protected_file_response(
+                f"{LABEL_CACHE_DIR}/{label_type}/{int(shipment.sendcloud_id)}.pdf",
+                filename=filename,
+                content_type="application/pdf",
+                as_attachment=True,
+            )
+            if response is not None:
+                logger.info(
+                    f"✅ Downloaded {label_type} label for shipment {shipment_id}"
+                )
+                return response
+
+        # Serve the cached label (downloaded from Sendcloud on first use)
+        try:
+            label_content, etag = get_label(shipment.sendcloud_id, label_type)
+        except (SendcloudAPIError, SendcloudValidationError) as e:
+            logger.error(f"Failed to download label: {str(e)}")
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            return response
+
+        # Return PDF as response
+        response = HttpResponse(label_content, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+
+        logger.info(f"✅ Downloaded {label_type} label for shipment {shipment_id}")
+        return response
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+def _build_eu_pickup_parcel_data(shipment):
+    """
+    Build the Sendcloud parcel data for a shipment's EU pickup
+
+    Returns:
+        Tuple (shipment_data, missing_fields)
+    """
+    # Validate all required EU pickup fields with fallbacks for older shipments
+    missing_fields = []
+
+    # Use fallback for name if missing (use receiver_name for EU pickup)
+    pickup_name = shipment.eu_pickup_name
+    if not pickup_name or not pickup_name.strip():
+        pickup_name = shipment.receiver_name
+        if not pickup_name or not pickup_name.strip():
+            missing_fields.append("name")
+
+    # Check address
+    if not shipment.eu_pickup_address or not shipment.eu_pickup_address.strip():
+        missing_fields.append("address")
+
+    # Check city
+    if not shipment.eu_pickup_city or not shipment.eu_pickup_city.strip():
+        missing_fields.append("city")
+
+    # Check postal_code
+    if not shipment.eu_pickup_postal_code or not shipment.eu_pickup_postal_code.strip():
+        missing_fields.append("postal_code")
+
+    # Check country
+    if not shipment.eu_pickup_country or not shipment.eu_pickup_country.strip():
+        missing_fields.append("country")
+
+    # Check weight
+    if not shipment.eu_pickup_weight or float(shipment.eu_pickup_weight) <= 0:
+        missing_fields.append("weight")
+
+    if missing_fields:
+        return None, missing_fields
+
+    # Prepare shipment data for Sendcloud (using new form fields with fallbacks)
+    shipment_data = {
+        "name": pickup_name.strip(),
+        "address": shipment.eu_pickup_address.strip(),
+        "city": shipment.eu_pickup_city.strip(),
+        "postal_code": shipment.eu_pickup_postal_code.strip(),
+        "country": shipment.eu_pickup_country.strip(),
+        "weight": float(shipment.eu_pickup_weight),
+    }
+
+    # Add optional fields with fallbacks
+    if shipment.eu_pickup_company_name:
+        shipment_data["company_name"] = shipment.eu_pickup_company_name
+
+    if shipment.eu_pickup_house_number:
+        shipment_data["house_number"] = shipment.eu_pickup_house_number
+
+    # Use fallback for email if missing (use receiver_email)
+    pickup_email = shipment.eu_pickup_email
+    if not pickup_email or not pickup_email.strip():
+        pickup_email = shipment.receiver_email
+    if pickup_email and pickup_email.strip():
+        shipment_data["email"] = pickup_email.strip()
+
+    # Use fallback for telephone if missing (use receiver_phone)
+    pickup_telephone = shipment.eu_pickup_telephone
+    if not pickup_telephone or not pickup_telephone.strip():
+        pickup_telephone = shipment.receiver_phone
+    if pickup_telephone and pickup_telephone.strip():
+        shipment_data["telephone"] = pickup_telephone.strip()
+
+    if shipment.shipment_number:
+        shipment_data["order_number"] = shipment.shipment_number
+
+    return shipment_data, []
+
+
+def _apply_sendcloud_parcel(shipment, sendcloud_result):
+    """Store a created Sendcloud parcel on the shipment and save it"""
+    shipment.sendcloud_id = sendcloud_result.get("sendcloud_id")
+    tracking_number = sendcloud_result.get("tracking_number", "")
+    shipment.tracking_number = tracking_number if tracking_number else ""
+
+    tracking_url = sendcloud_result.get("tracking_url")
+    shipment.tracking_url = tracking_url if tracking_url else None
+
+    label_url_a6 = sendcloud_result.get("label_url_a6")
+    label_url = sendcloud_result.get("label_url")
+    shipment.sendcloud_label_url = label_url_a6 or label_url or None
+
+    # Store A4 labels
+    normal_printer_labels = sendcloud_result.get("normal_printer_labels", [])
+    shipment.normal_printer_labels = (
+        normal_printer_labels if normal_printer_labels else []
+    )
+
+    # Update status
+    if shipment.sendcloud_id:
+        shipment.status = "PENDING_PICKUP"
+
+    shipment.save()
+
+
+def _eu_pickup_shipments_for_request(params):
+    """
+    Resolve the shipments targeted by a bulk EU pickup request
+
+    Accepts either "shipment_ids" (list or comma-separated string) or
+    "date" (YYYY-MM-DD, shipments created that day).
+
+    Returns:
+        Tuple (queryset, error message)
+    """
+    shipment_ids = params.get("shipment_ids")
+    date_str = params.get("date")
+
+    if shipment_ids:
+        if isinstance(shipment_ids, str):
+            shipment_ids = [part for part in shipment_ids.split(",") if part.strip()]
+        try:
+            shipment_ids = [int(shipment_id) for shipment_id in shipment_ids]
+        except (TypeError, ValueError):
+            return None, "shipment_ids must be a list of integers"
+        return LCLShipment.objects.filter(id__in=shipment_ids).order_by("id"), None
+
+    if date_str:
+        try:
+            day = datetime.strptime(str(date_str), "%Y-%m-%d").date()
+        except ValueError:
+            return None, "date must be in YYYY-MM-DD format"
+        return LCLShipment.objects.filter(created_at__date=day).order_by("id"), None
+
+    return None, "Provide shipment_ids or date"
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def approve_eu_shipping_view(request, shipment_id):
+    """
+    Admin endpoint to approve and create Sendcloud parcel for a shipment
+
+    POST /api/shipments/<shipment_id>/approve-eu-shipping/
+
+    Creates a parcel in Sendcloud using the form data from the shipment
+    """
+    from ..sendcloud_labels import prefetch_labels
+    from ..sendcloud_service import (
+        SendcloudAPIError,
+        SendcloudValidationError,
+        create_parcel,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    # Check if user is admin
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can approve EU shipping"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        # Get shipment
+        shipment = LCLShipment.objects.filter(id=shipment_id).first()
+        if not shipment:
+            return Response(
+                {"success": False, "error": "Shipment not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Check if shipment already has sendcloud_id
+        if shipment.sendcloud_id:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Shipment already has a Sendcloud parcel created",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check if required fields are present
+        if not shipment.selected_eu_shipping_method:
+            return Response(
+                {
+                    "success": False,
+                    "error": "No shipping method selected for this shipment",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        shipment_data, missing_fields = _build_eu_pickup_parcel_data(shipment)
+
+        if missing_fields:
+            return Response(
+                {
+                    "success": False,
+                    "error": f"Missing required EU pickup information: {', '.join(missing_fields)}",
+                    "missing_fields": missing_fields,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Create parcel in Sendcloud
+        logger.info(
+            f"Admin {request.user.username} approving EU shipping for shipment {shipment_id}"
+        )
+        logger.info(
+            f"Shipment data being sent to Sendcloud: {list(shipment_data.keys())}"
+        )
+        logger.debug(f"Full shipment data: {shipment_data}")
+        logger.info(
+            f"Selected shipping method ID: {shipment.selected_eu_shipping_method}"
+        )
+
+        try:
+            sendcloud_result = create_parcel(
+                shipment_data=shipment_data,
+                selected_shipping_method=shipment.selected_eu_shipping_method,
+            )
+        except Exception as e:
+            logger.error(f"Error calling create_parcel: {type(e).__name__}: {str(e)}")
+            import traceback
+
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            raise
+
+        # Update shipment with Sendcloud data
+        _apply_sendcloud_parcel(shipment, sendcloud_result)
+        prefetch_labels([shipment.sendcloud_id])
+
+        logger.info(
+            f"✅ Admin approved EU shipping for shipment {shipment_id}: sendcloud_id={shipment.sendcloud_id}"
+        )
+
+        return Response(
+            {
+                "success": True,
+                "message": "EU shipping approved and Sendcloud parcel created",
+                "sendcloud_id": shipment.sendcloud_id,
+                "tracking_number": shipment.tracking_number,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Validation error: {str(e)}")
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SendcloudAPIError as e:
+        error_msg = str(e)
+        logger.error(f"Sendcloud API error: {error_msg}")
+        # Return the actual error message to help with debugging
+        return Response(
+            {"success": False, "error": error_msg},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def approve_eu_shipping_bulk_view(request):
+    """
+    Admin endpoint to approve EU shipping for many shipments at once
+
+    POST /api/shipments/approve-eu-shipping/bulk/
+
+    Request Body (one of):
+    {"shipment_ids": [1, 2, 3]}
+    {"date": "2025-01-31"}   (all shipments created that day)
+
+    Shipments without a selected method, with missing pickup data or with an
+    existing parcel are skipped. The rest are created in Sendcloud with
+    multi-parcel requests (see sendcloud_service.create_parcels_bulk).
+    """
+    from ..sendcloud_labels import prefetch_labels
+    from ..sendcloud_service import SendcloudAPIError, create_parcels_bulk
+
+    logger = logging.getLogger(__name__)
+
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can approve EU shipping"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    shipments, error = _eu_pickup_shipments_for_request(request.data)
+    if error:
+        return Response(
+            {"success": False, "error": error},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = []
+    to_create = []
+
+    for shipment in shipments:
+        if shipment.sendcloud_id:
+            results.append(
+                {
+                    "shipment_id": shipment.id,
+                    "success": False,
+                    "error": "Shipment already has a Sendcloud parcel created",
+                }
+            )
+            continue
+
+        if not shipment.selected_eu_shipping_method:
+            results.append(
+                {
+                    "shipment_id": shipment.id,
+                    "success": False,
+                    "error": "No shipping method selected for this shipment",
+                }
+            )
+            continue
+
+        shipment_data, missing_fields = _build_eu_pickup_parcel_data(shipment)
+        if missing_fields:
+            results.append(
+                {
+                    "shipment_id": shipment.id,
+                    "success": False,
+                    "error": f"Missing required EU pickup information: {', '.join(missing_fields)}",
+                    "missing_fields": missing_fields,
+                }
+            )
+            continue
+
+        to_create.append((shipment, shipment_data))
+
+    if to_create:
+        logger.info(
+            f"Admin {request.user.username} approving EU shipping for {len(to_create)} shipments"
+        )
+        try:
+            created = create_parcels_bulk(
+                [
+                    (shipment_data, shipment.selected_eu_shipping_method)
+                    for shipment, shipment_data in to_create
+                ]
+            )
+        except SendcloudAPIError as e:
+            logger.error(f"Sendcloud API error: {str(e)}")
+            return Response(
+                {"success": False, "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        for (shipment, _), sendcloud_result in zip(to_create, created):
+            if "error" in sendcloud_result:
+                results.append(
+                    {
+                        "shipment_id": shipment.id,
+                        "success": False,
+                        "error": sendcloud_result["error"],
+                    }
+                )
+                continue
+
+            _apply_sendcloud_parcel(shipment, sendcloud_result)
+            results.append(
+                {
+                    "shipment_id": shipment.id,
+                    "success": True,
+                    "sendcloud_id": shipment.sendcloud_id,
+                    "tracking_number": shipment.tracking_number,
+                }
+            )
+
+    prefetch_labels([result["sendcloud_id"] for result in results if result["success"]])
+
+    approved = sum(1 for result in results if result["success"])
+    logger.info(f"✅ Bulk EU shipping approval: {approved}/{len(results)} approved")
+
+    return Response(
+        {
+            "success": True,
+            "approved": approved,
+            "total": len(results),
+            "results": results,
+        },
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def download_sendcloud_labels_bulk_view(request):
+    """
+    Admin endpoint to download the Sendcloud labels of many shipments as one PDF
+
+    GET /api/shipments/sendcloud-labels/bulk/?date=2025-01-31&type=normal_printer
+    GET /api/shipments/sendcloud-labels/bulk/?shipment_ids=1,2,3
+
+    Query params:
+        shipment_ids / date: see approve_eu_shipping_bulk_view
+        type: 'normal_printer' (A4) or 'label' (A6), default: 'normal_printer'
+    """
+    from ..sendcloud_service import (
+        SendcloudAPIError,
+        SendcloudValidationError,
+        download_labels_bulk,
+    )
+
+    logger = logging.getLogger(__name__)
+
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can download bulk labels"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    shipments, error = _eu_pickup_shipments_for_request(request.query_params)
+    if error:
+        return Response(
+            {"success": False, "error": error},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    parcel_ids = list(
+        shipments.filter(sendcloud_id__isnull=False).values_list(
+            "sendcloud_id", flat=True
+        )
+    )
+    if not parcel_ids:
+        return Response(
+            {"success": False, "error": "No Sendcloud parcels found"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+    label_type = request.query_params.get("type", "normal_printer")
+
+    try:
+        pdf_bytes, failed_ids = download_labels_bulk(parcel_ids, label_type)
+    except SendcloudValidationError as e:
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    except SendcloudAPIError as e:
+        logger.error(f"Failed to download bulk labels: {str(e)}")
+        return Response(
+            {"success": False, "error": str(e)},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+    response = HttpResponse(pdf_bytes, content_type="application/pdf")
+    filename = (
+        f"sendcloud_labels_{timezone.now().strftime('%Y%m%d_%H%M%S')}_{label_type}.pdf"
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if failed_ids:
+        response["X-Failed-Parcel-Ids"] = ",".join(str(i) for i in failed_ids)
+
+    logger.info(f"✅ Downloaded {label_type} labels for {len(parcel_ids)} parcels")
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def delete_eu_shipping_view(request, shipment_id):
+    """
+    Admin endpoint to delete/remove EU shipping method from a shipment
+
+    POST /api/shipments/<shipment_id>/delete-eu-shipping/
+
+    Removes the selected EU shipping method and related data
+    """
+    logger = logging.getLogger(__name__)
+
+    # Check if user is admin
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can delete EU shipping"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        # Get shipment
+        shipment = LCLShipment.objects.filter(id=shipment_id).first()
+        if not shipment:
+            return Response(
+                {"success": False, "error": "Shipment not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        # Check if sendcloud_id exists (parcel already created)
+        if shipment.sendcloud_id:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Cannot delete EU shipping: Sendcloud parcel already created. Contact Sendcloud support to cancel.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Remove EU shipping method and related data
+        shipment.selected_eu_shipping_method = None
+        shipment.selected_eu_shipping_name = ""
+        shipment.save()
+
+        logger.info(f"✅ Admin deleted EU shipping method for shipment {shipment_id}")
+
+        return Response(
+            {
+                "success": True,
+                "message": "EU shipping method removed successfully",
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "An unexpected error occurred"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@instrument_endpoint("sendcloud_webhook")
+@api_view(["POST"])
+@permission_classes([AllowAny])  # Webhooks come from Sendcloud, not authenticated users
+def sendcloud_webhook_view(request):
+    """
+    Handle Sendcloud webhook notifications
+
+    POST /api/sendcloud/webhook/
+
+    Headers:
+        Sendcloud-Signature: HMAC signature for verification
+
+    Body:
+    {
+        "parcel": {
+            "id": 12345,
+            "tracking_number": "3SABCD...",
+            "status": {
+                "id": 1,
+                "message": "delivered"
+            },
+            "carrier": {
+                "code": "postnl"
+            }
+        },
+        "timestamp": 1704103200000,
+        "action": "parcel_status_changed"
+    }
+
+    The event is queued and applied in batches by sendcloud_webhooks.
+
+    Security:
+    - Webhook signature verification (HMAC-SHA256)
+    - Payload validation
+    - Prevents fake webhook attacks
+    """
+    from ..sendcloud_service import (
+        SendcloudValidationError,
+        parse_webhook_data,
+        verify_webhook_signature,
+    )
+    from ..sendcloud_webhooks import enqueue_event
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        # ✅ STEP 1: Get signature from headers
+        signature = request.headers.get("Sendcloud-Signature", "")
+
+        # ✅ STEP 2: Verify webhook signature
+        if not verify_webhook_signature(request.body, signature):
+            logger.error(
+                "⚠️ Sendcloud webhook signature verification FAILED - rejecting request"
+            )
+            return Response(
+                {"success": False, "error": "Invalid signature"},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        logger.info("✅ Sendcloud webhook signature verified")
+
+        # ✅ STEP 3: Parse request body
+        try:
+            webhook_data = request.data
+        except Exception:
+            logger.error("Failed to parse webhook JSON")
+            return Response(
+                {"success": False, "error": "Invalid JSON"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # ✅ STEP 4: Validate and extract webhook data
+        validated_data = parse_webhook_data(webhook_data)
+
+        sendcloud_id = validated_data["sendcloud_id"]
+        tracking_number = validated_data["tracking_number"]
+        status_message = validated_data["status"]
+        carrier = validated_data["carrier"]
+
+        logger.info(
+            f"Webhook received: Parcel {sendcloud_id}, "
+            f"Tracking: {tracking_number}, Status: {status_message}, Carrier: {carrier}"
+        )
+
+        # ✅ STEP 5: Store the event before acknowledging it (Sendcloud does not
+        # redeliver acknowledged events); the worker applies it to the LCL
+        # shipment with this sendcloud_id (batched, last-write-wins)
+        enqueue_event(validated_data)
+        logger.info(f"Webhook stored for parcel {sendcloud_id}")
+
+        # ✅ Return 200 OK to acknowledge receipt
+        return Response(
+            {"success": True, "message": "Webhook processed"},
+            status=status.HTTP_200_OK,
+        )
+
+    except SendcloudValidationError as e:
+        logger.warning(f"Webhook validation failed: {str(e)}")
+        return Response(
+            {"success": False, "error": "Invalid webhook data"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    except Exception as e:
+        logger.error(f"Unexpected error in sendcloud_webhook: {type(e).__name__}")
+        logger.error(traceback.format_exc())
+        return Response(
+            {"success": False, "error": "Internal server error"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
@@ -0,0 +1,1142 @@
+"""
+LCL shipment endpoints: creation, listing, details and status updates
+"""
+
+import logging
+
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from ..email_service import (
+    send_lcl_shipment_payment_reminder_email,
+    send_lcl_shipment_payment_reminder_notification_to_admin,
+)
+from ..models import LCLShipment
+from ..pagination import CreatedAtCursorPagination
+from ..serializers import LCLShipmentListSerializer, LCLShipmentSerializer
+from ..whatsapp_service import send_lcl_shipment_whatsapp_notification
+from .common import _finish_recaptcha_check, _start_recaptcha_check
+from .uploads import _upload_error_response
+
+
+class LCLShipmentView(generics.CreateAPIView):
+    """API endpoint to create LCL shipment"""
+
+    serializer_class = LCLShipmentSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def create(self, request, *args, **kwargs):
+        """Override create to handle FormData with images and add reCAPTCHA verification"""
+        logger = logging.getLogger(__name__)
+        import json
+
+        from django.core.files.storage import default_storage
+        from rest_framework.exceptions import ValidationError
+
+        from ..photo_storage import (
+            ELECTRONICS_PHOTO_PREFIX,
+            PARCEL_PHOTO_PREFIX,
+            PhotoValidationError,
+            store_photo,
+        )
+        from ..upload_sessions import UploadSessionError, attach_uploaded_photos
+
+        # Stored photos, whose thumbnails are generated after the shipment is saved
+        saved_photos = []
+
+        def save_photo(uploaded_file, prefix):
+            """Store a photo; invalid images reject the request with a 400"""
+            try:
+                saved_path = store_photo(uploaded_file, prefix)
+                saved_photos.append(saved_path)
+                return saved_path
+            except PhotoValidationError as e:
+                logger.warning(f"⚠️ Rejected photo {uploaded_file.name}: {str(e)}")
+                raise ValidationError({"error": f"{uploaded_file.name}: {str(e)}"})
+
+        # Log immediately to verify method is called
+        logger.info("=" * 80)
+        logger.info("LCLShipmentView.create - METHOD CALLED")
+        logger.info(f"Request method: {request.method}")
+        logger.info(f"Content-Type: {request.content_type}")
+        logger.info(f"request.data type: {type(request.data)}")
+        logger.info(
+            f"request.data keys: {list(request.data.keys()) if hasattr(request.data, 'keys') else 'N/A'}"
+        )
+        logger.info(f"request.FILES keys: {list(request.FILES.keys())}")
+        logger.info(f"request.FILES count: {len(request.FILES)}")
+
+        # Check if request contains FormData with shipment_data
+        shipment_data_json = request.data.get("shipment_data")
+        logger.info(f"shipment_data_json exists: {shipment_data_json is not None}")
+        logger.info(f"shipment_data_json type: {type(shipment_data_json)}")
+        if shipment_data_json:
+            logger.info(f"shipment_data_json length: {len(str(shipment_data_json))}")
+
+        if shipment_data_json:
+            # Parse JSON data
+            try:
+                if isinstance(shipment_data_json, str):
+                    shipment_data = json.loads(shipment_data_json)
+                else:
+                    shipment_data = shipment_data_json
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.error(f"Failed to parse shipment_data JSON: {str(e)}")
+                return Response(
+                    {"success": False, "error": "Invalid shipment data format"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Extract parcels from shipment_data
+            parcels = shipment_data.get("parcels", [])
+            logger.info(f"Processing {len(parcels)} parcels with images")
+            logger.info(f"Available FILES keys: {list(request.FILES.keys())}")
+
+            # Process images and add URLs to parcels
+            for parcel_index, parcel in enumerate(parcels):
+                logger.info(
+                    f"Processing parcel {parcel_index}: isElectronics={parcel.get('isElectronicsShipment')}"
+                )
+                # Initialize image arrays
+                parcel["photo_urls"] = []
+                parcel["device_photo_url"] = None
+                parcel["electronics_picture_url"] = None
+
+                # Process parcel photos (for non-electronics)
+                photo_index = 0
+                while True:
+                    photo_key = f"parcel_{parcel_index}_photo_{photo_index}"
+                    if photo_key in request.FILES:
+                        photo_file = request.FILES[photo_key]
+                        logger.info(
+                            f"Found photo: {photo_key}, size: {photo_file.size}"
+                        )
+                        # Save photo (metadata stripped, stored by content hash)
+                        saved_path = save_photo(photo_file, PARCEL_PHOTO_PREFIX)
+                        # Get URL
+                        photo_url = default_storage.url(saved_path)
+                        parcel["photo_urls"].append(photo_url)
+                        logger.info(f"Saved photo {photo_index} to: {photo_url}")
+                        photo_index += 1
+                    else:
+                        break
+                logger.info(
+                    f"Parcel {parcel_index} has {len(parcel['photo_urls'])} photos"
+                )
+
+                # Process electronics photos
+                if parcel.get("isElectronicsShipment") or parcel.get(
+                    "is_electronics_shipment"
+                ):
+                    # Device photo
+                    device_photo_key = f"parcel_{parcel_index}_device_photo"
+                    if device_photo_key in request.FILES:
+                        device_photo_file = request.FILES[device_photo_key]
+                        saved_path = save_photo(
+                            device_photo_file, ELECTRONICS_PHOTO_PREFIX
+                        )
+                        parcel["device_photo_url"] = default_storage.url(saved_path)
+
+                    # Electronics picture
+                    electronics_picture_key = (
+                        f"parcel_{parcel_index}_electronics_picture"
+                    )
+                    if electronics_picture_key in request.FILES:
+                        electronics_picture_file = request.FILES[
+                            electronics_picture_key
+                        ]
+                        saved_path = save_photo(
+                            electronics_picture_file, ELECTRONICS_PHOTO_PREFIX
+                        )
+                        parcel["electronics_picture_url"] = default_storage.url(
+                            saved_path
+                        )
+
+            # Photos uploaded beforehand through resumable upload sessions
+            try:
+                saved_photos += attach_uploaded_photos(parcels, request.user)
+            except UploadSessionError as e:
+                return _upload_error_response(e)
+
+            # Clean up parcels: remove any File objects that might have been included
+            for parcel in parcels:
+                # Remove any File objects or empty objects that might have been serialized
+                if "photos" in parcel and isinstance(parcel["photos"], list):
+                    # Remove empty objects from photos array (these are File objects that were serialized)
+                    parcel["photos"] = [
+                        p
+                        for p in parcel["photos"]
+                        if p and not (isinstance(p, dict) and len(p) == 0)
+                    ]
+                    # If photos array is now empty or only contains empty objects, remove it
+                    if not parcel["photos"]:
+                        del parcel["photos"]
+
+                # Remove devicePhoto and electronicsPicture if they're empty objects
+                if (
+                    "devicePhoto" in parcel
+                    and isinstance(parcel["devicePhoto"], dict)
+                    and len(parcel["devicePhoto"]) == 0
+                ):
+                    del parcel["devicePhoto"]
+                if (
+                    "electronicsPicture" in parcel
+                    and isinstance(parcel["electronicsPicture"], dict)
+                    and len(parcel["electronicsPicture"]) == 0
+                ):
+                    del parcel["electronicsPicture"]
+
+            # Update shipment_data with processed parcels
+            shipment_data["parcels"] = parcels
+            logger.info(
+                f"Updated parcels with photo URLs. Parcel 0 has {parcels[0].get('photo_urls', []) if parcels else []} photos"
+            )
+            logger.info(
+                f"Final parcels data: {json.dumps(parcels, indent=2, default=str)[:500]}"
+            )
+
+            # Replace request.data with processed data for serializer
+            request._full_data = shipment_data
+        else:
+            # Regular JSON request (backward compatibility)
+            if isinstance(request.data, dict):
+                try:
+                    attach_uploaded_photos(request.data.get("parcels"), request.user)
+                except UploadSessionError as e:
+                    return _upload_error_response(e)
+            shipment_data = dict(request.data)
+
+        # Verify reCAPTCHA v3 token if provided
+        # Extract token the same way as registration - try request.data first, then shipment_data
+        recaptcha_token = request.data.get("recaptcha_token") or shipment_data.get(
+            "recaptcha_token"
+        )
+
+        # Check if reCAPTCHA is configured (standard v3 only)
+        from django.conf import settings
+
+        has_recaptcha_config = getattr(settings, "RECAPTCHA_SECRET_KEY", None)
+
+        if has_recaptcha_config:
+            # reCAPTCHA is configured, so token is required
+            if not recaptcha_token:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "reCAPTCHA verification is required. Please complete the reCAPTCHA verification.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Verify the token in the background while the data is validated
+        # (also when not configured - might be test key)
+        recaptcha_check = _start_recaptcha_check(
+            recaptcha_token, "create_shipment", request
+        )
+
+        # Validate payment method based on direction
+        direction = shipment_data.get("direction")
+        payment_method = shipment_data.get("payment_method")
+
+        if direction == "eu-sy":
+            # For EU to Syria: Allow both Stripe and cash payment
+            # If payment method is cash, set amount_paid to 0 (pay later)
+            if payment_method == "cash":
+                shipment_data["amount_paid"] = 0
+                shipment_data["payment_status"] = "pending"
+                logger.info(
+                    f"✅ EU to Syria shipment creation with cash payment (pay later): payment_method={payment_method}"
+                )
+            elif payment_method == "stripe":
+                logger.info(
+                    f"✅ EU to Syria shipment creation with Stripe: payment_method={payment_method}"
+                )
+            else:
+                logger.info(
+                    f"✅ EU to Syria shipment creation: payment_method={payment_method}"
+                )
+        elif direction == "sy-eu":
+            # For Syria to Europe: Allow creation with 0 paid_amount
+            # Set amount_paid to 0 if not provided
+            if (
+                "amount_paid" not in shipment_data
+                or shipment_data.get("amount_paid") is None
+            ):
+                shipment_data["amount_paid"] = 0
+                # Also update request.data for regular JSON requests (if mutable)
+                if not shipment_data_json:
+                    try:
+                        if hasattr(request.data, "_mutable"):
+                            request.data._mutable = True
+                            request.data["amount_paid"] = 0
+                            request.data._mutable = False
+                        else:
+                            # If request.data is not a QueryDict, it might be a dict - try to update it
+                            if isinstance(request.data, dict):
+                                request.data["amount_paid"] = 0
+                    except (AttributeError, TypeError) as e:
+                        logger.warning(
+                            f"Could not modify request.data for amount_paid: {str(e)}. Model default will be used."
+                        )
+            logger.info(
+                f"✅ Syria to Europe shipment creation allowed: amount_paid={shipment_data.get('amount_paid', 0)}"
+            )
+
+        # If we processed FormData, manually create serializer with processed data
+        if shipment_data_json:
+            # Ensure parcels is a list (not string) for JSONField
+            if "parcels" in shipment_data and isinstance(shipment_data["parcels"], str):
+                try:
+                    shipment_data["parcels"] = json.loads(shipment_data["parcels"])
+                except (json.JSONDecodeError, TypeError):
+                    logger.error("Failed to parse parcels JSON string")
+
+            logger.info(
+                f"Final shipment_data parcels type: {type(shipment_data.get('parcels'))}"
+            )
+            if shipment_data.get("parcels"):
+                logger.info(
+                    f"Final shipment_data first parcel: {json.dumps(shipment_data['parcels'][0] if len(shipment_data['parcels']) > 0 else {}, indent=2, default=str)[:500]}"
+                )
+
+            serializer = self.get_serializer(data=shipment_data)
+            serializer.is_valid(raise_exception=True)
+
+            recaptcha_error = _finish_recaptcha_check(
+                recaptcha_check,
+                bool(has_recaptcha_config),
+                "LCL shipment",
+                error_fields={"success": False},
+            )
+            if recaptcha_error:
+                return recaptcha_error
+
+            self.perform_create(serializer)
+
+            from ..image_derivatives import generate_derivatives_in_background
+
+            generate_derivatives_in_background(saved_photos)
+
+            # Refresh shipment from DB to get saved parcels
+            shipment = serializer.instance
+            shipment.refresh_from_db()
+            if shipment.parcels and len(shipment.parcels) > 0:
+                logger.info(
+                    f"After save, first parcel: {json.dumps(shipment.parcels[0], indent=2, default=str)[:500]}"
+                )
+
+            headers = self.get_success_headers(serializer.data)
+            return Response(
+                serializer.data, status=status.HTTP_201_CREATED, headers=headers
+            )
+
+        # Regular JSON requests
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        recaptcha_error = _finish_recaptcha_check(
+            recaptcha_check,
+            bool(has_recaptcha_config),
+            "LCL shipment",
+            error_fields={"success": False},
+        )
+        if recaptcha_error:
+            return recaptcha_error
+
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(
+            serializer.data, status=status.HTTP_201_CREATED, headers=headers
+        )
+
+    def perform_create(self, serializer):
+        """Set user to current authenticated user"""
+        serializer.save(user=self.request.user)
+
+        # Log creation
+        logger = logging.getLogger(__name__)
+        shipment = serializer.instance
+        logger.info(
+            f"Created LCL shipment {shipment.id} - {shipment.shipment_number} for user {self.request.user.id}"
+        )
+
+        # Send email notifications asynchronously to prevent timeout
+        try:
+            import threading
+
+            from ..email_service import (
+                send_lcl_shipment_confirmation_email,
+                send_lcl_shipment_notification_to_admin,
+            )
+
+            def send_emails_async():
+                """Send emails in background thread"""
+                try:
+                    # Send confirmation email to user
+                    send_lcl_shipment_confirmation_email(shipment)
+                    # Send notification email to admin
+                    send_lcl_shipment_notification_to_admin(shipment)
+                except Exception as email_error:
+                    logger.error(
+                        f"Failed to send LCL shipment email notifications: {str(email_error)}",
+                        exc_info=True,
+                    )
+
+            def send_whatsapp_async():
+                """Send WhatsApp notifications in background thread (to admin and user)"""
+                try:
+                    # Send WhatsApp notifications to both admin and user
+                    results = send_lcl_shipment_whatsapp_notification(shipment)
+                    if results.get("admin"):
+                        logger.info(
+                            f"LCL shipment WhatsApp notification sent to admin for shipment {shipment.id}"
+                        )
+                    if results.get("user"):
+                        logger.info(
+                            f"LCL shipment WhatsApp notification sent to user for shipment {shipment.id}"
+                        )
+                except Exception as whatsapp_error:
+                    logger.error(
+                        f"Failed to send LCL shipment WhatsApp notifications: {str(whatsapp_error)}",
+                        exc_info=True,
+                    )
+
+            # Start email sending in background thread
+            email_thread = threading.Thread(target=send_emails_async, daemon=True)
+            email_thread.start()
+            logger.info(
+                f"Started background thread for sending LCL shipment emails for shipment {shipment.id}"
+            )
+
+            # Start WhatsApp notification in background thread
+            whatsapp_thread = threading.Thread(target=send_whatsapp_async, daemon=True)
+            whatsapp_thread.start()
+            logger.info(
+                f"Started background thread for sending LCL shipment WhatsApp notification for shipment {shipment.id}"
+            )
+        except Exception as email_error:
+            logger.error(
+                f"Failed to start email thread for LCL shipment: {str(email_error)}",
+                exc_info=True,
+            )
+            # Don't fail the request if email fails
+
+
+class LCLShipmentListView(generics.ListAPIView):
+    """
+    API endpoint to list user's LCL shipments (or all shipments for admin)
+
+    Cursor-paginated on (-created_at, -id). Pass ?view=summary for the
+    compact LCLShipmentListSerializer representation (no parcels JSON).
+    """
+
+    serializer_class = LCLShipmentSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+
+    def is_summary(self):
+        return self.request.query_params.get("view") == "summary"
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return LCLShipmentListSerializer
+        return LCLShipmentSerializer
+
+    def get_queryset(self):
+        """Return shipments for the authenticated user, or all shipments if admin"""
+        if not self.request.user.is_authenticated:
+            return LCLShipment.objects.none()
+
+        # If user is superuser, return all shipments
+        if self.request.user.is_superuser:
+            queryset = LCLShipment.objects.all()
+        else:
+            # Regular user - only their shipments
+            queryset = LCLShipment.objects.filter(user=self.request.user)
+
+        # user_username/user_email come from the user row
+        queryset = queryset.select_related("user")
+
+        if self.is_summary():
+            queryset = queryset.only(
+                *(
+                    field
+                    for field in LCLShipmentListSerializer.Meta.fields
+                    if field != "user_username"
+                ),
+                "user__username",
+            )
+
+        return queryset
+
+
+class LCLShipmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+    """API endpoint to retrieve, update, or delete a specific LCL shipment"""
+
+    serializer_class = LCLShipmentSerializer
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    def get_queryset(self):
+        """Return shipments for the authenticated user, or all shipments if admin"""
+        if not self.request.user.is_authenticated:
+            return LCLShipment.objects.none()
+
+        # Admin can access all shipments, regular users only their own
+        if self.request.user.is_superuser:
+            return LCLShipment.objects.all()
+        return LCLShipment.objects.filter(user=self.request.user)
+
+    def get_serializer_context(self):
+        """Add request to serializer context"""
+        context = super().get_serializer_context()
+        context["request"] = self.request
+        return context
+
+    def update(self, request, *args, **kwargs):
+        """Override update to support partial updates"""
+        partial = kwargs.pop("partial", True)  # Always allow partial updates
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+
+        if getattr(instance, "_prefetched_object_cache", None):
+            instance._prefetched_object_cache = {}
+
+        # Thumbnails of newly uploaded transfer slips and signatures
+        from ..image_derivatives import (
+            SIGNATURE_VARIANTS,
+            generate_derivatives_in_background,
+        )
+
+        if "transfer_slip" in request.FILES and instance.transfer_slip:
+            generate_derivatives_in_background([instance.transfer_slip.name])
+        if "invoice_signature" in request.FILES and instance.invoice_signature:
+            generate_derivatives_in_background(
+                [instance.invoice_signature.name], SIGNATURE_VARIANTS
+            )
+
+        logger = logging.getLogger(__name__)
+        logger.info(
+            f"Updated LCL shipment {instance.id} - {instance.shipment_number} by user {request.user.id}"
+        )
+
+        return Response(serializer.data)
+
+    def destroy(self, request, *args, **kwargs):
+        """Delete LCL shipment"""
+        instance = self.get_object()
+
+        # Check if user is not admin and shipment status is PENDING_PAYMENT or later
+        if not request.user.is_superuser:
+            locked_statuses = [
+                "PENDING_PAYMENT",
+                "PENDING_PICKUP",
+                "IN_TRANSIT_TO_WATTWEG_5",
+                "ARRIVED_WATTWEG_5",
+                "SORTING_WATTWEG_5",
+                "READY_FOR_EXPORT",
+                "IN_TRANSIT_TO_DESTINATION",
+                "ARRIVED_DESTINATION",
+                "DESTINATION_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+                "CANCELLED",
+            ]
+            if instance.status in locked_statuses:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Cannot delete shipment after payment process has started. Only admins can delete shipments in this status.",
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        self.perform_destroy(instance)
+        return Response(
+            {"success": True, "message": "LCL shipment deleted successfully."},
+            status=status.HTTP_200_OK,
+        )
+
+
+@api_view(["PATCH"])
+@permission_classes([IsAuthenticated])
+def update_lcl_shipment_status_view(request, pk):
+    """API endpoint for admin to update LCL shipment status and amount_paid"""
+    logger = logging.getLogger(__name__)
+
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only superusers can update shipment status."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+        new_status = request.data.get("status")
+        amount_paid = request.data.get("amount_paid")
+        tracking_number = request.data.get("tracking_number")
+
+        # Log received data for debugging
+        logger.info(
+            f"📥 Received data: status={new_status}, amount_paid={amount_paid} (type: {type(amount_paid)}), tracking_number={tracking_number}"
+        )
+
+        # Store old status for email notification (before any updates)
+        old_status = shipment.status
+        old_payment_status = shipment.payment_status
+
+        logger.info(
+            f"📝 Updating shipment {shipment.id}: old_status={old_status}, new_status={new_status}, old_payment_status={old_payment_status}, amount_paid={amount_paid}, current_amount_paid={shipment.amount_paid}, total_price={shipment.total_price}"
+        )
+
+        # Update status if provided
+        if new_status:
+            # Validate status
+            valid_statuses = [choice[0] for choice in LCLShipment.STATUS_CHOICES]
+            if new_status not in valid_statuses:
+                return Response(
+                    {
+                        "success": False,
+                        "error": f"Invalid status. Valid statuses are: {', '.join(valid_statuses)}",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            # Check if payment is 100% before allowing status updates to certain statuses
+            restricted_statuses = [
+                "IN_TRANSIT_TO_WATTWEG_5",
+                "ARRIVED_WATTWEG_5",
+                "SORTING_WATTWEG_5",
+                "READY_FOR_EXPORT",
+                "IN_TRANSIT_TO_DESTINATION",
+                "ARRIVED_DESTINATION",
+                "DESTINATION_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+            ]
+            if new_status in restricted_statuses:
+                if shipment.total_price and shipment.total_price > 0:
+                    payment_percentage = (
+                        (shipment.amount_paid or 0) / shipment.total_price * 100
+                        if shipment.amount_paid
+                        else 0
+                    )
+                    if payment_percentage < 100:
+                        return Response(
+                            {
+                                "success": False,
+                                "error": f"Cannot update status to {new_status}. Payment must be 100% complete. Current payment: {payment_percentage:.1f}%",
+                            },
+                            status=status.HTTP_400_BAD_REQUEST,
+                        )
+
+            shipment.status = new_status
+
+        # Update amount_paid if provided
+        if amount_paid is not None:
+            try:
+                # Log the raw value before processing
+                logger.info(
+                    f"🔍 Processing amount_paid: {repr(amount_paid)} (type: {type(amount_paid).__name__})"
+                )
+
+                # Handle different input types (string, int, float, Decimal)
+                from decimal import Decimal
+
+                if isinstance(amount_paid, Decimal):
+                    amount_paid_decimal = float(amount_paid)
+                elif isinstance(amount_paid, str):
+                    # Remove any whitespace and try to convert
+                    amount_paid_clean = amount_paid.strip()
+                    if not amount_paid_clean or amount_paid_clean.lower() in [
+                        "null",
+                        "none",
+                        "",
+                    ]:
+                        raise ValueError(
+                            f"Empty or invalid string value: '{amount_paid}'"
+                        )
+                    try:
+                        amount_paid_decimal = float(amount_paid_clean)
+                    except ValueError as ve:
+                        logger.error(
+                            f"❌ Failed to convert string '{amount_paid_clean}' to float: {str(ve)}"
+                        )
+                        raise ValueError(
+                            f"Cannot convert '{amount_paid_clean}' to number: {str(ve)}"
+                        )
+                elif isinstance(amount_paid, (int, float)):
+                    amount_paid_decimal = float(amount_paid)
+                else:
+                    raise ValueError(f"Unsupported type: {type(amount_paid)}")
+
+                # Check for NaN or Infinity
+                import math
+
+                if math.isnan(amount_paid_decimal) or math.isinf(amount_paid_decimal):
+                    raise ValueError("Invalid numeric value (NaN or Infinity)")
+
+                if amount_paid_decimal < 0:
+                    return Response(
+                        {
+                            "success": False,
+                            "error": "Amount paid cannot be negative.",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                # Allow small tolerance (0.01) for floating point precision errors
+                tolerance = 0.01
+                # Convert total_price to float for comparison (it might be Decimal)
+                total_price_float = (
+                    float(shipment.total_price) if shipment.total_price else None
+                )
+                if (
+                    total_price_float
+                    and amount_paid_decimal > total_price_float + tolerance
+                ):
+                    return Response(
+                        {
+                            "success": False,
+                            "error": f"Amount paid ({amount_paid_decimal}) cannot be greater than total price ({total_price_float}).",
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                # Cap amount_paid to total_price if it's slightly over due to rounding
+                if total_price_float and amount_paid_decimal > total_price_float:
+                    amount_paid_decimal = total_price_float
+                    logger.info(
+                        f"⚠️ Capped amount_paid to total_price: {amount_paid_decimal}"
+                    )
+                shipment.amount_paid = amount_paid_decimal
+                logger.info(
+                    f"✅ Updated amount_paid to {amount_paid_decimal} for shipment {shipment.id}"
+                )
+            except (ValueError, TypeError) as e:
+                import traceback
+
+                logger.error(
+                    f"❌ Error converting amount_paid: {repr(amount_paid)} (type: {type(amount_paid)}), error: {str(e)}"
+                )
+                logger.error(f"❌ Traceback: {traceback.format_exc()}")
+                return Response(
+                    {
+                        "success": False,
+                        "error": f"Invalid amount_paid value: {repr(amount_paid)}. Please provide a valid number. Error: {str(e)}",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Update tracking_number if provided
+        if tracking_number is not None:
+            shipment.tracking_number = tracking_number
+
+        # Auto-update payment_status to "paid" when status changes from PENDING_PAYMENT to any other status
+        # This means admin confirmed the payment by changing the status
+        payment_status_updated = False
+
+        # If status is changing from PENDING_PAYMENT to any other status, payment is confirmed
+        if (
+            new_status
+            and old_status == "PENDING_PAYMENT"
+            and new_status != "PENDING_PAYMENT"
+        ):
+            # If admin is changing status from PENDING_PAYMENT, it means payment is confirmed
+            # Update payment_status to "paid" automatically
+            if shipment.payment_status != "paid":
+                shipment.payment_status = "paid"
+                payment_status_updated = True
+                if not shipment.paid_at:
+                    from django.utils import timezone
+
+                    shipment.paid_at = timezone.now()
+                logger.info(
+                    f"✅ Auto-updated payment_status to 'paid' for shipment {shipment.id} (admin confirmed payment by changing status from {old_status} to {new_status})"
+                )
+            else:
+                logger.info(
+                    f"ℹ️ payment_status already 'paid' for shipment {shipment.id}"
+                )
+
+        # Also: if status is being changed to PENDING_PICKUP or any status after PENDING_PAYMENT,
+        # and payment_status is still pending, update it to paid (admin confirmed payment)
+        if (
+            not payment_status_updated
+            and new_status
+            and new_status != "PENDING_PAYMENT"
+        ):
+            # Statuses that come after PENDING_PAYMENT (payment must be confirmed)
+            post_payment_statuses = [
+                "PENDING_PICKUP",
+                "IN_TRANSIT_TO_WATTWEG_5",
+                "ARRIVED_WATTWEG_5",
+                "SORTING_WATTWEG_5",
+                "READY_FOR_EXPORT",
+                "IN_TRANSIT_TO_DESTINATION",
+                "ARRIVED_DESTINATION",
+                "DESTINATION_SORTING",
+                "READY_FOR_DELIVERY",
+                "OUT_FOR_DELIVERY",
+                "DELIVERED",
+            ]
+            if (
+                new_status in post_payment_statuses
+                and shipment.payment_status == "pending"
+            ):
+                shipment.payment_status = "paid"
+                payment_status_updated = True
+                if not shipment.paid_at:
+                    from django.utils import timezone
+
+                    shipment.paid_at = timezone.now()
+                logger.info(
+                    f"✅ Auto-updated payment_status to 'paid' for shipment {shipment.id} (status changed to {new_status}, which requires payment confirmation)"
+                )
+
+        # Also update payment_status if amount_paid is being set and equals total_price
+        if (
+            not payment_status_updated
+            and amount_paid is not None
+            and shipment.total_price
+            and shipment.total_price > 0
+        ):
+            if (
+                float(amount_paid) >= float(shipment.total_price)
+                and shipment.payment_status != "paid"
+            ):
+                shipment.payment_status = "paid"
+                payment_status_updated = True
+                if not shipment.paid_at:
+                    from django.utils import timezone
+
+                    shipment.paid_at = timezone.now()
+                logger.info(
+                    f"✅ Auto-updated payment_status to 'paid' for shipment {shipment.id} (amount_paid {amount_paid} >= total_price {shipment.total_price})"
+                )
+
+        # Also check current amount_paid if status is being changed (even if not from PENDING_PAYMENT)
+        if not payment_status_updated and new_status and old_status != new_status:
+            if (
+                shipment.amount_paid
+                and shipment.total_price
+                and shipment.total_price > 0
+            ):
+                if (
+                    float(shipment.amount_paid) >= float(shipment.total_price)
+                    and shipment.payment_status != "paid"
+                ):
+                    shipment.payment_status = "paid"
+                    payment_status_updated = True
+                    if not shipment.paid_at:
+                        from django.utils import timezone
+
+                        shipment.paid_at = timezone.now()
+                    logger.info(
+                        f"✅ Auto-updated payment_status to 'paid' for shipment {shipment.id} (current amount_paid {shipment.amount_paid} >= total_price {shipment.total_price})"
+                    )
+
+        shipment.save()
+
+        # Generate invoice automatically if status changed from PENDING_PAYMENT to any other status
+        # and payment_status is 'paid'
+        if (
+            new_status
+            and old_status == "PENDING_PAYMENT"
+            and new_status != "PENDING_PAYMENT"
+        ):
+            if shipment.payment_status == "paid" and not shipment.invoice_file:
+                try:
+                    from ..document_service import (
+                        generate_invoice,
+                        save_invoice_to_storage,
+                    )
+                    from ..email_service import (
+                        send_invoice_email_to_admin,
+                        send_invoice_email_to_user,
+                    )
+
+                    # Generate regular invoice PDF
+                    pdf_bytes = generate_invoice(shipment, language="ar")
+
+                    # Save to storage
+                    save_invoice_to_storage(shipment, pdf_bytes)
+
+                    # Send standard invoice by email (user + admin)
+                    try:
+                        user_sent = send_invoice_email_to_user(shipment, pdf_bytes)
+                        admin_sent = send_invoice_email_to_admin(shipment, pdf_bytes)
+                        if user_sent:
+                            logger.info(
+                                f"✅ Invoice email sent to user for shipment {shipment.id}"
+                            )
+                        else:
+                            logger.warning(
+                                f"⚠️ Invoice email to user failed for shipment {shipment.id} (check email config or user email)"
+                            )
+                        if admin_sent:
+                            logger.info(
+                                f"✅ Invoice email sent to admin for shipment {shipment.id}"
+                            )
+                        else:
+                            logger.warning(
+                                f"⚠️ Invoice email to admin failed for shipment {shipment.id} (check email config)"
+                            )
+                    except Exception as email_error:
+                        logger.error(
+                            f"❌ Failed to send invoice emails: {str(email_error)}",
+                            exc_info=True,
+                        )
+                        # Don't fail if email fails
+
+                    logger.info(
+                        f"✅ Invoice generated and saved for shipment {shipment.id}"
+                    )
+                except Exception as invoice_error:
+                    # Log error but don't fail the request
+                    logger.error(
+                        f"Failed to generate invoice automatically: {str(invoice_error)}",
+                        exc_info=True,
+                    )
+
+            # Additionally, when moving from PENDING_PAYMENT to any other status (like PENDING_PICKUP),
+            # generate Consolidated Export Invoice for admin only
+            if (
+                new_status
+                and new_status != "PENDING_PAYMENT"
+                and shipment.payment_status == "paid"
+            ):
+                try:
+                    from ..document_service import (
+                        generate_consolidated_export_invoice_word,
+                    )
+                    from ..email_service import (
+                        send_consolidated_export_invoice_email_to_admin,
+                    )
+
+                    consolidated_docx = generate_consolidated_export_invoice_word(
+                        shipment, language="en"
+                    )
+                    admin_sent = send_consolidated_export_invoice_email_to_admin(
+                        shipment, consolidated_docx
+                    )
+                    if admin_sent:
+                        logger.info(
+                            f"✅ Consolidated export invoice generated and emailed for shipment {shipment.id}"
+                        )
+                    else:
+                        logger.warning(
+                            f"⚠️ Consolidated export invoice generated but email failed for shipment {shipment.id} (check email config)"
+                        )
+                except Exception as consolidated_error:
+                    logger.error(
+                        f"Failed to generate/send consolidated export invoice: {str(consolidated_error)}",
+                        exc_info=True,
+                    )
+
+        # Generate receipt automatically when shipment arrives at specific locations
+        # For eu-sy: when status changes to ARRIVED_WATTWEG_5
+        # For sy-eu: when status changes to ARRIVED_WATTWEG_5 (Arrived at Aleppo)
+        if new_status and not shipment.receipt_file:
+            should_generate_receipt = False
+
+            if shipment.direction == "eu-sy" and new_status == "ARRIVED_WATTWEG_5":
+                should_generate_receipt = True
+            elif shipment.direction == "sy-eu" and new_status == "ARRIVED_WATTWEG_5":
+                should_generate_receipt = True
+
+            if should_generate_receipt:
+                try:
+                    from ..document_service import (
+                        generate_receipt,
+                        save_receipt_to_storage,
+                    )
+                    from ..email_service import (
+                        send_receipt_email_to_admin,
+                        send_receipt_email_to_user,
+                    )
+
+                    # Generate receipt PDF
+                    pdf_bytes = generate_receipt(shipment, language="ar")
+
+                    # Save to storage
+                    save_receipt_to_storage(shipment, pdf_bytes)
+
+                    # Send receipt by email
+                    try:
+                        user_sent = send_receipt_email_to_user(shipment, pdf_bytes)
+                        admin_sent = send_receipt_email_to_admin(shipment, pdf_bytes)
+                        if user_sent:
+                            logger.info(
+                                f"✅ Receipt email sent to user for shipment {shipment.id}"
+                            )
+                        else:
+                            logger.warning(
+                                f"⚠️ Receipt email to user failed for shipment {shipment.id} (check email config or user email)"
+                            )
+                        if admin_sent:
+                            logger.info(
+                                f"✅ Receipt email sent to admin for shipment {shipment.id}"
+                            )
+                        else:
+                            logger.warning(
+                                f"⚠️ Receipt email to admin failed for shipment {shipment.id} (check email config)"
+                            )
+                    except Exception as email_error:
+                        logger.error(
+                            f"❌ Failed to send receipt emails: {str(email_error)}",
+                            exc_info=True,
+                        )
+                        # Don't fail if email fails
+
+                    logger.info(
+                        f"✅ Receipt generated and saved for shipment {shipment.id}"
+                    )
+                except Exception as receipt_error:
+                    # Log error but don't fail the request
+                    logger.error(
+                        f"Failed to generate receipt automatically: {str(receipt_error)}",
+                        exc_info=True,
+                    )
+
+        # Send email notifications if status was updated
+        if new_status:
+            try:
+                from ..email_service import (
+                    send_lcl_shipment_status_update_email,
+                    send_lcl_shipment_status_update_notification_to_admin,
+                )
+
+                # Send email to user
+                send_lcl_shipment_status_update_email(
+                    shipment=shipment,
+                    old_status=old_status,
+                    new_status=new_status,
+                )
+                # Send email to admin
+                send_lcl_shipment_status_update_notification_to_admin(
+                    shipment=shipment,
+                    old_status=old_status,
+                    new_status=new_status,
+                )
+            except Exception as email_error:
+                # Log email error but don't fail the request
+                logger = logging.getLogger(__name__)
+                logger.error(
+                    f"Failed to send status update email notifications: {str(email_error)}"
+                )
+
+        logger = logging.getLogger(__name__)
+        logger.info(
+            f"Admin {request.user.id} updated LCL shipment {shipment.id} - Status: {new_status or shipment.status}, Amount Paid: {amount_paid or shipment.amount_paid}"
+        )
+
+        serializer = LCLShipmentSerializer(shipment)
+        return Response(
+            {
+                "success": True,
+                "message": "Shipment updated successfully",
+                "data": serializer.data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "Shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error updating LCL shipment status: {str(e)}", exc_info=True)
+        return Response(
+            {"success": False, "error": f"An error occurred: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def send_lcl_shipment_payment_reminder_view(request, pk):
+    """API endpoint for admin to send payment reminder email to user for LCL shipment"""
+    if not request.user.is_superuser:
+        return Response(
+            {"success": False, "error": "Only admins can send payment reminders."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        shipment = LCLShipment.objects.get(pk=pk)
+
+        # Check if shipment has total price set
+        if not shipment.total_price or shipment.total_price <= 0:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Cannot send payment reminder. Total price must be set first.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Check if payment is already 100%
+        if shipment.total_price > 0:
+            payment_percentage = (
+                (shipment.amount_paid or 0) / shipment.total_price * 100
+                if shipment.amount_paid
+                else 0
+            )
+            if payment_percentage >= 100:
+                return Response(
+                    {
+                        "success": False,
+                        "error": "Payment is already 100% complete. No reminder needed.",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        # Send payment reminder emails
+        email_sent = send_lcl_shipment_payment_reminder_email(shipment)
+        # Also send notification to admin
+        send_lcl_shipment_payment_reminder_notification_to_admin(shipment)
+
+        if email_sent:
+            return Response(
+                {
+                    "success": True,
+                    "message": "Payment reminder email sent successfully.",
+                },
+                status=status.HTTP_200_OK,
+            )
+        else:
+            return Response(
+                {
+                    "success": False,
+                    "error": "Failed to send payment reminder email. Please check email configuration.",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+    except LCLShipment.DoesNotExist:
+        return Response(
+            {"success": False, "error": "LCL shipment not found."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error sending payment reminder: {str(e)}")
+        return Response(
+            {
+                "success": False,
+                "error": "An error occurred while processing the request.",
+            },
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        )
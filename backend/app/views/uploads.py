@@ -0,0 +1,106 @@
+"""
+Resumable photo upload endpoints (see upload_sessions.py)
+"""
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+
+def _upload_session_data(session):
+    from django.core.files.storage import default_storage
+
+    return {
+        "id": str(session.id),
+        "filename": session.filename,
+        "kind": session.kind,
+        "size": session.total_size,
+        "offset": session.received_size,
+        "status": session.status,
+        "chunk_size": settings.UPLOAD_CHUNK_SIZE,
+        "max_chunk_size": settings.UPLOAD_CHUNK_MAX_SIZE,
+        "url": (
+            default_storage.url(session.stored_name) if session.stored_name else None
+        ),
+    }
+
+
+def _upload_error_response(error):
+    return Response(
+        {"success": False, "error": str(error), **error.details},
+        status=error.status_code,
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_session_create_view(request):
+    """
+    Start a resumable photo upload
+
+    Body: {"filename": ..., "size": <bytes>, "kind": "parcel_photo" |
+    "electronics_photo"}. The chunks are then sent with PUT to
+    /api/uploads/<id>/?offset=<n>.
+    """
+    from ..upload_sessions import UploadSessionError, create_session
+
+    try:
+        session = create_session(
+            request.user,
+            request.data.get("filename", ""),
+            request.data.get("size"),
+            request.data.get("kind") or "parcel_photo",
+        )
+    except UploadSessionError as e:
+        return _upload_error_response(e)
+
+    return Response(
+        {"success": True, **_upload_session_data(session)},
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@api_view(["GET", "PUT"])
+@permission_classes([IsAuthenticated])
+def upload_session_view(request, upload_id):
+    """
+    GET: state of an upload; `offset` is where the next chunk starts
+    PUT: append a chunk (raw request body) at ?offset=<n> or the
+    Upload-Offset header
+    """
+    from ..upload_sessions import UploadSessionError, get_session, write_chunk
+
+    try:
+        if request.method == "GET":
+            session = get_session(upload_id, request.user)
+        else:
+            offset = request.query_params.get(
+                "offset", request.headers.get("Upload-Offset")
+            )
+            session = write_chunk(
+                upload_id,
+                request.user,
+                offset,
+                request.stream,
+                request.META.get("CONTENT_LENGTH"),
+            )
+    except UploadSessionError as e:
+        return _upload_error_response(e)
+
+    return Response({"success": True, **_upload_session_data(session)})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_session_complete_view(request, upload_id):
+    """Store a fully uploaded photo; its ID can then be used in a shipment"""
+    from ..upload_sessions import UploadSessionError, complete_session
+
+    try:
+        session = complete_session(upload_id, request.user)
+    except UploadSessionError as e:
+        return _upload_error_response(e)
+
+    return Response({"success": True, **_upload_session_data(session)})
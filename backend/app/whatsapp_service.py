@@ -5,7 +5,6 @@ WhatsApp messaging service using Twilio
 import logging
 
 from django.conf import settings
-from twilio.rest import Client
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +61,12 @@ def send_whatsapp_message(to_number: str, message: str) -> bool:
         return False
 
     try:
+        # Imported here: the Twilio SDK is only needed once a message is sent
+        from twilio.rest import Client
+
         # Initialize Twilio client
         client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+        client.api.base_url = settings.TWILIO_API_BASE
 
         # Format the 'from' number for WhatsApp (must be whatsapp:+...)
         from_number = settings.TWILIO_WHATSAPP_FROM_NUMBER
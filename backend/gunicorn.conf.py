@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration (gunicorn -c backend/gunicorn.conf.py)
+
+SERVER_MODE selects how requests are served:
+
+    wsgi  sync workers; each worker handles one request at a time
+    asgi  uvicorn workers; the Sendcloud and reCAPTCHA endpoints run as async
+          views (backend/app/async_views.py), so a worker keeps serving other
+          requests while they wait on the network
+
+Workers share their Prometheus metrics through PROMETHEUS_MULTIPROC_DIR
+(backend/app/prometheus_metrics.py).
+"""
+
+import os
+import shutil
+
+server_mode = os.environ.get("SERVER_MODE", "wsgi").strip().lower()
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "3"))
+timeout = 120
+accesslog = "-"
+errorlog = "-"
+
+if server_mode == "asgi":
+    wsgi_app = "backend.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "backend.wsgi:application"
+
+# Set before the workers start so every worker writes its metrics there
+prometheus_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc"
+)
+
+
+def on_starting(server):
+    # Files of a previous run would be added to the new values
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    # Drop the live gauges (emails in progress, queue depth) of the dead worker
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
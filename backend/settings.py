@@ -64,6 +64,29 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request wall/DB/HTTP/render timings (app/request_metrics.py): sent as
+# Server-Timing headers, logged, and aggregated per route at /api/admin/metrics/
+REQUEST_METRICS_ENABLED = config("REQUEST_METRICS_ENABLED", default=True, cast=bool)
+REQUEST_METRICS_SERVER_TIMING = config(
+    "REQUEST_METRICS_SERVER_TIMING", default=True, cast=bool
+)
+# Most recent requests kept per route for the percentiles (per worker process)
+REQUEST_METRICS_SAMPLES = config("REQUEST_METRICS_SAMPLES", default=1000, cast=int)
+if REQUEST_METRICS_ENABLED:
+    MIDDLEWARE.insert(0, "backend.app.request_metrics.RequestMetricsMiddleware")
+
+# Client addresses allowed to scrape /metrics (app/prometheus_metrics.py).
+# Prometheus scrapes the backend container directly; its host name must be in
+# ALLOWED_HOSTS as well (e.g. "backend").
+PROMETHEUS_METRICS_ALLOWED_NETWORKS = [
+    network.strip()
+    for network in config(
+        "PROMETHEUS_METRICS_ALLOWED_NETWORKS",
+        default="127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16",
+    ).split(",")
+    if network.strip()
+]
+
 ROOT_URLCONF = "backend.urls"
 
 TEMPLATES = [
@@ -156,7 +179,7 @@ SESSION_COOKIE_SECURE = config("SESSION_COOKIE_SECURE", default=False, cast=bool
 CSRF_COOKIE_SECURE = config("CSRF_COOKIE_SECURE", default=False, cast=bool)
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 # Exempt health endpoint from SSL redirect for healthchecks
-SECURE_REDIRECT_EXEMPT = ["/health/"]
+SECURE_REDIRECT_EXEMPT = ["/health/", r"^metrics$"]
 
 # Content Security Policy (CSP) - يمكن تخصيصه حسب الحاجة
 CSP_DEFAULT_SRC = ("'self'",)
@@ -225,6 +248,48 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads above this size are spooled to a temporary file instead of memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
+# Largest accepted parcel/electronics photo (nginx allows 20 MB per request)
+MAX_PHOTO_UPLOAD_SIZE = config(
+    "MAX_PHOTO_UPLOAD_SIZE", default=15 * 1024 * 1024, cast=int
+)
+
+# Protected files (invoices, receipts, transfer slips, labels, archive) are
+# sent by nginx: views answer with X-Accel-Redirect to these internal
+# locations. Without nginx (development) Django streams the files itself.
+USE_X_ACCEL_REDIRECT = config("USE_X_ACCEL_REDIRECT", default=False, cast=bool)
+PROTECTED_MEDIA_LOCATION = "/protected-media/"
+PROTECTED_ARCHIVE_LOCATION = "/protected-archive/"
+
+# Resumable (chunked) photo uploads: partial files are kept here until the
+# upload is completed, chunks are limited well below nginx's body size
+UPLOAD_SESSION_ROOT = Path(
+    config("UPLOAD_SESSION_ROOT", default=str(BASE_DIR / "upload_sessions"))
+)
+UPLOAD_CHUNK_SIZE = config("UPLOAD_CHUNK_SIZE", default=1024 * 1024, cast=int)
+UPLOAD_CHUNK_MAX_SIZE = config(
+    "UPLOAD_CHUNK_MAX_SIZE", default=5 * 1024 * 1024, cast=int
+)
+# Unfinished upload sessions are removed by cleanup_upload_sessions after this
+UPLOAD_SESSION_EXPIRY_HOURS = config(
+    "UPLOAD_SESSION_EXPIRY_HOURS", default=24, cast=int
+)
+
+# "wsgi": sync gunicorn workers; "asgi": uvicorn workers, with the endpoints
+# that mostly wait on Sendcloud/Google served by async views (app/async_views.py).
+# Read by backend/gunicorn.conf.py as well.
+SERVER_MODE = config("SERVER_MODE", default="wsgi").strip().lower()
+# Connection pool size of each async HTTP client per worker (app/async_http.py)
+ASYNC_HTTP_MAX_CONNECTIONS = config("ASYNC_HTTP_MAX_CONNECTIONS", default=100, cast=int)
+
+# Cold storage for media of archived records (not served by nginx)
+ARCHIVE_MEDIA_ROOT = Path(
+    config("ARCHIVE_MEDIA_ROOT", default=str(BASE_DIR / "archive_media"))
+)
+# Delivered/cancelled records older than this are archived by archive_records
+ARCHIVE_AFTER_DAYS = config("ARCHIVE_AFTER_DAYS", default=365, cast=int)
+
 # Email Configuration
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = config("EMAIL_HOST", default="smtp.gmail.com")
@@ -244,6 +309,7 @@ STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY", default="").strip()
 STRIPE_PUBLISHABLE_KEY = config("STRIPE_PUBLISHABLE_KEY", default="").strip()
 STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET", default="").strip()
 STRIPE_USE_TEST_MODE = config("STRIPE_USE_TEST_MODE", default=True, cast=bool)
+STRIPE_API_BASE = config("STRIPE_API_BASE", default="https://api.stripe.com").strip()
 
 # Stripe redirect URLs
 STRIPE_REDIRECT_SUCCESS_URL = config(
@@ -300,13 +366,68 @@ RECAPTCHA_ENTERPRISE_PROJECT_ID = config(
 # Recommended: 0.3-0.5 for better user experience, 0.7+ for stricter security
 RECAPTCHA_SCORE_THRESHOLD = config("RECAPTCHA_SCORE_THRESHOLD", default=0.3, cast=float)
 
+# How long form submissions wait for Google before accepting the token anyway
+# (fail-open). Set to 0 to always wait for the verification result.
+RECAPTCHA_FAIL_OPEN_SECONDS = config(
+    "RECAPTCHA_FAIL_OPEN_SECONDS", default=3.0, cast=float
+)
+
+# How long a successfully verified token is remembered, so client retries of
+# the same submission are not rejected by Google as duplicates
+RECAPTCHA_CACHE_SECONDS = config("RECAPTCHA_CACHE_SECONDS", default=120, cast=int)
+
+# Google endpoints used to verify tokens (standard v3 and Enterprise)
+RECAPTCHA_VERIFY_URL = config(
+    "RECAPTCHA_VERIFY_URL", default="https://www.google.com/recaptcha/api/siteverify"
+).strip()
+RECAPTCHA_ENTERPRISE_API_URL = config(
+    "RECAPTCHA_ENTERPRISE_API_URL",
+    default="https://recaptchaenterprise.googleapis.com/v1",
+).strip()
+
 SENDCLOUD_WEBHOOK_URL = config("SENDCLOUD_WEBHOOK_URL", default="")
 
 # Twilio WhatsApp Configuration
 TWILIO_ACCOUNT_SID = config("TWILIO_ACCOUNT_SID", default="").strip()
 TWILIO_AUTH_TOKEN = config("TWILIO_AUTH_TOKEN", default="").strip()
 TWILIO_WHATSAPP_FROM_NUMBER = config("TWILIO_WHATSAPP_FROM_NUMBER", default="").strip()
+TWILIO_API_BASE = config("TWILIO_API_BASE", default="https://api.twilio.com").strip()
 # Admin WhatsApp number to receive notifications (in E.164 format, e.g., +31683083916)
 TWILIO_ADMIN_WHATSAPP_NUMBER = config(
     "TWILIO_ADMIN_WHATSAPP_NUMBER", default=""
 ).strip()
+
+# Local service stubs (manage.py run_service_stubs) for load testing.
+# When set (e.g. http://127.0.0.1:8090), Sendcloud, Stripe, Twilio, reCAPTCHA
+# and SMTP all point to the stub server and missing credentials get dummy
+# values. Never set this in production.
+SERVICE_STUBS_URL = config("SERVICE_STUBS_URL", default="").strip().rstrip("/")
+SERVICE_STUBS_SMTP_PORT = config("SERVICE_STUBS_SMTP_PORT", default=8025, cast=int)
+
+if SERVICE_STUBS_URL:
+    from urllib.parse import urlsplit
+
+    SENDCLOUD_API_URL = f"{SERVICE_STUBS_URL}/sendcloud/api/v2/"
+    SENDCLOUD_PUBLIC_KEY = SENDCLOUD_PUBLIC_KEY or "stub-public-key"
+    SENDCLOUD_SECRET_KEY = SENDCLOUD_SECRET_KEY or "stub-secret-key"
+    SENDCLOUD_WEBHOOK_SECRET = SENDCLOUD_WEBHOOK_SECRET or "stub-webhook-secret"
+
+    STRIPE_API_BASE = f"{SERVICE_STUBS_URL}/stripe"
+    STRIPE_SECRET_KEY = STRIPE_SECRET_KEY or "sk_test_stub"
+    STRIPE_WEBHOOK_SECRET = STRIPE_WEBHOOK_SECRET or "whsec_stub"
+
+    TWILIO_API_BASE = f"{SERVICE_STUBS_URL}/twilio"
+    TWILIO_ACCOUNT_SID = TWILIO_ACCOUNT_SID or "ACstub"
+    TWILIO_AUTH_TOKEN = TWILIO_AUTH_TOKEN or "stub-auth-token"
+    TWILIO_WHATSAPP_FROM_NUMBER = TWILIO_WHATSAPP_FROM_NUMBER or "+31600000000"
+
+    RECAPTCHA_VERIFY_URL = f"{SERVICE_STUBS_URL}/recaptcha/api/siteverify"
+    RECAPTCHA_ENTERPRISE_API_URL = f"{SERVICE_STUBS_URL}/recaptcha-enterprise/v1"
+    RECAPTCHA_SECRET_KEY = RECAPTCHA_SECRET_KEY or "stub-recaptcha-secret"
+
+    EMAIL_HOST = urlsplit(SERVICE_STUBS_URL).hostname
+    EMAIL_PORT = SERVICE_STUBS_SMTP_PORT
+    EMAIL_USE_TLS = False
+    EMAIL_USE_SSL = False
+    EMAIL_HOST_USER = EMAIL_HOST_USER or "stub@example.com"
+    EMAIL_HOST_PASSWORD = EMAIL_HOST_PASSWORD or "stub-password"
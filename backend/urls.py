@@ -20,6 +20,8 @@ from django.contrib import admin
 from django.http import HttpResponse
 from django.urls import include, path
 
+from backend.app.prometheus_metrics import metrics_view
+
 
 def health_check(request):
     """Health check endpoint for Docker and load balancers"""
@@ -30,6 +32,8 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include("backend.app.urls")),
     path("health/", health_check, name="health"),
+    # Prometheus scrape endpoint, internal networks only (not routed by nginx)
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 # Serve media files in development
@@ -21,7 +21,7 @@ import Header from "@/components/Header";
 import Footer from "@/components/Footer";
 import { ShippingDirection, Parcel, PersonInfo } from "@/types/shipment";
 import { PricingResult } from "@/types/pricing";
-import { apiService } from "@/lib/api";
+import { apiService, uploadPhotoResumable } from "@/lib/api";
 import { useToast } from "@/contexts/ToastContext";
 import { useReCaptcha } from "@/components/ReCaptchaWrapper";
 
@@ -1786,7 +1786,7 @@ export default function CreateShipmentPage() {
 
                         // Prepare parcels data without File objects (for JSON)
                         // IMPORTANT: Do NOT include photos, devicePhoto, or electronicsPicture in JSON
-                        // These are File objects and will be sent separately in FormData
+                        // These are File objects and are uploaded separately (resumable uploads)
                         const parcelsData = parcels.map((parcel) => {
                           const parcelData: any = {
                             id: parcel.id,
@@ -1835,7 +1835,7 @@ export default function CreateShipmentPage() {
                           }
 
                           // Explicitly exclude File objects (photos, devicePhoto, electronicsPicture)
-                          // These will be sent separately in FormData
+                          // These are uploaded separately (resumable uploads)
                           // Make sure these fields are NOT in parcelData
                           delete parcelData.photos;
                           delete parcelData.devicePhoto;
@@ -1844,7 +1844,42 @@ export default function CreateShipmentPage() {
                           return parcelData;
                         });
 
-                        // Create FormData for file uploads
+                        // Upload photos in resumable chunks first; the
+                        // shipment only references their upload IDs
+                        for (
+                          let parcelIndex = 0;
+                          parcelIndex < parcels.length;
+                          parcelIndex++
+                        ) {
+                          const parcel = parcels[parcelIndex];
+                          const parcelData = parcelsData[parcelIndex];
+                          if (parcel.photos && parcel.photos.length > 0) {
+                            parcelData.photo_upload_ids = [];
+                            for (const photo of parcel.photos) {
+                              parcelData.photo_upload_ids.push(
+                                await uploadPhotoResumable(photo)
+                              );
+                            }
+                          }
+                          if (parcel.isElectronicsShipment) {
+                            if (parcel.devicePhoto) {
+                              parcelData.device_photo_upload_id =
+                                await uploadPhotoResumable(
+                                  parcel.devicePhoto,
+                                  "electronics_photo"
+                                );
+                            }
+                            if (parcel.electronicsPicture) {
+                              parcelData.electronics_picture_upload_id =
+                                await uploadPhotoResumable(
+                                  parcel.electronicsPicture,
+                                  "electronics_photo"
+                                );
+                            }
+                          }
+                        }
+
+                        // Create FormData for the shipment data
                         const formData = new FormData();
 
                         // Add all shipment data as JSON string
@@ -1904,50 +1939,6 @@ export default function CreateShipmentPage() {
                           })
                         );
 
-                        // Add parcel photos
-                        parcels.forEach((parcel, parcelIndex) => {
-                          // Parcel photos (for non-electronics)
-                          if (parcel.photos && parcel.photos.length > 0) {
-                            console.log(
-                              `Adding ${parcel.photos.length} photos for parcel ${parcelIndex}`
-                            );
-                            parcel.photos.forEach((photo, photoIndex) => {
-                              const key = `parcel_${parcelIndex}_photo_${photoIndex}`;
-                              formData.append(key, photo);
-                              console.log(
-                                `Added photo: ${key}, size: ${photo.size}`
-                              );
-                            });
-                          } else {
-                            console.log(`Parcel ${parcelIndex} has no photos`);
-                          }
-
-                          // Electronics photos
-                          if (parcel.isElectronicsShipment) {
-                            console.log(
-                              `Parcel ${parcelIndex} is electronics shipment`
-                            );
-                            if (parcel.devicePhoto) {
-                              formData.append(
-                                `parcel_${parcelIndex}_device_photo`,
-                                parcel.devicePhoto
-                              );
-                              console.log(
-                                `Added device photo for parcel ${parcelIndex}`
-                              );
-                            }
-                            if (parcel.electronicsPicture) {
-                              formData.append(
-                                `parcel_${parcelIndex}_electronics_picture`,
-                                parcel.electronicsPicture
-                              );
-                              console.log(
-                                `Added electronics picture for parcel ${parcelIndex}`
-                              );
-                            }
-                          }
-                        });
-
                         // Log FormData contents
                         console.log(
                           "FormData keys:",
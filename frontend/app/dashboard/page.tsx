@@ -5744,7 +5744,14 @@ export default function DashboardPage() {
                                                           className="block aspect-square rounded-lg overflow-hidden border-2 border-gray-200 hover:border-primary-yellow transition-all"
                                                         >
                                                           <img
-                                                            src={photoUrl}
+                                                            src={
+                                                              parcel
+                                                                .photo_derivatives?.[
+                                                                photoIdx
+                                                              ]?.thumb ||
+                                                              photoUrl
+                                                            }
+                                                            loading="lazy"
                                                             alt={`${
                                                               language === "ar"
                                                                 ? "صورة الطرد"
@@ -5786,8 +5793,12 @@ export default function DashboardPage() {
                                                       >
                                                         <img
                                                           src={
+                                                            parcel
+                                                              .device_photo_derivatives
+                                                              ?.thumb ||
                                                             parcel.device_photo_url
                                                           }
+                                                          loading="lazy"
                                                           alt={
                                                             language === "ar"
                                                               ? "صورة الجهاز"
@@ -5815,8 +5826,12 @@ export default function DashboardPage() {
                                                       >
                                                         <img
                                                           src={
+                                                            parcel
+                                                              .electronics_picture_derivatives
+                                                              ?.thumb ||
                                                             parcel.electronics_picture_url
                                                           }
+                                                          loading="lazy"
                                                           alt={
                                                             language === "ar"
                                                               ? "صورة الإلكترونيات"
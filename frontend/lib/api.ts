@@ -146,6 +146,30 @@ export const apiService = {
     return apiClient.put(`/shipments/${id}/`, data);
   },
 
+  // Resumable photo uploads (IDs are referenced in the shipment parcels)
+  createUploadSession: (data: {
+    filename: string;
+    size: number;
+    kind?: 'parcel_photo' | 'electronics_photo';
+  }) => {
+    return apiClient.post('/uploads/', data);
+  },
+
+  getUploadSession: (id: string) => {
+    return apiClient.get(`/uploads/${id}/`);
+  },
+
+  uploadChunk: (id: string, offset: number, chunk: Blob) => {
+    return apiClient.put(`/uploads/${id}/`, chunk, {
+      params: { offset },
+      headers: { 'Content-Type': 'application/octet-stream' },
+    });
+  },
+
+  completeUploadSession: (id: string) => {
+    return apiClient.post(`/uploads/${id}/complete/`);
+  },
+
   approveEUShipping: (shipmentId: number) => {
     return apiClient.post(`/shipments/${shipmentId}/approve-eu-shipping/`);
   },
@@ -588,5 +612,50 @@ export const apiService = {
   },
 };
 
+/**
+ * Upload a photo in chunks and return its upload ID.
+ *
+ * A failed chunk is retried after asking the server how much it received,
+ * so a dropped mobile connection only repeats the interrupted chunk.
+ */
+export const uploadPhotoResumable = async (
+  file: File,
+  kind: 'parcel_photo' | 'electronics_photo' = 'parcel_photo',
+  maxRetries = 5
+): Promise<string> => {
+  const session = await apiService.createUploadSession({
+    filename: file.name,
+    size: file.size,
+    kind,
+  });
+  const { id, chunk_size: chunkSize } = session.data;
+  let offset: number = session.data.offset || 0;
+  let failures = 0;
+
+  while (offset < file.size) {
+    try {
+      const response = await apiService.uploadChunk(
+        id,
+        offset,
+        file.slice(offset, offset + chunkSize)
+      );
+      offset = response.data.offset;
+      failures = 0;
+    } catch (error: any) {
+      failures += 1;
+      if (failures > maxRetries || (error.response && error.response.status !== 409 && error.response.status < 500)) {
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000 * failures));
+      // Continue from what the server actually stored
+      const state = await apiService.getUploadSession(id);
+      offset = state.data.offset;
+    }
+  }
+
+  await apiService.completeUploadSession(id);
+  return id;
+};
+
 export default apiService;
 